@@ -0,0 +1,506 @@
+# the functions of Solution as coroutines, on an asyncpg connection pool.
+# every function keeps the ReturnValue / business object contract of its Solution counterpart
+# and runs the same statements of Queries, so both modules can be used on the same tables.
+from typing import List, Iterable, Callable
+import Utility.AsyncDBConnector as Connector
+import Utility.Cache as Cache
+from Utility.ReturnValue import ReturnValue
+from Utility.Exceptions import DatabaseException
+from Business.Photo import Photo
+from Business.RAM import RAM
+from Business.Disk import Disk
+import Queries
+
+
+async def createTables():
+    conn = Connector.AsyncDBConnector()
+    try:
+        await conn.execute(Queries.CREATE_TABLES)
+        await conn.commit()
+        Cache.clearCaches()
+    except Exception as e:
+        print(e)
+    finally:
+        await conn.close()
+
+
+async def clearTables():
+    conn = Connector.AsyncDBConnector()
+    try:
+        await conn.execute(Queries.CLEAR_TABLES)
+        await conn.commit()
+        Cache.clearCaches()
+    except Exception as e:
+        print(e)
+    finally:
+        await conn.close()
+
+
+async def dropTables():
+    conn = Connector.AsyncDBConnector()
+    try:
+        await conn.execute(Queries.DROP_TABLES)
+        await conn.commit()
+        Cache.clearCaches()
+    except Exception as e:
+        print(e)
+    finally:
+        await conn.close()
+
+
+async def addPhoto(photo: Photo) -> ReturnValue:
+    conn = Connector.AsyncDBConnector()
+    try:
+        await conn.executePrepared("addPhoto", Queries.ADD_PHOTO,
+                                   (photo.getPhotoID(), photo.getDescription(), photo.getSize()))
+        await conn.commit()
+        Cache.photo_cache.invalidate(photo.getPhotoID())
+    except (DatabaseException.NOT_NULL_VIOLATION, DatabaseException.CHECK_VIOLATION) as e:
+        print(e)
+        return ReturnValue.BAD_PARAMS
+    except DatabaseException.UNIQUE_VIOLATION as e:
+        print(e)
+        return ReturnValue.ALREADY_EXISTS
+    except Exception as e:
+        print(e)
+        return ReturnValue.ERROR
+    finally:
+        # rolls back whatever was not committed
+        await conn.close()
+
+    return ReturnValue.OK
+
+
+async def getPhotoByID(photoID: int) -> Photo:
+    found, photo_entry = Cache.photo_cache.get(photoID)
+    if found:
+        return Photo.badPhoto() if photo_entry is None else Photo(photo_entry[0], photo_entry[1], photo_entry[2])
+    generation = Cache.photo_cache.generation()
+
+    conn = Connector.AsyncDBConnector()
+    try:
+        rows_effected, result = await conn.executePrepared("getPhotoByID", Queries.GET_PHOTO_BY_ID, (photoID,))
+        await conn.commit()
+    except Exception as e:
+        print(e)
+        return Photo.badPhoto()
+    finally:
+        await conn.close()
+
+    if rows_effected == 0:
+        Cache.photo_cache.put(photoID, None, generation)
+        return Photo.badPhoto()
+    photo_entry = tuple(result.rows[0])
+    Cache.photo_cache.put(photoID, photo_entry, generation)
+    return Photo(photo_entry[0], photo_entry[1], photo_entry[2])
+
+
+async def deletePhoto(photo: Photo) -> ReturnValue:
+    conn = Connector.AsyncDBConnector()
+    try:
+        # both statements run in the connection's transaction, committed together
+        _, freed = await conn.executePrepared("deletePhoto_freeSpace", Queries.DELETE_PHOTO_FREE_SPACE,
+                                              (photo.getPhotoID(), photo.getSize()))
+        await conn.executePrepared("deletePhoto", Queries.DELETE_PHOTO, (photo.getPhotoID(),))
+        await conn.commit()
+        Cache.photo_cache.invalidate(photo.getPhotoID())
+        Cache.disk_cache.invalidate(*(row[0] for row in freed.rows))
+    except Exception as e:
+        print(e)
+        return ReturnValue.ERROR
+    finally:
+        await conn.close()
+
+    return ReturnValue.OK
+
+
+async def addDisk(disk: Disk) -> ReturnValue:
+    conn = Connector.AsyncDBConnector()
+    try:
+        await conn.executePrepared("addDisk", Queries.ADD_DISK,
+                                   (disk.getDiskID(), disk.getCompany(), disk.getSpeed(), disk.getFreeSpace(),
+                                    disk.getCost()))
+        await conn.commit()
+        Cache.disk_cache.invalidate(disk.getDiskID())
+    except (DatabaseException.NOT_NULL_VIOLATION, DatabaseException.CHECK_VIOLATION) as e:
+        print(e)
+        return ReturnValue.BAD_PARAMS
+    except DatabaseException.UNIQUE_VIOLATION as e:
+        print(e)
+        return ReturnValue.ALREADY_EXISTS
+    except Exception as e:
+        print(e)
+        return ReturnValue.ERROR
+    finally:
+        await conn.close()
+
+    return ReturnValue.OK
+
+
+async def getDiskByID(diskID: int) -> Disk:
+    found, disk_entry = Cache.disk_cache.get(diskID)
+    if found:
+        if disk_entry is None:
+            return Disk.badDisk()
+        return Disk(disk_entry[0], disk_entry[1], disk_entry[2], disk_entry[3], disk_entry[4])
+    generation = Cache.disk_cache.generation()
+
+    conn = Connector.AsyncDBConnector()
+    try:
+        rows_effected, result = await conn.executePrepared("getDiskByID", Queries.GET_DISK_BY_ID, (diskID,))
+        await conn.commit()
+    except Exception as e:
+        print(e)
+        return Disk.badDisk()
+    finally:
+        await conn.close()
+
+    if rows_effected == 0:
+        Cache.disk_cache.put(diskID, None, generation)
+        return Disk.badDisk()
+    disk_entry = tuple(result.rows[0])
+    Cache.disk_cache.put(diskID, disk_entry, generation)
+    return Disk(disk_entry[0], disk_entry[1], disk_entry[2], disk_entry[3], disk_entry[4])
+
+
+async def deleteDisk(diskID: int) -> ReturnValue:
+    conn = Connector.AsyncDBConnector()
+    try:
+        rows_effected, result = await conn.executePrepared("deleteDisk", Queries.DELETE_DISK, (diskID,))
+        await conn.commit()
+        Cache.disk_cache.invalidate(diskID)
+    except Exception as e:
+        print(e)
+        return ReturnValue.ERROR
+    finally:
+        await conn.close()
+
+    if rows_effected != 1:
+        return ReturnValue.NOT_EXISTS
+    return ReturnValue.OK
+
+
+async def addRAM(ram: RAM) -> ReturnValue:
+    conn = Connector.AsyncDBConnector()
+    try:
+        await conn.executePrepared("addRAM", Queries.ADD_RAM, (ram.getRamID(), ram.getSize(), ram.getCompany()))
+        await conn.commit()
+        Cache.ram_cache.invalidate(ram.getRamID())
+    except (DatabaseException.NOT_NULL_VIOLATION, DatabaseException.CHECK_VIOLATION) as e:
+        print(e)
+        return ReturnValue.BAD_PARAMS
+    except DatabaseException.UNIQUE_VIOLATION as e:
+        print(e)
+        return ReturnValue.ALREADY_EXISTS
+    except Exception as e:
+        print(e)
+        return ReturnValue.ERROR
+    finally:
+        await conn.close()
+
+    return ReturnValue.OK
+
+
+async def getRAMByID(ramID: int) -> RAM:
+    found, ram_entry = Cache.ram_cache.get(ramID)
+    if found:
+        return RAM.badRAM() if ram_entry is None else RAM(ram_entry[0], ram_entry[2], ram_entry[1])
+    generation = Cache.ram_cache.generation()
+
+    conn = Connector.AsyncDBConnector()
+    try:
+        rows_effected, result = await conn.executePrepared("getRAMByID", Queries.GET_RAM_BY_ID, (ramID,))
+        await conn.commit()
+    except Exception as e:
+        print(e)
+        return RAM.badRAM()
+    finally:
+        await conn.close()
+
+    if rows_effected == 0:
+        Cache.ram_cache.put(ramID, None, generation)
+        return RAM.badRAM()
+    ram_entry = tuple(result.rows[0])
+    Cache.ram_cache.put(ramID, ram_entry, generation)
+    return RAM(ram_entry[0], ram_entry[2], ram_entry[1])
+
+
+async def deleteRAM(ramID: int) -> ReturnValue:
+    conn = Connector.AsyncDBConnector()
+    try:
+        rows_effected, result = await conn.executePrepared("deleteRAM", Queries.DELETE_RAM, (ramID,))
+        await conn.commit()
+        Cache.ram_cache.invalidate(ramID)
+    except Exception as e:
+        print(e)
+        return ReturnValue.ERROR
+    finally:
+        await conn.close()
+
+    if rows_effected != 1:
+        return ReturnValue.NOT_EXISTS
+    return ReturnValue.OK
+
+
+async def addDiskAndPhoto(disk: Disk, photo: Photo) -> ReturnValue:
+    conn = Connector.AsyncDBConnector()
+    try:
+        # same statements as addPhoto and addDisk, committed together
+        await conn.executePrepared("addPhoto", Queries.ADD_PHOTO,
+                                   (photo.getPhotoID(), photo.getDescription(), photo.getSize()))
+        await conn.executePrepared("addDisk", Queries.ADD_DISK,
+                                   (disk.getDiskID(), disk.getCompany(), disk.getSpeed(), disk.getFreeSpace(),
+                                    disk.getCost()))
+        await conn.commit()
+        Cache.photo_cache.invalidate(photo.getPhotoID())
+        Cache.disk_cache.invalidate(disk.getDiskID())
+    except DatabaseException.UNIQUE_VIOLATION as e:
+        print(e)
+        return ReturnValue.ALREADY_EXISTS
+    except Exception as e:
+        print(e)
+        return ReturnValue.ERROR
+    finally:
+        await conn.close()
+
+    return ReturnValue.OK
+
+
+# Solution._getByIDs: cached rows are served from the cache, the others are read with one = ANY statement
+# per Queries.IDS_PER_STATEMENT IDs. returns one entity per ID in request order
+async def _getByIDs(name: str, query: str, ids: Iterable[int], cache: Cache.EntityCache, toEntity: Callable,
+                    badEntity: Callable) -> list:
+    ids = list(ids)
+    rows = {}
+    missing = []
+    for entity_id in ids:
+        if entity_id in rows:
+            continue
+        found, row = cache.get(entity_id)
+        rows[entity_id] = row
+        if not found and entity_id is not None:
+            missing.append(entity_id)
+
+    if missing:
+        generation = cache.generation()
+        conn = Connector.AsyncDBConnector()
+        try:
+            for start in range(0, len(missing), Queries.IDS_PER_STATEMENT):
+                chunk = missing[start:start + Queries.IDS_PER_STATEMENT]
+                _, result = await conn.executePrepared(name, query, (chunk,))
+                for row in result.rows:
+                    rows[row[0]] = tuple(row)
+            await conn.commit()
+        except Exception as e:
+            print(e)
+            return [badEntity() for _ in ids]
+        finally:
+            await conn.close()
+
+        for entity_id in missing:
+            cache.put(entity_id, rows[entity_id], generation)
+
+    return [badEntity() if rows[entity_id] is None else toEntity(rows[entity_id]) for entity_id in ids]
+
+
+async def getPhotosByIDs(photoIDs: Iterable[int]) -> List[Photo]:
+    return await _getByIDs("getPhotosByIDs", Queries.GET_PHOTOS_BY_IDS, photoIDs, Cache.photo_cache,
+                           lambda entry: Photo(entry[0], entry[1], entry[2]), Photo.badPhoto)
+
+
+async def getDisksByIDs(diskIDs: Iterable[int]) -> List[Disk]:
+    return await _getByIDs("getDisksByIDs", Queries.GET_DISKS_BY_IDS, diskIDs, Cache.disk_cache,
+                           lambda entry: Disk(entry[0], entry[1], entry[2], entry[3], entry[4]), Disk.badDisk)
+
+
+async def getRAMsByIDs(ramIDs: Iterable[int]) -> List[RAM]:
+    return await _getByIDs("getRAMsByIDs", Queries.GET_RAMS_BY_IDS, ramIDs, Cache.ram_cache,
+                           lambda entry: RAM(entry[0], entry[2], entry[1]), RAM.badRAM)
+
+
+async def addPhotoToDisk(photo: Photo, diskID: int) -> ReturnValue:
+    conn = Connector.AsyncDBConnector()
+    try:
+        await conn.executePrepared("addPhotoToDisk", Queries.ADD_PHOTO_TO_DISK, (photo.getPhotoID(), diskID))
+        await conn.executePrepared("addPhotoToDisk_freeSpace", Queries.ADD_PHOTO_TO_DISK_FREE_SPACE,
+                                   (diskID, photo.getSize()))
+        await conn.commit()
+        Cache.disk_cache.invalidate(diskID)
+    except DatabaseException.FOREIGN_KEY_VIOLATION as e:
+        print(e)
+        return ReturnValue.NOT_EXISTS
+    except DatabaseException.UNIQUE_VIOLATION as e:
+        print(e)
+        return ReturnValue.ALREADY_EXISTS
+    except DatabaseException.CHECK_VIOLATION as e:
+        print(e)
+        return ReturnValue.BAD_PARAMS
+    except Exception as e:
+        print(e)
+        return ReturnValue.ERROR
+    finally:
+        await conn.close()
+
+    return ReturnValue.OK
+
+
+async def removePhotoFromDisk(photo: Photo, diskID: int) -> ReturnValue:
+    conn = Connector.AsyncDBConnector()
+    try:
+        await conn.executePrepared("removePhotoFromDisk_freeSpace", Queries.REMOVE_PHOTO_FROM_DISK_FREE_SPACE,
+                                   (photo.getPhotoID(), diskID, photo.getSize()))
+        await conn.executePrepared("removePhotoFromDisk", Queries.REMOVE_PHOTO_FROM_DISK,
+                                   (photo.getPhotoID(), diskID))
+        await conn.commit()
+        Cache.disk_cache.invalidate(diskID)
+    except Exception as e:
+        print(e)
+        return ReturnValue.ERROR
+    finally:
+        await conn.close()
+
+    return ReturnValue.OK
+
+
+async def addRAMToDisk(ramID: int, diskID: int) -> ReturnValue:
+    conn = Connector.AsyncDBConnector()
+    try:
+        await conn.executePrepared("addRAMToDisk", Queries.ADD_RAM_TO_DISK, (ramID, diskID))
+        await conn.commit()
+    except DatabaseException.FOREIGN_KEY_VIOLATION as e:
+        print(e)
+        return ReturnValue.NOT_EXISTS
+    except DatabaseException.UNIQUE_VIOLATION as e:
+        print(e)
+        return ReturnValue.ALREADY_EXISTS
+    except Exception as e:
+        print(e)
+        return ReturnValue.ERROR
+    finally:
+        await conn.close()
+
+    return ReturnValue.OK
+
+
+async def removeRAMFromDisk(ramID: int, diskID: int) -> ReturnValue:
+    conn = Connector.AsyncDBConnector()
+    try:
+        rows_effected, result = await conn.executePrepared("removeRAMFromDisk", Queries.REMOVE_RAM_FROM_DISK,
+                                                           (ramID, diskID))
+        await conn.commit()
+    except Exception as e:
+        print(e)
+        return ReturnValue.ERROR
+    finally:
+        await conn.close()
+
+    if rows_effected != 1:
+        return ReturnValue.NOT_EXISTS
+    return ReturnValue.OK
+
+
+# runs a statement returning a single number, -1 when the statement fails
+async def _fetchValue(name: str, query: str, params: tuple):
+    conn = Connector.AsyncDBConnector()
+    try:
+        rows_effected, result = await conn.executePrepared(name, query, params)
+        await conn.commit()
+    except Exception as e:
+        print(e)
+        return -1
+    finally:
+        await conn.close()
+
+    if result.isEmpty():
+        return 0
+    return result.rows[0][0]
+
+
+# runs a statement returning IDs in its first column, an empty list when the statement fails
+async def _fetchIDs(name: str, query: str, params: tuple = ()) -> List[int]:
+    conn = Connector.AsyncDBConnector()
+    try:
+        rows_effected, result = await conn.executePrepared(name, query, params)
+        await conn.commit()
+    except Exception as e:
+        print(e)
+        return []
+    finally:
+        await conn.close()
+
+    return [row[0] for row in result.rows]
+
+
+# runs a statement that returns a row when the answer is yes, False when the statement fails
+async def _fetchExists(name: str, query: str, params: tuple) -> bool:
+    conn = Connector.AsyncDBConnector()
+    try:
+        rows_effected, result = await conn.executePrepared(name, query, params)
+        await conn.commit()
+    except Exception as e:
+        print(e)
+        return False
+    finally:
+        await conn.close()
+
+    return not result.isEmpty()
+
+
+async def averagePhotosSizeOnDisk(diskID: int) -> float:
+    return await _fetchValue("averagePhotosSizeOnDisk", Queries.AVERAGE_PHOTOS_SIZE_ON_DISK, (diskID,))
+
+
+async def getTotalRamOnDisk(diskID: int) -> int:
+    return await _fetchValue("getTotalRamOnDisk", Queries.GET_TOTAL_RAM_ON_DISK, (diskID,))
+
+
+async def getCostForDescription(description: str) -> int:
+    return await _fetchValue("getCostForDescription", Queries.GET_COST_FOR_DESCRIPTION, (description,))
+
+
+async def getPhotosCanBeAddedToDisk(diskID: int) -> List[int]:
+    return await _fetchIDs("getPhotosCanBeAddedToDisk", Queries.GET_PHOTOS_CAN_BE_ADDED_TO_DISK, (diskID,))
+
+
+async def getPhotosCanBeAddedToDiskAndRAM(diskID: int) -> List[int]:
+    return await _fetchIDs("getPhotosCanBeAddedToDiskAndRAM", Queries.GET_PHOTOS_CAN_BE_ADDED_TO_DISK_AND_RAM,
+                           (diskID,))
+
+
+async def isCompanyExclusive(diskID: int) -> bool:
+    return await _fetchExists("isCompanyExclusive", Queries.IS_COMPANY_EXCLUSIVE, (diskID,))
+
+
+async def isDiskContainingAtLeastNumExists(description: str, num: int) -> bool:
+    return await _fetchExists("isDiskContainingAtLeastNumExists", Queries.IS_DISK_CONTAINING_AT_LEAST_NUM_EXISTS,
+                              (description, num))
+
+
+async def getDisksContainingTheMostData() -> List[int]:
+    return await _fetchIDs("getDisksContainingTheMostData", Queries.GET_DISKS_CONTAINING_THE_MOST_DATA)
+
+
+async def getConflictingDisks() -> List[int]:
+    return await _fetchIDs("getConflictingDisks", Queries.GET_CONFLICTING_DISKS)
+
+
+async def mostAvailableDisks() -> List[int]:
+    return await _fetchIDs("mostAvailableDisks", Queries.MOST_AVAILABLE_DISKS)
+
+
+async def getClosePhotos(photoID: int) -> List[int]:
+    conn = Connector.AsyncDBConnector()
+    try:
+        rows_effected, result = await conn.executePrepared("getClosePhotos_disks", Queries.GET_CLOSE_PHOTOS_DISKS,
+                                                            (photoID,))
+        disk_ids, has_pairs = result.rows[0]
+        name, query, params = Queries.closePhotos(photoID, disk_ids, has_pairs)
+        rows_effected, result = await conn.executePrepared(name, query, params)
+        await conn.commit()
+    except Exception as e:
+        print(e)
+        return []
+    finally:
+        await conn.close()
+
+    return [row[0] for row in result.rows]
@@ -0,0 +1,241 @@
+# Generates Photos, Disks, RAMs and their StoredOn / PartOf relations from a seed, with controllable shapes:
+#   photos, descriptions      the number of photos and of distinct descriptions among them, description_skew
+#                             the Zipf exponent of how often each description is used (0 for uniform)
+#   popularity_skew           the Zipf exponent of how often a photo is stored: the photo of rank k is picked
+#                             with weight 1 / k^popularity_skew, ranks are scattered over the photo IDs
+#   disks, fill_ratio         every disk gets a capacity between min_capacity and max_capacity and is filled with
+#                             photos up to fill_ratio of it, its free_space is what is left
+#   rams_per_disk, companies, companies_per_disk
+#                             the RAMs of a disk are of 1 to companies_per_disk of the companies, its own first
+# the same seed and settings always give the same rows. every row is computed from its ID (and every disk from
+# its own random stream), so the tables are streamed without being held in memory. to load them, run from the
+# code directory:
+#     python -m Benchmarks.DataGenerator --photos 1000000 --disks 10000 --seed 1
+# WARNING: drops and recreates the tables of the configured database.
+import argparse
+import math
+import random
+import time
+from typing import Iterator, List, Tuple
+import Solution
+import Utility.Cache as Cache
+import Utility.DBConnector as Connector
+from Business.Photo import Photo
+from Business.Batch import PhotoBatch, DiskBatch, RAMBatch
+
+GENERATOR_DEFAULTS = {
+    'photos': 100000,
+    'descriptions': 1000,
+    'description_skew': 0.0,
+    'min_photo_size': 1,
+    'max_photo_size': 1000,
+    'popularity_skew': 1.0,
+    'disks': 1000,
+    'min_capacity': 10000,
+    'max_capacity': 100000,
+    'fill_ratio': 0.5,
+    'rams_per_disk': 4,
+    'companies': 20,
+    'companies_per_disk': 2,
+}
+
+# a disk stops taking photos after this many draws in a row that are already on it or do not fit
+MAX_MISSES = 32
+
+# separate the hashes of the photo sizes, descriptions, disk streams and disk companies
+_SIZE, _DESCRIPTION, _DISK, _COMPANY, _RAM = range(5)
+_MASK = (1 << 64) - 1
+
+
+# splitmix64 of values, a well mixed 64-bit hash
+def _mix(*values: int) -> int:
+    h = 0x9E3779B97F4A7C15
+    for value in values:
+        h = ((h ^ value) * 0xBF58476D1CE4E5B9) & _MASK
+        h = ((h ^ (h >> 27)) * 0x94D049BB133111EB) & _MASK
+        h ^= h >> 31
+    return h
+
+
+# a rank in 1..n drawn with weight 1 / rank^skew from u in [0, 1), by inverting the distribution of the
+# continuous power law on [1, n + 1)
+def zipfRank(u: float, n: int, skew: float) -> int:
+    if skew == 0:
+        x = 1 + u * n
+    elif skew == 1:
+        x = (n + 1) ** u
+    else:
+        a = 1 - skew
+        x = (1 + u * ((n + 1) ** a - 1)) ** (1 / a)
+    return min(n, int(x))
+
+
+class DataGenerator:
+    def __init__(self, seed: int = 0, **settings):
+        unknown = set(settings) - set(GENERATOR_DEFAULTS)
+        if unknown:
+            raise ValueError("Unknown generator settings: " + ", ".join(sorted(unknown)))
+        self.seed = seed
+        self.settings = dict(GENERATOR_DEFAULTS, **settings)
+        if not 0 < self.settings['fill_ratio'] <= 1:
+            raise ValueError("fill_ratio must be in (0, 1]")
+        # photo ranks are mapped to IDs by a stride coprime with the number of photos
+        photos = max(self.settings['photos'], 1)
+        self.__stride = _mix(seed) % photos | 1
+        while math.gcd(self.__stride, photos) != 1:
+            self.__stride += 1
+
+    def photoSize(self, photoID: int) -> int:
+        low, high = self.settings['min_photo_size'], self.settings['max_photo_size']
+        return low + _mix(self.seed, _SIZE, photoID) % (high - low + 1)
+
+    def photoDescription(self, photoID: int) -> str:
+        u = (_mix(self.seed, _DESCRIPTION, photoID) >> 11) / (1 << 53)
+        return "description" + str(zipfRank(u, self.settings['descriptions'], self.settings['description_skew']))
+
+    # the photo of popularity rank, 1 the most popular
+    def photoOfRank(self, rank: int) -> int:
+        return (rank - 1) * self.__stride % self.settings['photos'] + 1
+
+    def diskCompany(self, diskID: int) -> str:
+        return "company" + str(_mix(self.seed, _COMPANY, diskID) % self.settings['companies'])
+
+    # (capacity, speed, cost, the IDs of the photos stored on it) of a disk, the photos in the order placed
+    def disk(self, diskID: int) -> Tuple[int, int, int, List[int]]:
+        settings = self.settings
+        rnd = random.Random(_mix(self.seed, _DISK, diskID))
+        capacity = rnd.randint(settings['min_capacity'], settings['max_capacity'])
+        speed, cost = rnd.randint(1, 100), rnd.randint(1, 100)
+        room = int(capacity * settings['fill_ratio'])
+        photos, skew = settings['photos'], settings['popularity_skew']
+        placed, chosen, misses = [], set(), 0
+        while misses < MAX_MISSES and len(placed) < photos:
+            photo_id = self.photoOfRank(zipfRank(rnd.random(), photos, skew))
+            size = self.photoSize(photo_id)
+            if photo_id in chosen or size > room:
+                misses += 1
+                continue
+            misses = 0
+            room -= size
+            chosen.add(photo_id)
+            placed.append(photo_id)
+        return capacity, speed, cost, placed
+
+    # the companies of the RAMs of a disk, the company of the disk first
+    def ramCompanies(self, diskID: int) -> List[str]:
+        settings = self.settings
+        rnd = random.Random(_mix(self.seed, _RAM, diskID))
+        own = self.diskCompany(diskID)
+        others = [company for company in ("company" + str(i) for i in range(settings['companies'])) if company != own]
+        count = rnd.randint(1, max(1, min(settings['companies_per_disk'], len(others) + 1)))
+        return [own] + rnd.sample(others, count - 1)
+
+    # rows in the column order of the tables
+    def photos(self) -> Iterator[tuple]:
+        for photo_id in range(1, self.settings['photos'] + 1):
+            yield photo_id, self.photoDescription(photo_id), self.photoSize(photo_id)
+
+    # the free space of every disk is its capacity less the photos of storedOn
+    def disks(self, placed=True) -> Iterator[tuple]:
+        for disk_id in range(1, self.settings['disks'] + 1):
+            capacity, speed, cost, photo_ids = self.disk(disk_id)
+            used = sum(self.photoSize(photo_id) for photo_id in photo_ids) if placed else 0
+            yield disk_id, self.diskCompany(disk_id), speed, capacity - used, cost
+
+    def rams(self) -> Iterator[tuple]:
+        per_disk = self.settings['rams_per_disk']
+        for disk_id in range(1, self.settings['disks'] + 1):
+            companies = self.ramCompanies(disk_id)
+            rnd = random.Random(_mix(self.seed, _RAM, disk_id, 1))
+            for index in range(per_disk):
+                yield (disk_id - 1) * per_disk + index + 1, rnd.randint(1, 64), companies[index % len(companies)]
+
+    def storedOn(self) -> Iterator[tuple]:
+        for disk_id in range(1, self.settings['disks'] + 1):
+            for photo_id in self.disk(disk_id)[3]:
+                yield photo_id, disk_id
+
+    def partOf(self) -> Iterator[tuple]:
+        per_disk = self.settings['rams_per_disk']
+        for disk_id in range(1, self.settings['disks'] + 1):
+            for index in range(per_disk):
+                yield (disk_id - 1) * per_disk + index + 1, disk_id
+
+
+# streams the tables of generator into empty tables, one COPY per table in a single transaction on PostgreSQL.
+# the other engines are loaded through Solution: addPhotos, addDisks and addRAMs in batches of chunk rows,
+# the photos placed by placePhotos (which takes their sizes off the free space) and addRAMToDisk, in a Session.
+# returns the number of rows loaded per table
+def load(generator: DataGenerator, chunk: int = 100000) -> dict:
+    if Solution.engine == "postgresql":
+        counts = {}
+        conn = Connector.DBConnector()
+        try:
+            counts["photos"] = conn.copy("photos", ["photo_id", "description", "size"], generator.photos())
+            counts["disks"] = conn.copy("disks", ["disk_id", "company", "speed", "free_space", "cost"],
+                                        generator.disks())
+            counts["rams"] = conn.copy("rams", ["ram_id", "size", "company"], generator.rams())
+            counts["storedon"] = conn.copy("storedon", ["photo_id", "disk_id"], generator.storedOn())
+            counts["partof"] = conn.copy("partof", ["ram_id", "disk_id"], generator.partOf())
+            conn.commit()
+            conn.execute("ANALYZE")
+            conn.commit()
+        finally:
+            conn.close()
+        Cache.clearCaches()
+        return counts
+
+    def batches(rows: Iterator[tuple], batchType: type):
+        batch = batchType()
+        for row in rows:
+            batch.appendRow(*row)
+            if len(batch) == chunk:
+                yield batch
+                batch = batchType()
+        if len(batch):
+            yield batch
+
+    counts = dict.fromkeys(["photos", "disks", "rams", "storedon", "partof"], 0)
+    with Solution.Session():
+        for name, rows, batchType, add in (("photos", generator.photos(), PhotoBatch, Solution.addPhotos),
+                                           ("disks", generator.disks(placed=False), DiskBatch, Solution.addDisks),
+                                           ("rams", generator.rams(), RAMBatch, Solution.addRAMs)):
+            for batch in batches(rows, batchType):
+                counts[name] += len(add(batch))
+        placements = []
+        for photo_id, disk_id in generator.storedOn():
+            placements.append((Photo(photo_id, None, generator.photoSize(photo_id)), disk_id))
+            if len(placements) == chunk:
+                counts["storedon"] += len(Solution.placePhotos(placements))
+                placements = []
+        counts["storedon"] += len(Solution.placePhotos(placements))
+        for ram_id, disk_id in generator.partOf():
+            Solution.addRAMToDisk(ram_id, disk_id)
+            counts["partof"] += 1
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engine", default="postgresql", choices=list(Solution.ENGINES))
+    for name, default in GENERATOR_DEFAULTS.items():
+        parser.add_argument("--" + name.replace("_", "-"), type=type(default), default=default)
+    args = parser.parse_args()
+
+    generator = DataGenerator(args.seed, **{name: getattr(args, name) for name in GENERATOR_DEFAULTS})
+    Solution.configureEngine(args.engine)
+    Solution.dropTables()
+    Solution.createTables()
+    start = time.perf_counter()
+    counts = load(generator)
+    elapsed = time.perf_counter() - start
+    for name, count in counts.items():
+        print("{:<12}{:>12} rows".format(name, count))
+    rows = sum(counts.values())
+    print("{:<12}{:>12} rows in {:.1f} s, {:.2f} million rows per minute".format(
+        "total", rows, elapsed, rows / elapsed * 60 / 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+# Measures the same workload on every engine of Solution.configureEngine: bulk loading, then a mix of placements,
+# lookups and analytics. run from the code directory:
+#     python -m Benchmarks.EngineBenchmark --photos 20000 --disks 200 --operations 5000
+# WARNING: drops and recreates the tables of the configured databases.
+import argparse
+import os
+import random
+import tempfile
+import time
+import Solution
+import Utility.SQLiteConnector as SQLite
+from Business.Batch import PhotoBatch, DiskBatch, RAMBatch
+
+
+def load(photos: int, disks: int, rnd: random.Random) -> float:
+    photo_batch, disk_batch, ram_batch = PhotoBatch(), DiskBatch(), RAMBatch()
+    for i in range(1, photos + 1):
+        photo_batch.appendRow(i, "description" + str(rnd.randrange(100)), rnd.randint(1, 100))
+    for i in range(1, disks + 1):
+        disk_batch.appendRow(i, "company" + str(i % 5), rnd.randint(1, 50), rnd.randint(1000, 100000),
+                             rnd.randint(1, 9))
+        ram_batch.appendRow(i, rnd.randint(1, 100), "company" + str(rnd.randrange(5)))
+    start = time.perf_counter()
+    Solution.addPhotos(photo_batch)
+    Solution.addDisks(disk_batch)
+    Solution.addRAMs(ram_batch)
+    for i in range(1, disks + 1):
+        Solution.addRAMToDisk(i, i)
+    return time.perf_counter() - start
+
+
+# the calls of the mixed workload, the same for every engine
+def workload(photos: int, disks: int, operations: int, rnd: random.Random) -> list:
+    calls = []
+    for _ in range(operations):
+        photo_id, disk_id = rnd.randint(1, photos), rnd.randint(1, disks)
+        calls.append(rnd.choice([
+            lambda photo_id=photo_id, disk_id=disk_id:
+                Solution.addPhotoToDisk(Solution.getPhotoByID(photo_id), disk_id),
+            lambda photo_id=photo_id, disk_id=disk_id:
+                Solution.removePhotoFromDisk(Solution.getPhotoByID(photo_id), disk_id),
+            lambda disk_id=disk_id: Solution.averagePhotosSizeOnDisk(disk_id),
+            lambda disk_id=disk_id: Solution.getPhotosCanBeAddedToDiskAndRAM(disk_id),
+            lambda disk_id=disk_id: Solution.isCompanyExclusive(disk_id),
+            lambda photo_id=photo_id: Solution.getClosePhotos(photo_id),
+            lambda: Solution.mostAvailableDisks(),
+            lambda: Solution.getDisksContainingTheMostData(),
+        ]))
+    return calls
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--photos", type=int, default=20000)
+    parser.add_argument("--disks", type=int, default=200)
+    parser.add_argument("--operations", type=int, default=5000, help="calls of the mixed workload")
+    parser.add_argument("--engines", default=",".join(Solution.ENGINES))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    directory = tempfile.TemporaryDirectory()
+    SQLite.configureSQLite(path=os.path.join(directory.name, "benchmark.db"))
+    print("{:<12}{:>14}{:>16}".format("engine", "load (s)", "mixed (calls/s)"))
+    try:
+        for name in args.engines.split(","):
+            Solution.configureEngine(name)
+            Solution.dropTables()
+            Solution.createTables()
+            try:
+                rnd = random.Random(args.seed)
+                loaded = load(args.photos, args.disks, rnd)
+                calls = workload(args.photos, args.disks, args.operations, rnd)
+                start = time.perf_counter()
+                for call in calls:
+                    call()
+                elapsed = time.perf_counter() - start
+                print("{:<12}{:>14.2f}{:>16.1f}".format(name, loaded, len(calls) / elapsed))
+            finally:
+                Solution.dropTables()
+    finally:
+        Solution.configureEngine("postgresql")
+        SQLite.closeConnection()
+        directory.cleanup()
+
+
+if __name__ == '__main__':
+    main()
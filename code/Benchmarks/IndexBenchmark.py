@@ -0,0 +1,117 @@
+# Measures the analytics functions of Solution with and without the secondary indexes of Queries.INDEXES.
+# run from the code directory (where Utility/database.ini is found):
+#     python -m Benchmarks.IndexBenchmark --photos 1000000 --disks 2000
+# WARNING: drops and recreates the tables of the configured database.
+import argparse
+import random
+import statistics
+import time
+import Solution
+import Queries
+import Utility.DBConnector as Connector
+from Business.Photo import Photo
+from Business.RAM import RAM
+from Business.Disk import Disk
+
+DESCRIPTIONS = 1000
+
+
+def seed(photos: int, disks: int, rams: int, copies: int, rnd: random.Random):
+    Solution.dropTables()
+    Solution.createTables()
+    Solution.addDisks(Disk(i, "company" + str(i % 20), rnd.randint(1, 100), 2 ** 31 - 1, rnd.randint(1, 100))
+                      for i in range(1, disks + 1))
+    Solution.addRAMs(RAM(i, "company" + str(i % 20), rnd.randint(1, 64)) for i in range(1, rams + 1))
+    Solution.addPhotos(Photo(i, "description" + str(rnd.randrange(DESCRIPTIONS)), rnd.randint(0, 1000))
+                       for i in range(1, photos + 1))
+    conn = Connector.DBConnector()
+    try:
+        # placement is not what is measured here, so the relations are copied in directly
+        conn.copy("storedon", ["photo_id", "disk_id"],
+                  ((photo_id, disk_id) for photo_id in range(1, photos + 1)
+                   for disk_id in rnd.sample(range(1, disks + 1), copies)))
+        conn.copy("partof", ["ram_id", "disk_id"], ((ram_id, rnd.randint(1, disks)) for ram_id in range(1, rams + 1)))
+        conn.commit()
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def setIndexes(enabled: bool):
+    conn = Connector.DBConnector()
+    try:
+        for name, definition in Queries.INDEXES.items():
+            conn.execute("DROP INDEX IF EXISTS " + name)
+            if enabled:
+                conn.execute(definition)
+        conn.commit()
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def measure(function, arguments) -> list:
+    latencies = []
+    for args in arguments:
+        start = time.perf_counter()
+        function(*args)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def run(photos: int, disks: int, calls: int, rnd: random.Random) -> dict:
+    disk_ids = [(rnd.randint(1, disks),) for _ in range(calls)]
+    cases = {
+        "getTotalRamOnDisk": (Solution.getTotalRamOnDisk, disk_ids),
+        "averagePhotosSizeOnDisk": (Solution.averagePhotosSizeOnDisk, disk_ids),
+        "isCompanyExclusive": (Solution.isCompanyExclusive, disk_ids),
+        "getPhotosCanBeAddedToDisk": (Solution.getPhotosCanBeAddedToDisk, disk_ids),
+        "getCostForDescription": (Solution.getCostForDescription,
+                                  [("description" + str(rnd.randrange(DESCRIPTIONS)),) for _ in range(calls)]),
+        "getClosePhotos": (Solution.getClosePhotos, [(rnd.randint(1, photos),) for _ in range(calls)]),
+    }
+    results = {}
+    for name, (function, arguments) in cases.items():
+        results[name] = measure(function, arguments)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--photos", type=int, default=1000000)
+    parser.add_argument("--disks", type=int, default=2000)
+    parser.add_argument("--rams", type=int, default=20000)
+    parser.add_argument("--copies", type=int, default=2, help="disks every photo is stored on")
+    parser.add_argument("--calls", type=int, default=20, help="calls per function and phase")
+    parser.add_argument("--seed", type=int, default=236363)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    start = time.perf_counter()
+    seed(args.photos, args.disks, args.rams, args.copies, rnd)
+    print("seeded " + str(args.photos) + " photos in " + "{:.1f}".format(time.perf_counter() - start) + "s")
+
+    setIndexes(False)
+    before = run(args.photos, args.disks, args.calls, random.Random(args.seed))
+    setIndexes(True)
+    after = run(args.photos, args.disks, args.calls, random.Random(args.seed))
+
+    # deleteDisk cascades into StoredOn and PartOf, every phase deletes its own disks
+    setIndexes(False)
+    before["deleteDisk"] = measure(Solution.deleteDisk, [(i,) for i in range(1, args.calls + 1)])
+    setIndexes(True)
+    after["deleteDisk"] = measure(Solution.deleteDisk, [(i,) for i in range(args.calls + 1, 2 * args.calls + 1)])
+
+    print("{:<28}{:>16}{:>16}{:>10}".format("function", "before (ms)", "after (ms)", "speedup"))
+    for name in before:
+        median_before = statistics.median(before[name])
+        median_after = statistics.median(after[name])
+        print("{:<28}{:>16.2f}{:>16.2f}{:>9.1f}x".format(name, median_before, median_after,
+                                                        median_before / max(median_after, 1e-9)))
+    Solution.dropTables()
+
+
+if __name__ == '__main__':
+    main()
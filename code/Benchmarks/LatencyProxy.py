@@ -0,0 +1,74 @@
+# A TCP proxy holding back everything it forwards by a fixed delay in each direction, a local stand-in for a
+# database behind a slow network. used by the benchmarks through Connector.configureConnection:
+#     proxy = LatencyProxy("localhost", 5432, delay_ms=5)
+#     Connector.configureConnection(host="127.0.0.1", port=proxy.start())
+import socket
+import threading
+import time
+from collections import deque
+
+
+class LatencyProxy:
+    def __init__(self, target_host: str, target_port: int, delay_ms: float, host="127.0.0.1", port=0):
+        self.target = (target_host, int(target_port))
+        self.delay = delay_ms / 1000
+        self.__listener = socket.create_server((host, port))
+        self.__closed = False
+
+    # starts accepting connections, returns the port to connect to
+    def start(self) -> int:
+        threading.Thread(target=self.__accept, daemon=True).start()
+        return self.__listener.getsockname()[1]
+
+    def close(self):
+        self.__closed = True
+        self.__listener.close()
+
+    def __accept(self):
+        while not self.__closed:
+            try:
+                client, _ = self.__listener.accept()
+            except OSError:
+                return
+            server = socket.create_connection(self.target)
+            for sock in (client, server):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.__forward(client, server)
+            self.__forward(server, client)
+
+    # what source sends reaches destination delay seconds later, in order
+    def __forward(self, source: socket.socket, destination: socket.socket):
+        chunks = deque()
+        ready = threading.Condition()
+
+        def read():
+            while True:
+                try:
+                    data = source.recv(65536)
+                except OSError:
+                    data = b""
+                with ready:
+                    chunks.append((time.perf_counter() + self.delay, data))
+                    ready.notify()
+                if not data:
+                    return
+
+        def write():
+            while True:
+                with ready:
+                    while not chunks:
+                        ready.wait()
+                    due, data = chunks.popleft()
+                pause = due - time.perf_counter()
+                if pause > 0:
+                    time.sleep(pause)
+                try:
+                    if not data:
+                        destination.shutdown(socket.SHUT_WR)
+                        return
+                    destination.sendall(data)
+                except OSError:
+                    return
+
+        threading.Thread(target=read, daemon=True).start()
+        threading.Thread(target=write, daemon=True).start()
@@ -0,0 +1,84 @@
+# Measures the memory held by many photos kept as dict-backed objects (the business classes before __slots__),
+# as the slotted Business.Photo and as a Business.Batch.PhotoBatch. needs no database. run from the code directory:
+#     python -m Benchmarks.MemoryBenchmark --objects 10000000
+import argparse
+import gc
+import os
+import time
+import tracemalloc
+from Business.Photo import Photo
+from Business.Batch import PhotoBatch
+
+
+# Business.Photo without __slots__, every instance has its own __dict__
+class DictPhoto:
+    def __init__(self, photoID=None, description=None, size=None):
+        self.__photoID = photoID
+        self.__description = description
+        self.__size = size
+
+    def getPhotoID(self):
+        return self.__photoID
+
+
+# distinct descriptions reused by the photos, like the generated data of the other benchmarks
+def descriptions(count: int) -> list:
+    return ["description" + str(i) for i in range(count)]
+
+
+def dictPhotos(objects: int, texts: list):
+    return [DictPhoto(i, texts[i % len(texts)], i % 1000) for i in range(objects)]
+
+
+def slottedPhotos(objects: int, texts: list):
+    return [Photo(i, texts[i % len(texts)], i % 1000) for i in range(objects)]
+
+
+def photoBatch(objects: int, texts: list):
+    batch = PhotoBatch()
+    for i in range(objects):
+        batch.appendRow(i, texts[i % len(texts)], i % 1000)
+    return batch
+
+
+def residentBytes() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+# (bytes held once built, seconds to build). the growth of the resident set by default, tracemalloc counts
+# exactly what Python allocated but keeps a trace per allocation, too much memory for millions of objects
+def measure(build, objects: int, texts: list, traced: bool) -> tuple:
+    gc.collect()
+    if traced:
+        tracemalloc.start()
+    before = residentBytes()
+    start = time.perf_counter()
+    held = build(objects, texts)
+    elapsed = time.perf_counter() - start
+    if traced:
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    else:
+        size = residentBytes() - before
+    del held
+    gc.collect()
+    return size, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--objects", type=int, default=10000000, help="photos held at once")
+    parser.add_argument("--descriptions", type=int, default=1000, help="distinct descriptions")
+    parser.add_argument("--tracemalloc", action="store_true", help="measure with tracemalloc")
+    args = parser.parse_args()
+
+    texts = descriptions(args.descriptions)
+    print("{:<16}{:>14}{:>14}{:>12}".format("", "MB", "bytes/photo", "build s"))
+    for name, build in (("dict objects", dictPhotos), ("slotted Photo", slottedPhotos), ("PhotoBatch", photoBatch)):
+        size, elapsed = measure(build, args.objects, texts, args.tracemalloc)
+        print("{:<16}{:>14.1f}{:>14.1f}{:>12.2f}".format(name, size / 2 ** 20, size / args.objects, elapsed))
+
+
+if __name__ == '__main__':
+    main()
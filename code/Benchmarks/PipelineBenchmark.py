@@ -0,0 +1,86 @@
+# Measures the throughput of Solution.runPipelined against the same calls made one by one, through a proxy
+# adding network latency (see Benchmarks.LatencyProxy). run from the code directory:
+#     python -m Benchmarks.PipelineBenchmark --latency-ms 2 --operations 2000 --depths 1,16,256
+# WARNING: drops and recreates the tables of the configured database.
+import argparse
+import time
+import Solution
+import Utility.Cache as Cache
+import Utility.DBConnector as Connector
+from Benchmarks.LatencyProxy import LatencyProxy
+from Business.Photo import Photo
+from Business.Disk import Disk
+
+# the calls made for every new ID, the same for both ways of running them
+CALLS_PER_ID = 7
+
+
+def calls(first: int, operations: int) -> list:
+    queue = []
+    for i in range(first, first + operations // CALLS_PER_ID):
+        photo = Photo(i, "description" + str(i % 1000), 1)
+        queue += [(Solution.addPhoto, photo),
+                  (Solution.addDisk, Disk(i, "company" + str(i % 20), 10, 1000, 10)),
+                  (Solution.addPhotoToDisk, photo, i),
+                  (Solution.addPhotoToDisk, photo, i),  # ALREADY_EXISTS
+                  (Solution.getPhotoByID, i),
+                  (Solution.removePhotoFromDisk, photo, i),
+                  (Solution.deletePhoto, photo)]
+    return queue
+
+
+# the results in a comparable form, business objects by their text
+def comparable(results: list) -> list:
+    return [result if isinstance(result, Solution.ReturnValue) else str(result) for result in results]
+
+
+def sequential(queue: list) -> list:
+    return [call[0](*call[1:]) for call in queue]
+
+
+def pipelined(queue: list, depth: int) -> list:
+    results = []
+    for start in range(0, len(queue), depth):
+        results += Solution.runPipelined(queue[start:start + depth])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="delay added in each direction")
+    parser.add_argument("--operations", type=int, default=2000, help="calls per measurement")
+    parser.add_argument("--depths", default="1,16,64,256", help="calls per runPipelined call")
+    args = parser.parse_args()
+
+    config = Connector.DBConnector.connectionConfig()
+    proxy = LatencyProxy(config.get("host", "localhost"), int(config.get("port", 5432)), args.latency_ms)
+    Connector.configureConnection(host="127.0.0.1", port=proxy.start())
+    Cache.configureCaches(enabled=False)
+    Solution.dropTables()
+    Solution.createTables()
+    try:
+        first = 1
+        queue = calls(first, args.operations)
+        start = time.perf_counter()
+        expected = comparable(sequential(queue))
+        elapsed = time.perf_counter() - start
+        print("{:<24}{:>12.1f} calls/s".format("one by one", len(queue) / elapsed))
+        for depth in [int(depth) for depth in args.depths.split(",")]:
+            first += args.operations
+            queue = calls(first, args.operations)
+            start = time.perf_counter()
+            results = comparable(pipelined(queue, depth))
+            elapsed = time.perf_counter() - start
+            # same ReturnValues as the calls made one by one, the IDs differ
+            same = [result if isinstance(result, Solution.ReturnValue) else None for result in results] == \
+                [result if isinstance(result, Solution.ReturnValue) else None for result in expected]
+            print("{:<24}{:>12.1f} calls/s{}".format("pipelined, depth " + str(depth), len(queue) / elapsed,
+                                                     "" if same else "  RESULTS DIFFER"))
+    finally:
+        Solution.dropTables()
+        Connector.closePool()
+        proxy.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,306 @@
+# Measures every Solution function on a synthetic dataset, with one client and with N concurrent clients,
+# and writes p50/p95/p99 latency, throughput and allocations to a JSON file that can be diffed across commits.
+# run from the code directory (where Utility/database.ini is found):
+#     python -m Benchmarks.SolutionBenchmark --photos 100000 --disks 2000 --clients 1,8 --output before.json
+#     python -m Benchmarks.SolutionBenchmark --compare before.json after.json
+# with --plans the plans of a few calls of every function are captured too (see Utility.PlanCapture):
+#     python -m Benchmarks.SolutionBenchmark --plans plans_before.json ...
+#     python -m Benchmarks.SolutionBenchmark --compare-plans plans_before.json plans_after.json
+# WARNING: drops and recreates the tables of the configured database.
+import argparse
+import itertools
+import json
+import platform
+import random
+import subprocess
+import threading
+import time
+import tracemalloc
+import Solution
+import Utility.Cache as Cache
+import Utility.DBConnector as Connector
+import Utility.PlanCapture as PlanCapture
+from Business.Photo import Photo
+from Business.RAM import RAM
+from Business.Disk import Disk
+
+DESCRIPTIONS = 1000
+COMPANIES = 20
+
+
+# photo-to-disk placement follows a Zipf law of exponent skew: disk k is picked with weight 1 / k^skew
+def seed(photos: int, disks: int, rams: int, copies: int, skew: float, rnd: random.Random):
+    Solution.dropTables()
+    Solution.createTables()
+    Solution.addDisks(Disk(i, "company" + str(i % COMPANIES), rnd.randint(1, 100), rnd.randint(0, 2000),
+                           rnd.randint(1, 100))
+                      for i in range(1, disks + 1))
+    Solution.addRAMs(RAM(i, "company" + str(i % COMPANIES), rnd.randint(1, 64)) for i in range(1, rams + 1))
+    Solution.addPhotos(Photo(i, "description" + str(rnd.randrange(DESCRIPTIONS)), rnd.randint(0, 1000))
+                       for i in range(1, photos + 1))
+    disk_ids = range(1, disks + 1)
+    cum_weights = list(itertools.accumulate(1 / k ** skew for k in disk_ids))
+    copies = min(copies, disks)
+
+    def placements():
+        for photo_id in range(1, photos + 1):
+            chosen = set()
+            while len(chosen) < copies:
+                chosen.update(rnd.choices(disk_ids, cum_weights=cum_weights, k=copies - len(chosen)))
+            for disk_id in chosen:
+                yield photo_id, disk_id
+
+    conn = Connector.DBConnector()
+    try:
+        # placement is measured by addPhotoToDisk, the seeded relations are copied in directly
+        conn.copy("storedon", ["photo_id", "disk_id"], placements())
+        conn.copy("partof", ["ram_id", "disk_id"], ((ram_id, rnd.randint(1, disks)) for ram_id in range(1, rams + 1)))
+        conn.commit()
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+# the benchmarked calls, in the order they run. every case maps (client, call) to the arguments of that call.
+# new_ids are IDs no seeded row uses: the write cases add them, link them, unlink them and delete them again
+def cases(photos: int, disks: int, rams: int, new_ids, pair_ids, seed_value: int) -> list:
+    def randomArgs(make):
+        return lambda client, call: make(random.Random(hash((seed_value, client, call))))
+
+    def newArgs(make):
+        return lambda client, call: make(new_ids(client, call))
+
+    return [
+        ("getPhotoByID", Solution.getPhotoByID, randomArgs(lambda r: (r.randint(1, photos),))),
+        ("getDiskByID", Solution.getDiskByID, randomArgs(lambda r: (r.randint(1, disks),))),
+        ("getRAMByID", Solution.getRAMByID, randomArgs(lambda r: (r.randint(1, rams),))),
+        ("averagePhotosSizeOnDisk", Solution.averagePhotosSizeOnDisk, randomArgs(lambda r: (r.randint(1, disks),))),
+        ("getTotalRamOnDisk", Solution.getTotalRamOnDisk, randomArgs(lambda r: (r.randint(1, disks),))),
+        ("getCostForDescription", Solution.getCostForDescription,
+         randomArgs(lambda r: ("description" + str(r.randrange(DESCRIPTIONS)),))),
+        ("getPhotosCanBeAddedToDisk", Solution.getPhotosCanBeAddedToDisk,
+         randomArgs(lambda r: (r.randint(1, disks),))),
+        ("getPhotosCanBeAddedToDiskAndRAM", Solution.getPhotosCanBeAddedToDiskAndRAM,
+         randomArgs(lambda r: (r.randint(1, disks),))),
+        ("isCompanyExclusive", Solution.isCompanyExclusive, randomArgs(lambda r: (r.randint(1, disks),))),
+        ("isDiskContainingAtLeastNumExists", Solution.isDiskContainingAtLeastNumExists,
+         randomArgs(lambda r: ("description" + str(r.randrange(DESCRIPTIONS)), r.randint(1, 10)))),
+        ("getDisksContainingTheMostData", Solution.getDisksContainingTheMostData, lambda client, call: ()),
+        ("getConflictingDisks", Solution.getConflictingDisks, lambda client, call: ()),
+        ("mostAvailableDisks", Solution.mostAvailableDisks, lambda client, call: ()),
+        ("getClosePhotos", Solution.getClosePhotos, randomArgs(lambda r: (r.randint(1, photos),))),
+        ("addPhoto", Solution.addPhoto, newArgs(lambda i: (Photo(i, "description" + str(i % DESCRIPTIONS), 1),))),
+        ("addDisk", Solution.addDisk, newArgs(lambda i: (Disk(i, "company" + str(i % COMPANIES), 10, 1000, 10),))),
+        ("addRAM", Solution.addRAM, newArgs(lambda i: (RAM(i, "company" + str(i % COMPANIES), 8),))),
+        ("addPhotoToDisk", Solution.addPhotoToDisk,
+         newArgs(lambda i: (Photo(i, "description" + str(i % DESCRIPTIONS), 1), i))),
+        ("addRAMToDisk", Solution.addRAMToDisk, newArgs(lambda i: (i, i))),
+        ("removePhotoFromDisk", Solution.removePhotoFromDisk,
+         newArgs(lambda i: (Photo(i, "description" + str(i % DESCRIPTIONS), 1), i))),
+        ("removeRAMFromDisk", Solution.removeRAMFromDisk, newArgs(lambda i: (i, i))),
+        ("deletePhoto", Solution.deletePhoto, newArgs(lambda i: (Photo(i, "description" + str(i % DESCRIPTIONS), 1),))),
+        ("deleteRAM", Solution.deleteRAM, newArgs(lambda i: (i,))),
+        ("deleteDisk", Solution.deleteDisk, newArgs(lambda i: (i,))),
+        ("addDiskAndPhoto", Solution.addDiskAndPhoto,
+         lambda client, call: (Disk(pair_ids(client, call), "company0", 10, 1000, 10),
+                               Photo(pair_ids(client, call), "description0", 1))),
+    ]
+
+
+# linear interpolation between the closest ranks of the sorted samples
+def percentile(samples: list, p: float) -> float:
+    if not samples:
+        return 0.0
+    position = (len(samples) - 1) * p / 100
+    lower = int(position)
+    upper = min(lower + 1, len(samples) - 1)
+    return samples[lower] + (samples[upper] - samples[lower]) * (position - lower)
+
+
+# runs calls calls of function on every client thread at once, returns the latencies (ms) and the wall time (s)
+def measure(function, arguments, clients: int, calls: int):
+    latencies = [[] for _ in range(clients)]
+    barrier = threading.Barrier(clients + 1)
+
+    def client(index):
+        barrier.wait()
+        for call in range(calls):
+            args = arguments(index, call)
+            start = time.perf_counter()
+            function(*args)
+            latencies[index].append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(clients)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return [latency for client_latencies in latencies for latency in client_latencies], time.perf_counter() - start
+
+
+# peak memory allocated by Python objects during a call, measured on a single client
+def measureAllocations(function, arguments, calls: int) -> list:
+    peaks = []
+    tracemalloc.start()
+    try:
+        for call in range(calls):
+            args = arguments(0, call)
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            function(*args)
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    finally:
+        tracemalloc.stop()
+    return sorted(peaks)
+
+
+def summary(latencies: list, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "calls": len(latencies),
+        "p50_ms": round(percentile(latencies, 50), 4),
+        "p95_ms": round(percentile(latencies, 95), 4),
+        "p99_ms": round(percentile(latencies, 99), 4),
+        "mean_ms": round(sum(latencies) / max(len(latencies), 1), 4),
+        "throughput_per_s": round(len(latencies) / max(elapsed, 1e-9), 2),
+    }
+
+
+def environment(args) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    conn = Connector.DBConnector()
+    try:
+        _, result = conn.execute("SHOW server_version")
+        server_version = result.rows[0][0]
+    finally:
+        conn.close()
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "postgresql": server_version,
+        "parameters": vars(args),
+    }
+
+
+def run(args) -> dict:
+    rnd = random.Random(args.seed)
+    start = time.perf_counter()
+    seed(args.photos, args.disks, args.rams, args.copies, args.skew, rnd)
+    seeding = time.perf_counter() - start
+    print("seeded " + str(args.photos) + " photos in " + "{:.1f}".format(seeding) + "s")
+
+    client_counts = sorted({int(clients) for clients in args.clients.split(",")})
+    Connector.configurePool(maxconn=max(client_counts + [Connector.POOL_DEFAULTS['maxconn']]))
+    selected = set(args.functions.split(",")) if args.functions else None
+    results = {}
+    base = max(args.photos, args.disks, args.rams) + 1
+    for level, clients in enumerate(client_counts):
+        # every phase adds, links and deletes rows of its own ID block
+        block = base + level * 2 * max(client_counts) * args.calls
+        new_ids = lambda client, call, block=block: block + client * args.calls + call
+        pair_ids = lambda client, call, block=block: block + (max(client_counts) + client) * args.calls + call
+        for name, function, arguments in cases(args.photos, args.disks, args.rams, new_ids, pair_ids, args.seed):
+            if selected is not None and name not in selected:
+                continue
+            latencies, elapsed = measure(function, arguments, clients, args.calls)
+            results.setdefault(name, {"clients": {}})["clients"][str(clients)] = summary(latencies, elapsed)
+            print("{:<34}{:>4} clients  p50 {:>9.3f} ms  p99 {:>9.3f} ms  {:>10.1f} calls/s".format(
+                name, clients, percentile(sorted(latencies), 50), percentile(sorted(latencies), 99),
+                results[name]["clients"][str(clients)]["throughput_per_s"]))
+
+    if args.alloc_calls > 0:
+        # a last block of new IDs, the write cases repeat their cycle once more under tracemalloc
+        block = base + len(client_counts) * 2 * max(client_counts) * args.calls
+        new_ids = lambda client, call: block + call
+        pair_ids = lambda client, call: block + args.alloc_calls + call
+        for name, function, arguments in cases(args.photos, args.disks, args.rams, new_ids, pair_ids, args.seed):
+            if selected is not None and name not in selected:
+                continue
+            peaks = measureAllocations(function, arguments, args.alloc_calls)
+            results[name]["allocations"] = {
+                "calls": len(peaks),
+                "peak_bytes_p50": int(percentile(peaks, 50)),
+                "peak_bytes_max": peaks[-1],
+            }
+
+    if args.plans:
+        # after the measured calls, so EXPLAIN ANALYZE does not slow them down. with the caches off every
+        # lookup runs its statement
+        block = base + len(client_counts) * 2 * max(client_counts) * args.calls + 2 * args.alloc_calls
+        new_ids = lambda client, call: block + call
+        pair_ids = lambda client, call: block + args.plan_calls + call
+        Cache.configureCaches(enabled=False)
+        PlanCapture.reset()
+        with PlanCapture.capture(args.plans):
+            for name, function, arguments in cases(args.photos, args.disks, args.rams, new_ids, pair_ids, args.seed):
+                if selected is None or name in selected:
+                    for call in range(args.plan_calls):
+                        function(*arguments(0, call))
+        Cache.configureCaches(**Cache.CACHE_DEFAULTS)
+        print("written " + str(len(PlanCapture.plans)) + " plans to " + args.plans)
+
+    report = {"environment": environment(args), "seeding_s": round(seeding, 2), "results": results}
+    Connector.DBConnector.pool_settings.clear()
+    Connector.closePool()
+    Solution.dropTables()
+    return report
+
+
+# prints the p50, p99 and throughput of every function and client count of two reports side by side
+def compare(before_path: str, after_path: str):
+    with open(before_path) as before_file, open(after_path) as after_file:
+        before, after = json.load(before_file)["results"], json.load(after_file)["results"]
+    print("{:<34}{:>8}{:>12}{:>12}{:>9}{:>12}{:>12}{:>9}".format(
+        "function", "clients", "p50 before", "p50 after", "ratio", "tput before", "tput after", "ratio"))
+    for name in before:
+        for clients, old in before[name]["clients"].items():
+            new = after.get(name, {}).get("clients", {}).get(clients)
+            if new is None:
+                continue
+            print("{:<34}{:>8}{:>12.3f}{:>12.3f}{:>8.2f}x{:>12.1f}{:>12.1f}{:>8.2f}x".format(
+                name, clients, old["p50_ms"], new["p50_ms"], old["p50_ms"] / max(new["p50_ms"], 1e-9),
+                old["throughput_per_s"], new["throughput_per_s"],
+                new["throughput_per_s"] / max(old["throughput_per_s"], 1e-9)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--photos", type=int, default=100000)
+    parser.add_argument("--disks", type=int, default=2000)
+    parser.add_argument("--rams", type=int, default=5000)
+    parser.add_argument("--copies", type=int, default=2, help="disks every photo is stored on")
+    parser.add_argument("--skew", type=float, default=1.0, help="Zipf exponent of the photo-to-disk placement")
+    parser.add_argument("--calls", type=int, default=50, help="calls per function and client")
+    parser.add_argument("--clients", default="1,8", help="comma separated client counts")
+    parser.add_argument("--alloc-calls", type=int, default=10, help="calls per function traced by tracemalloc")
+    parser.add_argument("--functions", default="", help="comma separated functions to run, all by default")
+    parser.add_argument("--seed", type=int, default=236363)
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="compare two reports and exit")
+    parser.add_argument("--plans", default="", help="capture the plans of every function into this file")
+    parser.add_argument("--plan-calls", type=int, default=3, help="calls per function captured with --plans")
+    parser.add_argument("--compare-plans", nargs=2, metavar=("BEFORE", "AFTER"),
+                        help="summarise the plan changes between two captures and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    if args.compare_plans:
+        PlanCapture.summarise(*(PlanCapture.load(path) for path in args.compare_plans))
+        return
+    report = run(args)
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2, sort_keys=True)
+    print("written " + args.output)
+
+
+if __name__ == '__main__':
+    main()
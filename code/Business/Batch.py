@@ -0,0 +1,178 @@
+from abc import ABC, abstractmethod
+from array import array
+from typing import Iterable
+from Business.Photo import Photo
+from Business.Disk import Disk
+from Business.RAM import RAM
+
+
+# integers packed into an array, turned into a list once a value does not fit (None, a huge integer)
+class _IntColumn:
+    __slots__ = ('values',)
+
+    def __init__(self):
+        self.values = array('q')
+
+    def append(self, value):
+        if type(self.values) is array and type(value) is int:
+            try:
+                self.values.append(value)
+                return
+            except OverflowError:
+                pass
+        if type(self.values) is array:
+            self.values = list(self.values)
+        self.values.append(value)
+
+    def __getitem__(self, index: int):
+        return self.values[index]
+
+    def __len__(self):
+        return len(self.values)
+
+
+# strings stored once each, the column itself holds the index of every value in strings
+class _StringColumn:
+    __slots__ = ('codes', 'strings', '__index')
+
+    def __init__(self):
+        self.codes = array('l')
+        self.strings = []
+        self.__index = {}
+
+    def append(self, value):
+        code = self.__index.get(value)
+        if code is None:
+            code = self.__index[value] = len(self.strings)
+            self.strings.append(value)
+        self.codes.append(code)
+
+    def __getitem__(self, index: int):
+        return self.strings[self.codes[index]]
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def values(self) -> list:
+        strings = self.strings
+        return [strings[code] for code in self.codes]
+
+
+# business objects held column by column, rows are ordered like the columns of their table.
+# an object is only built when one is read, the bulk functions of Solution read the rows directly
+class _Batch(ABC):
+    __slots__ = ('_columns',)
+
+    # the type of every column of the table, int or str
+    kinds = ()
+
+    def __init__(self, entities: Iterable = ()):
+        self._columns = [_IntColumn() if kind is int else _StringColumn() for kind in self.kinds]
+        self.extend(entities)
+
+    # the row of an entity, ordered like the columns of its table
+    @staticmethod
+    @abstractmethod
+    def toRow(entity) -> tuple:
+        pass
+
+    @staticmethod
+    @abstractmethod
+    def toEntity(row: tuple):
+        pass
+
+    def append(self, entity):
+        self.appendRow(*self.toRow(entity))
+
+    def appendRow(self, *row):
+        for column, value in zip(self._columns, row):
+            column.append(value)
+
+    def extend(self, entities: Iterable):
+        if isinstance(entities, _Batch):
+            for row in entities.rows():
+                self.appendRow(*row)
+            return
+        for entity in entities:
+            self.append(entity)
+
+    def __len__(self):
+        return len(self._columns[0])
+
+    # a new business object for the row, negative indexes count from the end
+    def __getitem__(self, index: int):
+        return self.toEntity(self.row(index))
+
+    def __iter__(self):
+        for row in self.rows():
+            yield self.toEntity(row)
+
+    def row(self, index: int) -> tuple:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("batch index out of range")
+        return tuple(column[index] for column in self._columns)
+
+    def rows(self) -> Iterable[tuple]:
+        return zip(*(column.values if isinstance(column, _IntColumn) else
+                     map(column.strings.__getitem__, column.codes) for column in self._columns))
+
+    # the values of the column at position col, an array('q') for integers that all fit in one
+    def column(self, col: int):
+        return self._columns[col].values
+
+
+class PhotoBatch(_Batch):
+    __slots__ = ()
+    kinds = (int, str, int)
+
+    @staticmethod
+    def toRow(photo: Photo) -> tuple:
+        return photo.getPhotoID(), photo.getDescription(), photo.getSize()
+
+    @staticmethod
+    def toEntity(row: tuple) -> Photo:
+        return Photo(row[0], row[1], row[2])
+
+    def getPhotoIDs(self):
+        return self.column(0)
+
+    def getSizes(self):
+        return self.column(2)
+
+
+class DiskBatch(_Batch):
+    __slots__ = ()
+    kinds = (int, str, int, int, int)
+
+    @staticmethod
+    def toRow(disk: Disk) -> tuple:
+        return disk.getDiskID(), disk.getCompany(), disk.getSpeed(), disk.getFreeSpace(), disk.getCost()
+
+    @staticmethod
+    def toEntity(row: tuple) -> Disk:
+        return Disk(row[0], row[1], row[2], row[3], row[4])
+
+    def getDiskIDs(self):
+        return self.column(0)
+
+    def getFreeSpaces(self):
+        return self.column(3)
+
+
+class RAMBatch(_Batch):
+    __slots__ = ()
+    kinds = (int, int, str)
+
+    @staticmethod
+    def toRow(ram: RAM) -> tuple:
+        return ram.getRamID(), ram.getSize(), ram.getCompany()
+
+    @staticmethod
+    def toEntity(row: tuple) -> RAM:
+        return RAM(row[0], row[2], row[1])
+
+    def getRamIDs(self):
+        return self.column(0)
@@ -1,4 +1,6 @@
 class Disk:
+    __slots__ = ('__diskID', '__company', '__speed', '__free_space', '__cost')
+
     def __init__(self, diskID=None, company=None, speed=None, free_space=None, cost=None):
         self.__diskID = diskID
         self.__company = company
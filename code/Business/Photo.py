@@ -1,4 +1,6 @@
 class Photo:
+    __slots__ = ('__photoID', '__description', '__size')
+
     def __init__(self, photoID=None, description=None, size=None):
         self.__photoID = photoID
         self.__description = description
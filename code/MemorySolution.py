@@ -0,0 +1,575 @@
+# the functions of Solution on Utility.MemoryEngine, tables held in this process instead of PostgreSQL.
+# every function keeps the ReturnValue / business object contract of its Solution counterpart: the engine raises
+# the DatabaseException PostgreSQL would, and they are handled the same way. select it with
+# Solution.configureEngine("memory") (or SOLUTION_ENGINE=memory) to run code written against Solution on it.
+# the analytics read the indexes of the engine: adjacency sets of StoredOn and PartOf, the sorted photo sizes and
+# IDs, photos by description and running sums per disk
+import bisect
+import heapq
+from collections import Counter
+from typing import List, Iterable, Tuple, Optional, Union
+from Utility.MemoryEngine import MemoryEngine
+from Utility.ReturnValue import ReturnValue
+from Utility.Exceptions import DatabaseException
+from Business.Photo import Photo
+from Business.RAM import RAM
+from Business.Disk import Disk
+from Business.Batch import PhotoBatch, DiskBatch, RAMBatch
+
+# the tables of this process, shared by every thread
+engine = MemoryEngine()
+
+
+# runs a sequence of calls in one transaction like Solution.Session: committed when the block ends, rolled back
+# if it raises. a failed call only undoes its own writes. other threads wait for the session to end
+class Session:
+    def __init__(self):
+        self.__savepoint = None
+
+    def __enter__(self):
+        self.__savepoint = engine.begin()
+        return self
+
+    def __exit__(self, kind, error, traceback):
+        engine.end(self.__savepoint, rollback=error is not None)
+        return False
+
+    # keep what the session did so far
+    def commit(self):
+        engine.commit()
+
+    # undo what the session did so far
+    def rollback(self):
+        engine.rollbackTo(0)
+
+
+def createTables():
+    try:
+        with engine.transaction():
+            engine.createTables()
+    except Exception as e:
+        print(e)
+
+
+def clearTables():
+    try:
+        with engine.transaction():
+            engine.clearTables()
+    except Exception as e:
+        print(e)
+
+
+def dropTables():
+    with engine.transaction():
+        engine.dropTables()
+
+
+# the disks whose running sums do not match StoredOn and PartOf, see Solution.checkDiskStats
+def checkDiskStats(rebuild: bool = False) -> Optional[List[int]]:
+    try:
+        with engine.transaction():
+            return engine.checkDiskStats(rebuild)
+    except Exception as e:
+        print(e)
+        return None
+
+
+# getClosePhotos reads the adjacency sets, there is no PhotoPairs table to create
+def createPhotoPairs():
+    pass
+
+
+def dropPhotoPairs():
+    pass
+
+
+def addPhoto(photo: Photo) -> ReturnValue:
+    try:
+        with engine.transaction():
+            engine.insertPhoto(photo.getPhotoID(), photo.getDescription(), photo.getSize())
+    except (DatabaseException.NOT_NULL_VIOLATION, DatabaseException.CHECK_VIOLATION) as e:
+        print(e)
+        return ReturnValue.BAD_PARAMS
+    except DatabaseException.UNIQUE_VIOLATION as e:
+        print(e)
+        return ReturnValue.ALREADY_EXISTS
+    except Exception as e:
+        print(e)
+        return ReturnValue.ERROR
+
+    return ReturnValue.OK
+
+
+def getPhotoByID(photoID: int) -> Photo:
+    try:
+        with engine.transaction():
+            photo_entry = engine.tables.photos.get(photoID)
+    except Exception as e:
+        print(e)
+        return Photo.badPhoto()
+
+    return Photo.badPhoto() if photo_entry is None else Photo(photo_entry[0], photo_entry[1], photo_entry[2])
+
+
+def deletePhoto(photo: Photo) -> ReturnValue:
+    try:
+        with engine.transaction():
+            tables = engine.tables
+            # the disks get back the space of the photo as given, before it is deleted with its StoredOn rows
+            for disk_id in sorted(tables.photo_disks.get(photo.getPhotoID(), ())):
+                free_space = tables.disks[disk_id][3]
+                engine.setFreeSpace(disk_id, None if photo.getSize() is None else free_space + photo.getSize())
+            engine.deletePhoto(photo.getPhotoID())
+    except Exception as e:
+        print(e)
+        return ReturnValue.ERROR
+
+    return ReturnValue.OK
+
+
+def addDisk(disk: Disk) -> ReturnValue:
+    try:
+        with engine.transaction():
+            engine.insertDisk(disk.getDiskID(), disk.getCompany(), disk.getSpeed(), disk.getFreeSpace(),
+                              disk.getCost())
+    except (DatabaseException.NOT_NULL_VIOLATION, DatabaseException.CHECK_VIOLATION) as e:
+        print(e)
+        return ReturnValue.BAD_PARAMS
+    except DatabaseException.UNIQUE_VIOLATION as e:
+        print(e)
+        return ReturnValue.ALREADY_EXISTS
+    except Exception as e:
+        print(e)
+        return ReturnValue.ERROR
+
+    return ReturnValue.OK
+
+
+def getDiskByID(diskID: int) -> Disk:
+    try:
+        with engine.transaction():
+            disk_entry = engine.tables.disks.get(diskID)
+    except Exception as e:
+        print(e)
+        return Disk.badDisk()
+
+    if disk_entry is None:
+        return Disk.badDisk()
+    return Disk(disk_entry[0], disk_entry[1], disk_entry[2], disk_entry[3], disk_entry[4])
+
+
+def deleteDisk(diskID: int) -> ReturnValue:
+    try:
+        with engine.transaction():
+            deleted = engine.deleteDisk(diskID)
+    except Exception as e:
+        print(e)
+        return ReturnValue.ERROR
+
+    return ReturnValue.OK if deleted else ReturnValue.NOT_EXISTS
+
+
+def addRAM(ram: RAM) -> ReturnValue:
+    try:
+        with engine.transaction():
+            engine.insertRAM(ram.getRamID(), ram.getSize(), ram.getCompany())
+    except (DatabaseException.NOT_NULL_VIOLATION, DatabaseException.CHECK_VIOLATION) as e:
+        print(e)
+        return ReturnValue.BAD_PARAMS
+    except DatabaseException.UNIQUE_VIOLATION as e:
+        print(e)
+        return ReturnValue.ALREADY_EXISTS
+    except Exception as e:
+        print(e)
+        return ReturnValue.ERROR
+
+    return ReturnValue.OK
+
+
+def getRAMByID(ramID: int) -> RAM:
+    try:
+        with engine.transaction():
+            ram_entry = engine.tables.rams.get(ramID)
+    except Exception as e:
+        print(e)
+        return RAM.badRAM()
+
+    return RAM.badRAM() if ram_entry is None else RAM(ram_entry[0], ram_entry[2], ram_entry[1])
+
+
+def deleteRAM(ramID: int) -> ReturnValue:
+    try:
+        with engine.transaction():
+            deleted = engine.deleteRAM(ramID)
+    except Exception as e:
+        print(e)
+        return ReturnValue.ERROR
+
+    return ReturnValue.OK if deleted else ReturnValue.NOT_EXISTS
+
+
+def addDiskAndPhoto(disk: Disk, photo: Photo) -> ReturnValue:
+    try:
+        # the photo first, like Solution, so a bad photo is reported before a duplicate disk
+        with engine.transaction():
+            engine.insertPhoto(photo.getPhotoID(), photo.getDescription(), photo.getSize())
+            engine.insertDisk(disk.getDiskID(), disk.getCompany(), disk.getSpeed(), disk.getFreeSpace(),
+                              disk.getCost())
+    except DatabaseException.UNIQUE_VIOLATION as e:
+        print(e)
+        return ReturnValue.ALREADY_EXISTS
+    except Exception as e:
+        print(e)
+        return ReturnValue.ERROR
+
+    return ReturnValue.OK
+
+
+# Solution._addInBulk: one ReturnValue per entry as if each was added on its own, ERROR for every entry if there
+# are no tables
+def _addInBulk(entries: Iterable, batchType: type, insert) -> List[ReturnValue]:
+    rows = list(entries.rows() if isinstance(entries, batchType) else map(batchType.toRow, entries))
+    results = []
+    try:
+        with engine.transaction():
+            if rows and engine.tables:
+                for row in rows:
+                    try:
+                        insert(*row)
+                        results.append(ReturnValue.OK)
+                    except (DatabaseException.NOT_NULL_VIOLATION, DatabaseException.CHECK_VIOLATION):
+                        results.append(ReturnValue.BAD_PARAMS)
+                    except DatabaseException.UNIQUE_VIOLATION:
+                        results.append(ReturnValue.ALREADY_EXISTS)
+                    except TypeError as e:
+                        # a value of the wrong type, only its own entry fails
+                        print(e)
+                        results.append(ReturnValue.ERROR)
+    except Exception as e:
+        print(e)
+        return [ReturnValue.ERROR] * len(rows)
+
+    return results
+
+
+def addPhotos(photos: Union[Iterable[Photo], PhotoBatch], useCopy=True) -> List[ReturnValue]:
+    return _addInBulk(photos, PhotoBatch, engine.insertPhoto)
+
+
+def addDisks(disks: Union[Iterable[Disk], DiskBatch], useCopy=True) -> List[ReturnValue]:
+    return _addInBulk(disks, DiskBatch, engine.insertDisk)
+
+
+def addRAMs(rams: Union[Iterable[RAM], RAMBatch], useCopy=True) -> List[ReturnValue]:
+    return _addInBulk(rams, RAMBatch, lambda ram_id, size, company: engine.insertRAM(ram_id, size, company))
+
+
+# Solution._getByIDs: one entity per ID in request order, or with asBatch a batchType of their rows
+def _getByIDs(table: str, ids: Iterable[int], batchType: type, badEntity, asBatch: bool):
+    ids = list(ids)
+    try:
+        with engine.transaction():
+            rows = getattr(engine.tables, table)
+            found = [rows.get(entity_id) for entity_id in ids]
+    except Exception as e:
+        print(e)
+        found = [None] * len(ids)
+
+    if asBatch:
+        batch = batchType()
+        bad = (None,) * len(batchType.kinds)
+        for row in found:
+            batch.appendRow(*(row or bad))
+        return batch
+    return [badEntity() if row is None else batchType.toEntity(row) for row in found]
+
+
+def getPhotosByIDs(photoIDs: Iterable[int], asBatch=False) -> Union[List[Photo], PhotoBatch]:
+    return _getByIDs("photos", photoIDs, PhotoBatch, Photo.badPhoto, asBatch)
+
+
+def getDisksByIDs(diskIDs: Iterable[int], asBatch=False) -> Union[List[Disk], DiskBatch]:
+    return _getByIDs("disks", diskIDs, DiskBatch, Disk.badDisk, asBatch)
+
+
+def getRAMsByIDs(ramIDs: Iterable[int], asBatch=False) -> Union[List[RAM], RAMBatch]:
+    return _getByIDs("rams", ramIDs, RAMBatch, RAM.badRAM, asBatch)
+
+
+# the StoredOn row first, then the free space of the disk less the size of the photo as given
+def _placePhoto(photo: Photo, diskID: int):
+    engine.insertStoredOn(photo.getPhotoID(), diskID)
+    free_space = engine.tables.disks[diskID][3]
+    engine.setFreeSpace(diskID, None if photo.getSize() is None else free_space - photo.getSize())
+
+
+def addPhotoToDisk(photo: Photo, diskID: int) -> ReturnValue:
+    try:
+        with engine.transaction():
+            _placePhoto(photo, diskID)
+    except DatabaseException.FOREIGN_KEY_VIOLATION as e:
+        print(e)
+        return ReturnValue.NOT_EXISTS
+    except DatabaseException.UNIQUE_VIOLATION as e:
+        print(e)
+        return ReturnValue.ALREADY_EXISTS
+    except DatabaseException.CHECK_VIOLATION as e:
+        print(e)
+        return ReturnValue.BAD_PARAMS
+    except Exception as e:
+        print(e)
+        return ReturnValue.ERROR
+
+    return ReturnValue.OK
+
+
+# see Solution.placePhotos, one ReturnValue per pair as if addPhotoToDisk was called for each pair in turn
+def placePhotos(placements: Iterable[Tuple[Photo, int]]) -> List[ReturnValue]:
+    placements = list(placements)
+    results = []
+    try:
+        with engine.transaction():
+            tables = engine.tables
+            for photo, disk_id in placements:
+                photo_id, size = photo.getPhotoID(), photo.getSize()
+                if photo_id is None or disk_id is None:
+                    results.append(ReturnValue.ERROR)
+                elif photo_id not in tables.photos or disk_id not in tables.disks:
+                    results.append(ReturnValue.NOT_EXISTS)
+                elif disk_id in tables.photo_disks[photo_id]:
+                    results.append(ReturnValue.ALREADY_EXISTS)
+                elif size is None:
+                    results.append(ReturnValue.ERROR)
+                elif tables.disks[disk_id][3] - size < 0:
+                    results.append(ReturnValue.BAD_PARAMS)
+                else:
+                    _placePhoto(photo, disk_id)
+                    results.append(ReturnValue.OK)
+    except Exception as e:
+        print(e)
+        return [ReturnValue.ERROR] * len(placements)
+
+    return results
+
+
+def addPhotosToDisk(photos: Iterable[Photo], diskID: int) -> List[ReturnValue]:
+    return placePhotos((photo, diskID) for photo in photos)
+
+
+def removePhotoFromDisk(photo: Photo, diskID: int) -> ReturnValue:
+    try:
+        with engine.transaction():
+            tables = engine.tables
+            if diskID in tables.photo_disks.get(photo.getPhotoID(), ()):
+                free_space = tables.disks[diskID][3]
+                engine.setFreeSpace(diskID, None if photo.getSize() is None else free_space + photo.getSize())
+                engine.deleteStoredOn(photo.getPhotoID(), diskID)
+    except Exception as e:
+        print(e)
+        return ReturnValue.ERROR
+
+    return ReturnValue.OK
+
+
+def addRAMToDisk(ramID: int, diskID: int) -> ReturnValue:
+    try:
+        with engine.transaction():
+            engine.insertPartOf(ramID, diskID)
+    except DatabaseException.FOREIGN_KEY_VIOLATION as e:
+        print(e)
+        return ReturnValue.NOT_EXISTS
+    except DatabaseException.UNIQUE_VIOLATION as e:
+        print(e)
+        return ReturnValue.ALREADY_EXISTS
+    except Exception as e:
+        print(e)
+        return ReturnValue.ERROR
+
+    return ReturnValue.OK
+
+
+def removeRAMFromDisk(ramID: int, diskID: int) -> ReturnValue:
+    try:
+        with engine.transaction():
+            removed = engine.deletePartOf(ramID, diskID)
+    except Exception as e:
+        print(e)
+        return ReturnValue.ERROR
+
+    return ReturnValue.OK if removed else ReturnValue.NOT_EXISTS
+
+
+def averagePhotosSizeOnDisk(diskID: int) -> float:
+    try:
+        with engine.transaction():
+            tables = engine.tables
+            photo_count = len(tables.disk_photos.get(diskID, ()))
+            photo_bytes = tables.photo_bytes.get(diskID, 0)
+    except Exception as e:
+        print(e)
+        return -1
+
+    return photo_bytes / photo_count if photo_count > 0 else 0
+
+
+def getTotalRamOnDisk(diskID: int) -> int:
+    try:
+        with engine.transaction():
+            total = engine.tables.ram_total.get(diskID, 0)
+    except Exception as e:
+        print(e)
+        return -1
+
+    return total
+
+
+def getCostForDescription(description: str) -> int:
+    try:
+        with engine.transaction():
+            tables = engine.tables
+            cost = sum(tables.photos[photo_id][2] * sum(tables.disks[disk_id][4]
+                                                        for disk_id in tables.photo_disks[photo_id])
+                       for photo_id in tables.descriptions.get(description, ()))
+    except Exception as e:
+        print(e)
+        return -1
+
+    return cost
+
+
+# up to 5 IDs of the photos no larger than limit, walking the sorted photo IDs from the given end.
+# the sorted sizes answer "every photo fits" and "no photo fits" without a walk
+def _fittingPhotos(tables, limit: int, descending: bool) -> List[int]:
+    ids = tables.photo_ids
+    if not tables.photo_sizes or tables.photo_sizes[0] > limit:
+        return []
+    if tables.photo_sizes[-1] <= limit:
+        return ids[:-6:-1] if descending else ids[:5]
+    photo_ids = []
+    for photo_id in reversed(ids) if descending else ids:
+        if tables.photos[photo_id][2] <= limit:
+            photo_ids.append(photo_id)
+            if len(photo_ids) == 5:
+                break
+    return photo_ids
+
+
+def getPhotosCanBeAddedToDisk(diskID: int) -> List[int]:
+    try:
+        with engine.transaction():
+            tables = engine.tables
+            disk_entry = tables.disks.get(diskID)
+            photo_ids = [] if disk_entry is None else _fittingPhotos(tables, disk_entry[3], descending=True)
+    except Exception as e:
+        print(e)
+        return []
+
+    return photo_ids
+
+
+def getPhotosCanBeAddedToDiskAndRAM(diskID: int) -> List[int]:
+    try:
+        with engine.transaction():
+            tables = engine.tables
+            disk_entry = tables.disks.get(diskID)
+            photo_ids = [] if disk_entry is None else \
+                _fittingPhotos(tables, min(disk_entry[3], tables.ram_total[diskID]), descending=False)
+    except Exception as e:
+        print(e)
+        return []
+
+    return photo_ids
+
+
+def isCompanyExclusive(diskID: int) -> bool:
+    try:
+        with engine.transaction():
+            tables = engine.tables
+            disk_entry = tables.disks.get(diskID)
+            exclusive = disk_entry is not None and set(tables.ram_companies[diskID]) <= {disk_entry[1]}
+    except Exception as e:
+        print(e)
+        return False
+
+    return exclusive
+
+
+def isDiskContainingAtLeastNumExists(description : str, num : int) -> bool:
+    try:
+        with engine.transaction():
+            tables = engine.tables
+            per_disk = Counter(disk_id for photo_id in tables.descriptions.get(description, ())
+                               for disk_id in tables.photo_disks[photo_id])
+            exists = num is not None and any(count >= num for count in per_disk.values())
+    except Exception as e:
+        print(e)
+        return False
+
+    return exists
+
+
+def getDisksContainingTheMostData() -> List[int]:
+    try:
+        with engine.transaction():
+            photo_bytes = engine.tables.photo_bytes
+            disk_ids = heapq.nsmallest(5, photo_bytes, key=lambda disk_id: (-photo_bytes[disk_id], disk_id))
+    except Exception as e:
+        print(e)
+        return []
+
+    return disk_ids
+
+
+def getConflictingDisks() -> List[int]:
+    try:
+        with engine.transaction():
+            disk_ids = sorted(disk_id for disk_id, shared in engine.tables.shared_photos.items() if shared > 0)
+    except Exception as e:
+        print(e)
+        return []
+
+    return disk_ids
+
+
+# the photos fitting on a disk are counted from the sorted photo sizes, one binary search per disk
+def mostAvailableDisks() -> List[int]:
+    try:
+        with engine.transaction():
+            tables = engine.tables
+            sizes = tables.photo_sizes
+            disk_ids = heapq.nsmallest(5, tables.disks.values(),
+                                       key=lambda disk: (-bisect.bisect_right(sizes, disk[3]), -disk[2], disk[0]))
+    except Exception as e:
+        print(e)
+        return []
+
+    return [disk[0] for disk in disk_ids]
+
+
+# the photos sharing at least half of the disks of photoID, counted over the photos of those disks
+def getClosePhotos(photoID: int) -> List[int]:
+    try:
+        with engine.transaction():
+            tables = engine.tables
+            disk_ids = tables.photo_disks.get(photoID, ())
+            if photoID is None:
+                close_photos = []
+            elif not disk_ids:
+                close_photos = [photo_id for photo_id in tables.photo_ids[:11] if photo_id != photoID][:10]
+            else:
+                min_shared = (len(disk_ids) + 1) // 2
+                shared = Counter(photo_id for disk_id in disk_ids for photo_id in tables.disk_photos[disk_id])
+                close_photos = heapq.nsmallest(10, (photo_id for photo_id, count in shared.items()
+                                                    if count >= min_shared and photo_id != photoID))
+    except Exception as e:
+        print(e)
+        return []
+
+    return close_photos
+
+
+# every call runs in turn, there is no round trip to save. the functions of PostgreSQL, taken from Solution
+# before configureEngine selected this engine, run as the functions of this module of the same name
+def runPipelined(calls: Iterable[tuple]) -> list:
+    return [(globals()[call[0].__name__] if getattr(call[0], "__module__", None) == "Solution" else call[0])
+            (*call[1:]) for call in calls]
@@ -0,0 +1,681 @@
+# the SQL run by Solution (and AsyncSolution), statements use $1, $2, ... for their parameters.
+# statements whose caller checks the number of rows effected report them with RETURNING
+
+# secondary indexes for the disk_id-leading access paths of the analytics queries and deleteDisk cascades,
+# the description filter of getCostForDescription and the "fits in free space" size filters
+INDEXES = {
+    "StoredOn_disk_id": "CREATE INDEX StoredOn_disk_id ON StoredOn(disk_id, photo_id);",
+    "PartOf_disk_id": "CREATE INDEX PartOf_disk_id ON PartOf(disk_id, ram_id);",
+    "Photos_description": "CREATE INDEX Photos_description ON Photos(description);",
+    "Photos_size": "CREATE INDEX Photos_size ON Photos(size);",
+}
+
+# per-disk aggregates kept up to date by triggers, so the per-disk analytics are single-row lookups.
+# inserts and deletes on StoredOn and PartOf are aggregated per statement (bulk placements update each disk once).
+# when a photo or RAM is deleted its rows are subtracted before the cascade, the cascaded deletes then
+# find no photo or RAM to join with and leave the aggregates alone.
+# shared_photos counts the photos of a disk stored on other disks too, a disk conflicts while it is positive.
+# it only depends on StoredOn, so it follows the cascaded deletes as well
+DISK_STATS = """
+        CREATE TABLE DiskStats (
+        disk_id INTEGER NOT NULL,
+        photo_count INTEGER NOT NULL DEFAULT 0,
+        photo_bytes BIGINT NOT NULL DEFAULT 0,
+        ram_total BIGINT NOT NULL DEFAULT 0,
+        ram_companies INTEGER NOT NULL DEFAULT 0,
+        shared_photos INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (disk_id),
+        FOREIGN KEY (disk_id) REFERENCES Disks ON DELETE CASCADE ON UPDATE CASCADE
+        );
+        CREATE INDEX DiskStats_photo_bytes ON DiskStats(photo_bytes DESC, disk_id ASC);
+        CREATE INDEX DiskStats_conflicting ON DiskStats(disk_id) WHERE shared_photos > 0;
+        CREATE TABLE DiskRamCompanies (
+        disk_id INTEGER NOT NULL,
+        company TEXT NOT NULL,
+        ram_count INTEGER NOT NULL,
+        PRIMARY KEY (disk_id, company),
+        FOREIGN KEY (disk_id) REFERENCES Disks ON DELETE CASCADE ON UPDATE CASCADE
+        );
+
+        CREATE OR REPLACE FUNCTION DiskStats_disks_inserted() RETURNS TRIGGER AS $$
+        BEGIN
+            INSERT INTO DiskStats(disk_id) SELECT disk_id FROM inserted;
+            RETURN NULL;
+        END; $$ LANGUAGE plpgsql;
+        CREATE TRIGGER DiskStats_disks_inserted AFTER INSERT ON Disks
+        REFERENCING NEW TABLE AS inserted
+        FOR EACH STATEMENT EXECUTE FUNCTION DiskStats_disks_inserted();
+
+        CREATE OR REPLACE FUNCTION DiskStats_add_photos(disk_ids INTEGER[], sizes BIGINT[], sign INTEGER)
+        RETURNS VOID AS $$
+            UPDATE DiskStats
+            SET photo_count = DiskStats.photo_count + sign * changed.photos,
+                photo_bytes = DiskStats.photo_bytes + sign * changed.bytes
+            FROM (SELECT disk_id, COUNT(*) AS photos, SUM(size) AS bytes
+                  FROM UNNEST(disk_ids, sizes) AS change(disk_id, size)
+                  GROUP BY disk_id) changed
+            WHERE DiskStats.disk_id = changed.disk_id;
+        $$ LANGUAGE sql;
+
+        -- a photo is shared while it has two replicas or more. the replicas after the statement are counted
+        -- from StoredOn, before it they were off by the rows the statement changed. the disks the photo stays
+        -- on follow it crossing two replicas, the disks it was added to or removed from count it while shared.
+        -- the photos are locked first, so concurrent placements of a photo count each other's replicas
+        CREATE OR REPLACE FUNCTION DiskStats_add_shared(photo_ids INTEGER[], disk_ids INTEGER[], sign INTEGER)
+        RETURNS VOID AS $$
+        DECLARE
+            disk RECORD;
+        BEGIN
+            PERFORM 1 FROM Photos WHERE photo_id = ANY(photo_ids) ORDER BY photo_id FOR NO KEY UPDATE;
+            -- a few disks change per statement, they are updated one by one through the primary key
+            FOR disk IN
+                WITH change AS (SELECT * FROM UNNEST(photo_ids, disk_ids) AS change(photo_id, disk_id)),
+                replicas AS (SELECT photo_id, after, after - sign * changed AS before
+                             FROM (SELECT c.photo_id, COUNT(*) AS changed,
+                                          (SELECT COUNT(*) FROM StoredOn s WHERE s.photo_id = c.photo_id) AS after
+                                   FROM change c
+                                   GROUP BY c.photo_id) counted)
+                SELECT disk_id, SUM(shared) AS shared
+                FROM (SELECT s.disk_id, (r.after >= 2)::INTEGER - (r.before >= 2)::INTEGER AS shared
+                      FROM replicas r INNER JOIN StoredOn s ON s.photo_id = r.photo_id
+                      WHERE NOT EXISTS (SELECT 1 FROM change c
+                                        WHERE c.photo_id = s.photo_id AND c.disk_id = s.disk_id)
+                      UNION ALL
+                      SELECT c.disk_id, sign * (GREATEST(r.before, r.after) >= 2)::INTEGER
+                      FROM change c INNER JOIN replicas r ON r.photo_id = c.photo_id) shared
+                GROUP BY disk_id
+                HAVING SUM(shared) <> 0
+                ORDER BY disk_id
+            LOOP
+                UPDATE DiskStats SET shared_photos = shared_photos + disk.shared
+                WHERE disk_id = disk.disk_id;
+            END LOOP;
+        END; $$ LANGUAGE plpgsql;
+
+        CREATE OR REPLACE FUNCTION DiskStats_storedon_changed() RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM DiskStats_add_shared(ARRAY(SELECT photo_id FROM inserted ORDER BY photo_id, disk_id),
+                                             ARRAY(SELECT disk_id FROM inserted ORDER BY photo_id, disk_id), 1);
+                PERFORM DiskStats_add_photos(ARRAY(SELECT c.disk_id FROM inserted c JOIN Photos p
+                                                   ON p.photo_id = c.photo_id ORDER BY c.disk_id),
+                                             ARRAY(SELECT p.size FROM inserted c JOIN Photos p
+                                                   ON p.photo_id = c.photo_id ORDER BY c.disk_id), 1);
+            ELSE
+                PERFORM DiskStats_add_shared(ARRAY(SELECT photo_id FROM deleted ORDER BY photo_id, disk_id),
+                                             ARRAY(SELECT disk_id FROM deleted ORDER BY photo_id, disk_id), -1);
+                PERFORM DiskStats_add_photos(ARRAY(SELECT c.disk_id FROM deleted c JOIN Photos p
+                                                   ON p.photo_id = c.photo_id ORDER BY c.disk_id),
+                                             ARRAY(SELECT p.size FROM deleted c JOIN Photos p
+                                                   ON p.photo_id = c.photo_id ORDER BY c.disk_id), -1);
+            END IF;
+            RETURN NULL;
+        END; $$ LANGUAGE plpgsql;
+        CREATE TRIGGER DiskStats_storedon_inserted AFTER INSERT ON StoredOn
+        REFERENCING NEW TABLE AS inserted
+        FOR EACH STATEMENT EXECUTE FUNCTION DiskStats_storedon_changed();
+        CREATE TRIGGER DiskStats_storedon_deleted AFTER DELETE ON StoredOn
+        REFERENCING OLD TABLE AS deleted
+        FOR EACH STATEMENT EXECUTE FUNCTION DiskStats_storedon_changed();
+
+        CREATE OR REPLACE FUNCTION DiskStats_photo_deleted() RETURNS TRIGGER AS $$
+        BEGIN
+            PERFORM DiskStats_add_photos(ARRAY(SELECT disk_id FROM StoredOn WHERE photo_id = OLD.photo_id),
+                                         ARRAY(SELECT OLD.size::BIGINT FROM StoredOn
+                                               WHERE photo_id = OLD.photo_id), -1);
+            RETURN OLD;
+        END; $$ LANGUAGE plpgsql;
+        CREATE TRIGGER DiskStats_photo_deleted BEFORE DELETE ON Photos
+        FOR EACH ROW EXECUTE FUNCTION DiskStats_photo_deleted();
+
+        CREATE OR REPLACE FUNCTION DiskStats_add_rams(disk_ids INTEGER[], sizes BIGINT[], companies TEXT[],
+                                                      sign INTEGER)
+        RETURNS VOID AS $$
+            INSERT INTO DiskRamCompanies(disk_id, company, ram_count)
+            SELECT change.disk_id, change.company, sign * COUNT(*)
+            FROM UNNEST(disk_ids, companies) AS change(disk_id, company)
+            -- disks deleted by this statement are skipped, their rows go with the cascade
+            INNER JOIN Disks ON Disks.disk_id = change.disk_id
+            GROUP BY change.disk_id, change.company
+            ON CONFLICT (disk_id, company) DO UPDATE
+            SET ram_count = DiskRamCompanies.ram_count + EXCLUDED.ram_count;
+            DELETE FROM DiskRamCompanies WHERE disk_id = ANY(disk_ids) AND ram_count <= 0;
+            UPDATE DiskStats
+            SET ram_total = DiskStats.ram_total + sign * changed.total,
+                ram_companies = (SELECT COUNT(*) FROM DiskRamCompanies c WHERE c.disk_id = DiskStats.disk_id)
+            FROM (SELECT disk_id, SUM(size) AS total
+                  FROM UNNEST(disk_ids, sizes) AS change(disk_id, size)
+                  GROUP BY disk_id) changed
+            WHERE DiskStats.disk_id = changed.disk_id;
+        $$ LANGUAGE sql;
+
+        CREATE OR REPLACE FUNCTION DiskStats_partof_changed() RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM DiskStats_add_rams(ARRAY(SELECT c.disk_id FROM inserted c JOIN RAMs r
+                                                 ON r.ram_id = c.ram_id ORDER BY c.disk_id, c.ram_id),
+                                           ARRAY(SELECT r.size FROM inserted c JOIN RAMs r
+                                                 ON r.ram_id = c.ram_id ORDER BY c.disk_id, c.ram_id),
+                                           ARRAY(SELECT r.company FROM inserted c JOIN RAMs r
+                                                 ON r.ram_id = c.ram_id ORDER BY c.disk_id, c.ram_id), 1);
+            ELSE
+                PERFORM DiskStats_add_rams(ARRAY(SELECT c.disk_id FROM deleted c JOIN RAMs r
+                                                 ON r.ram_id = c.ram_id ORDER BY c.disk_id, c.ram_id),
+                                           ARRAY(SELECT r.size FROM deleted c JOIN RAMs r
+                                                 ON r.ram_id = c.ram_id ORDER BY c.disk_id, c.ram_id),
+                                           ARRAY(SELECT r.company FROM deleted c JOIN RAMs r
+                                                 ON r.ram_id = c.ram_id ORDER BY c.disk_id, c.ram_id), -1);
+            END IF;
+            RETURN NULL;
+        END; $$ LANGUAGE plpgsql;
+        CREATE TRIGGER DiskStats_partof_inserted AFTER INSERT ON PartOf
+        REFERENCING NEW TABLE AS inserted
+        FOR EACH STATEMENT EXECUTE FUNCTION DiskStats_partof_changed();
+        CREATE TRIGGER DiskStats_partof_deleted AFTER DELETE ON PartOf
+        REFERENCING OLD TABLE AS deleted
+        FOR EACH STATEMENT EXECUTE FUNCTION DiskStats_partof_changed();
+
+        CREATE OR REPLACE FUNCTION DiskStats_ram_deleted() RETURNS TRIGGER AS $$
+        BEGIN
+            PERFORM DiskStats_add_rams(ARRAY(SELECT disk_id FROM PartOf WHERE ram_id = OLD.ram_id),
+                                       ARRAY(SELECT OLD.size::BIGINT FROM PartOf WHERE ram_id = OLD.ram_id),
+                                       ARRAY(SELECT OLD.company FROM PartOf WHERE ram_id = OLD.ram_id), -1);
+            RETURN OLD;
+        END; $$ LANGUAGE plpgsql;
+        CREATE TRIGGER DiskStats_ram_deleted BEFORE DELETE ON RAMs
+        FOR EACH ROW EXECUTE FUNCTION DiskStats_ram_deleted();
+        """
+
+
+# what every DiskStats row should hold, computed from the tables
+DISK_STATS_FROM_TABLES = """
+        SELECT d.disk_id,
+               COALESCE(photos.photo_count, 0) AS photo_count,
+               COALESCE(photos.photo_bytes, 0) AS photo_bytes,
+               COALESCE(rams.ram_total, 0) AS ram_total,
+               COALESCE(rams.ram_companies, 0) AS ram_companies,
+               COALESCE(photos.shared_photos, 0) AS shared_photos
+        FROM Disks d
+        LEFT OUTER JOIN (SELECT s.disk_id, COUNT(*) AS photo_count, SUM(p.size) AS photo_bytes,
+                                COUNT(*) FILTER (WHERE replicas.replicas >= 2) AS shared_photos
+                         FROM StoredOn s
+                         INNER JOIN Photos p ON p.photo_id = s.photo_id
+                         INNER JOIN (SELECT photo_id, COUNT(*) AS replicas FROM StoredOn GROUP BY photo_id) replicas
+                         ON replicas.photo_id = s.photo_id
+                         GROUP BY s.disk_id) photos ON photos.disk_id = d.disk_id
+        LEFT OUTER JOIN (SELECT po.disk_id, SUM(r.size) AS ram_total, COUNT(DISTINCT r.company) AS ram_companies
+                         FROM PartOf po INNER JOIN RAMs r ON r.ram_id = po.ram_id
+                         GROUP BY po.disk_id) rams ON rams.disk_id = d.disk_id
+        """
+
+# the disks whose DiskStats row is missing or differs from the tables
+CHECK_DISK_STATS = f"""
+        SELECT expected.disk_id
+        FROM ({DISK_STATS_FROM_TABLES}) expected
+        LEFT OUTER JOIN DiskStats s ON s.disk_id = expected.disk_id
+        WHERE (s.photo_count, s.photo_bytes, s.ram_total, s.ram_companies, s.shared_photos)
+              IS DISTINCT FROM (expected.photo_count, expected.photo_bytes, expected.ram_total,
+                                expected.ram_companies, expected.shared_photos)
+        ORDER BY expected.disk_id ASC;
+        """
+
+# recompute DiskStats and DiskRamCompanies from the tables, writers wait until the transaction ends
+REBUILD_DISK_STATS = f"""
+        LOCK TABLE Photos, Disks, RAMs, StoredOn, PartOf IN SHARE MODE;
+        DELETE FROM DiskRamCompanies;
+        INSERT INTO DiskRamCompanies(disk_id, company, ram_count)
+        SELECT po.disk_id, r.company, COUNT(*)
+        FROM PartOf po INNER JOIN RAMs r ON r.ram_id = po.ram_id
+        GROUP BY po.disk_id, r.company;
+        INSERT INTO DiskStats(disk_id) SELECT disk_id FROM Disks ON CONFLICT (disk_id) DO NOTHING;
+        UPDATE DiskStats
+        SET photo_count = expected.photo_count, photo_bytes = expected.photo_bytes,
+            ram_total = expected.ram_total, ram_companies = expected.ram_companies,
+            shared_photos = expected.shared_photos
+        FROM ({DISK_STATS_FROM_TABLES}) expected
+        WHERE DiskStats.disk_id = expected.disk_id
+        AND (DiskStats.photo_count, DiskStats.photo_bytes, DiskStats.ram_total, DiskStats.ram_companies,
+             DiskStats.shared_photos)
+            IS DISTINCT FROM (expected.photo_count, expected.photo_bytes, expected.ram_total,
+                              expected.ram_companies, expected.shared_photos);
+        """
+
+
+# CREATE_TABLES, CLEAR_TABLES and DROP_TABLES run in the transaction of the connector, so inside a Session
+# they are steps of its transaction like any other statement
+CREATE_TABLES = f"""
+        CREATE TABLE Photos (
+        photo_id INTEGER NOT NULL,
+        description TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        PRIMARY KEY (photo_id),
+        UNIQUE (photo_id),
+        CHECK (photo_id > 0),
+        CHECK (size >= 0)
+        );
+        CREATE TABLE Disks (
+        disk_id INTEGER NOT NULL,
+        company TEXT NOT NULL,
+        speed INTEGER NOT NULL,
+        free_space INTEGER NOT NULL,
+        cost INTEGER NOT NULL,
+        PRIMARY KEY (disk_id),
+        UNIQUE (disk_id),
+        CHECK (disk_id > 0),
+        CHECK (speed > 0),
+        CHECK (free_space >= 0),
+        CHECK (cost > 0)
+        );
+        CREATE TABLE RAMs (
+        ram_id INTEGER NOT NULL,
+        size INTEGER NOT NULL,
+        company TEXT NOT NULL,
+        PRIMARY KEY(ram_id),
+        UNIQUE(ram_id),
+        CHECK(ram_id>0),
+        CHECK(size>0)
+        );
+        CREATE TABLE StoredOn (
+        photo_id INTEGER,
+        disk_id INTEGER,
+        PRIMARY KEY(photo_id, disk_id),
+        FOREIGN KEY(photo_id) REFERENCES Photos ON DELETE CASCADE ON UPDATE CASCADE,
+        FOREIGN KEY(disk_id) REFERENCES Disks ON DELETE CASCADE ON UPDATE CASCADE
+        );
+        CREATE TABLE PartOf(
+        ram_id INTEGER,
+        disk_id INTEGER,
+        PRIMARY KEY(ram_id, disk_id),
+        FOREIGN KEY(ram_id ) REFERENCES RAMs ON DELETE CASCADE ON UPDATE CASCADE,
+        FOREIGN KEY(disk_id) REFERENCES Disks ON DELETE CASCADE ON UPDATE CASCADE
+        );
+        CREATE VIEW Photos_Stored_On_Disks AS
+        SELECT disk_id, StoredOn.photo_id, description, size
+        FROM Photos INNER JOIN StoredOn
+        ON Photos.photo_id = StoredOn.photo_id;
+
+        CREATE VIEW Rams_Part_Of_Disks AS
+        SELECT disk_id, PartOf.ram_id, size, company
+        FROM RAMs INNER JOIN PartOf
+        ON RAMs.ram_id = PartOf.ram_id;
+
+        {" ".join(INDEXES.values())}
+        {DISK_STATS}
+        """
+
+CLEAR_TABLES = """
+        DELETE FROM Photos CASCADE;
+        DELETE FROM Disks CASCADE;
+        DELETE FROM RAMs CASCADE;
+        """
+
+DROP_TABLES = """
+        DROP TABLE IF EXISTS Photos CASCADE;
+        DROP TABLE IF EXISTS Disks CASCADE;
+        DROP TABLE IF EXISTS RAMs CASCADE;
+        DROP TABLE IF EXISTS StoredOn CASCADE;
+        DROP TABLE IF EXISTS PartOf CASCADE;
+        DROP VIEW IF EXISTS Photos_Stored_On_Disks;
+        DROP VIEW IF EXISTS Rams_Part_Of_Disks;
+        DROP TABLE IF EXISTS DiskStats CASCADE;
+        DROP TABLE IF EXISTS DiskRamCompanies CASCADE;
+        DROP FUNCTION IF EXISTS DiskStats_disks_inserted, DiskStats_add_photos, DiskStats_add_shared,
+        DiskStats_storedon_changed, DiskStats_photo_deleted, DiskStats_add_rams,
+        DiskStats_partof_changed, DiskStats_ram_deleted CASCADE;
+        DROP TABLE IF EXISTS PhotoPairs CASCADE;
+        DROP FUNCTION IF EXISTS PhotoPairs_storedon_changed CASCADE;
+        """
+
+# whether every table of CREATE_TABLES exists, for the test harness deciding whether to create them
+TABLES_EXIST = """
+        SELECT bool_and(to_regclass(name) IS NOT NULL)
+        FROM unnest(ARRAY['photos', 'disks', 'rams', 'storedon', 'partof', 'diskstats', 'diskramcompanies']) AS name;
+        """
+
+ADD_PHOTO = """
+        INSERT INTO Photos VALUES($1, $2, $3);
+        """
+
+GET_PHOTO_BY_ID = """
+        SELECT * FROM Photos WHERE photo_id=$1;
+        """
+
+# largest number of IDs bound to one of the *_BY_IDS statements, longer ID lists are split over several
+IDS_PER_STATEMENT = 10000
+
+GET_PHOTOS_BY_IDS = """
+        SELECT * FROM Photos WHERE photo_id = ANY($1::INTEGER[]);
+        """
+
+DELETE_PHOTO_FREE_SPACE = """
+        UPDATE Disks
+        SET free_space = free_space + $2
+        WHERE disk_id IN (SELECT disk_id
+                          FROM StoredOn
+                          WHERE photo_id = $1)
+        RETURNING disk_id;
+        """
+
+DELETE_PHOTO = """
+        DELETE
+        FROM Photos
+        WHERE photo_id = $1;
+        """
+
+ADD_DISK = """
+        INSERT INTO Disks VALUES($1, $2, $3, $4, $5);
+        """
+
+GET_DISK_BY_ID = """
+        SELECT * FROM Disks WHERE disk_id=$1;
+        """
+
+GET_DISKS_BY_IDS = """
+        SELECT * FROM Disks WHERE disk_id = ANY($1::INTEGER[]);
+        """
+
+DELETE_DISK = """
+        DELETE
+        FROM Disks
+        WHERE disk_id = $1
+        RETURNING disk_id;
+        """
+
+ADD_RAM = """
+        INSERT INTO RAMs
+        VALUES($1, $2, $3);
+        """
+
+GET_RAM_BY_ID = """
+        SELECT * FROM RAMs WHERE ram_id=$1;
+        """
+
+GET_RAMS_BY_IDS = """
+        SELECT * FROM RAMs WHERE ram_id = ANY($1::INTEGER[]);
+        """
+
+DELETE_RAM = """
+        DELETE
+        FROM RAMs
+        WHERE ram_id = $1
+        RETURNING ram_id;
+        """
+
+ADD_PHOTO_TO_DISK = """
+        INSERT INTO StoredOn
+        VALUES ($1, $2);
+        """
+
+ADD_PHOTO_TO_DISK_FREE_SPACE = """
+        UPDATE Disks
+        SET free_space = free_space - $2
+        WHERE disk_id=$1;
+        """
+
+PLACE_PHOTOS_DISKS = """
+        SELECT disk_id, free_space FROM Disks
+        WHERE disk_id = ANY($1)
+        ORDER BY disk_id
+        FOR UPDATE;
+        """
+
+PLACE_PHOTOS_PHOTOS = """
+        SELECT photo_id FROM Photos
+        WHERE photo_id = ANY($1)
+        FOR KEY SHARE;
+        """
+
+PLACE_PHOTOS_STORED = """
+        SELECT photo_id, disk_id FROM StoredOn
+        WHERE photo_id = ANY($1) AND disk_id = ANY($2);
+        """
+
+PLACE_PHOTOS_FREE_SPACE = """
+        UPDATE Disks
+        SET free_space = free_space - taken.size
+        FROM UNNEST($1::INTEGER[], $2::INTEGER[]) AS taken(disk_id, size)
+        WHERE Disks.disk_id = taken.disk_id;
+        """
+
+REMOVE_PHOTO_FROM_DISK_FREE_SPACE = """
+        UPDATE Disks
+        SET free_space = free_space + $3
+        WHERE disk_id IN (SELECT disk_id FROM StoredOn WHERE photo_id=$1 AND disk_id=$2);
+        """
+
+REMOVE_PHOTO_FROM_DISK = """
+        DELETE FROM StoredOn
+        WHERE photo_id=$1 AND disk_id=$2;
+        """
+
+ADD_RAM_TO_DISK = """
+        INSERT INTO PartOf
+        VALUES ($1, $2);
+        """
+
+REMOVE_RAM_FROM_DISK = """
+        DELETE FROM PartOf
+        WHERE ram_id=$1 AND disk_id=$2
+        RETURNING ram_id;
+        """
+
+AVERAGE_PHOTOS_SIZE_ON_DISK = """
+        SELECT COALESCE((SELECT photo_bytes::DECIMAL / NULLIF(photo_count, 0)
+                         FROM DiskStats
+                         WHERE disk_id = $1), 0);
+        """
+
+GET_TOTAL_RAM_ON_DISK = """
+        SELECT COALESCE((SELECT ram_total
+                         FROM DiskStats
+                         WHERE disk_id = $1), 0);
+        """
+
+GET_COST_FOR_DESCRIPTION = """
+        SELECT COALESCE(SUM(cost*size), 0)
+        FROM Photos_Stored_On_Disks pd INNER JOIN Disks d ON pd.disk_id = d.disk_id
+        WHERE description = $1;
+        """
+
+GET_PHOTOS_CAN_BE_ADDED_TO_DISK = """
+        SELECT photo_id
+        FROM Photos, (SELECT free_space FROM Disks where Disks.disk_id=$1) AS Free_Space
+        WHERE size <= Free_Space.free_space
+        ORDER BY photo_id DESC
+        LIMIT 5;
+        """
+
+GET_PHOTOS_CAN_BE_ADDED_TO_DISK_AND_RAM = """
+        SELECT photo_id
+        FROM Photos, (SELECT free_space, ram_total
+                      FROM Disks INNER JOIN DiskStats ON Disks.disk_id = DiskStats.disk_id
+                      WHERE Disks.disk_id=$1) AS Disk
+        WHERE size <= Disk.free_space AND size <= Disk.ram_total
+        ORDER by photo_id ASC
+        LIMIT 5;
+        """
+
+IS_COMPANY_EXCLUSIVE = """
+        SELECT company
+        FROM Disks INNER JOIN DiskStats ON Disks.disk_id = DiskStats.disk_id
+        WHERE Disks.disk_id = $1 AND (ram_companies = 0 OR
+                                      (ram_companies = 1 AND EXISTS (SELECT 1 FROM DiskRamCompanies c
+                                                                     WHERE c.disk_id = $1
+                                                                     AND c.company = Disks.company)));
+        """
+
+IS_DISK_CONTAINING_AT_LEAST_NUM_EXISTS = """
+        SELECT disk_id
+        FROM Photos_Stored_On_Disks
+        WHERE description =$1
+        GROUP BY disk_id
+        HAVING COUNT(*)>= $2;
+        """
+
+GET_DISKS_CONTAINING_THE_MOST_DATA = """
+        SELECT disk_id, photo_bytes
+        FROM DiskStats
+        ORDER BY photo_bytes DESC, disk_id ASC
+        LIMIT 5;
+        """
+
+GET_CONFLICTING_DISKS = """
+        SELECT disk_id
+        FROM DiskStats
+        WHERE shared_photos > 0
+        ORDER BY disk_id ASC;
+        """
+
+# the photos fitting on a disk are the photos of size <= free_space. instead of joining every photo with every
+# disk, the photo sizes are counted once and merged with the free space of the disks in one sort: a running
+# total over both, photos before disks of equal value, is the number of photos fitting on each disk
+MOST_AVAILABLE_DISKS = """
+        SELECT disk_id, fitting
+        FROM (SELECT disk_id, speed,
+                     SUM(photos) OVER (ORDER BY value, is_disk ROWS UNBOUNDED PRECEDING) AS fitting
+              FROM (SELECT size AS value, FALSE AS is_disk, NULL::INTEGER AS disk_id, NULL::INTEGER AS speed,
+                           COUNT(*) AS photos
+                    FROM Photos
+                    GROUP BY size
+                    UNION ALL
+                    SELECT free_space, TRUE, disk_id, speed, 0
+                    FROM Disks) AS sizes_and_disks) AS ranked
+        WHERE disk_id IS NOT NULL
+        ORDER BY fitting DESC, speed DESC, disk_id ASC
+        LIMIT 5;
+        """
+
+# the disks of a photo, and whether the optional PhotoPairs table exists, read before choosing how to find
+# the photos close to it
+GET_CLOSE_PHOTOS_DISKS = """
+        SELECT ARRAY(SELECT disk_id FROM StoredOn WHERE photo_id = $1 ORDER BY disk_id),
+               to_regclass('PhotoPairs') IS NOT NULL;
+        """
+
+# a photo stored on no disk is close to every other photo
+GET_CLOSE_PHOTOS_ALL = """
+        SELECT photo_id
+        FROM Photos
+        WHERE photo_id <> $1
+        ORDER BY photo_id ASC
+        LIMIT 10;
+        """
+
+# the photos sharing at least $2 of the disks in $3, counted from the StoredOn_disk_id index in one pass
+GET_CLOSE_PHOTOS_ANY = """
+        SELECT photo_id
+        FROM StoredOn
+        WHERE disk_id = ANY($3::INTEGER[]) AND photo_id <> $1
+        GROUP BY photo_id
+        HAVING COUNT(*) >= $2
+        ORDER BY photo_id ASC
+        LIMIT 10;
+        """
+
+GET_CLOSE_PHOTOS_PAIRS = """
+        SELECT other_id
+        FROM PhotoPairs
+        WHERE photo_id = $1 AND shared >= $2
+        ORDER BY other_id ASC
+        LIMIT 10;
+        """
+
+# photos on at most this many disks are looked up with a statement of their own shape, see closePhotos
+CLOSE_PHOTOS_MERGED_DISKS = 16
+
+
+# the statement finding the photos close to photoID, the photos sharing at least half of its disks, first 10 by ID.
+# returns (name, query, params) for executePrepared.
+# for a photo on a few disks, the photo IDs of every disk are read in order from the StoredOn_disk_id index
+# and merged, so the scan stops as soon as 10 photos qualify instead of counting every photo of every disk
+def closePhotos(photoID: int, diskIDs: list, hasPairs: bool) -> tuple:
+    if len(diskIDs) == 0:
+        return "getClosePhotos_all", GET_CLOSE_PHOTOS_ALL, (photoID,)
+    min_shared = (len(diskIDs) + 1) // 2
+    if hasPairs:
+        return "getClosePhotos_pairs", GET_CLOSE_PHOTOS_PAIRS, (photoID, min_shared)
+    if len(diskIDs) > CLOSE_PHOTOS_MERGED_DISKS:
+        return "getClosePhotos_any", GET_CLOSE_PHOTOS_ANY, (photoID, min_shared, list(diskIDs))
+    disks = "\n                  UNION ALL\n                  ".join(
+        "(SELECT photo_id FROM StoredOn WHERE disk_id = $" + str(index + 3) + " AND photo_id <> $1 ORDER BY photo_id)"
+        for index in range(len(diskIDs)))
+    query = """
+        SELECT photo_id
+        FROM (""" + disks + """) AS candidates
+        GROUP BY photo_id
+        HAVING COUNT(*) >= $2
+        ORDER BY photo_id ASC
+        LIMIT 10;
+        """
+    return "getClosePhotos_" + str(len(diskIDs)), query, (photoID, min_shared) + tuple(diskIDs)
+
+
+# optional table of the number of disks every two photos share, for getClosePhotos on photos stored on many
+# disks. maintained per StoredOn statement: a placement (p, d) adds a shared disk to p and every photo on d,
+# a removal takes it back, both directions are stored. pairs among the rows of one statement are counted
+# once from each side
+PHOTO_PAIRS = """
+        CREATE TABLE PhotoPairs (
+        photo_id INTEGER NOT NULL,
+        other_id INTEGER NOT NULL,
+        shared INTEGER NOT NULL,
+        PRIMARY KEY (photo_id, other_id)
+        );
+        INSERT INTO PhotoPairs(photo_id, other_id, shared)
+        SELECT a.photo_id, b.photo_id, COUNT(*)
+        FROM StoredOn a INNER JOIN StoredOn b ON a.disk_id = b.disk_id AND a.photo_id <> b.photo_id
+        GROUP BY a.photo_id, b.photo_id;
+
+        CREATE OR REPLACE FUNCTION PhotoPairs_storedon_changed() RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO PhotoPairs(photo_id, other_id, shared)
+                SELECT photo_id, other_id, COUNT(*)
+                FROM (SELECT c.photo_id, s.photo_id AS other_id
+                      FROM inserted c INNER JOIN StoredOn s ON s.disk_id = c.disk_id AND s.photo_id <> c.photo_id
+                      UNION ALL
+                      SELECT s.photo_id, c.photo_id
+                      FROM inserted c INNER JOIN StoredOn s ON s.disk_id = c.disk_id AND s.photo_id <> c.photo_id
+                      WHERE NOT EXISTS (SELECT 1 FROM inserted n
+                                        WHERE n.photo_id = s.photo_id AND n.disk_id = s.disk_id)) pairs
+                GROUP BY photo_id, other_id
+                ON CONFLICT (photo_id, other_id) DO UPDATE
+                SET shared = PhotoPairs.shared + EXCLUDED.shared;
+            ELSE
+                UPDATE PhotoPairs
+                SET shared = PhotoPairs.shared - changed.shared
+                FROM (SELECT photo_id, other_id, COUNT(*) AS shared
+                      FROM (SELECT c.photo_id, s.photo_id AS other_id
+                            FROM deleted c
+                            INNER JOIN (SELECT photo_id, disk_id FROM StoredOn
+                                        UNION ALL
+                                        SELECT photo_id, disk_id FROM deleted) s
+                            ON s.disk_id = c.disk_id AND s.photo_id <> c.photo_id
+                            UNION ALL
+                            SELECT s.photo_id, c.photo_id
+                            FROM deleted c INNER JOIN StoredOn s
+                            ON s.disk_id = c.disk_id AND s.photo_id <> c.photo_id) pairs
+                      GROUP BY photo_id, other_id) changed
+                WHERE PhotoPairs.photo_id = changed.photo_id AND PhotoPairs.other_id = changed.other_id;
+                -- shared is symmetric, the pairs of the deleted photos find their mirrors
+                DELETE FROM PhotoPairs p
+                USING PhotoPairs z
+                WHERE z.photo_id IN (SELECT photo_id FROM deleted) AND z.shared <= 0
+                AND p.photo_id = z.other_id AND p.other_id = z.photo_id;
+                DELETE FROM PhotoPairs
+                WHERE photo_id IN (SELECT photo_id FROM deleted) AND shared <= 0;
+            END IF;
+            RETURN NULL;
+        END; $$ LANGUAGE plpgsql;
+        CREATE TRIGGER PhotoPairs_storedon_inserted AFTER INSERT ON StoredOn
+        REFERENCING NEW TABLE AS inserted
+        FOR EACH STATEMENT EXECUTE FUNCTION PhotoPairs_storedon_changed();
+        CREATE TRIGGER PhotoPairs_storedon_deleted AFTER DELETE ON StoredOn
+        REFERENCING OLD TABLE AS deleted
+        FOR EACH STATEMENT EXECUTE FUNCTION PhotoPairs_storedon_changed();
+        """
+
+DROP_PHOTO_PAIRS = """
+        DROP TABLE IF EXISTS PhotoPairs CASCADE;
+        DROP FUNCTION IF EXISTS PhotoPairs_storedon_changed CASCADE;
+        """
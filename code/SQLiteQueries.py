@@ -0,0 +1,306 @@
+# the SQL run by SQLiteSolution, the SQLite counterparts of the statements of Queries.
+# statements use ?1, ?2, ... for their parameters, lists of IDs are bound as a JSON array and read with json_each.
+# the tables are WITHOUT ROWID, so an INTEGER primary key is not an alias of the rowid (which would turn a NULL
+# ID into a new one instead of a NOT NULL violation) and rows are stored in primary key order.
+# STRICT rejects values of the wrong type like PostgreSQL does
+
+# ;-separated, run by SQLiteConnector.executeScript
+CREATE_TABLES = """
+        CREATE TABLE Photos (
+        photo_id INTEGER NOT NULL,
+        description TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        PRIMARY KEY (photo_id),
+        CHECK (photo_id > 0),
+        CHECK (size >= 0)
+        ) STRICT, WITHOUT ROWID;
+        CREATE TABLE Disks (
+        disk_id INTEGER NOT NULL,
+        company TEXT NOT NULL,
+        speed INTEGER NOT NULL,
+        free_space INTEGER NOT NULL,
+        cost INTEGER NOT NULL,
+        PRIMARY KEY (disk_id),
+        CHECK (disk_id > 0),
+        CHECK (speed > 0),
+        CHECK (free_space >= 0),
+        CHECK (cost > 0)
+        ) STRICT, WITHOUT ROWID;
+        CREATE TABLE RAMs (
+        ram_id INTEGER NOT NULL,
+        size INTEGER NOT NULL,
+        company TEXT NOT NULL,
+        PRIMARY KEY (ram_id),
+        CHECK (ram_id > 0),
+        CHECK (size > 0)
+        ) STRICT, WITHOUT ROWID;
+        CREATE TABLE StoredOn (
+        photo_id INTEGER NOT NULL,
+        disk_id INTEGER NOT NULL,
+        PRIMARY KEY (photo_id, disk_id),
+        FOREIGN KEY (photo_id) REFERENCES Photos ON DELETE CASCADE ON UPDATE CASCADE,
+        FOREIGN KEY (disk_id) REFERENCES Disks ON DELETE CASCADE ON UPDATE CASCADE
+        ) STRICT, WITHOUT ROWID;
+        CREATE TABLE PartOf (
+        ram_id INTEGER NOT NULL,
+        disk_id INTEGER NOT NULL,
+        PRIMARY KEY (ram_id, disk_id),
+        FOREIGN KEY (ram_id) REFERENCES RAMs ON DELETE CASCADE ON UPDATE CASCADE,
+        FOREIGN KEY (disk_id) REFERENCES Disks ON DELETE CASCADE ON UPDATE CASCADE
+        ) STRICT, WITHOUT ROWID;
+        CREATE INDEX StoredOn_disk_id ON StoredOn(disk_id, photo_id);
+        CREATE INDEX PartOf_disk_id ON PartOf(disk_id, ram_id);
+        CREATE INDEX Photos_description ON Photos(description);
+        CREATE INDEX Photos_size ON Photos(size);
+        CREATE VIEW Photos_Stored_On_Disks AS
+        SELECT disk_id, StoredOn.photo_id, description, size
+        FROM Photos INNER JOIN StoredOn
+        ON Photos.photo_id = StoredOn.photo_id;
+        CREATE VIEW Rams_Part_Of_Disks AS
+        SELECT disk_id, PartOf.ram_id, size, company
+        FROM RAMs INNER JOIN PartOf
+        ON RAMs.ram_id = PartOf.ram_id;
+        """
+
+CLEAR_TABLES = """
+        DELETE FROM StoredOn;
+        DELETE FROM PartOf;
+        DELETE FROM Photos;
+        DELETE FROM Disks;
+        DELETE FROM RAMs;
+        """
+
+DROP_TABLES = """
+        DROP VIEW IF EXISTS Photos_Stored_On_Disks;
+        DROP VIEW IF EXISTS Rams_Part_Of_Disks;
+        DROP TABLE IF EXISTS StoredOn;
+        DROP TABLE IF EXISTS PartOf;
+        DROP TABLE IF EXISTS Photos;
+        DROP TABLE IF EXISTS Disks;
+        DROP TABLE IF EXISTS RAMs;
+        """
+
+ADD_PHOTO = """
+        INSERT INTO Photos VALUES (?1, ?2, ?3);
+        """
+
+# the rows of addPhotos and the like, a taken ID effects no row
+ADD_PHOTOS = """
+        INSERT INTO Photos VALUES (?1, ?2, ?3)
+        ON CONFLICT DO NOTHING;
+        """
+
+GET_PHOTO_BY_ID = """
+        SELECT * FROM Photos WHERE photo_id = ?1;
+        """
+
+GET_PHOTOS_BY_IDS = """
+        SELECT * FROM Photos WHERE photo_id IN (SELECT value FROM json_each(?1));
+        """
+
+DELETE_PHOTO_FREE_SPACE = """
+        UPDATE Disks
+        SET free_space = free_space + ?2
+        WHERE disk_id IN (SELECT disk_id
+                          FROM StoredOn
+                          WHERE photo_id = ?1);
+        """
+
+DELETE_PHOTO = """
+        DELETE FROM Photos WHERE photo_id = ?1;
+        """
+
+ADD_DISK = """
+        INSERT INTO Disks VALUES (?1, ?2, ?3, ?4, ?5);
+        """
+
+ADD_DISKS = """
+        INSERT INTO Disks VALUES (?1, ?2, ?3, ?4, ?5)
+        ON CONFLICT DO NOTHING;
+        """
+
+GET_DISK_BY_ID = """
+        SELECT * FROM Disks WHERE disk_id = ?1;
+        """
+
+GET_DISKS_BY_IDS = """
+        SELECT * FROM Disks WHERE disk_id IN (SELECT value FROM json_each(?1));
+        """
+
+DELETE_DISK = """
+        DELETE FROM Disks WHERE disk_id = ?1;
+        """
+
+ADD_RAM = """
+        INSERT INTO RAMs VALUES (?1, ?2, ?3);
+        """
+
+ADD_RAMS = """
+        INSERT INTO RAMs VALUES (?1, ?2, ?3)
+        ON CONFLICT DO NOTHING;
+        """
+
+GET_RAM_BY_ID = """
+        SELECT * FROM RAMs WHERE ram_id = ?1;
+        """
+
+GET_RAMS_BY_IDS = """
+        SELECT * FROM RAMs WHERE ram_id IN (SELECT value FROM json_each(?1));
+        """
+
+DELETE_RAM = """
+        DELETE FROM RAMs WHERE ram_id = ?1;
+        """
+
+ADD_PHOTO_TO_DISK = """
+        INSERT INTO StoredOn VALUES (?1, ?2);
+        """
+
+ADD_PHOTO_TO_DISK_FREE_SPACE = """
+        UPDATE Disks
+        SET free_space = free_space - ?2
+        WHERE disk_id = ?1;
+        """
+
+PLACE_PHOTOS_DISKS = """
+        SELECT disk_id, free_space FROM Disks
+        WHERE disk_id IN (SELECT value FROM json_each(?1));
+        """
+
+PLACE_PHOTOS_PHOTOS = """
+        SELECT photo_id FROM Photos
+        WHERE photo_id IN (SELECT value FROM json_each(?1));
+        """
+
+PLACE_PHOTOS_STORED = """
+        SELECT photo_id, disk_id FROM StoredOn
+        WHERE photo_id IN (SELECT value FROM json_each(?1)) AND disk_id IN (SELECT value FROM json_each(?2));
+        """
+
+REMOVE_PHOTO_FROM_DISK_FREE_SPACE = """
+        UPDATE Disks
+        SET free_space = free_space + ?3
+        WHERE disk_id IN (SELECT disk_id FROM StoredOn WHERE photo_id = ?1 AND disk_id = ?2);
+        """
+
+REMOVE_PHOTO_FROM_DISK = """
+        DELETE FROM StoredOn
+        WHERE photo_id = ?1 AND disk_id = ?2;
+        """
+
+ADD_RAM_TO_DISK = """
+        INSERT INTO PartOf VALUES (?1, ?2);
+        """
+
+REMOVE_RAM_FROM_DISK = """
+        DELETE FROM PartOf
+        WHERE ram_id = ?1 AND disk_id = ?2;
+        """
+
+AVERAGE_PHOTOS_SIZE_ON_DISK = """
+        SELECT COALESCE(AVG(size), 0)
+        FROM Photos_Stored_On_Disks
+        WHERE disk_id = ?1;
+        """
+
+GET_TOTAL_RAM_ON_DISK = """
+        SELECT COALESCE(SUM(size), 0)
+        FROM Rams_Part_Of_Disks
+        WHERE disk_id = ?1;
+        """
+
+GET_COST_FOR_DESCRIPTION = """
+        SELECT COALESCE(SUM(cost*size), 0)
+        FROM Photos_Stored_On_Disks pd INNER JOIN Disks d ON pd.disk_id = d.disk_id
+        WHERE description = ?1;
+        """
+
+# the photos are walked in primary key order, the walk stops at the fifth photo that fits
+GET_PHOTOS_CAN_BE_ADDED_TO_DISK = """
+        SELECT photo_id
+        FROM Photos
+        WHERE size <= (SELECT free_space FROM Disks WHERE disk_id = ?1)
+        ORDER BY photo_id DESC
+        LIMIT 5;
+        """
+
+GET_PHOTOS_CAN_BE_ADDED_TO_DISK_AND_RAM = """
+        SELECT photo_id
+        FROM Photos
+        WHERE size <= (SELECT free_space FROM Disks WHERE disk_id = ?1)
+        AND size <= (SELECT COALESCE(SUM(size), 0) FROM Rams_Part_Of_Disks WHERE disk_id = ?1)
+        ORDER BY photo_id ASC
+        LIMIT 5;
+        """
+
+IS_COMPANY_EXCLUSIVE = """
+        SELECT company
+        FROM Disks d
+        WHERE disk_id = ?1 AND NOT EXISTS (SELECT 1 FROM Rams_Part_Of_Disks r
+                                           WHERE r.disk_id = ?1 AND r.company <> d.company);
+        """
+
+IS_DISK_CONTAINING_AT_LEAST_NUM_EXISTS = """
+        SELECT disk_id
+        FROM Photos_Stored_On_Disks
+        WHERE description = ?1
+        GROUP BY disk_id
+        HAVING COUNT(*) >= ?2
+        LIMIT 1;
+        """
+
+GET_DISKS_CONTAINING_THE_MOST_DATA = """
+        SELECT d.disk_id
+        FROM Disks d LEFT OUTER JOIN Photos_Stored_On_Disks pd ON pd.disk_id = d.disk_id
+        GROUP BY d.disk_id
+        ORDER BY COALESCE(SUM(pd.size), 0) DESC, d.disk_id ASC
+        LIMIT 5;
+        """
+
+# the other disks of a photo are found in the primary key of StoredOn
+GET_CONFLICTING_DISKS = """
+        SELECT DISTINCT s1.disk_id
+        FROM StoredOn s1
+        WHERE EXISTS (SELECT 1 FROM StoredOn s2 WHERE s2.photo_id = s1.photo_id AND s2.disk_id <> s1.disk_id)
+        ORDER BY s1.disk_id ASC;
+        """
+
+# see Queries.MOST_AVAILABLE_DISKS, a running total over the photo sizes and the free space of the disks
+MOST_AVAILABLE_DISKS = """
+        SELECT disk_id
+        FROM (SELECT disk_id, speed,
+                     SUM(photos) OVER (ORDER BY value, is_disk ROWS UNBOUNDED PRECEDING) AS fitting
+              FROM (SELECT size AS value, 0 AS is_disk, NULL AS disk_id, NULL AS speed, COUNT(*) AS photos
+                    FROM Photos
+                    GROUP BY size
+                    UNION ALL
+                    SELECT free_space, 1, disk_id, speed, 0
+                    FROM Disks))
+        WHERE disk_id IS NOT NULL
+        ORDER BY fitting DESC, speed DESC, disk_id ASC
+        LIMIT 5;
+        """
+
+GET_CLOSE_PHOTOS_DISKS = """
+        SELECT disk_id FROM StoredOn WHERE photo_id = ?1;
+        """
+
+# a photo stored on no disk is close to every other photo
+GET_CLOSE_PHOTOS_ALL = """
+        SELECT photo_id
+        FROM Photos
+        WHERE photo_id <> ?1
+        ORDER BY photo_id ASC
+        LIMIT 10;
+        """
+
+# the photos sharing at least ?2 of the disks in ?3, read from the StoredOn_disk_id index
+GET_CLOSE_PHOTOS_ANY = """
+        SELECT photo_id
+        FROM StoredOn
+        WHERE disk_id IN (SELECT value FROM json_each(?3)) AND photo_id <> ?1
+        GROUP BY photo_id
+        HAVING COUNT(*) >= ?2
+        ORDER BY photo_id ASC
+        LIMIT 10;
+        """
@@ -0,0 +1,408 @@
+# the functions of Solution on SQLite (see Utility.SQLiteConnector), the tables kept in one database file.
+# every function keeps the ReturnValue / business object contract of its Solution counterpart: SQLiteConnector
+# raises the DatabaseException PostgreSQL would, and they are handled the same way. select it with
+# Solution.configureEngine("sqlite") (or SOLUTION_ENGINE=sqlite) to run code written against Solution on it.
+# there is no DiskStats table, the analytics are plain SQL over the indexes of SQLiteQueries.CREATE_TABLES.
+# nothing is cached: statements run in process, a lookup costs about as much as a cache hit
+import json
+import sqlite3
+from typing import List, Iterable, Tuple, Optional, Union
+from Utility.SQLiteConnector import SQLiteConnector
+import Utility.SQLiteConnector as SQLite
+from Utility.ReturnValue import ReturnValue
+from Utility.Exceptions import DatabaseException
+from Business.Photo import Photo
+from Business.RAM import RAM
+from Business.Disk import Disk
+from Business.Batch import PhotoBatch, DiskBatch, RAMBatch
+import SQLiteQueries
+
+# runs a sequence of calls in one transaction, committed when the block ends, see SQLiteConnector.Session
+Session = SQLite.Session
+
+
+# runs script in one transaction, printing the error if it fails
+def _runScript(script: str):
+    conn = None
+    try:
+        conn = SQLiteConnector()
+        conn.executeScript(script)
+        conn.commit()
+    except Exception as e:
+        print(e)
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+# the rows query selects, in one transaction. raises what the statement raises
+def _select(query: str, params=()) -> list:
+    conn = SQLiteConnector()
+    try:
+        _, result = conn.execute(query, params)
+        conn.commit()
+    finally:
+        conn.close()
+    return result.rows
+
+
+def createTables():
+    _runScript(SQLiteQueries.CREATE_TABLES)
+
+
+def clearTables():
+    _runScript(SQLiteQueries.CLEAR_TABLES)
+
+
+def dropTables():
+    _runScript(SQLiteQueries.DROP_TABLES)
+
+
+# there are no running sums to check, the analytics read the tables
+def checkDiskStats(rebuild: bool = False) -> Optional[List[int]]:
+    return []
+
+
+# getClosePhotos reads the StoredOn_disk_id index, there is no PhotoPairs table to create
+def createPhotoPairs():
+    pass
+
+
+def dropPhotoPairs():
+    pass
+
+
+# runs the statements of one call in a transaction: failed maps the DatabaseException classes it handles to
+# their ReturnValue, anything else is an ERROR. returns OK, or what done returns from the last rows effected
+def _write(statements: List[tuple], failed: dict = None, done=None) -> ReturnValue:
+    conn = None
+    try:
+        conn = SQLiteConnector()
+        for query, params in statements:
+            rows_effected, _ = conn.execute(query, params)
+        conn.commit()
+    except Exception as e:
+        print(e)
+        for kind, value in (failed or {}).items():
+            if isinstance(e, kind):
+                return value
+        return ReturnValue.ERROR
+    finally:
+        if conn is not None:
+            conn.close()
+
+    return ReturnValue.OK if done is None else done(rows_effected)
+
+
+_ADD_FAILED = {DatabaseException.NOT_NULL_VIOLATION: ReturnValue.BAD_PARAMS,
+               DatabaseException.CHECK_VIOLATION: ReturnValue.BAD_PARAMS,
+               DatabaseException.UNIQUE_VIOLATION: ReturnValue.ALREADY_EXISTS}
+
+
+def _deleted(rows_effected: int) -> ReturnValue:
+    return ReturnValue.OK if rows_effected == 1 else ReturnValue.NOT_EXISTS
+
+
+def addPhoto(photo: Photo) -> ReturnValue:
+    return _write([(SQLiteQueries.ADD_PHOTO, (photo.getPhotoID(), photo.getDescription(), photo.getSize()))],
+                  _ADD_FAILED)
+
+
+def getPhotoByID(photoID: int) -> Photo:
+    try:
+        rows = _select(SQLiteQueries.GET_PHOTO_BY_ID, (photoID,))
+    except Exception as e:
+        print(e)
+        return Photo.badPhoto()
+
+    return PhotoBatch.toEntity(rows[0]) if rows else Photo.badPhoto()
+
+
+def deletePhoto(photo: Photo) -> ReturnValue:
+    # the disks get back the space of the photo as given, before it is deleted with its StoredOn rows
+    return _write([(SQLiteQueries.DELETE_PHOTO_FREE_SPACE, (photo.getPhotoID(), photo.getSize())),
+                   (SQLiteQueries.DELETE_PHOTO, (photo.getPhotoID(),))])
+
+
+def addDisk(disk: Disk) -> ReturnValue:
+    return _write([(SQLiteQueries.ADD_DISK, (disk.getDiskID(), disk.getCompany(), disk.getSpeed(),
+                                             disk.getFreeSpace(), disk.getCost()))], _ADD_FAILED)
+
+
+def getDiskByID(diskID: int) -> Disk:
+    try:
+        rows = _select(SQLiteQueries.GET_DISK_BY_ID, (diskID,))
+    except Exception as e:
+        print(e)
+        return Disk.badDisk()
+
+    return DiskBatch.toEntity(rows[0]) if rows else Disk.badDisk()
+
+
+def deleteDisk(diskID: int) -> ReturnValue:
+    return _write([(SQLiteQueries.DELETE_DISK, (diskID,))], done=_deleted)
+
+
+def addRAM(ram: RAM) -> ReturnValue:
+    return _write([(SQLiteQueries.ADD_RAM, (ram.getRamID(), ram.getSize(), ram.getCompany()))], _ADD_FAILED)
+
+
+def getRAMByID(ramID: int) -> RAM:
+    try:
+        rows = _select(SQLiteQueries.GET_RAM_BY_ID, (ramID,))
+    except Exception as e:
+        print(e)
+        return RAM.badRAM()
+
+    return RAMBatch.toEntity(rows[0]) if rows else RAM.badRAM()
+
+
+def deleteRAM(ramID: int) -> ReturnValue:
+    return _write([(SQLiteQueries.DELETE_RAM, (ramID,))], done=_deleted)
+
+
+def addDiskAndPhoto(disk: Disk, photo: Photo) -> ReturnValue:
+    # the photo first, like Solution, so a bad photo is reported before a duplicate disk
+    return _write([(SQLiteQueries.ADD_PHOTO, (photo.getPhotoID(), photo.getDescription(), photo.getSize())),
+                   (SQLiteQueries.ADD_DISK, (disk.getDiskID(), disk.getCompany(), disk.getSpeed(),
+                                             disk.getFreeSpace(), disk.getCost()))],
+                  {DatabaseException.UNIQUE_VIOLATION: ReturnValue.ALREADY_EXISTS})
+
+
+# Solution._addInBulk: one ReturnValue per entry as if each was added on its own, ERROR for every entry if the
+# batch could not be loaded. the rows are inserted one statement each in a single transaction, a compiled
+# statement costs microseconds in process, and a failed row only undoes itself
+def _addInBulk(query: str, entries: Iterable, batchType: type) -> List[ReturnValue]:
+    rows = list(entries.rows() if isinstance(entries, batchType) else map(batchType.toRow, entries))
+    results = []
+    conn = None
+    try:
+        conn = SQLiteConnector()
+        for row in rows:
+            try:
+                rows_effected, _ = conn.execute(query, row)
+                results.append(ReturnValue.OK if rows_effected == 1 else ReturnValue.ALREADY_EXISTS)
+            except (DatabaseException.NOT_NULL_VIOLATION, DatabaseException.CHECK_VIOLATION):
+                results.append(ReturnValue.BAD_PARAMS)
+            except (sqlite3.IntegrityError, OverflowError) as e:
+                # a value of the wrong type, only its own entry fails
+                print(e)
+                results.append(ReturnValue.ERROR)
+        conn.commit()
+    except Exception as e:
+        print(e)
+        return [ReturnValue.ERROR] * len(rows)
+    finally:
+        if conn is not None:
+            conn.close()
+
+    return results
+
+
+def addPhotos(photos: Union[Iterable[Photo], PhotoBatch], useCopy=True) -> List[ReturnValue]:
+    return _addInBulk(SQLiteQueries.ADD_PHOTOS, photos, PhotoBatch)
+
+
+def addDisks(disks: Union[Iterable[Disk], DiskBatch], useCopy=True) -> List[ReturnValue]:
+    return _addInBulk(SQLiteQueries.ADD_DISKS, disks, DiskBatch)
+
+
+def addRAMs(rams: Union[Iterable[RAM], RAMBatch], useCopy=True) -> List[ReturnValue]:
+    return _addInBulk(SQLiteQueries.ADD_RAMS, rams, RAMBatch)
+
+
+# Solution._getByIDs: one entity per ID in request order, or with asBatch a batchType of their rows.
+# the IDs are sent as one JSON array
+def _getByIDs(query: str, ids: Iterable[int], batchType: type, badEntity, asBatch: bool):
+    ids = list(ids)
+    try:
+        found = {row[0]: row for row in _select(query, (json.dumps([i for i in set(ids) if i is not None]),))}
+    except Exception as e:
+        print(e)
+        found = {}
+
+    if asBatch:
+        batch = batchType()
+        bad = (None,) * len(batchType.kinds)
+        for entity_id in ids:
+            batch.appendRow(*found.get(entity_id, bad))
+        return batch
+    return [batchType.toEntity(found[entity_id]) if entity_id in found else badEntity() for entity_id in ids]
+
+
+def getPhotosByIDs(photoIDs: Iterable[int], asBatch=False) -> Union[List[Photo], PhotoBatch]:
+    return _getByIDs(SQLiteQueries.GET_PHOTOS_BY_IDS, photoIDs, PhotoBatch, Photo.badPhoto, asBatch)
+
+
+def getDisksByIDs(diskIDs: Iterable[int], asBatch=False) -> Union[List[Disk], DiskBatch]:
+    return _getByIDs(SQLiteQueries.GET_DISKS_BY_IDS, diskIDs, DiskBatch, Disk.badDisk, asBatch)
+
+
+def getRAMsByIDs(ramIDs: Iterable[int], asBatch=False) -> Union[List[RAM], RAMBatch]:
+    return _getByIDs(SQLiteQueries.GET_RAMS_BY_IDS, ramIDs, RAMBatch, RAM.badRAM, asBatch)
+
+
+def addPhotoToDisk(photo: Photo, diskID: int) -> ReturnValue:
+    return _write([(SQLiteQueries.ADD_PHOTO_TO_DISK, (photo.getPhotoID(), diskID)),
+                   (SQLiteQueries.ADD_PHOTO_TO_DISK_FREE_SPACE, (diskID, photo.getSize()))],
+                  {DatabaseException.FOREIGN_KEY_VIOLATION: ReturnValue.NOT_EXISTS,
+                   DatabaseException.UNIQUE_VIOLATION: ReturnValue.ALREADY_EXISTS,
+                   DatabaseException.CHECK_VIOLATION: ReturnValue.BAD_PARAMS})
+
+
+# see Solution.placePhotos, one ReturnValue per pair as if addPhotoToDisk was called for each pair in turn
+def placePhotos(placements: Iterable[Tuple[Photo, int]]) -> List[ReturnValue]:
+    placements = [(photo.getPhotoID(), photo.getSize(), diskID) for photo, diskID in placements]
+    if not placements:
+        return []
+    photo_ids = json.dumps(list({photo_id for photo_id, _, _ in placements if photo_id is not None}))
+    disk_ids = json.dumps(list({disk_id for _, _, disk_id in placements if disk_id is not None}))
+    conn = None
+    try:
+        conn = SQLiteConnector()
+        _, result = conn.execute(SQLiteQueries.PLACE_PHOTOS_DISKS, (disk_ids,))
+        free_space = {row[0]: row[1] for row in result.rows}
+        _, result = conn.execute(SQLiteQueries.PLACE_PHOTOS_PHOTOS, (photo_ids,))
+        existing_photos = {row[0] for row in result.rows}
+        _, result = conn.execute(SQLiteQueries.PLACE_PHOTOS_STORED, (photo_ids, disk_ids))
+        stored = {(row[0], row[1]) for row in result.rows}
+
+        results = []
+        accepted = []
+        taken = {}
+        for photo_id, size, disk_id in placements:
+            if photo_id is None or disk_id is None:
+                results.append(ReturnValue.ERROR)
+            elif photo_id not in existing_photos or disk_id not in free_space:
+                results.append(ReturnValue.NOT_EXISTS)
+            elif (photo_id, disk_id) in stored:
+                results.append(ReturnValue.ALREADY_EXISTS)
+            elif size is None:
+                results.append(ReturnValue.ERROR)
+            elif free_space[disk_id] - size < 0:
+                results.append(ReturnValue.BAD_PARAMS)
+            else:
+                free_space[disk_id] -= size
+                taken[disk_id] = taken.get(disk_id, 0) + size
+                stored.add((photo_id, disk_id))
+                accepted.append((photo_id, disk_id))
+                results.append(ReturnValue.OK)
+
+        conn.executeMany(SQLiteQueries.ADD_PHOTO_TO_DISK, accepted)
+        conn.executeMany(SQLiteQueries.ADD_PHOTO_TO_DISK_FREE_SPACE, taken.items())
+        conn.commit()
+    except Exception as e:
+        print(e)
+        return [ReturnValue.ERROR] * len(placements)
+    finally:
+        if conn is not None:
+            conn.close()
+
+    return results
+
+
+def addPhotosToDisk(photos: Iterable[Photo], diskID: int) -> List[ReturnValue]:
+    return placePhotos((photo, diskID) for photo in photos)
+
+
+def removePhotoFromDisk(photo: Photo, diskID: int) -> ReturnValue:
+    return _write([(SQLiteQueries.REMOVE_PHOTO_FROM_DISK_FREE_SPACE, (photo.getPhotoID(), diskID, photo.getSize())),
+                   (SQLiteQueries.REMOVE_PHOTO_FROM_DISK, (photo.getPhotoID(), diskID))])
+
+
+def addRAMToDisk(ramID: int, diskID: int) -> ReturnValue:
+    return _write([(SQLiteQueries.ADD_RAM_TO_DISK, (ramID, diskID))],
+                  {DatabaseException.FOREIGN_KEY_VIOLATION: ReturnValue.NOT_EXISTS,
+                   DatabaseException.UNIQUE_VIOLATION: ReturnValue.ALREADY_EXISTS})
+
+
+def removeRAMFromDisk(ramID: int, diskID: int) -> ReturnValue:
+    return _write([(SQLiteQueries.REMOVE_RAM_FROM_DISK, (ramID, diskID))], done=_deleted)
+
+
+# the single value query selects, or failed if it cannot be read
+def _value(query: str, params: tuple, failed):
+    try:
+        return _select(query, params)[0][0]
+    except Exception as e:
+        print(e)
+        return failed
+
+
+# the first column of the rows query selects, [] if they cannot be read
+def _ids(query: str, params=()) -> List[int]:
+    try:
+        return [row[0] for row in _select(query, params)]
+    except Exception as e:
+        print(e)
+        return []
+
+
+def averagePhotosSizeOnDisk(diskID: int) -> float:
+    return _value(SQLiteQueries.AVERAGE_PHOTOS_SIZE_ON_DISK, (diskID,), -1)
+
+
+def getTotalRamOnDisk(diskID: int) -> int:
+    return _value(SQLiteQueries.GET_TOTAL_RAM_ON_DISK, (diskID,), -1)
+
+
+def getCostForDescription(description: str) -> int:
+    return _value(SQLiteQueries.GET_COST_FOR_DESCRIPTION, (description,), -1)
+
+
+def getPhotosCanBeAddedToDisk(diskID: int) -> List[int]:
+    return _ids(SQLiteQueries.GET_PHOTOS_CAN_BE_ADDED_TO_DISK, (diskID,))
+
+
+def getPhotosCanBeAddedToDiskAndRAM(diskID: int) -> List[int]:
+    return _ids(SQLiteQueries.GET_PHOTOS_CAN_BE_ADDED_TO_DISK_AND_RAM, (diskID,))
+
+
+def isCompanyExclusive(diskID: int) -> bool:
+    return bool(_ids(SQLiteQueries.IS_COMPANY_EXCLUSIVE, (diskID,)))
+
+
+def isDiskContainingAtLeastNumExists(description : str, num : int) -> bool:
+    return bool(_ids(SQLiteQueries.IS_DISK_CONTAINING_AT_LEAST_NUM_EXISTS, (description, num)))
+
+
+def getDisksContainingTheMostData() -> List[int]:
+    return _ids(SQLiteQueries.GET_DISKS_CONTAINING_THE_MOST_DATA)
+
+
+def getConflictingDisks() -> List[int]:
+    return _ids(SQLiteQueries.GET_CONFLICTING_DISKS)
+
+
+def mostAvailableDisks() -> List[int]:
+    return _ids(SQLiteQueries.MOST_AVAILABLE_DISKS)
+
+
+# the disks of the photo are read first, a photo on no disk is close to every other photo
+def getClosePhotos(photoID: int) -> List[int]:
+    conn = None
+    try:
+        conn = SQLiteConnector()
+        _, result = conn.execute(SQLiteQueries.GET_CLOSE_PHOTOS_DISKS, (photoID,))
+        disk_ids = [row[0] for row in result.rows]
+        if disk_ids:
+            _, result = conn.execute(SQLiteQueries.GET_CLOSE_PHOTOS_ANY,
+                                     (photoID, (len(disk_ids) + 1) // 2, json.dumps(disk_ids)))
+        else:
+            _, result = conn.execute(SQLiteQueries.GET_CLOSE_PHOTOS_ALL, (photoID,))
+        conn.commit()
+    except Exception as e:
+        print(e)
+        return []
+    finally:
+        if conn is not None:
+            conn.close()
+
+    return [row[0] for row in result.rows]
+
+
+# every call runs in turn, there is no round trip to save. the functions of PostgreSQL, taken from Solution
+# before configureEngine selected this engine, run as the functions of this module of the same name
+def runPipelined(calls: Iterable[tuple]) -> list:
+    return [(globals()[call[0].__name__] if getattr(call[0], "__module__", None) == "Solution" else call[0])
+            (*call[1:]) for call in calls]
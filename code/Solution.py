@@ -1,11 +1,19 @@
-from typing import List
+import importlib
+import os
+from typing import List, Iterable, Callable, Tuple, Optional, Union
 import Utility.DBConnector as Connector
+import Utility.Cache as Cache
 from Utility.ReturnValue import ReturnValue
 from Utility.Exceptions import DatabaseException
 from Business.Photo import Photo
 from Business.RAM import RAM
 from Business.Disk import Disk
+from Business.Batch import PhotoBatch, DiskBatch, RAMBatch
 from psycopg2 import sql
+import Queries
+
+# runs a sequence of Solution calls in one transaction, committed when the block ends, see DBConnector.Session
+Session = Connector.Session
 
 
 def createTables():
@@ -14,67 +22,9 @@ def createTables():
         conn = Connector.DBConnector()
 
         # Create the tables in one transaction to create
-        create_query = f"""
-                    BEGIN TRANSACTION;
-                    CREATE TABLE Photos ( 
-                    photo_id INTEGER NOT NULL,
-                    description TEXT NOT NULL,
-                    size INTEGER NOT NULL,
-                    PRIMARY KEY (photo_id),
-                    UNIQUE (photo_id),
-                    CHECK (photo_id > 0),
-                    CHECK (size >= 0)
-                    );   
-                    CREATE TABLE Disks (
-                    disk_id INTEGER NOT NULL,
-                    company TEXT NOT NULL,
-                    speed INTEGER NOT NULL,
-                    free_space INTEGER NOT NULL,
-                    cost INTEGER NOT NULL,
-                    PRIMARY KEY (disk_id),
-                    UNIQUE (disk_id),
-                    CHECK (disk_id > 0),
-                    CHECK (speed > 0),
-                    CHECK (free_space >= 0),
-                    CHECK (cost > 0)
-                    ); 
-                    CREATE TABLE RAMs (
-                    ram_id INTEGER NOT NULL, 
-                    size INTEGER NOT NULL,
-                    company TEXT NOT NULL, 
-                    PRIMARY KEY(ram_id),
-                    UNIQUE(ram_id),
-                    CHECK(ram_id>0),
-                    CHECK(size>0)
-                    ); 
-                    CREATE TABLE StoredOn (
-                    photo_id INTEGER, 
-                    disk_id INTEGER,
-                    PRIMARY KEY(photo_id, disk_id),
-                    FOREIGN KEY(photo_id) REFERENCES Photos ON DELETE CASCADE ON UPDATE CASCADE,
-                    FOREIGN KEY(disk_id) REFERENCES Disks ON DELETE CASCADE ON UPDATE CASCADE
-                    ); 
-                    CREATE TABLE PartOf(
-                    ram_id INTEGER, 
-                    disk_id INTEGER,
-                    PRIMARY KEY(ram_id, disk_id),
-                    FOREIGN KEY(ram_id ) REFERENCES RAMs ON DELETE CASCADE ON UPDATE CASCADE,
-                    FOREIGN KEY(disk_id) REFERENCES Disks ON DELETE CASCADE ON UPDATE CASCADE
-                    ); 
-                    CREATE VIEW Photos_Stored_On_Disks AS
-                    SELECT disk_id, StoredOn.photo_id, description, size 
-                    FROM Photos INNER JOIN StoredOn
-                    ON Photos.photo_id = StoredOn.photo_id;
-
-                    CREATE VIEW Rams_Part_Of_Disks AS
-                    SELECT disk_id, PartOf.ram_id, size, company
-                    FROM RAMs INNER JOIN PartOf
-                    ON RAMs.ram_id = PartOf.ram_id;
-                    COMMIT;
-                """
-
-        conn.execute(create_query)
+        conn.execute(Queries.CREATE_TABLES)
         conn.commit()
+        Cache.clearCaches()
         # Commit if all the queries succeeded
     except Exception as e:
         conn.rollback()
@@ -90,16 +40,9 @@ def clearTables():
         conn = Connector.DBConnector()
 
         # Create the tables in one transaction to create
-        create_query = f"""
-                        BEGIN TRANSACTION;
-                        DELETE FROM Photos CASCADE;   
-                        DELETE FROM Disks CASCADE;
-                        DELETE FROM RAMs CASCADE;
-                        COMMIT;
-                        """
-
-        conn.execute(create_query)
+        conn.execute(Queries.CLEAR_TABLES)
         conn.commit()
+        Cache.clearCaches()
         # Commit if all the queries succeeded
     except Exception as e:
         conn.rollback()
@@ -114,20 +57,9 @@ def dropTables():
     conn = None
     try:
         conn = Connector.DBConnector()
-        create_query = f"""
-                            BEGIN;
-                            DROP TABLE IF EXISTS Photos CASCADE;   
-                            DROP TABLE IF EXISTS Disks CASCADE;
-                            DROP TABLE IF EXISTS RAMs CASCADE;
-                            DROP TABLE IF EXISTS StoredOn CASCADE;
-                            DROP TABLE IF EXISTS PartOf CASCADE;
-                            DROP VIEW IF EXISTS Photos_Stored_On_Disks;
-                            DROP VIEW IF EXISTS Rams_Part_Of_Disks;
-                            COMMIT;
-                            """
-
-        conn.execute(create_query)
+        conn.execute(Queries.DROP_TABLES)
         conn.commit()
+        Cache.clearCaches()
         # Commit if all the queries succeeded
     except Exception as e:
         conn.rollback()
@@ -138,18 +70,67 @@ def dropTables():
     pass
 
 
-def addPhoto(photo: Photo) -> ReturnValue:
+# the disks whose DiskStats row does not match the tables, with rebuild=True DiskStats and DiskRamCompanies
+# are then recomputed from the tables. returns None if the check failed
+def checkDiskStats(rebuild: bool = False) -> Optional[List[int]]:
     conn = None
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("""
-                        INSERT INTO Photos VALUES({photoID}, {photoDescription}, {photoSize});
-                        """).format(photoID=sql.Literal(photo.getPhotoID()),
-                   photoDescription=sql.Literal(photo.getDescription()),
-                   photoSize=sql.Literal(photo.getSize()))
+        rows_effected, result = conn.execute(Queries.CHECK_DISK_STATS)
+        if rebuild and rows_effected > 0:
+            conn.execute(Queries.REBUILD_DISK_STATS)
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(e)
+        return None
+    finally:
+        conn.close()
+    return [row[0] for row in result.rows]
+
 
-        conn.execute(query)
+# opt in to the PhotoPairs table for getClosePhotos, kept up to date by triggers on StoredOn from now on.
+# it pays off when photos are stored on many disks, every placement then also writes a row per photo on the disk
+def createPhotoPairs():
+    conn = None
+    try:
+        conn = Connector.DBConnector()
+        conn.execute(Queries.DROP_PHOTO_PAIRS + Queries.PHOTO_PAIRS)
         conn.commit()
+        # Commit if all the queries succeeded
+    except Exception as e:
+        conn.rollback()
+        # Roll back if one of the query failed
+        print(e)
+    finally:
+        conn.close()
+    pass
+
+
+def dropPhotoPairs():
+    conn = None
+    try:
+        conn = Connector.DBConnector()
+        conn.execute(Queries.DROP_PHOTO_PAIRS)
+        conn.commit()
+        # Commit if all the queries succeeded
+    except Exception as e:
+        conn.rollback()
+        # Roll back if one of the query failed
+        print(e)
+    finally:
+        conn.close()
+    pass
+
+
+def addPhoto(photo: Photo) -> ReturnValue:
+    conn = None
+    try:
+        conn = Connector.DBConnector()
+        conn.executePrepared("addPhoto", Queries.ADD_PHOTO,
+                             (photo.getPhotoID(), photo.getDescription(), photo.getSize()))
+        conn.commit()
+        Cache.photo_cache.invalidate(photo.getPhotoID())
 
     except DatabaseException.NOT_NULL_VIOLATION as e:
         conn.rollback()
@@ -183,14 +164,17 @@ def addPhoto(photo: Photo) -> ReturnValue:
 
 
 def getPhotoByID(photoID: int) -> Photo:
+    # a new business object is built for every call, the cached row itself is never handed out
+    found, photo_entry = Cache.photo_cache.get(photoID)
+    if found:
+        return Photo.badPhoto() if photo_entry is None else Photo(photo_entry[0], photo_entry[1], photo_entry[2])
+    generation = Cache.photo_cache.generation()
+
     conn = None
     rows_effected, result = 0, Connector.ResultSet()
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("""
-                        SELECT * FROM Photos WHERE photo_id={photoID};
-                        """).format(photoID=sql.Literal(photoID))
-        rows_effected, result = conn.execute(query)
+        rows_effected, result = conn.executePrepared("getPhotoByID", Queries.GET_PHOTO_BY_ID, (photoID,))
         conn.commit()
 
     except DatabaseException.CHECK_VIOLATION as e:
@@ -216,9 +200,11 @@ def getPhotoByID(photoID: int) -> Photo:
         conn.close()
 
     if rows_effected == 0:
+        Cache.photo_cache.put(photoID, None, generation)
         return Photo.badPhoto()
     else:
-        photo_entry = result.rows[0]
+        photo_entry = tuple(result.rows[0])
+        Cache.photo_cache.put(photoID, photo_entry, generation)
         return Photo(photo_entry[0], photo_entry[1], photo_entry[2])
 
 
@@ -227,22 +213,13 @@ def deletePhoto(photo: Photo) -> ReturnValue:
 
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("""
-                    BEGIN TRANSACTION;
-                    UPDATE Disks
-                    SET free_space = free_space + {photoSize}
-                    WHERE disk_id IN (SELECT disk_id
-                                      FROM StoredOn
-                                      WHERE photo_id = {photoID});
-                    DELETE
-                    FROM Photos
-                    WHERE photo_id = {photoID};
-                    COMMIT;
-                    """).format(photoID=sql.Literal(photo.getPhotoID()),
-                                photoSize=sql.Literal(photo.getSize()))
-
-        rows_effected, result = conn.execute(query)
+        # both statements run in the connection's transaction, committed together
+        _, freed = conn.executePrepared("deletePhoto_freeSpace", Queries.DELETE_PHOTO_FREE_SPACE,
+                                        (photo.getPhotoID(), photo.getSize()))
+        rows_effected, result = conn.executePrepared("deletePhoto", Queries.DELETE_PHOTO, (photo.getPhotoID(),))
         conn.commit()
+        Cache.photo_cache.invalidate(photo.getPhotoID())
+        Cache.disk_cache.invalidate(*(row[0] for row in freed.rows))
 
     except DatabaseException.CHECK_VIOLATION as e:
         conn.rollback()
@@ -279,15 +256,11 @@ def addDisk(disk: Disk) -> ReturnValue:
     conn = None
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("""
-                        INSERT INTO Disks VALUES({diskID}, {diskCompany}, {diskSpeed}, {diskFreeSpace}, {diskCost});
-                        """).format(diskID=sql.Literal(disk.getDiskID()),
-                                    diskCompany=sql.Literal(disk.getCompany()),
-                                    diskSpeed=sql.Literal(disk.getSpeed()),
-                                    diskFreeSpace=sql.Literal(disk.getFreeSpace()),
-                                    diskCost=sql.Literal(disk.getCost()))
-        conn.execute(query)
+        conn.executePrepared("addDisk", Queries.ADD_DISK,
+                             (disk.getDiskID(), disk.getCompany(), disk.getSpeed(), disk.getFreeSpace(),
+                              disk.getCost()))
         conn.commit()
+        Cache.disk_cache.invalidate(disk.getDiskID())
 
     except DatabaseException.NOT_NULL_VIOLATION as e:
         conn.rollback()
@@ -321,13 +294,19 @@ def addDisk(disk: Disk) -> ReturnValue:
 
 
 def getDiskByID(diskID: int) -> Disk:
+    # a new business object is built for every call, the cached row itself is never handed out
+    found, disk_entry = Cache.disk_cache.get(diskID)
+    if found:
+        if disk_entry is None:
+            return Disk.badDisk()
+        return Disk(disk_entry[0], disk_entry[1], disk_entry[2], disk_entry[3], disk_entry[4])
+    generation = Cache.disk_cache.generation()
+
     conn = None
     rows_effected, result = 0, Connector.ResultSet()
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("""
-                        SELECT * FROM Disks WHERE disk_id={diskID};""").format(diskID=sql.Literal(diskID))
-        rows_effected, result = conn.execute(query)
+        rows_effected, result = conn.executePrepared("getDiskByID", Queries.GET_DISK_BY_ID, (diskID,))
         conn.commit()
 
     except DatabaseException.CHECK_VIOLATION as e:
@@ -353,9 +332,11 @@ def getDiskByID(diskID: int) -> Disk:
         conn.close()
 
     if rows_effected == 0:
+        Cache.disk_cache.put(diskID, None, generation)
         return Disk.badDisk()
     else:
-        disk_entry = result.rows[0]
+        disk_entry = tuple(result.rows[0])
+        Cache.disk_cache.put(diskID, disk_entry, generation)
         return Disk(disk_entry[0], disk_entry[1], disk_entry[2], disk_entry[3], disk_entry[4])
 
 
@@ -364,13 +345,9 @@ def deleteDisk(diskID: int) -> ReturnValue:
     rows_effected, result = 0, Connector.ResultSet()
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("""
-                        DELETE
-                        FROM Disks
-                        WHERE disk_id = {disk_ID};
-                        """).format(disk_ID=sql.Literal(diskID))
-        rows_effected, result = conn.execute(query)
+        rows_effected, result = conn.executePrepared("deleteDisk", Queries.DELETE_DISK, (diskID,))
         conn.commit()
+        Cache.disk_cache.invalidate(diskID)
         if rows_effected != 1:
             conn.rollback()
             return ReturnValue.NOT_EXISTS
@@ -410,14 +387,9 @@ def addRAM(ram: RAM) -> ReturnValue:
     conn = None
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("""
-                        INSERT INTO RAMs 
-                        VALUES({ramID}, {ramSize}, {ramCompany});
-                        """).format(ramID=sql.Literal(ram.getRamID()),
-                                    ramCompany=sql.Literal(ram.getCompany()),
-                                    ramSize=sql.Literal(ram.getSize()))
-        conn.execute(query)
+        conn.executePrepared("addRAM", Queries.ADD_RAM, (ram.getRamID(), ram.getSize(), ram.getCompany()))
         conn.commit()
+        Cache.ram_cache.invalidate(ram.getRamID())
 
     except DatabaseException.NOT_NULL_VIOLATION as e:
         conn.rollback()
@@ -451,14 +423,17 @@ def addRAM(ram: RAM) -> ReturnValue:
 
 
 def getRAMByID(ramID: int) -> RAM:
+    # a new business object is built for every call, the cached row itself is never handed out
+    found, ram_entry = Cache.ram_cache.get(ramID)
+    if found:
+        return RAM.badRAM() if ram_entry is None else RAM(ram_entry[0], ram_entry[2], ram_entry[1])
+    generation = Cache.ram_cache.generation()
+
     conn = None
     rows_effected, result = 0, Connector.ResultSet()
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("""
-                        SELECT * FROM RAMs WHERE ram_id={RamId};
-                        """).format(RamId=sql.Literal(ramID))
-        rows_effected, result = conn.execute(query)
+        rows_effected, result = conn.executePrepared("getRAMByID", Queries.GET_RAM_BY_ID, (ramID,))
         conn.commit()
 
     except DatabaseException.CHECK_VIOLATION as e:
@@ -484,9 +459,11 @@ def getRAMByID(ramID: int) -> RAM:
         conn.close()
 
     if rows_effected == 0:
+        Cache.ram_cache.put(ramID, None, generation)
         return RAM.badRAM()
     else:
-        ram_entry = result.rows[0]
+        ram_entry = tuple(result.rows[0])
+        Cache.ram_cache.put(ramID, ram_entry, generation)
         return RAM(ram_entry[0], ram_entry[2], ram_entry[1])
 
 
@@ -495,14 +472,9 @@ def deleteRAM(ramID: int) -> ReturnValue:
     rows_effected, result = 0, Connector.ResultSet()
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("""
-                            DELETE
-                            FROM RAMs
-                            WHERE ram_id = {RamID};
-                            """).format(RamID=sql.Literal(ramID))
-
-        rows_effected, result = conn.execute(query)
+        rows_effected, result = conn.executePrepared("deleteRAM", Queries.DELETE_RAM, (ramID,))
         conn.commit()
+        Cache.ram_cache.invalidate(ramID)
 
         if rows_effected != 1:
             conn.rollback()
@@ -543,23 +515,15 @@ def addDiskAndPhoto(disk: Disk, photo: Photo) -> ReturnValue:
     conn = None
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("""
-                        BEGIN TRANSACTION;
-                        INSERT INTO Photos VALUES({photoID}, {photoDescription}, {photoSize});
-                        INSERT INTO Disks VALUES({diskID}, {diskCompany}, {diskSpeed}, {diskFreeSpace}, {diskCost});
-                        COMMIT;
-                        """).\
-            format(photoID=sql.Literal(photo.getPhotoID()),
-                   photoDescription=sql.Literal(photo.getDescription()),
-                   photoSize=sql.Literal(photo.getSize()),
-                   diskID=sql.Literal(disk.getDiskID()),
-                   diskCompany=sql.Literal(disk.getCompany()),
-                   diskSpeed=sql.Literal(disk.getSpeed()),
-                   diskFreeSpace=sql.Literal(disk.getFreeSpace()),
-                   diskCost=sql.Literal(disk.getCost()))
-
-        conn.execute(query)
+        # same statements as addPhoto and addDisk, committed together
+        conn.executePrepared("addPhoto", Queries.ADD_PHOTO,
+                             (photo.getPhotoID(), photo.getDescription(), photo.getSize()))
+        conn.executePrepared("addDisk", Queries.ADD_DISK,
+                             (disk.getDiskID(), disk.getCompany(), disk.getSpeed(), disk.getFreeSpace(),
+                              disk.getCost()))
         conn.commit()
+        Cache.photo_cache.invalidate(photo.getPhotoID())
+        Cache.disk_cache.invalidate(disk.getDiskID())
 
     except DatabaseException.UNIQUE_VIOLATION as e:
         conn.rollback()
@@ -592,27 +556,197 @@ def addDiskAndPhoto(disk: Disk, photo: Photo) -> ReturnValue:
     return ReturnValue.OK
 
 
+def _isPositive(value) -> bool:
+    return value is not None and value > 0
+
+
+def _isNotNegative(value) -> bool:
+    return value is not None and value >= 0
+
+
+# the range of the INTEGER columns of createTables
+_INT_MIN, _INT_MAX = -2 ** 31, 2 ** 31 - 1
+
+
+# whether every integer of row fits its column, PostgreSQL rejects the statement before checking any
+# constraint otherwise. values are not converted: a float or a str in an integer column does not fit
+def _isStorable(row: tuple, kinds: tuple) -> bool:
+    for value, kind in zip(row, kinds):
+        if kind is int and value is not None and (type(value) is not int or not _INT_MIN <= value <= _INT_MAX):
+            return False
+    return True
+
+
+# the CHECK and NOT NULL constraints of createTables, evaluated on the rows before they are sent in bulk
+def _isValidPhoto(row: tuple) -> bool:
+    return _isPositive(row[0]) and row[1] is not None and _isNotNegative(row[2])
+
+
+def _isValidDisk(row: tuple) -> bool:
+    return _isPositive(row[0]) and row[1] is not None and _isPositive(row[2]) and _isNotNegative(row[3]) and \
+        _isPositive(row[4])
+
+
+def _isValidRAM(row: tuple) -> bool:
+    return _isPositive(row[0]) and _isPositive(row[1]) and row[2] is not None
+
+
+# loads entries into table through a temporary staging table in one transaction.
+# returns one ReturnValue per entry, in input order, as if each entry was added on its own:
+# ERROR for rows with a value their column cannot hold, BAD_PARAMS for rows violating a constraint,
+# ALREADY_EXISTS for IDs already in the table (or earlier in the batch), ERROR for every entry if the batch
+# could not be loaded at all.
+# entries are business objects, or a batch of them whose rows are sent without building any
+def _addInBulk(table: str, columns: List[str], entries: Iterable, batchType: type, isValid: Callable,
+               cache: Cache.EntityCache, useCopy: bool) -> List[ReturnValue]:
+    # materialized so that a failure can still answer every entry
+    is_batch = isinstance(entries, batchType)
+    if not is_batch:
+        entries = list(entries)
+    results = []
+    first_index = {}
+
+    def stagedRows():
+        for row in entries.rows() if is_batch else map(batchType.toRow, entries):
+            if not _isStorable(row, batchType.kinds):
+                results.append(ReturnValue.ERROR)
+                continue
+            if not isValid(row):
+                results.append(ReturnValue.BAD_PARAMS)
+                continue
+            if row[0] not in first_index:
+                first_index[row[0]] = len(results)
+                yield row
+            # becomes OK once the row is actually inserted
+            results.append(ReturnValue.ALREADY_EXISTS)
+
+    rows = stagedRows()
+    conn = None
+    try:
+        conn = Connector.DBConnector()
+        staging = table + "_staging"
+        # inside a Session the staging table of an earlier call is only dropped when the session commits
+        conn.execute(sql.SQL("DROP TABLE IF EXISTS pg_temp.{staging}; "
+                             "CREATE TEMP TABLE {staging} (LIKE {table}) ON COMMIT DROP;").
+                     format(staging=sql.Identifier(staging), table=sql.Identifier(table)))
+        if useCopy:
+            conn.copy(staging, columns, rows)
+        else:
+            conn.insertValues(staging, columns, rows)
+        rows_effected, inserted = conn.execute(sql.SQL("""
+                        INSERT INTO {table} SELECT * FROM {staging}
+                        ON CONFLICT DO NOTHING
+                        RETURNING {key};
+                        """).format(table=sql.Identifier(table),
+                                    staging=sql.Identifier(staging),
+                                    key=sql.Identifier(columns[0])))
+        conn.commit()
+        cache.invalidate(*(row[0] for row in inserted.rows))
+
+    except Exception as e:
+        if conn is not None:
+            conn.rollback()
+        print(e)
+        return [ReturnValue.ERROR] * len(entries)
+    finally:
+        # will happen any way after try termination or exception handling
+        if conn is not None:
+            conn.close()
+
+    for row in inserted.rows:
+        results[first_index[row[0]]] = ReturnValue.OK
+    return results
+
+
+def addPhotos(photos: Union[Iterable[Photo], PhotoBatch], useCopy=True) -> List[ReturnValue]:
+    return _addInBulk("photos", ["photo_id", "description", "size"], photos, PhotoBatch, _isValidPhoto,
+                      Cache.photo_cache, useCopy)
+
+
+def addDisks(disks: Union[Iterable[Disk], DiskBatch], useCopy=True) -> List[ReturnValue]:
+    return _addInBulk("disks", ["disk_id", "company", "speed", "free_space", "cost"], disks, DiskBatch,
+                      _isValidDisk, Cache.disk_cache, useCopy)
+
+
+def addRAMs(rams: Union[Iterable[RAM], RAMBatch], useCopy=True) -> List[ReturnValue]:
+    return _addInBulk("rams", ["ram_id", "size", "company"], rams, RAMBatch, _isValidRAM, Cache.ram_cache, useCopy)
+
+
+# looks up many entities at once: cached rows are served from the cache, the others are read with one
+# = ANY statement per Queries.IDS_PER_STATEMENT IDs, all on one connection.
+# returns one entity per ID in request order, badEntity() for IDs that do not exist (for every ID on error).
+# with asBatch, a batchType holding the rows instead, all of their columns None for a bad entity
+def _getByIDs(name: str, query: str, ids: Iterable[int], cache: Cache.EntityCache, batchType: type,
+              badEntity: Callable, asBatch: bool = False):
+    ids = list(ids)
+    rows = {}
+    missing = []
+    for entity_id in ids:
+        if entity_id in rows:
+            continue
+        found, row = cache.get(entity_id)
+        rows[entity_id] = row
+        if not found and entity_id is not None:
+            missing.append(entity_id)
+
+    if missing:
+        generation = cache.generation()
+        conn = None
+        try:
+            conn = Connector.DBConnector()
+            for start in range(0, len(missing), Queries.IDS_PER_STATEMENT):
+                chunk = missing[start:start + Queries.IDS_PER_STATEMENT]
+                _, result = conn.executePrepared(name, query, (chunk,))
+                for row in result.rows:
+                    rows[row[0]] = tuple(row)
+            conn.commit()
+
+        except Exception as e:
+            if conn is not None:
+                conn.rollback()
+            print(e)
+            rows = dict.fromkeys(ids)
+            missing = []
+        finally:
+            # will happen any way after try termination or exception handling
+            if conn is not None:
+                conn.close()
+
+        for entity_id in missing:
+            cache.put(entity_id, rows[entity_id], generation)
+
+    if asBatch:
+        batch = batchType()
+        bad = (None,) * len(batchType.kinds)
+        for entity_id in ids:
+            batch.appendRow(*(rows[entity_id] or bad))
+        return batch
+    return [badEntity() if rows[entity_id] is None else batchType.toEntity(rows[entity_id]) for entity_id in ids]
+
+
+def getPhotosByIDs(photoIDs: Iterable[int], asBatch=False) -> Union[List[Photo], PhotoBatch]:
+    return _getByIDs("getPhotosByIDs", Queries.GET_PHOTOS_BY_IDS, photoIDs, Cache.photo_cache, PhotoBatch,
+                     Photo.badPhoto, asBatch)
+
+
+def getDisksByIDs(diskIDs: Iterable[int], asBatch=False) -> Union[List[Disk], DiskBatch]:
+    return _getByIDs("getDisksByIDs", Queries.GET_DISKS_BY_IDS, diskIDs, Cache.disk_cache, DiskBatch, Disk.badDisk,
+                     asBatch)
+
+
+def getRAMsByIDs(ramIDs: Iterable[int], asBatch=False) -> Union[List[RAM], RAMBatch]:
+    return _getByIDs("getRAMsByIDs", Queries.GET_RAMS_BY_IDS, ramIDs, Cache.ram_cache, RAMBatch, RAM.badRAM, asBatch)
+
+
 def addPhotoToDisk(photo: Photo, diskID: int) -> ReturnValue:
     conn = None
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("""
-                        BEGIN TRANSACTION; 
-                        
-                        INSERT INTO StoredOn 
-                        VALUES ({photoID}, {diskID});
-                        
-                        UPDATE Disks 
-                        SET free_space = free_space - {photoSize} 
-                        WHERE disk_id={diskID};
-
-                        COMMIT;
-                        """).format(photoID=sql.Literal(photo.getPhotoID()),
-                                    photoSize=sql.Literal(photo.getSize()),
-                                    diskID=sql.Literal(diskID))
-
-        conn.execute(query)
+        conn.executePrepared("addPhotoToDisk", Queries.ADD_PHOTO_TO_DISK, (photo.getPhotoID(), diskID))
+        conn.executePrepared("addPhotoToDisk_freeSpace", Queries.ADD_PHOTO_TO_DISK_FREE_SPACE,
+                             (diskID, photo.getSize()))
         conn.commit()
+        Cache.disk_cache.invalidate(diskID)
 
     except DatabaseException.FOREIGN_KEY_VIOLATION as e:
         conn.rollback()
@@ -645,27 +779,86 @@ def addPhotoToDisk(photo: Photo, diskID: int) -> ReturnValue:
     return ReturnValue.OK
 
 
+# places every (photo, diskID) pair in one transaction: all StoredOn rows are inserted in bulk and each disk
+# gets a single free_space update. returns one ReturnValue per pair, in input order, as if addPhotoToDisk was
+# called for each pair in turn: NOT_EXISTS for a missing photo or disk, ALREADY_EXISTS for a pair already
+# stored (or placed earlier in the batch), BAD_PARAMS when the disk has no room left for the photo.
+def placePhotos(placements: Iterable[Tuple[Photo, int]]) -> List[ReturnValue]:
+    placements = [(photo.getPhotoID(), photo.getSize(), diskID) for photo, diskID in placements]
+    if not placements:
+        return []
+    photo_ids = list({photo_id for photo_id, _, _ in placements if photo_id is not None})
+    disk_ids = list({disk_id for _, _, disk_id in placements if disk_id is not None})
+    conn = None
+    try:
+        conn = Connector.DBConnector()
+        free_space = {}
+        existing_photos = set()
+        stored = set()
+        if photo_ids and disk_ids:
+            # lock the disks first so concurrent placements cannot overdraw the same free space
+            _, result = conn.executePrepared("placePhotos_disks", Queries.PLACE_PHOTOS_DISKS, (disk_ids,))
+            free_space = {row[0]: row[1] for row in result.rows}
+            _, result = conn.executePrepared("placePhotos_photos", Queries.PLACE_PHOTOS_PHOTOS, (photo_ids,))
+            existing_photos = {row[0] for row in result.rows}
+            _, result = conn.executePrepared("placePhotos_stored", Queries.PLACE_PHOTOS_STORED, (photo_ids, disk_ids))
+            stored = {(row[0], row[1]) for row in result.rows}
+
+        results = []
+        accepted = []
+        taken = {}
+        for photo_id, size, disk_id in placements:
+            if photo_id is None or disk_id is None:
+                results.append(ReturnValue.ERROR)
+            elif photo_id not in existing_photos or disk_id not in free_space:
+                results.append(ReturnValue.NOT_EXISTS)
+            elif (photo_id, disk_id) in stored:
+                results.append(ReturnValue.ALREADY_EXISTS)
+            elif size is None:
+                results.append(ReturnValue.ERROR)
+            elif free_space[disk_id] - size < 0:
+                results.append(ReturnValue.BAD_PARAMS)
+            else:
+                free_space[disk_id] -= size
+                taken[disk_id] = taken.get(disk_id, 0) + size
+                stored.add((photo_id, disk_id))
+                accepted.append((photo_id, disk_id))
+                results.append(ReturnValue.OK)
+
+        if accepted:
+            conn.copy("storedon", ["photo_id", "disk_id"], accepted)
+            conn.executePrepared("placePhotos_freeSpace", Queries.PLACE_PHOTOS_FREE_SPACE,
+                                 (list(taken), list(taken.values())))
+        conn.commit()
+        Cache.disk_cache.invalidate(*taken)
+
+    except Exception as e:
+        if conn is not None:
+            conn.rollback()
+        print(e)
+        return [ReturnValue.ERROR] * len(placements)
+    finally:
+        # will happen any way after try termination or exception handling
+        if conn is not None:
+            conn.close()
+
+    return results
+
+
+def addPhotosToDisk(photos: Iterable[Photo], diskID: int) -> List[ReturnValue]:
+    return placePhotos((photo, diskID) for photo in photos)
+
+
 def removePhotoFromDisk(photo: Photo, diskID: int) -> ReturnValue:
 
     conn = None
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("""
-                        BEGIN TRANSACTION; 
-                        UPDATE Disks
-                        SET free_space = free_space + {photoSize}
-                        WHERE disk_id IN (SELECT disk_id FROM StoredOn WHERE photo_id={photoID} AND disk_id={diskID});
-                        
-                        DELETE FROM StoredOn 
-                        WHERE photo_id={photoID} AND disk_id={diskID};
-                        COMMIT;
-                        """).format(photoID=sql.Literal(photo.getPhotoID()),
-                                    photoSize=sql.Literal(photo.getSize()),
-                                    diskID=sql.Literal(diskID)
-                                    )
-
-        conn.execute(query)
+        conn.executePrepared("removePhotoFromDisk_freeSpace", Queries.REMOVE_PHOTO_FROM_DISK_FREE_SPACE,
+                             (photo.getPhotoID(), diskID, photo.getSize()))
+        conn.executePrepared("removePhotoFromDisk", Queries.REMOVE_PHOTO_FROM_DISK, (photo.getPhotoID(), diskID))
         conn.commit()
+        Cache.disk_cache.invalidate(diskID)
     except DatabaseException.FOREIGN_KEY_VIOLATION as e:
         conn.rollback()
         print(e)
@@ -701,12 +894,7 @@ def addRAMToDisk(ramID: int, diskID: int) -> ReturnValue:
     conn = None
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("""
-                            INSERT INTO PartOf 
-                            VALUES ({ramID}, {diskID});
-                            """).format(ramID=sql.Literal(ramID),
-                                        diskID=sql.Literal(diskID))
-        conn.execute(query)
+        conn.executePrepared("addRAMToDisk", Queries.ADD_RAM_TO_DISK, (ramID, diskID))
         conn.commit()
 
     except DatabaseException.FOREIGN_KEY_VIOLATION as e:
@@ -744,13 +932,8 @@ def removeRAMFromDisk(ramID: int, diskID: int) -> ReturnValue:
     conn = None
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("""
-                            DELETE FROM PartOf 
-                            WHERE ram_id={ramID} AND disk_id={diskID} 
-                            """).format(ramID=sql.Literal(ramID),
-                                        diskID=sql.Literal(diskID))
-
-        rows_effected, result = conn.execute(query)
+        rows_effected, result = conn.executePrepared("removeRAMFromDisk",
+                                                     Queries.REMOVE_RAM_FROM_DISK, (ramID, diskID))
         conn.commit()
 
         if rows_effected != 1:
@@ -791,12 +974,9 @@ def averagePhotosSizeOnDisk(diskID: int) -> float:
     conn = None
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("""
-                        SELECT COALESCE(AVG(size), 0)
-                        FROM Photos_Stored_On_Disks
-                        WHERE disk_id = {diskID}
-                        """).format(diskID=sql.Literal(diskID))
-        rows_effected, result = conn.execute(query)
+        rows_effected, result = conn.executePrepared("averagePhotosSizeOnDisk",
+                                                     Queries.AVERAGE_PHOTOS_SIZE_ON_DISK,
+                                                     (diskID,))
         conn.commit()
 
     except DatabaseException.CHECK_VIOLATION as e:
@@ -833,12 +1013,8 @@ def getTotalRamOnDisk(diskID: int) -> int:
     conn = None
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("""
-                            SELECT COALESCE(SUM(size), 0)
-                            FROM Rams_Part_Of_Disks
-                            WHERE disk_id = {diskID};
-                            """).format(diskID=sql.Literal(diskID))
-        rows_effected, result = conn.execute(query)
+        rows_effected, result = conn.executePrepared("getTotalRamOnDisk",
+                                                     Queries.GET_TOTAL_RAM_ON_DISK, (diskID,))
         conn.commit()
 
     except DatabaseException.CHECK_VIOLATION as e:
@@ -875,12 +1051,9 @@ def getCostForDescription(description: str) -> int:
     conn = None
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("""
-                                SELECT COALESCE(SUM(cost*size), 0)
-                                FROM Photos_Stored_On_Disks pd INNER JOIN Disks d ON pd.disk_id = d.disk_id
-                                WHERE description = {description};
-                                """).format(description=sql.Literal(description))
-        rows_effected, result = conn.execute(query)
+        rows_effected, result = conn.executePrepared("getCostForDescription",
+                                                     Queries.GET_COST_FOR_DESCRIPTION,
+                                                     (description,))
         conn.commit()
 
     except DatabaseException.CHECK_VIOLATION as e:
@@ -917,14 +1090,8 @@ def getPhotosCanBeAddedToDisk(diskID: int) -> List[int]:
     conn = None
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("""
-                        SELECT photo_id 
-                        FROM Photos, (SELECT free_space FROM Disks where Disks.disk_id={DiskID}) AS Free_Space
-                        WHERE size <= Free_Space.free_space
-                        ORDER BY photo_id DESC
-                        LIMIT 5
-                        """).format(DiskID=sql.Literal(diskID))
-        rows_selected, result = conn.execute(query)
+        rows_selected, result = conn.executePrepared("getPhotosCanBeAddedToDisk",
+                                                     Queries.GET_PHOTOS_CAN_BE_ADDED_TO_DISK, (diskID,))
         conn.commit()
 
     except DatabaseException.CHECK_VIOLATION as e:
@@ -957,16 +1124,8 @@ def getPhotosCanBeAddedToDiskAndRAM(diskID: int) -> List[int]:
     conn = None
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("""
-                        SELECT photo_id
-                        FROM Photos, (SELECT free_space FROM Disks WHERE Disks.disk_id={DiskID}) AS Free_Space,
-                        (SELECT SUM(size) as sum_ram FROM Rams_Part_Of_Disks WHERE Rams_Part_Of_Disks.disk_id={DiskID}) AS Sum_RAMs
-                        WHERE size<= Free_Space.free_space AND ((Sum_RAMs.sum_ram IS NOT NULL AND size <= Sum_RAMs.sum_ram) OR (Sum_RAMs.sum_ram IS NULL AND size = 0))
-                        ORDER by photo_id ASC
-                        LIMIT 5;
-                        """).format(DiskID=sql.Literal(diskID))
-
-        rows_selected, result = conn.execute(query)
+        rows_selected, result = conn.executePrepared("getPhotosCanBeAddedToDiskAndRAM",
+                                                     Queries.GET_PHOTOS_CAN_BE_ADDED_TO_DISK_AND_RAM, (diskID,))
         conn.commit()
 
     except DatabaseException.CHECK_VIOLATION as e:
@@ -999,13 +1158,8 @@ def isCompanyExclusive(diskID: int) -> bool:
     conn = None
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("""
-                        SELECT company 
-                        FROM Disks
-                        WHERE disk_id = {DiskID} AND company = ALL(SELECT company FROM Rams_Part_Of_Disks WHERE disk_id={DiskID})
-                        """).format(DiskID=sql.Literal(diskID))
-
-        rows_effected, result = conn.execute(query)
+        rows_effected, result = conn.executePrepared("isCompanyExclusive",
+                                                     Queries.IS_COMPANY_EXCLUSIVE, (diskID,))
         conn.commit()
 
     except DatabaseException.CHECK_VIOLATION as e:
@@ -1040,15 +1194,9 @@ def isDiskContainingAtLeastNumExists(description : str, num : int) -> bool:
     conn = None
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("""
-                            SELECT disk_id 
-                            FROM Photos_Stored_On_Disks 
-                            WHERE description ={description} 
-                            GROUP BY disk_id 
-                            HAVING COUNT(*)>= {num};
-                            """).format(description=sql.Literal(description), num=sql.Literal(num))
-
-        rows_effected, result = conn.execute(query)
+        rows_effected, result = conn.executePrepared("isDiskContainingAtLeastNumExists",
+                                                     Queries.IS_DISK_CONTAINING_AT_LEAST_NUM_EXISTS,
+                                                     (description, num))
         conn.commit()
 
     except DatabaseException.CHECK_VIOLATION as e:
@@ -1083,15 +1231,8 @@ def getDisksContainingTheMostData() -> List[int]:
     conn = None
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("""
-                        SELECT d.disk_id, COALESCE(SUM(pd.size), 0) as amount_data
-                        FROM Photos_Stored_On_Disks pd RIGHT OUTER JOIN Disks d ON pd.disk_id = d.disk_id
-                        GROUP BY d.disk_id
-                        ORDER BY amount_data DESC, d.disk_id ASC
-                        LIMIT 5;
-                        """)
-
-        rows_effected, result = conn.execute(query)
+        rows_effected, result = conn.executePrepared("getDisksContainingTheMostData",
+                                                     Queries.GET_DISKS_CONTAINING_THE_MOST_DATA)
         conn.commit()
 
     except DatabaseException.CHECK_VIOLATION as e:
@@ -1124,13 +1265,8 @@ def getConflictingDisks() -> List[int]:
     conn = None
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("""
-                        SELECT DISTINCT so1.disk_id
-                        FROM StoredOn so1 JOIN StoredOn so2 ON so1.photo_id = so2.photo_id AND so1.disk_id <> so2.disk_id
-                        ORDER BY disk_id ASC;
-                        """)
-
-        rows_effected, result = conn.execute(query)
+        rows_effected, result = conn.executePrepared("getConflictingDisks",
+                                                     Queries.GET_CONFLICTING_DISKS)
         conn.commit()
 
     except DatabaseException.CHECK_VIOLATION as e:
@@ -1163,19 +1299,8 @@ def mostAvailableDisks() -> List[int]:
     conn = None
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("""
-                        SELECT d.disk_id, COUNT(bd.d_id)
-                        FROM Disks d 
-                        LEFT OUTER JOIN (SELECT D.disk_id as d_id, D.speed as d_speed
-                        FROM Photos P, Disks D
-                        WHERE P.size <= D.free_space) bd
-                        ON d.disk_id = bd.d_id
-                        GROUP BY d.disk_id
-                        ORDER BY COUNT(bd.d_id) DESC, d.speed DESC, d.disk_id ASC
-                        LIMIT 5;
-                        """)
-
-        rows_effected, result = conn.execute(query)
+        rows_effected, result = conn.executePrepared("mostAvailableDisks",
+                                                     Queries.MOST_AVAILABLE_DISKS)
         conn.commit()
 
     except DatabaseException.CHECK_VIOLATION as e:
@@ -1209,22 +1334,11 @@ def getClosePhotos(photoID: int) -> List[int]:
     try:
         conn = Connector.DBConnector()
 
-        query = sql.SQL("""
-                        SELECT p.photo_id, COUNT(s2_id)
-                        FROM
-                        (SELECT s1.photo_id as s1_id, s2.photo_id as s2_id, s1.disk_id as disk_id
-                        FROM StoredOn s1 
-                        INNER JOIN StoredOn s2 ON s1.disk_id = s2.disk_id
-                        WHERE s1.photo_id = {PhotoID} AND s2.photo_id <> {PhotoID}) sd
-                        RIGHT OUTER JOIN Photos p ON sd.s2_id = p.photo_id
-                        WHERE p.photo_id <> {PhotoID}
-                        GROUP BY p.photo_id
-                        HAVING COUNT(s2_id) >= 0.5*(SELECT COUNT(disk_id) FROM StoredOn WHERE photo_id = {PhotoID})
-                        ORDER BY p.photo_id ASC
-                        LIMIT 10;
-                        """).format(PhotoID=sql.Literal(photoID))
-
-        rows_effected, result = conn.execute(query)
+        rows_effected, result = conn.executePrepared("getClosePhotos_disks", Queries.GET_CLOSE_PHOTOS_DISKS,
+                                                      (photoID,))
+        disk_ids, has_pairs = result.rows[0]
+        name, query, params = Queries.closePhotos(photoID, disk_ids, has_pairs)
+        rows_effected, result = conn.executePrepared(name, query, params)
         conn.commit()
 
     except DatabaseException.CHECK_VIOLATION as e:
@@ -1250,3 +1364,199 @@ def getClosePhotos(photoID: int) -> List[int]:
         conn.close()
     close_photos = [row[0] for row in result.rows]
     return close_photos
+
+
+# the ReturnValue of a failed call, failed maps the DatabaseException classes the function handles
+def _failure(failed: dict) -> Callable:
+    def failure(error: Exception) -> ReturnValue:
+        print(error)
+        return failed.get(type(error), ReturnValue.ERROR)
+    return failure
+
+
+def _invalidated(cache: Cache.EntityCache, *keys) -> ReturnValue:
+    cache.invalidate(*keys)
+    return ReturnValue.OK
+
+
+_ADD_FAILED = _failure({DatabaseException.NOT_NULL_VIOLATION: ReturnValue.BAD_PARAMS,
+                        DatabaseException.CHECK_VIOLATION: ReturnValue.BAD_PARAMS,
+                        DatabaseException.UNIQUE_VIOLATION: ReturnValue.ALREADY_EXISTS})
+_FAILED = _failure({})
+
+
+def _pipelinedLookup(name: str, query: str, entityID: int, cache: Cache.EntityCache, toEntity: Callable,
+                     badEntity: Callable):
+    if cache.get(entityID)[0]:
+        return None
+    generation = cache.generation()
+
+    def done(results):
+        rows_effected, result = results[0]
+        entry = tuple(result.rows[0]) if rows_effected > 0 else None
+        cache.put(entityID, entry, generation)
+        return badEntity() if entry is None else toEntity(entry)
+
+    def failed(error):
+        print(error)
+        return badEntity()
+    return [(name, query, (entityID,))], done, failed
+
+
+def _pipelinedDeletePhoto(photo: Photo):
+    def done(results):
+        Cache.disk_cache.invalidate(*(row[0] for row in results[0][1].rows))
+        return _invalidated(Cache.photo_cache, photo.getPhotoID())
+    return [("deletePhoto_freeSpace", Queries.DELETE_PHOTO_FREE_SPACE, (photo.getPhotoID(), photo.getSize())),
+            ("deletePhoto", Queries.DELETE_PHOTO, (photo.getPhotoID(),))], done, _FAILED
+
+
+def _pipelinedAddDiskAndPhoto(disk: Disk, photo: Photo):
+    def done(results):
+        Cache.photo_cache.invalidate(photo.getPhotoID())
+        return _invalidated(Cache.disk_cache, disk.getDiskID())
+    return [("addPhoto", Queries.ADD_PHOTO, (photo.getPhotoID(), photo.getDescription(), photo.getSize())),
+            ("addDisk", Queries.ADD_DISK, (disk.getDiskID(), disk.getCompany(), disk.getSpeed(), disk.getFreeSpace(),
+                                           disk.getCost()))], \
+        done, _failure({DatabaseException.UNIQUE_VIOLATION: ReturnValue.ALREADY_EXISTS})
+
+
+def _pipelinedDelete(name: str, query: str, entityID: int, cache: Cache.EntityCache):
+    def done(results):
+        cache.invalidate(entityID)
+        return ReturnValue.OK if results[0][0] == 1 else ReturnValue.NOT_EXISTS
+    return [(name, query, (entityID,))], done, _FAILED
+
+
+# how runPipelined runs each function: its arguments give the (name, query, params) statements of the call,
+# what it returns once they committed (from their results) and what it returns when one failed.
+# the same statements, cache updates and ReturnValues as the function itself, PipelineTest checks that the
+# statements match what the function sends. None runs the function itself
+_PIPELINED = {
+    addPhoto: lambda photo: (
+        [("addPhoto", Queries.ADD_PHOTO, (photo.getPhotoID(), photo.getDescription(), photo.getSize()))],
+        lambda results: _invalidated(Cache.photo_cache, photo.getPhotoID()), _ADD_FAILED),
+    addDisk: lambda disk: (
+        [("addDisk", Queries.ADD_DISK, (disk.getDiskID(), disk.getCompany(), disk.getSpeed(), disk.getFreeSpace(),
+                                        disk.getCost()))],
+        lambda results: _invalidated(Cache.disk_cache, disk.getDiskID()), _ADD_FAILED),
+    addRAM: lambda ram: (
+        [("addRAM", Queries.ADD_RAM, (ram.getRamID(), ram.getSize(), ram.getCompany()))],
+        lambda results: _invalidated(Cache.ram_cache, ram.getRamID()), _ADD_FAILED),
+    addDiskAndPhoto: _pipelinedAddDiskAndPhoto,
+    getPhotoByID: lambda photoID: _pipelinedLookup(
+        "getPhotoByID", Queries.GET_PHOTO_BY_ID, photoID, Cache.photo_cache,
+        lambda entry: Photo(entry[0], entry[1], entry[2]), Photo.badPhoto),
+    getDiskByID: lambda diskID: _pipelinedLookup(
+        "getDiskByID", Queries.GET_DISK_BY_ID, diskID, Cache.disk_cache,
+        lambda entry: Disk(entry[0], entry[1], entry[2], entry[3], entry[4]), Disk.badDisk),
+    getRAMByID: lambda ramID: _pipelinedLookup(
+        "getRAMByID", Queries.GET_RAM_BY_ID, ramID, Cache.ram_cache,
+        lambda entry: RAM(entry[0], entry[2], entry[1]), RAM.badRAM),
+    deletePhoto: _pipelinedDeletePhoto,
+    deleteDisk: lambda diskID: _pipelinedDelete("deleteDisk", Queries.DELETE_DISK, diskID, Cache.disk_cache),
+    deleteRAM: lambda ramID: _pipelinedDelete("deleteRAM", Queries.DELETE_RAM, ramID, Cache.ram_cache),
+    addPhotoToDisk: lambda photo, diskID: (
+        [("addPhotoToDisk", Queries.ADD_PHOTO_TO_DISK, (photo.getPhotoID(), diskID)),
+         ("addPhotoToDisk_freeSpace", Queries.ADD_PHOTO_TO_DISK_FREE_SPACE, (diskID, photo.getSize()))],
+        lambda results: _invalidated(Cache.disk_cache, diskID),
+        _failure({DatabaseException.FOREIGN_KEY_VIOLATION: ReturnValue.NOT_EXISTS,
+                  DatabaseException.UNIQUE_VIOLATION: ReturnValue.ALREADY_EXISTS,
+                  DatabaseException.CHECK_VIOLATION: ReturnValue.BAD_PARAMS})),
+    removePhotoFromDisk: lambda photo, diskID: (
+        [("removePhotoFromDisk_freeSpace", Queries.REMOVE_PHOTO_FROM_DISK_FREE_SPACE,
+          (photo.getPhotoID(), diskID, photo.getSize())),
+         ("removePhotoFromDisk", Queries.REMOVE_PHOTO_FROM_DISK, (photo.getPhotoID(), diskID))],
+        lambda results: _invalidated(Cache.disk_cache, diskID), _FAILED),
+    addRAMToDisk: lambda ramID, diskID: (
+        [("addRAMToDisk", Queries.ADD_RAM_TO_DISK, (ramID, diskID))],
+        lambda results: ReturnValue.OK,
+        _failure({DatabaseException.FOREIGN_KEY_VIOLATION: ReturnValue.NOT_EXISTS,
+                  DatabaseException.UNIQUE_VIOLATION: ReturnValue.ALREADY_EXISTS})),
+    removeRAMFromDisk: lambda ramID, diskID: (
+        [("removeRAMFromDisk", Queries.REMOVE_RAM_FROM_DISK, (ramID, diskID))],
+        lambda results: ReturnValue.OK if results[0][0] == 1 else ReturnValue.NOT_EXISTS, _FAILED),
+}
+
+
+# runs a queue of independent calls, each (function, *arguments), and returns what every call returns, in order.
+# each call is still committed on its own, but the statements of the calls in _PIPELINED are sent on one
+# connection without waiting for the results of the calls before them (see DBConnector.executePipelined).
+# other functions, and lookups served from the caches, run as usual once the calls queued before them are done.
+# inside a Session every call simply runs in turn. once configureEngine selected another engine, its
+# runPipelined runs the calls, _PIPELINED only holds the functions of PostgreSQL
+def runPipelined(calls: Iterable[tuple]) -> list:
+    if engine != "postgresql":
+        return globals()["runPipelined"](calls)
+    calls = [(call[0], tuple(call[1:])) for call in calls]
+    if Connector.currentSession() is not None:
+        return [function(*arguments) for function, arguments in calls]
+    results = [None] * len(calls)
+    queued = []  # (index, statements, done, failed)
+
+    def flush():
+        if not queued:
+            return
+        conn = None
+        try:
+            conn = Connector.DBConnector()
+            outcomes = conn.executePipelined([statements for _, statements, _, _ in queued])
+        except Exception as e:
+            outcomes = [e] * len(queued)
+        finally:
+            if conn is not None:
+                conn.close()
+        for (index, _, done, failed), outcome in zip(queued, outcomes):
+            results[index] = failed(outcome) if isinstance(outcome, Exception) else done(outcome)
+        queued.clear()
+
+    for index, (function, arguments) in enumerate(calls):
+        plan = _PIPELINED.get(function)
+        operation = plan(*arguments) if plan is not None else None
+        if operation is None:
+            flush()
+            results[index] = function(*arguments)
+        else:
+            queued.append((index,) + operation)
+    flush()
+    return results
+
+
+# the engine the functions of this module run on, selected with configureEngine or at import by ENGINE_ENV
+ENGINE_ENV = "SOLUTION_ENGINE"
+# the module implementing each engine, None for the functions defined here
+ENGINES = {"postgresql": None, "memory": "MemorySolution", "sqlite": "SQLiteSolution"}
+engine = "postgresql"
+
+# the functions configureEngine swaps, as defined above for PostgreSQL. every engine module defines all of them
+_POSTGRESQL = dict({name: value for name, value in globals().items()
+                    if not name.startswith("_") and getattr(value, "__module__", None) == __name__}, Session=Session)
+
+
+# runs every function of this module (and Session) on the engine name: PostgreSQL, "memory" for the tables of
+# MemorySolution, held in this process, or "sqlite" for SQLiteSolution. the tables of one engine are not seen
+# by the others
+def configureEngine(name: str):
+    global engine
+    if name not in ENGINES:
+        raise ValueError("Unknown engine: " + name)
+    if ENGINES[name] is None:
+        functions = _POSTGRESQL
+    else:
+        module = importlib.import_module(ENGINES[name])
+        missing = [function for function in _POSTGRESQL if not hasattr(module, function)]
+        if missing:
+            raise ValueError("Engine " + name + " does not define " + ", ".join(sorted(missing)))
+        functions = {function: getattr(module, function) for function in _POSTGRESQL}
+    globals().update(functions)
+    engine = name
+    Cache.clearCaches()
+
+
+# adds an engine configureEngine can select, implemented by the functions of the module named module
+def registerEngine(name: str, module: str):
+    ENGINES[name] = module
+
+
+if os.environ.get(ENGINE_ENV):
+    configureEngine(os.environ[ENGINE_ENV])
@@ -0,0 +1,127 @@
+import asyncio
+import random
+import unittest
+import Solution
+import AsyncSolution
+import Utility.AsyncDBConnector as AsyncConnector
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+from Business.RAM import RAM
+from Business.Disk import Disk
+
+
+class Test(AbstractTest):
+    # AsyncSolution reads the tables on connections of its own pool, so the rows have to be committed
+    isolation = "truncate"
+
+    # run a coroutine on its own event loop, closing the pool of that loop afterwards
+    def runAsync(self, coroutine):
+        async def runAndClose():
+            try:
+                return await coroutine
+            finally:
+                await AsyncConnector.closePool()
+        return asyncio.run(runAndClose())
+
+    def test_add_get_and_remove(self) -> None:
+        async def scenario():
+            self.assertEqual(ReturnValue.OK, await AsyncSolution.addDisk(Disk(1, "DELL", 10, 10, 10)), "Should work")
+            self.assertEqual(ReturnValue.ALREADY_EXISTS, await AsyncSolution.addDisk(Disk(1, "DELL", 10, 10, 10)),
+                             "ID 1 ALREADY_EXISTS")
+            self.assertEqual(ReturnValue.BAD_PARAMS, await AsyncSolution.addDisk(Disk(2, "HP", 0, 10, 10)),
+                             "Speed 0 is illegal")
+            self.assertEqual(ReturnValue.BAD_PARAMS, await AsyncSolution.addDisk(Disk(2, None, 10, 10, 10)),
+                             "NULL is not allowed")
+            self.assertEqual(ReturnValue.OK, await AsyncSolution.addPhoto(Photo(1, "Tree", 4)), "Should work")
+            self.assertEqual(ReturnValue.BAD_PARAMS, await AsyncSolution.addPhoto(Photo(2, "Tree", -1)),
+                             "Size -1 is illegal")
+            self.assertEqual(ReturnValue.OK, await AsyncSolution.addRAM(RAM(1, "DELL", 8)), "Should work")
+            self.assertEqual(ReturnValue.ALREADY_EXISTS, await AsyncSolution.addDiskAndPhoto(
+                Disk(2, "HP", 10, 10, 10), Photo(1, "Tree", 4)), "Photo 1 exists")
+            self.assertEqual(None, (await AsyncSolution.getDiskByID(2)).getDiskID(), "Rolled back together")
+            disk = await AsyncSolution.getDiskByID(1)
+            self.assertEqual("DELL", disk.getCompany(), "Should work")
+            self.assertEqual(10, disk.getFreeSpace(), "Should work")
+            self.assertEqual("Tree", (await AsyncSolution.getPhotoByID(1)).getDescription(), "Should work")
+            self.assertEqual(8, (await AsyncSolution.getRAMByID(1)).getSize(), "Should work")
+            self.assertEqual(ReturnValue.OK, await AsyncSolution.addPhotoToDisk(Photo(1, "Tree", 4), 1), "Should work")
+            self.assertEqual(ReturnValue.ALREADY_EXISTS, await AsyncSolution.addPhotoToDisk(Photo(1, "Tree", 4), 1),
+                             "Already stored")
+            self.assertEqual(ReturnValue.NOT_EXISTS, await AsyncSolution.addPhotoToDisk(Photo(1, "Tree", 4), 5),
+                             "Disk 5 does not exist")
+            self.assertEqual(6, (await AsyncSolution.getDiskByID(1)).getFreeSpace(), "Should work")
+            self.assertEqual(ReturnValue.OK, await AsyncSolution.addRAMToDisk(1, 1), "Should work")
+            self.assertEqual(8, await AsyncSolution.getTotalRamOnDisk(1), "Should work")
+            self.assertEqual(4, await AsyncSolution.averagePhotosSizeOnDisk(1), "Should work")
+            self.assertEqual(40, await AsyncSolution.getCostForDescription("Tree"), "Size 4 at cost 10")
+            self.assertTrue(await AsyncSolution.isCompanyExclusive(1), "Should work")
+            self.assertTrue(await AsyncSolution.isDiskContainingAtLeastNumExists("Tree", 1), "Should work")
+            self.assertEqual(ReturnValue.OK, await AsyncSolution.removeRAMFromDisk(1, 1), "Should work")
+            self.assertEqual(ReturnValue.NOT_EXISTS, await AsyncSolution.removeRAMFromDisk(1, 1), "Already removed")
+            self.assertEqual(ReturnValue.OK, await AsyncSolution.removePhotoFromDisk(Photo(1, "Tree", 4), 1),
+                             "Should work")
+            self.assertEqual(ReturnValue.OK, await AsyncSolution.deletePhoto(Photo(1, "Tree", 4)), "Should work")
+            self.assertEqual(None, (await AsyncSolution.getPhotoByID(1)).getPhotoID(), "Should return badPhoto")
+            self.assertEqual(ReturnValue.OK, await AsyncSolution.deleteRAM(1), "Should work")
+            self.assertEqual(ReturnValue.NOT_EXISTS, await AsyncSolution.deleteRAM(1), "Already removed")
+            self.assertEqual(ReturnValue.OK, await AsyncSolution.deleteDisk(1), "Should work")
+            self.assertEqual(ReturnValue.NOT_EXISTS, await AsyncSolution.deleteDisk(1), "Already removed")
+            await AsyncSolution.dropTables()
+            self.assertEqual(ReturnValue.ERROR, await AsyncSolution.addDisk(Disk(1, "HP", 1, 1, 1)), "Should error")
+            self.assertEqual(None, (await AsyncSolution.getDiskByID(1)).getDiskID(), "Should return badDisk")
+            self.assertEqual(-1, await AsyncSolution.getTotalRamOnDisk(1), "Should error")
+            self.assertListEqual([], await AsyncSolution.getConflictingDisks(), "Should error")
+            await AsyncSolution.createTables()
+            self.assertEqual(ReturnValue.OK, await AsyncSolution.addDisk(Disk(1, "HP", 5, 5, 5)), "Should work")
+        self.runAsync(scenario())
+
+    def test_matches_solution(self) -> None:
+        rnd = random.Random(236363)
+        Solution.addDisks([Disk(i, rnd.choice(["DELL", "HP"]), 10, rnd.randint(0, 60), rnd.randint(1, 9))
+                           for i in range(1, 9)])
+        Solution.addPhotos([Photo(i, rnd.choice(["Tree", "Sky"]), rnd.randint(0, 9)) for i in range(1, 31)])
+        Solution.addRAMs([RAM(i, rnd.choice(["DELL", "HP"]), rnd.randint(1, 8)) for i in range(1, 11)])
+        for _ in range(60):
+            Solution.addPhotoToDisk(Solution.getPhotoByID(rnd.randint(1, 30)), rnd.randint(1, 8))
+            Solution.addRAMToDisk(rnd.randint(1, 10), rnd.randint(1, 8))
+
+        async def compare():
+            for disk_id in range(1, 9):
+                self.assertEqual(Solution.averagePhotosSizeOnDisk(disk_id),
+                                 await AsyncSolution.averagePhotosSizeOnDisk(disk_id), "Same average")
+                self.assertEqual(Solution.getTotalRamOnDisk(disk_id),
+                                 await AsyncSolution.getTotalRamOnDisk(disk_id), "Same RAM")
+                self.assertEqual(Solution.isCompanyExclusive(disk_id),
+                                 await AsyncSolution.isCompanyExclusive(disk_id), "Same answer")
+                self.assertListEqual(Solution.getPhotosCanBeAddedToDisk(disk_id),
+                                     await AsyncSolution.getPhotosCanBeAddedToDisk(disk_id), "Same photos")
+                self.assertListEqual(Solution.getPhotosCanBeAddedToDiskAndRAM(disk_id),
+                                     await AsyncSolution.getPhotosCanBeAddedToDiskAndRAM(disk_id), "Same photos")
+            for photo_id in range(1, 31):
+                self.assertListEqual(Solution.getClosePhotos(photo_id),
+                                     await AsyncSolution.getClosePhotos(photo_id), "Same close photos")
+            self.assertEqual(Solution.getCostForDescription("Tree"),
+                             await AsyncSolution.getCostForDescription("Tree"), "Same cost")
+            self.assertEqual(Solution.isDiskContainingAtLeastNumExists("Sky", 2),
+                             await AsyncSolution.isDiskContainingAtLeastNumExists("Sky", 2), "Same answer")
+            self.assertListEqual(Solution.getDisksContainingTheMostData(),
+                                 await AsyncSolution.getDisksContainingTheMostData(), "Same disks")
+            self.assertListEqual(Solution.getConflictingDisks(),
+                                 await AsyncSolution.getConflictingDisks(), "Same disks")
+            self.assertListEqual(Solution.mostAvailableDisks(),
+                                 await AsyncSolution.mostAvailableDisks(), "Same disks")
+        self.runAsync(compare())
+
+    def test_concurrent_lookups(self) -> None:
+        Solution.addPhotos([Photo(i, "Tree", i) for i in range(1, 101)])
+
+        async def lookups():
+            return await asyncio.gather(*(AsyncSolution.getPhotoByID(i % 120 + 1) for i in range(2000)))
+        photos = self.runAsync(lookups())
+        self.assertListEqual([i % 120 + 1 if i % 120 < 100 else None for i in range(2000)],
+                             [photo.getPhotoID() for photo in photos], "Every lookup is answered")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
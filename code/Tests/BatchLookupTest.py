@@ -0,0 +1,75 @@
+import asyncio
+import unittest
+import Solution
+import AsyncSolution
+import Queries
+import Utility.Cache as Cache
+import Utility.DBConnector as Connector
+import Utility.AsyncDBConnector as AsyncConnector
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+from Business.RAM import RAM
+from Business.Disk import Disk
+
+
+class Test(AbstractTest):
+    # the lookups have to go through the caches (bypassed in a Session) and AsyncSolution
+    isolation = "truncate"
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        Queries.IDS_PER_STATEMENT = 10000
+        Cache.configureCaches(**Cache.CACHE_DEFAULTS)
+
+    def test_request_order_and_placeholders(self) -> None:
+        Solution.addPhotos([Photo(i, "Tree" + str(i), i) for i in range(1, 6)])
+        Solution.addDisks([Disk(i, "DELL", i, 10, 10) for i in range(1, 4)])
+        Solution.addRAMs([RAM(i, "HP", i) for i in range(1, 3)])
+        photos = Solution.getPhotosByIDs([5, 9, 1, 5, None, 3])
+        self.assertListEqual([5, None, 1, 5, None, 3], [photo.getPhotoID() for photo in photos], "Request order")
+        self.assertEqual("Tree5", photos[0].getDescription(), "Should work")
+        self.assertIsNot(photos[0], photos[3], "Every position gets its own object")
+        disks = Solution.getDisksByIDs(iter([3, 4, 2]))
+        self.assertListEqual([3, None, 2], [disk.getSpeed() for disk in disks], "Should work")
+        rams = Solution.getRAMsByIDs([2, 1, 7])
+        self.assertListEqual([2, 1, None], [ram.getSize() for ram in rams], "Should work")
+        self.assertListEqual(["HP", "HP", None], [ram.getCompany() for ram in rams], "Should work")
+        self.assertListEqual([], Solution.getDisksByIDs([]), "Empty request")
+        Solution.dropTables()
+        self.assertListEqual([None, None], [disk.getDiskID() for disk in Solution.getDisksByIDs([1, 2])],
+                             "Should return badDisk")
+
+    def test_chunks_and_cache(self) -> None:
+        Solution.addDisks([Disk(i, "DELL", 10, 10, 10) for i in range(1, 8)])
+        Queries.IDS_PER_STATEMENT = 3
+        Cache.configureCaches(enabled=False)
+        Connector.prepared_statistics.reset()
+        disk_ids = [7, 1, 2, 3, 4, 5, 6, 8, 9]
+        self.assertListEqual([7, 1, 2, 3, 4, 5, 6, None, None],
+                             [disk.getDiskID() for disk in Solution.getDisksByIDs(disk_ids)], "Should work")
+        self.assertEqual(3, Connector.prepared_statistics.executions, "Nine IDs in chunks of three")
+        Cache.configureCaches(enabled=True)
+        Solution.getDiskByID(1)
+        Solution.getDiskByID(8)
+        Connector.prepared_statistics.reset()
+        self.assertListEqual([1, 2, None], [disk.getDiskID() for disk in Solution.getDisksByIDs([1, 2, 8])],
+                             "Should work")
+        self.assertEqual(1, Connector.prepared_statistics.executions, "Only disk 2 is read")
+        Connector.prepared_statistics.reset()
+        self.assertEqual(2, Solution.getDiskByID(2).getDiskID(), "Filled by the batch lookup")
+        self.assertEqual(0, Connector.prepared_statistics.executions, "Should work")
+
+    def test_async(self) -> None:
+        Solution.addPhotos([Photo(i, "Tree", i) for i in range(1, 4)])
+
+        async def lookup():
+            try:
+                return await AsyncSolution.getPhotosByIDs([3, 4, 1])
+            finally:
+                await AsyncConnector.closePool()
+        photos = asyncio.run(lookup())
+        self.assertListEqual([3, None, 1], [photo.getSize() for photo in photos], "Should work")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,80 @@
+import unittest
+import Solution
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+from Business.RAM import RAM
+from Business.Disk import Disk
+
+
+class Test(AbstractTest):
+    def test_addPhotos(self) -> None:
+        self.assertEqual(ReturnValue.OK, Solution.addPhoto(Photo(1, "Tree", 10)), "Should work")
+        results = Solution.addPhotos([Photo(1, "Tree", 10), Photo(2, "Tab\tand\\slash", 20), Photo(0, "Tree", 10),
+                                      Photo(3, None, 10), Photo(2, "Tree", 10), Photo(4, "Tree", -1),
+                                      Photo(5, "Tree", 0)])
+        self.assertListEqual([ReturnValue.ALREADY_EXISTS, ReturnValue.OK, ReturnValue.BAD_PARAMS,
+                              ReturnValue.BAD_PARAMS, ReturnValue.ALREADY_EXISTS, ReturnValue.BAD_PARAMS,
+                              ReturnValue.OK], results)
+        self.assertEqual("Tab\tand\\slash", Solution.getPhotoByID(2).getDescription(), "COPY must escape text")
+        self.assertEqual(0, Solution.getPhotoByID(5).getSize(), "Should work")
+        self.assertEqual(None, Solution.getPhotoByID(4).getPhotoID(), "Bad row must not be inserted")
+        results = Solution.addPhotos((Photo(i, "Tree", i) for i in range(4, 8)), useCopy=False)
+        self.assertListEqual([ReturnValue.OK, ReturnValue.ALREADY_EXISTS, ReturnValue.OK, ReturnValue.OK], results)
+        self.assertListEqual([], Solution.addPhotos([]), "Empty batch")
+
+    def test_unstorable_entries(self) -> None:
+        for use_copy in (True, False):
+            photos = [Photo(1, "Tree", 1), Photo(2 ** 40, "Tree", 1), Photo(3, "Tree", 1), Photo(5, "Tree", "x"),
+                      Photo(6, "Tree", -2 ** 40), Photo(7, None, 2 ** 40)]
+            expected = [Solution.addPhoto(photo) for photo in photos]
+            self.assertListEqual([ReturnValue.OK, ReturnValue.ERROR, ReturnValue.OK, ReturnValue.ERROR,
+                                  ReturnValue.ERROR, ReturnValue.ERROR], expected, "Should work")
+            Solution.clearTables()
+            self.assertListEqual(expected, Solution.addPhotos(iter(photos), useCopy=use_copy), "Only the bad rows")
+            self.assertEqual(3, Solution.getPhotoByID(3).getPhotoID(), "The rest is loaded")
+            Solution.clearTables()
+        results = Solution.addDisks([Disk(1, "DELL", 10, 2 ** 31, 10), Disk(2, "DELL", 10, 2 ** 31 - 1, 10)])
+        self.assertListEqual([ReturnValue.ERROR, ReturnValue.OK], results, "Should work")
+        rams = [RAM(1, "DELL", 10), RAM(2, 7, 10), RAM(3, "DELL", True)]
+        self.assertListEqual([ReturnValue.OK, ReturnValue.OK, ReturnValue.ERROR], Solution.addRAMs(rams), "Should work")
+        self.assertEqual("7", Solution.getRAMByID(2).getCompany(), "Text columns take any value, as in addRAM")
+
+    def test_addDisks_and_addRAMs(self) -> None:
+        results = Solution.addDisks([Disk(1, "DELL", 10, 10, 10), Disk(2, "HP", 0, 10, 10), Disk(1, "HP", 0, 10, 10),
+                                     Disk(1, "HP", 10, 10, 10), Disk(3, "HP", 10, 0, 10)])
+        self.assertListEqual([ReturnValue.OK, ReturnValue.BAD_PARAMS, ReturnValue.BAD_PARAMS,
+                              ReturnValue.ALREADY_EXISTS, ReturnValue.OK], results)
+        self.assertEqual("DELL", Solution.getDiskByID(1).getCompany(), "First occurrence wins")
+        results = Solution.addRAMs([RAM(1, "DELL", 10), RAM(2, "DELL", 0), RAM(1, "HP", 5), RAM(None, "HP", 5)])
+        self.assertListEqual([ReturnValue.OK, ReturnValue.BAD_PARAMS, ReturnValue.ALREADY_EXISTS,
+                              ReturnValue.BAD_PARAMS], results)
+        ram = Solution.getRAMByID(1)
+        self.assertEqual(10, ram.getSize(), "Should work")
+        self.assertEqual("DELL", ram.getCompany(), "Should work")
+        Solution.dropTables()
+        self.assertListEqual([ReturnValue.ERROR, ReturnValue.ERROR],
+                             Solution.addRAMs([RAM(1, "DELL", 10), RAM(2, "DELL", 0)]), "Should error")
+
+    def test_placePhotos(self) -> None:
+        Solution.addDisks([Disk(1, "DELL", 10, 10, 10), Disk(2, "DELL", 10, 5, 10)])
+        Solution.addPhotos([Photo(i, "Tree", 3) for i in range(1, 6)])
+        self.assertEqual(ReturnValue.OK, Solution.addPhotoToDisk(Photo(1, "Tree", 3), 1), "Should work")
+        results = Solution.placePhotos([(Photo(1, "Tree", 3), 1), (Photo(2, "Tree", 3), 1), (Photo(9, "Tree", 3), 1),
+                                        (Photo(3, "Tree", 3), 3), (Photo(2, "Tree", 3), 1), (Photo(3, "Tree", 3), 1),
+                                        (Photo(4, "Tree", 3), 1), (Photo(5, "Tree", 1), 1), (Photo(2, "Tree", 3), 2)])
+        self.assertListEqual([ReturnValue.ALREADY_EXISTS, ReturnValue.OK, ReturnValue.NOT_EXISTS,
+                              ReturnValue.NOT_EXISTS, ReturnValue.ALREADY_EXISTS, ReturnValue.OK,
+                              ReturnValue.BAD_PARAMS, ReturnValue.OK, ReturnValue.OK], results)
+        self.assertEqual(0, Solution.getDiskByID(1).getFreeSpace(), "10 - 3 - 3 - 3 - 1")
+        self.assertEqual(2, Solution.getDiskByID(2).getFreeSpace(), "5 - 3")
+        self.assertEqual(ReturnValue.ALREADY_EXISTS, Solution.addPhotoToDisk(Photo(5, "Tree", 1), 1), "Was placed")
+        results = Solution.addPhotosToDisk([Photo(3, "Tree", 2), Photo(4, "Tree", 3), Photo(5, "Tree", 3)], 2)
+        self.assertListEqual([ReturnValue.OK, ReturnValue.BAD_PARAMS, ReturnValue.BAD_PARAMS], results)
+        self.assertEqual(0, Solution.getDiskByID(2).getFreeSpace(), "Should work")
+        Solution.dropTables()
+        self.assertListEqual([ReturnValue.ERROR], Solution.addPhotosToDisk([Photo(1, "Tree", 3)], 1), "Should error")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,91 @@
+import unittest
+import Solution
+import Utility.Cache as Cache
+import Utility.DBConnector as Connector
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+from Business.RAM import RAM
+from Business.Disk import Disk
+
+
+class Test(AbstractTest):
+    # the caches are bypassed inside a Session, these tests need them
+    isolation = "truncate"
+
+    def setUp(self) -> None:
+        super().setUp()
+        for cache in (Cache.photo_cache, Cache.disk_cache, Cache.ram_cache):
+            cache.resetStatistics()
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        Cache.configureCaches(**Cache.CACHE_DEFAULTS)
+
+    def test_lookups_are_cached(self) -> None:
+        self.assertEqual(ReturnValue.OK, Solution.addDisk(Disk(1, "DELL", 10, 10, 10)), "Should work")
+        Connector.prepared_statistics.reset()
+        for _ in range(3):
+            self.assertEqual(10, Solution.getDiskByID(1).getFreeSpace(), "Should work")
+            self.assertEqual(None, Solution.getDiskByID(2).getDiskID(), "Missing disks are cached too")
+        self.assertEqual(2, Connector.prepared_statistics.executions, "One query per disk")
+        self.assertEqual(4, Cache.disk_cache.hits, "Should work")
+        self.assertEqual(2, Cache.disk_cache.misses, "Should work")
+        disk = Solution.getDiskByID(1)
+        disk.setFreeSpace(0)
+        self.assertEqual(10, Solution.getDiskByID(1).getFreeSpace(), "Callers get their own object")
+
+    def test_writes_invalidate(self) -> None:
+        self.assertEqual(None, Solution.getDiskByID(1).getDiskID(), "Caches the missing disk")
+        self.assertEqual(None, Solution.getPhotoByID(1).getPhotoID(), "Caches the missing photo")
+        self.assertEqual(None, Solution.getRAMByID(1).getRamID(), "Caches the missing RAM")
+        self.assertEqual(ReturnValue.OK, Solution.addDiskAndPhoto(Disk(1, "DELL", 10, 10, 10), Photo(1, "Tree", 3)),
+                         "Should work")
+        self.assertEqual(ReturnValue.OK, Solution.addRAM(RAM(1, "DELL", 10)), "Should work")
+        self.assertEqual(1, Solution.getDiskByID(1).getDiskID(), "addDiskAndPhoto invalidates the disk")
+        self.assertEqual(1, Solution.getPhotoByID(1).getPhotoID(), "addDiskAndPhoto invalidates the photo")
+        self.assertEqual(10, Solution.getRAMByID(1).getSize(), "addRAM invalidates")
+        self.assertEqual(ReturnValue.OK, Solution.addPhotoToDisk(Photo(1, "Tree", 3), 1), "Should work")
+        self.assertEqual(7, Solution.getDiskByID(1).getFreeSpace(), "addPhotoToDisk changes free_space")
+        self.assertEqual(ReturnValue.OK, Solution.removePhotoFromDisk(Photo(1, "Tree", 3), 1), "Should work")
+        self.assertEqual(10, Solution.getDiskByID(1).getFreeSpace(), "removePhotoFromDisk changes free_space")
+        Solution.placePhotos([(Photo(1, "Tree", 3), 1)])
+        self.assertEqual(7, Solution.getDiskByID(1).getFreeSpace(), "placePhotos changes free_space")
+        self.assertEqual(ReturnValue.OK, Solution.deletePhoto(Photo(1, "Tree", 3)), "Should work")
+        self.assertEqual(None, Solution.getPhotoByID(1).getPhotoID(), "deletePhoto invalidates the photo")
+        self.assertEqual(10, Solution.getDiskByID(1).getFreeSpace(), "deletePhoto frees the disks it was on")
+        self.assertEqual(ReturnValue.OK, Solution.deleteDisk(1), "Should work")
+        self.assertEqual(None, Solution.getDiskByID(1).getDiskID(), "deleteDisk invalidates")
+        self.assertEqual(ReturnValue.OK, Solution.deleteRAM(1), "Should work")
+        self.assertEqual(None, Solution.getRAMByID(1).getRamID(), "deleteRAM invalidates")
+        Solution.addDisks([Disk(1, "HP", 10, 5, 10)])
+        self.assertEqual("HP", Solution.getDiskByID(1).getCompany(), "addDisks invalidates")
+        Solution.clearTables()
+        self.assertEqual(None, Solution.getDiskByID(1).getDiskID(), "clearTables drops every entry")
+        Solution.addDisk(Disk(1, "DELL", 10, 10, 10))
+        Solution.getDiskByID(1)
+        Solution.dropTables()
+        self.assertEqual(None, Solution.getDiskByID(1).getDiskID(), "dropTables drops every entry")
+
+    def test_bounded_and_expiring(self) -> None:
+        cache = Cache.EntityCache(maxsize=2, ttl=60)
+        for key in range(3):
+            cache.put(key, (key,), cache.generation())
+        self.assertEqual(2, cache.size(), "Bounded by maxsize")
+        self.assertEqual(1, cache.evictions, "Should work")
+        self.assertEqual((False, None), cache.get(0), "Least recently used entry was evicted")
+        self.assertEqual((True, (1,)), cache.get(1), "Should work")
+        cache.put(3, (3,), cache.generation())
+        self.assertEqual((False, None), cache.get(2), "2 was used less recently than 1")
+        generation = cache.generation()
+        cache.invalidate(1)
+        cache.put(4, (4,), generation)
+        self.assertEqual((False, None), cache.get(4), "Rows read before an invalidation are not stored")
+        cache.ttl = -1
+        cache.put(5, (5,), cache.generation())
+        self.assertEqual((False, None), cache.get(5), "Expired")
+        self.assertEqual(1, cache.expirations, "Should work")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
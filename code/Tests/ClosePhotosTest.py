@@ -0,0 +1,146 @@
+import asyncio
+import random
+import unittest
+import Solution
+import AsyncSolution
+import Queries
+import Utility.DBConnector as Connector
+import Utility.AsyncDBConnector as AsyncConnector
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+from Business.Disk import Disk
+
+# the self join getClosePhotos had before, kept as the reference
+REFERENCE = """
+        SELECT p.photo_id, COUNT(s2_id)
+        FROM (SELECT s1.photo_id as s1_id, s2.photo_id as s2_id, s1.disk_id as disk_id
+        FROM StoredOn s1 INNER JOIN StoredOn s2 ON s1.disk_id = s2.disk_id
+        WHERE s1.photo_id = $1 AND s2.photo_id <> $1) sd
+        RIGHT OUTER JOIN Photos p ON sd.s2_id = p.photo_id
+        WHERE p.photo_id <> $1
+        GROUP BY p.photo_id
+        HAVING COUNT(s2_id) >= 0.5*(SELECT COUNT(disk_id) FROM StoredOn WHERE photo_id = $1)
+        ORDER BY p.photo_id ASC
+        LIMIT 10;
+        """
+
+# PhotoPairs recomputed from StoredOn, rows that differ from the maintained table
+PAIRS_DIFFERENCE = """
+        (SELECT a.photo_id, b.photo_id, COUNT(*)
+        FROM StoredOn a INNER JOIN StoredOn b ON a.disk_id = b.disk_id AND a.photo_id <> b.photo_id
+        GROUP BY a.photo_id, b.photo_id
+        EXCEPT
+        SELECT photo_id, other_id, shared FROM PhotoPairs)
+        UNION ALL
+        (SELECT photo_id, other_id, shared FROM PhotoPairs
+        EXCEPT
+        SELECT a.photo_id, b.photo_id, COUNT(*)
+        FROM StoredOn a INNER JOIN StoredOn b ON a.disk_id = b.disk_id AND a.photo_id <> b.photo_id
+        GROUP BY a.photo_id, b.photo_id);
+        """
+
+
+class Test(AbstractTest):
+    # AsyncSolution has to see the rows added by Solution
+    isolation = "truncate"
+
+    def tearDown(self) -> None:
+        Solution.dropPhotoPairs()
+        super().tearDown()
+        Queries.CLOSE_PHOTOS_MERGED_DISKS = 16
+
+    def query(self, query: str) -> list:
+        conn = Connector.DBConnector()
+        try:
+            _, result = conn.execute(query)
+        finally:
+            conn.close()
+        return result.rows
+
+    def reference(self, photoID: int) -> list:
+        conn = Connector.DBConnector()
+        try:
+            _, result = conn.executePrepared("getClosePhotosReference", REFERENCE, (photoID,))
+        finally:
+            conn.close()
+        return [row[0] for row in result.rows]
+
+    def populate(self, rnd: random.Random, photos: int, disks: int) -> None:
+        Solution.addDisks([Disk(i, "DELL", 1, 1000, 1) for i in range(1, disks + 1)])
+        Solution.addPhotos([Photo(i, "Tree", 1) for i in range(1, photos + 1)])
+        Solution.placePhotos([(Photo(p, "Tree", 1), d) for p in range(1, photos + 1) for d in range(1, disks + 1)
+                              if rnd.random() < 0.3])
+
+    def change(self, rnd: random.Random, photos: int, disks: int) -> None:
+        for _ in range(10):
+            photo = Photo(rnd.randint(1, photos), "Tree", 1)
+            disk = rnd.randint(1, disks)
+            action = rnd.random()
+            if action < 0.4:
+                Solution.addPhotoToDisk(photo, disk)
+            elif action < 0.8:
+                Solution.removePhotoFromDisk(photo, disk)
+            elif action < 0.9:
+                Solution.deletePhoto(photo)
+            else:
+                Solution.deleteDisk(disk)
+        Solution.addDisks([Disk(i, "DELL", 1, 1000, 1) for i in range(1, disks + 1)])
+        Solution.addPhotos([Photo(i, "Tree", 1) for i in range(1, photos + 1)])
+
+    def check(self, photos: int) -> None:
+        for photo_id in range(0, photos + 2):
+            self.assertListEqual(self.reference(photo_id), Solution.getClosePhotos(photo_id),
+                                 "Same photos for photo " + str(photo_id))
+
+    def test_matches_self_join_on_random_data(self) -> None:
+        rnd = random.Random(14)
+        for _ in range(10):
+            Solution.clearTables()
+            photos, disks = rnd.randint(1, 30), rnd.randint(0, 8)
+            self.populate(rnd, photos, disks)
+            self.check(photos)
+            if disks > 0:
+                self.change(rnd, photos, disks)
+                self.check(photos)
+
+    def test_many_disks_fall_back_to_one_aggregate(self) -> None:
+        Queries.CLOSE_PHOTOS_MERGED_DISKS = 2
+        rnd = random.Random(1414)
+        for _ in range(5):
+            Solution.clearTables()
+            self.populate(rnd, 25, 8)
+            self.check(25)
+
+    def test_photo_pairs_follow_storedon(self) -> None:
+        rnd = random.Random(141414)
+        self.populate(rnd, 20, 6)
+        Solution.createPhotoPairs()
+        self.assertListEqual([], self.query(PAIRS_DIFFERENCE), "Filled from StoredOn")
+        for _ in range(10):
+            self.change(rnd, 20, 6)
+            self.assertListEqual([], self.query(PAIRS_DIFFERENCE), "Maintained by the triggers")
+            self.check(20)
+        Solution.clearTables()
+        self.assertListEqual([], self.query("SELECT * FROM PhotoPairs;"), "Emptied with StoredOn")
+        Solution.dropPhotoPairs()
+        self.populate(rnd, 20, 6)
+        self.check(20)
+
+    def test_photo_on_no_disk(self) -> None:
+        Solution.addPhotos([Photo(i, "Tree", 1) for i in range(1, 15)])
+        Solution.addDisk(Disk(1, "DELL", 1, 1000, 1))
+        Solution.addPhotoToDisk(Photo(2, "Tree", 1), 1)
+        self.assertListEqual(list(range(2, 12)), Solution.getClosePhotos(1), "Close to every other photo")
+        self.assertListEqual(list(range(1, 11)), Solution.getClosePhotos(99), "A missing photo is on no disk")
+        self.assertListEqual([], Solution.getClosePhotos(2), "No photo shares disk 1")
+
+        async def close():
+            try:
+                return await AsyncSolution.getClosePhotos(1)
+            finally:
+                await AsyncConnector.closePool()
+        self.assertListEqual(list(range(2, 12)), asyncio.run(close()), "Should work")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,71 @@
+import collections
+import io
+import unittest
+import Solution
+import Utility.DBConnector as Connector
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+
+# the part of a cursor description a ColumnarResultSet reads
+_Column = collections.namedtuple('_Column', ['name'])
+
+
+class Test(AbstractTest):
+    def query(self, query, columnar):
+        conn = Connector.DBConnector()
+        try:
+            return conn.execute(query, columnar=columnar)
+        finally:
+            conn.close()
+
+    def test_columnar_matches_row_result(self) -> None:
+        Solution.addPhotos([Photo(i, "Tree", i * 10) for i in range(1, 6)])
+        query = "SELECT photo_id, description, size, size / 3.0 AS third FROM Photos ORDER BY photo_id"
+        rows_effected, expected = self.query(query, False)
+        rows_effected_columnar, result = self.query(query, True)
+        self.assertEqual(rows_effected, rows_effected_columnar, "Should work")
+        self.assertEqual(expected.size(), result.size(), "Should work")
+        self.assertEqual(str(expected), str(result), "Same printed output")
+        for index in range(result.size()):
+            self.assertListEqual(list(expected.rows[index]), list(result.rows[index]), "Same rows")
+            self.assertEqual(expected[index]['SIZE'], result[index]['SIZE'], "Case insensitive column name")
+        self.assertEqual(30, result.rows[2][2], "Should work")
+        self.assertListEqual([1, 2, 3, 4, 5], list(result.column("photo_id")), "Column access")
+        self.assertEqual('q', result.column("size").typecode, "Integer column is packed")
+        self.assertEqual(1, result.cols["description"], "Should work")
+        stream = io.StringIO()
+        result.write(stream)
+        self.assertEqual(str(expected), stream.getvalue(), "Streaming formatter")
+        self.assertEqual(Connector.ResultSetDict(), result[5], "Invalid row")
+        if Connector.numpy is not None:
+            self.assertEqual(150, result.numpyColumn("size").sum(), "Zero-copy NumPy view")
+
+    def test_columnar_empty_and_mixed(self) -> None:
+        rows_effected, result = self.query("SELECT * FROM Photos", True)
+        self.assertTrue(result.isEmpty(), "Should work")
+        self.assertEqual([], list(result.rows), "Should work")
+        rows_effected, result = self.query("SELECT * FROM (VALUES (1), (NULL), (9223372036854775808)) AS v(x)", True)
+        self.assertListEqual([1, None, 9223372036854775808], list(result.column(0)), "Falls back to a list")
+        rows_effected, result = self.query("DELETE FROM Photos", True)
+        self.assertTrue(result.isEmpty(), "Should work")
+
+
+    def test_bad_value_in_a_later_batch(self) -> None:
+        for bad in (None, 4.5, 2 ** 63):
+            batches = [[(1,), (2,)], [(3,), (bad,), (5,)]]
+            result = Connector.ColumnarResultSet([_Column("x")], batches)
+            self.assertEqual(5, result.size(), "Should work")
+            self.assertListEqual([1, 2, 3, bad, 5], list(result.column(0)), "Each value once")
+        conn = Connector.DBConnector()
+        try:
+            cursor = conn.connection.cursor()
+            cursor.execute("SELECT * FROM (VALUES (1), (2), (3), (NULL), (5)) AS v(x)")
+            result = Connector.ColumnarResultSet.fromCursor(cursor, batch_size=3)
+            conn.commit()
+        finally:
+            conn.close()
+        self.assertListEqual([1, 2, 3, None, 5], list(result.column(0)), "NULL in the second fetch batch")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,62 @@
+import unittest
+import Solution
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+from Business.RAM import RAM
+from Business.Disk import Disk
+from Business.Batch import PhotoBatch, DiskBatch, RAMBatch
+
+
+class Test(AbstractTest):
+    def test_slots(self) -> None:
+        for entity in (Photo(1, "Tree", 10), Disk(1, "DELL", 10, 10, 10), RAM(1, "DELL", 10)):
+            self.assertFalse(hasattr(entity, "__dict__"), "Should work")
+            with self.assertRaises(AttributeError):
+                entity.other = 1
+        photo = Photo(1, "Tree", 10)
+        photo.setDescription("Sky")
+        photo.setSize(5)
+        self.assertEqual((1, "Sky", 5), (photo.getPhotoID(), photo.getDescription(), photo.getSize()), "Should work")
+        self.assertIsNone(Disk.badDisk().getDiskID(), "Should work")
+
+    def test_batch(self) -> None:
+        photos = PhotoBatch([Photo(1, "Tree", 10), Photo(2, "Sky", 20)])
+        photos.append(Photo(3, "Tree", 30))
+        self.assertEqual(3, len(photos), "Should work")
+        self.assertEqual((2, "Sky", 20), photos.row(1), "Should work")
+        self.assertEqual("Tree", photos[-1].getDescription(), "Counted from the end")
+        self.assertListEqual([1, 2, 3], [photo.getPhotoID() for photo in photos], "Should work")
+        self.assertListEqual([10, 20, 30], list(photos.getSizes()), "Should work")
+        with self.assertRaises(IndexError):
+            photos.row(3)
+        photos.appendRow(None, None, 2 ** 70)
+        self.assertEqual((None, None, 2 ** 70), photos.row(3), "Does not fit in the array")
+        self.assertListEqual([1, 2, 3, None], list(photos.getPhotoIDs()), "Should work")
+        rams = RAMBatch([RAM(1, "DELL", 10)])
+        self.assertEqual((1, 10, "DELL"), rams.row(0), "Ordered like the table")
+        self.assertEqual("DELL", rams[0].getCompany(), "Should work")
+        self.assertEqual(3, len(PhotoBatch(photos)) - 1, "Copied row by row")
+
+    def test_bulk(self) -> None:
+        self.assertEqual(ReturnValue.OK, Solution.addPhoto(Photo(1, "Tree", 10)), "Should work")
+        photos = PhotoBatch([Photo(1, "Tree", 10), Photo(2, "Sky", 20), Photo(3, "Tree", -1), Photo(2, "Sky", 20)])
+        self.assertListEqual([ReturnValue.ALREADY_EXISTS, ReturnValue.OK, ReturnValue.BAD_PARAMS,
+                              ReturnValue.ALREADY_EXISTS], Solution.addPhotos(photos), "Same as a list")
+        disks = DiskBatch([Disk(1, "DELL", 10, 10, 10), Disk(2, "HP", 0, 10, 10)])
+        self.assertListEqual([ReturnValue.OK, ReturnValue.BAD_PARAMS], Solution.addDisks(disks, useCopy=False),
+                             "Should work")
+        self.assertListEqual([ReturnValue.OK], Solution.addRAMs(RAMBatch([RAM(1, "DELL", 10)])), "Should work")
+        found = Solution.getPhotosByIDs([2, 5, 1], asBatch=True)
+        self.assertIsInstance(found, PhotoBatch, "Should work")
+        self.assertListEqual([(2, "Sky", 20), (None, None, None), (1, "Tree", 10)], list(found.rows()),
+                             "Missing IDs as empty rows")
+        self.assertListEqual([10], list(Solution.getDisksByIDs([1], asBatch=True).getFreeSpaces()), "Should work")
+        self.assertEqual("DELL", Solution.getRAMsByIDs([1], asBatch=True)[0].getCompany(), "Should work")
+        Solution.dropTables()
+        self.assertListEqual([(None, None, None)], list(Solution.getPhotosByIDs([1], asBatch=True).rows()),
+                             "Should error")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,110 @@
+import time
+import unittest
+import psycopg2
+import Solution
+import Utility.DBConnector as Connector
+import Utility.Cache as Cache
+from Utility.Exceptions import DatabaseException
+from Tests.abstractTest import AbstractTest
+from Business.Disk import Disk
+
+
+class Test(AbstractTest):
+    # checks out pooled connections of its own, outside of any Session
+    isolation = "truncate"
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        Connector.DBConnector.pool_settings.clear()
+        Connector.closePool()
+        Cache.configureCaches(enabled=True)
+
+    def test_connection_is_reused(self) -> None:
+        conn = Connector.DBConnector()
+        _, result = conn.execute("SELECT pg_backend_pid()")
+        first_pid = result.rows[0][0]
+        conn.close()
+        conn = Connector.DBConnector()
+        _, result = conn.execute("SELECT pg_backend_pid()")
+        conn.close()
+        self.assertEqual(first_pid, result.rows[0][0], "Second connector should reuse the warm connection")
+
+    def test_uncommitted_changes_are_rolled_back_on_close(self) -> None:
+        conn = Connector.DBConnector()
+        conn.execute("INSERT INTO Disks VALUES(1, 'DELL', 10, 10, 10)")
+        conn.close()
+        self.assertEqual(None, Solution.getDiskByID(1).getDiskID(), "Insert was never committed")
+        self.assertEqual(Solution.ReturnValue.OK, Solution.addDisk(Disk(1, "DELL", 10, 10, 10)), "Should work")
+
+    def test_pool_is_bounded(self) -> None:
+        Connector.configurePool(minconn=0, maxconn=1, checkout_timeout=0.1)
+        conn = Connector.DBConnector()
+        with self.assertRaises(DatabaseException.ConnectionInvalid):
+            Connector.DBConnector()
+        conn.close()
+        conn = Connector.DBConnector()
+        self.assertEqual(1, Connector.getPool().size(), "Only one connection should ever be opened")
+        conn.close()
+        conn.close()
+        self.assertEqual(1, Connector.getPool().idle(), "Closing twice must not return the connection twice")
+
+    def test_prepared_statements_are_reused(self) -> None:
+        # every lookup must reach the database
+        Cache.configureCaches(enabled=False)
+        Connector.closePool()
+        Connector.prepared_statistics.reset()
+        for _ in range(3):
+            self.assertEqual(None, Solution.getDiskByID(1).getDiskID(), "Disk does not exist")
+        self.assertEqual(3, Connector.prepared_statistics.executions, "Should work")
+        self.assertEqual(1, Connector.prepared_statistics.prepares, "Prepared once on the pooled connection")
+        self.assertAlmostEqual(2 / 3, Connector.prepared_statistics.hitRate(), msg="Should work")
+        Solution.dropTables()
+        self.assertEqual(None, Solution.getDiskByID(1).getDiskID(), "Should return badDisk")
+        Solution.createTables()
+        self.assertEqual(Solution.ReturnValue.OK, Solution.addDisk(Disk(1, "DELL", 10, 10, 10)), "Should work")
+        self.assertEqual(1, Solution.getDiskByID(1).getDiskID(), "Statement survives the tables being recreated")
+
+    def terminate(self, pid: int) -> None:
+        conn = Connector.DBConnector()
+        try:
+            conn.execute("SELECT pg_terminate_backend(" + str(pid) + ")")
+            conn.commit()
+        finally:
+            conn.close()
+        time.sleep(0.1)
+
+    def test_terminated_connection_is_not_handed_out(self) -> None:
+        Connector.configurePool(minconn=0, maxconn=2, health_check_interval=30)
+        conn = Connector.DBConnector()
+        _, result = conn.execute("SELECT pg_backend_pid()")
+        conn.close()
+        self.terminate(result.rows[0][0])
+        conn = Connector.DBConnector()
+        try:
+            _, result = conn.execute("SELECT 1")
+            self.assertEqual(1, result.rows[0][0], "Killed within the health check interval, still caught")
+        finally:
+            conn.close()
+        self.assertEqual(Solution.ReturnValue.OK, Solution.addDisk(Disk(1, "DELL", 10, 10, 10)), "Should work")
+
+    def test_statement_is_retried_once(self) -> None:
+        Cache.configureCaches(enabled=False)
+        conn = Connector.DBConnector()
+        try:
+            _, result = conn.execute("SELECT pg_backend_pid()")
+            conn.commit()
+            self.terminate(result.rows[0][0])
+            _, result = conn.executePrepared("lookup", "SELECT $1::integer", (7,))
+            self.assertEqual(7, result.rows[0][0], "Retried on another connection")
+            conn.execute("INSERT INTO Disks VALUES(1, 'DELL', 10, 10, 10)")
+            _, result = conn.execute("SELECT pg_backend_pid()")
+            self.terminate(result.rows[0][0])
+            with self.assertRaises(psycopg2.OperationalError):
+                conn.execute("SELECT 1")
+        finally:
+            conn.close()
+        self.assertEqual(None, Solution.getDiskByID(1).getDiskID(), "Not retried once the transaction did work")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
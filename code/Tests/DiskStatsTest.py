@@ -0,0 +1,129 @@
+import random
+import unittest
+import Solution
+import Utility.DBConnector as Connector
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+from Business.RAM import RAM
+from Business.Disk import Disk
+
+
+class Test(AbstractTest):
+    # DiskStats next to the same aggregates computed from the views
+    def assertDiskStatsConsistent(self) -> None:
+        conn = Connector.DBConnector()
+        try:
+            _, stats = conn.execute("""
+                    SELECT disk_id, photo_count, photo_bytes, ram_total, ram_companies, shared_photos
+                    FROM DiskStats ORDER BY disk_id""")
+            _, expected = conn.execute("""
+                    SELECT d.disk_id,
+                    (SELECT COUNT(*) FROM Photos_Stored_On_Disks pd WHERE pd.disk_id = d.disk_id),
+                    (SELECT COALESCE(SUM(size), 0) FROM Photos_Stored_On_Disks pd WHERE pd.disk_id = d.disk_id),
+                    (SELECT COALESCE(SUM(size), 0) FROM Rams_Part_Of_Disks rd WHERE rd.disk_id = d.disk_id),
+                    (SELECT COUNT(DISTINCT company) FROM Rams_Part_Of_Disks rd WHERE rd.disk_id = d.disk_id),
+                    (SELECT COUNT(*) FROM StoredOn s1 WHERE s1.disk_id = d.disk_id AND EXISTS
+                        (SELECT 1 FROM StoredOn s2 WHERE s2.photo_id = s1.photo_id AND s2.disk_id <> s1.disk_id))
+                    FROM Disks d ORDER BY d.disk_id""")
+            _, conflicting = conn.execute("""
+                    SELECT DISTINCT so1.disk_id
+                    FROM StoredOn so1 JOIN StoredOn so2 ON so1.photo_id = so2.photo_id AND so1.disk_id <> so2.disk_id
+                    ORDER BY disk_id ASC""")
+        finally:
+            conn.close()
+        self.assertListEqual([tuple(row) for row in expected.rows], [tuple(row) for row in stats.rows],
+                             "DiskStats should match the views")
+        self.assertListEqual([row[0] for row in conflicting.rows], Solution.getConflictingDisks(),
+                             "Same disks as the self join")
+        self.assertListEqual([], Solution.checkDiskStats(), "Nothing for the checker to find")
+
+    def test_disk_stats_follow_random_operations(self) -> None:
+        rnd = random.Random(236363)
+        companies = ["DELL", "HP", "APPLE"]
+        for step in range(600):
+            photo = Photo(rnd.randint(1, 30), "Tree", rnd.randint(0, 5))
+            disk_id = rnd.randint(1, 8)
+            ram_id = rnd.randint(1, 20)
+            operation = rnd.randrange(11)
+            if operation == 0:
+                Solution.addPhoto(photo)
+            elif operation == 1:
+                Solution.addDisk(Disk(disk_id, rnd.choice(companies), 10, 40, 10))
+            elif operation == 2:
+                Solution.addRAM(RAM(ram_id, rnd.choice(companies), rnd.randint(1, 8)))
+            elif operation == 3:
+                stored = Solution.getPhotoByID(photo.getPhotoID())
+                if stored.getPhotoID() is not None:
+                    Solution.addPhotoToDisk(stored, disk_id)
+            elif operation == 4:
+                stored = Solution.getPhotoByID(photo.getPhotoID())
+                if stored.getPhotoID() is not None:
+                    Solution.removePhotoFromDisk(stored, disk_id)
+            elif operation == 5:
+                stored = Solution.getPhotoByID(photo.getPhotoID())
+                if stored.getPhotoID() is not None and rnd.random() < 0.3:
+                    Solution.deletePhoto(stored)
+            elif operation == 6 and rnd.random() < 0.2:
+                Solution.deleteDisk(disk_id)
+            elif operation == 7:
+                Solution.addRAMToDisk(ram_id, disk_id)
+            elif operation == 8:
+                Solution.removeRAMFromDisk(ram_id, disk_id)
+            elif operation == 9 and rnd.random() < 0.3:
+                Solution.deleteRAM(ram_id)
+            elif operation == 10:
+                photos = [Solution.getPhotoByID(rnd.randint(1, 30)) for _ in range(4)]
+                Solution.placePhotos([(p, rnd.randint(1, 8)) for p in photos if p.getPhotoID() is not None])
+            if step % 50 == 0:
+                self.assertDiskStatsConsistent()
+        self.assertDiskStatsConsistent()
+        Solution.clearTables()
+        self.assertDiskStatsConsistent()
+
+    def test_check_and_rebuild(self) -> None:
+        Solution.addDisks([Disk(i, "DELL", 10, 10, 10) for i in range(1, 5)])
+        Solution.addPhotos([Photo(i, "Tree", i) for i in range(1, 4)])
+        Solution.addRAMs([RAM(1, "DELL", 5), RAM(2, "HP", 5)])
+        Solution.placePhotos([(Photo(1, "Tree", 1), 1), (Photo(1, "Tree", 1), 2), (Photo(2, "Tree", 2), 3)])
+        Solution.addRAMToDisk(1, 1)
+        Solution.addRAMToDisk(2, 1)
+        self.assertListEqual([1, 2], Solution.getConflictingDisks(), "Photo 1 is on disks 1 and 2")
+        conn = Connector.DBConnector()
+        try:
+            conn.execute("""
+                    UPDATE DiskStats SET shared_photos = 1 WHERE disk_id = 4;
+                    UPDATE DiskStats SET photo_bytes = 0 WHERE disk_id = 3;
+                    DELETE FROM DiskStats WHERE disk_id = 2;
+                    DELETE FROM DiskRamCompanies WHERE disk_id = 1 AND company = 'HP';
+                    UPDATE DiskStats SET ram_companies = 1 WHERE disk_id = 1;""")
+            conn.commit()
+        finally:
+            conn.close()
+        self.assertListEqual([1, 4], Solution.getConflictingDisks(), "Answered from DiskStats")
+        self.assertListEqual([1, 2, 3, 4], Solution.checkDiskStats(), "Every damaged row")
+        self.assertListEqual([1, 2, 3, 4], Solution.checkDiskStats(rebuild=True), "Should work")
+        self.assertDiskStatsConsistent()
+        Solution.removeRAMFromDisk(1, 1)
+        self.assertFalse(Solution.isCompanyExclusive(1), "DiskRamCompanies was rebuilt too")
+        self.assertDiskStatsConsistent()
+
+    def test_isCompanyExclusive_uses_companies(self) -> None:
+        Solution.addDisks([Disk(1, "DELL", 10, 10, 10), Disk(2, "HP", 10, 10, 10)])
+        Solution.addRAMs([RAM(1, "DELL", 5), RAM(2, "DELL", 5), RAM(3, "HP", 5)])
+        self.assertTrue(Solution.isCompanyExclusive(1), "No RAMs")
+        Solution.addRAMToDisk(1, 1)
+        Solution.addRAMToDisk(2, 1)
+        Solution.addRAMToDisk(1, 2)
+        self.assertTrue(Solution.isCompanyExclusive(1), "Two DELL RAMs on a DELL disk")
+        self.assertFalse(Solution.isCompanyExclusive(2), "A DELL RAM on an HP disk")
+        Solution.addRAMToDisk(3, 1)
+        self.assertFalse(Solution.isCompanyExclusive(1), "An HP RAM on a DELL disk")
+        Solution.deleteRAM(3)
+        Solution.removeRAMFromDisk(1, 1)
+        self.assertTrue(Solution.isCompanyExclusive(1), "One DELL RAM left")
+        self.assertEqual(5, Solution.getTotalRamOnDisk(1), "Should work")
+        self.assertListEqual([1, 2], Solution.getDisksContainingTheMostData(), "Should work")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,93 @@
+import unittest
+from collections import Counter
+import Solution
+import Utility.DBConnector as Connector
+from Tests.abstractTest import AbstractTest
+from Benchmarks.DataGenerator import DataGenerator, load, zipfRank
+
+SETTINGS = dict(photos=2000, descriptions=30, description_skew=1.0, disks=40, min_capacity=2000, max_capacity=8000,
+                max_photo_size=200, fill_ratio=0.6, rams_per_disk=3, companies=5, companies_per_disk=2)
+
+
+class Test(AbstractTest):
+    # loads through its own connections, with COPY
+    isolation = "truncate"
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.generator = DataGenerator(7, **SETTINGS)
+
+    # (disk ID, free space) of every disk, and the total size stored on every disk
+    def loaded(self) -> tuple:
+        conn = Connector.DBConnector()
+        try:
+            _, free = conn.execute("SELECT disk_id, free_space FROM Disks")
+            _, used = conn.execute("SELECT S.disk_id, SUM(P.size) FROM StoredOn S JOIN Photos P "
+                                   "ON P.photo_id = S.photo_id GROUP BY S.disk_id")
+            conn.commit()
+        finally:
+            conn.close()
+        return dict(free.rows), dict(used.rows)
+
+    def test_seeded(self) -> None:
+        again = DataGenerator(7, **SETTINGS)
+        for rows in ("photos", "disks", "rams", "storedOn", "partOf"):
+            self.assertEqual(list(getattr(self.generator, rows)()), list(getattr(again, rows)()), "Same seed")
+        self.assertNotEqual(list(self.generator.storedOn()), list(DataGenerator(8, **SETTINGS).storedOn()),
+                            "Another seed")
+        with self.assertRaises(ValueError):
+            DataGenerator(7, pictures=10)
+
+    def test_shape(self) -> None:
+        descriptions = Counter(description for _, description, _ in self.generator.photos())
+        self.assertLessEqual(len(descriptions), SETTINGS['descriptions'], "Description cardinality")
+        self.assertGreater(descriptions["description1"], descriptions["description10"], "Skewed descriptions")
+
+        fill = []
+        for disk_id, company, _, free_space, _ in self.generator.disks():
+            capacity = self.generator.disk(disk_id)[0]
+            self.assertGreaterEqual(free_space, capacity * (1 - SETTINGS['fill_ratio']), "Filled up to the ratio")
+            fill.append(1 - free_space / capacity)
+            companies = set(self.generator.ramCompanies(disk_id))
+            self.assertIn(company, companies, "A RAM of the company of the disk")
+            self.assertLessEqual(len(companies), SETTINGS['companies_per_disk'], "Companies per disk")
+        self.assertAlmostEqual(SETTINGS['fill_ratio'], sum(fill) / len(fill), delta=0.05, msg="Fill ratio")
+
+        copies = Counter(photo_id for photo_id, _ in self.generator.storedOn())
+        popular = [copies[self.generator.photoOfRank(rank)] for rank in range(1, 11)]
+        rare = [copies[self.generator.photoOfRank(rank)] for rank in range(1001, 1011)]
+        self.assertGreater(sum(popular), 5 * sum(rare), "Popular photos are stored more")
+
+    def test_zipf_rank(self) -> None:
+        for skew in (0, 0.5, 1, 2):
+            self.assertEqual(1, zipfRank(0, 100, skew), "Should work")
+            self.assertEqual(100, zipfRank(0.999999, 100, skew), "Should work")
+
+    def test_load(self) -> None:
+        counts = load(self.generator)
+        self.assertEqual(SETTINGS['photos'], counts["photos"], "Should work")
+        self.assertEqual(SETTINGS['disks'] * SETTINGS['rams_per_disk'], counts["partof"], "Should work")
+        self.assertEqual(len(list(self.generator.storedOn())), counts["storedon"], "Should work")
+        self.assertEqual([], Solution.checkDiskStats(), "The statistics follow COPY")
+        free, used = self.loaded()
+        for disk_id, free_space in free.items():
+            self.assertEqual(self.generator.disk(disk_id)[0] - used.get(disk_id, 0), free_space, "Free space")
+
+    def test_load_through_solution(self) -> None:
+        expected = load(self.generator)
+        free, used = self.loaded()
+        for engine in ("memory", "sqlite"):
+            Solution.configureEngine(engine)
+            try:
+                Solution.dropTables()
+                Solution.createTables()
+                self.assertEqual(expected, load(self.generator), "Same rows on " + engine)
+                for disk_id, free_space in free.items():
+                    self.assertEqual(free_space, Solution.getDiskByID(disk_id).getFreeSpace(), "Same free space")
+                Solution.dropTables()
+            finally:
+                Solution.configureEngine("postgresql")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,127 @@
+import asyncio
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import Solution
+import AsyncSolution
+import Utility.Cache as Cache
+import Utility.Instrumentation as Instrumentation
+import Utility.AsyncDBConnector as AsyncConnector
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+from Business.Disk import Disk
+
+
+class Test(AbstractTest):
+    # probes the connections of AsyncSolution too, which only see committed rows
+    isolation = "truncate"
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.events = []
+        Instrumentation.metrics.reset()
+        Instrumentation.addHook(self.events.append)
+        Cache.configureCaches(enabled=False)
+
+    def tearDown(self) -> None:
+        Instrumentation.configureInstrumentation(**Instrumentation.INSTRUMENTATION_DEFAULTS)
+        Instrumentation.removeHook(self.events.append)
+        Cache.configureCaches(**Cache.CACHE_DEFAULTS)
+        super().tearDown()
+
+    def test_disabled_by_default(self) -> None:
+        Solution.addPhoto(Photo(1, "Tree", 10))
+        Solution.getPhotoByID(1)
+        self.assertListEqual([], self.events, "Nothing is measured")
+        self.assertDictEqual({}, Instrumentation.metrics.snapshot(), "Should work")
+
+    def test_events_and_metrics(self) -> None:
+        Solution.addPhotos([Photo(i, "Tree", i) for i in range(1, 4)])
+        Instrumentation.configureInstrumentation(enabled=True)
+        self.assertEqual(3, Solution.getPhotoByID(3).getSize(), "Should work")
+        self.assertEqual(["connect", "prepared"], [event.kind for event in self.events], "Should work")
+        connect, lookup = self.events
+        self.assertEqual("Solution.getPhotoByID", lookup.function, "Named after the Solution function")
+        self.assertEqual("getPhotoByID", lookup.statement, "Named after the prepared statement")
+        self.assertEqual(1, lookup.rows, "Should work")
+        self.assertGreater(lookup.bytes_sent, 0, "Should work")
+        self.assertEqual(len("3Tree3"), lookup.bytes_received, "The values as text")
+        self.assertGreater(lookup.execute, 0, "Should work")
+        self.assertGreater(connect.connect, 0, "Should work")
+        self.assertEqual(ReturnValue.ALREADY_EXISTS, Solution.addPhoto(Photo(1, "Tree", 1)), "Should work")
+        self.assertEqual("UNIQUE_VIOLATION", self.events[-1].error, "Failed statements are recorded too")
+        Solution.addPhotos([Photo(4, "Tree", 4)])
+        self.assertEqual({"Solution.addPhotos"}, {event.function for event in self.events[-4:]},
+                         "The outermost Solution function")
+        snapshot = Instrumentation.metrics.snapshot()
+        self.assertEqual(1, snapshot["Solution.getPhotoByID getPhotoByID"]["calls"], "Should work")
+        self.assertEqual(1, snapshot["Solution.getPhotoByID getPhotoByID"]["execute"]["count"], "Should work")
+        self.assertEqual(1, snapshot["Solution.addPhoto addPhoto"]["errors"], "Should work")
+        self.assertEqual(1, snapshot["Solution.addPhotos copy photos_staging"]["rows"], "Should work")
+        self.assertIn("Solution.getPhotoByID connect", snapshot, "Connection checkouts by kind")
+        text = io.StringIO()
+        Instrumentation.metrics.writeText(text)
+        self.assertEqual(len(snapshot), len(text.getvalue().splitlines()), "A line per statement")
+
+    def test_pipelined(self) -> None:
+        Instrumentation.configureInstrumentation(enabled=True)
+        results = Solution.runPipelined([(Solution.addPhoto, Photo(1, "Tree", 10)),
+                                         (Solution.addPhoto, Photo(1, "Tree", 10)),
+                                         (Solution.getPhotoByID, 1)])
+        self.assertEqual(ReturnValue.ALREADY_EXISTS, results[1], "Should work")
+        pipelined = [event for event in self.events if event.kind == "pipelined"]
+        self.assertListEqual(["addPhoto", "addPhoto", "getPhotoByID"], [event.statement for event in pipelined],
+                             "A statement at a time")
+        self.assertListEqual([None, "UNIQUE_VIOLATION", None], [event.error for event in pipelined], "Should work")
+        self.assertEqual(1, pipelined[2].rows, "Should work")
+        self.assertEqual(len("1Tree10"), pipelined[2].bytes_received, "Should work")
+        self.assertEqual({"Solution.runPipelined"}, {event.function for event in pipelined}, "Should work")
+        self.assertEqual(2, Instrumentation.metrics.snapshot()["Solution.runPipelined addPhoto"]["calls"],
+                         "Should work")
+
+    def test_slow_queries_and_sinks(self) -> None:
+        slow = []
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "queries.jsonl")
+        sink = Instrumentation.JsonLinesSink(path)
+        Instrumentation.addHook(slow.append, slow_only=True)
+        Instrumentation.addHook(sink)
+        try:
+            Instrumentation.configureInstrumentation(enabled=True, slow_query_ms=10000)
+            Solution.addDisk(Disk(1, "DELL", 10, 10, 10))
+            self.assertListEqual([], slow, "Nothing that slow")
+            Instrumentation.configureInstrumentation(slow_query_ms=0)
+            Solution.getDiskByID(1)
+            self.assertEqual(["connect", "prepared"], [event.kind for event in slow], "Everything is slow")
+        finally:
+            Instrumentation.removeHook(slow.append)
+            Instrumentation.removeHook(sink)
+        with open(path) as file:
+            lines = [json.loads(line) for line in file]
+        self.assertEqual(4, len(lines), "Every event")
+        self.assertEqual("getDiskByID", lines[-1]["statement"], "Should work")
+        Instrumentation.metrics.writeJson(os.path.join(directory, "metrics.json"))
+        with open(os.path.join(directory, "metrics.json")) as file:
+            self.assertEqual(1, json.load(file)["Solution.addDisk addDisk"]["calls"], "Should work")
+
+    def test_async(self) -> None:
+        Solution.addPhoto(Photo(1, "Tree", 10))
+        Instrumentation.configureInstrumentation(enabled=True)
+
+        async def lookup():
+            try:
+                return await AsyncSolution.getPhotoByID(1)
+            finally:
+                await AsyncConnector.closePool()
+        self.assertEqual(10, asyncio.run(lookup()).getSize(), "Should work")
+        self.assertEqual([("connect", "AsyncSolution.getPhotoByID"), ("prepared", "AsyncSolution.getPhotoByID")],
+                         [(event.kind, event.function) for event in self.events], "Should work")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,34 @@
+import unittest
+import Solution
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+
+
+# the tests run in name order: test_1 leaves rows and drops the tables, test_2 must start from empty tables
+class Test(AbstractTest):
+    isolation = "rollback"
+
+    def test_1_leave_rows_behind(self) -> None:
+        self.assertEqual(ReturnValue.OK, Solution.addPhoto(Photo(1, "Tree", 10)), "Should work")
+        Solution.dropTables()
+        self.assertEqual(ReturnValue.ERROR, Solution.addPhoto(Photo(1, "Tree", 10)), "No tables")
+        Solution.createTables()
+        self.assertEqual(ReturnValue.OK, Solution.addPhoto(Photo(2, "Tree", 10)), "Should work")
+
+    def test_2_start_empty(self) -> None:
+        self.assertIsNone(Solution.getPhotoByID(2).getPhotoID(), "Rolled back")
+        self.assertEqual(ReturnValue.OK, Solution.addPhoto(Photo(1, "Tree", 10)), "Should work")
+        Solution.dropTables()
+
+
+class TestTruncate(Test):
+    isolation = "truncate"
+
+
+class TestDDL(Test):
+    isolation = "ddl"
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,49 @@
+import unittest
+import Solution
+import Utility.DBConnector as Connector
+from Utility.Exceptions import DatabaseException
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+
+
+class Test(AbstractTest):
+    def test_iterate_rows_and_chunks(self) -> None:
+        Solution.addPhotos(Photo(i, "Tree", i) for i in range(1, 2501))
+        conn = Connector.DBConnector()
+        try:
+            photo_ids = [row[0] for row in conn.iterate("SELECT photo_id FROM Photos ORDER BY photo_id", batch_size=1000)]
+            self.assertListEqual(list(range(1, 2501)), photo_ids, "Should work")
+            chunks = list(conn.iterate("SELECT * FROM Photos WHERE size > %s", (500,), batch_size=1000, chunks=True))
+            self.assertListEqual([1000, 1000], [chunk.size() for chunk in chunks], "Should work")
+            self.assertEqual("Tree", chunks[0][0]['description'], "Should work")
+            chunks = list(conn.iterate("SELECT size FROM Photos", batch_size=2000, chunks=True, columnar=True))
+            self.assertEqual(sum(range(1, 2501)), sum(sum(chunk.column("size")) for chunk in chunks), "Should work")
+            self.assertListEqual([], list(conn.iterate("SELECT * FROM Photos WHERE size < 0")), "Empty result")
+            with self.assertRaises(Exception):
+                list(conn.iterate("SELECT * FROM NoSuchTable"))
+        finally:
+            conn.close()
+
+    def test_iterate_closed_connection(self) -> None:
+        conn = Connector.DBConnector()
+        conn.close()
+        with self.assertRaises(DatabaseException.ConnectionInvalid):
+            next(conn.iterate("SELECT * FROM Photos"))
+
+    def test_close_while_iterating(self) -> None:
+        Solution.addPhotos(Photo(i, "Tree", i) for i in range(1, 11))
+        conn = Connector.DBConnector()
+        rows = conn.iterate("SELECT photo_id FROM Photos ORDER BY photo_id", batch_size=2)
+        self.assertEqual(1, next(rows)[0], "Should work")
+        conn.close()
+        rows.close()
+        self.assertEqual(10, Solution.getPhotoByID(10).getPhotoID(), "The connection is still usable")
+
+
+# the same tests on connections of the pool rather than of the Session of the test
+class TestPooled(Test):
+    isolation = "truncate"
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,112 @@
+import random
+import unittest
+import Solution
+import MemorySolution
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+from Business.RAM import RAM
+from Business.Disk import Disk
+
+
+# ReturnValues and numbers as they are, business objects by their text
+def comparable(result):
+    if isinstance(result, list):
+        return [comparable(entry) for entry in result]
+    return result if isinstance(result, (ReturnValue, int, float, bool, type(None))) else str(result)
+
+
+# a random call of module, bad parameters and missing IDs included
+def randomCall(rnd: random.Random, module):
+    photo = Photo(rnd.randint(-1, 30), rnd.choice(["Tree", "Sky", None]), rnd.choice([rnd.randint(0, 6), -1]))
+    disk_id = rnd.randint(0, 8)
+    ram_id = rnd.randint(0, 20)
+    return rnd.choice([
+        lambda: module.addPhoto(photo),
+        lambda: module.addDisk(Disk(disk_id, rnd.choice(["DELL", "HP"]), rnd.randint(0, 3), rnd.randint(0, 30), 2)),
+        lambda: module.addRAM(RAM(ram_id, rnd.choice(["DELL", "HP", "APPLE"]), rnd.randint(0, 8))),
+        lambda: module.addDiskAndPhoto(Disk(disk_id, "HP", 1, 20, 1), photo),
+        lambda: module.addPhotoToDisk(photo, disk_id),
+        lambda: module.addPhotoToDisk(module.getPhotoByID(photo.getPhotoID()), disk_id),
+        lambda: module.removePhotoFromDisk(module.getPhotoByID(photo.getPhotoID()), disk_id),
+        lambda: module.addRAMToDisk(ram_id, disk_id),
+        lambda: module.removeRAMFromDisk(ram_id, disk_id),
+        lambda: module.deletePhoto(module.getPhotoByID(photo.getPhotoID())),
+        lambda: module.deleteDisk(disk_id),
+        lambda: module.deleteRAM(ram_id),
+        lambda: module.placePhotos([(module.getPhotoByID(rnd.randint(1, 30)), rnd.randint(1, 8)) for _ in range(3)]),
+        lambda: module.getDiskByID(disk_id),
+        lambda: module.getRAMsByIDs([ram_id, 1, ram_id]),
+        lambda: float(module.averagePhotosSizeOnDisk(disk_id)),
+        lambda: module.getTotalRamOnDisk(disk_id),
+        lambda: module.getCostForDescription(photo.getDescription()),
+        lambda: module.getPhotosCanBeAddedToDisk(disk_id),
+        lambda: module.getPhotosCanBeAddedToDiskAndRAM(disk_id),
+        lambda: module.isCompanyExclusive(disk_id),
+        lambda: module.isDiskContainingAtLeastNumExists(photo.getDescription(), rnd.randint(0, 3)),
+        lambda: module.getDisksContainingTheMostData(),
+        lambda: module.getConflictingDisks(),
+        lambda: module.mostAvailableDisks(),
+        lambda: module.getClosePhotos(photo.getPhotoID()),
+    ])()
+
+
+class Test(AbstractTest):
+    def setUp(self) -> None:
+        super().setUp()
+        MemorySolution.createTables()
+
+    def tearDown(self) -> None:
+        MemorySolution.dropTables()
+        Solution.configureEngine("postgresql")
+        super().tearDown()
+
+    def test_same_results_as_postgresql(self) -> None:
+        for seed in range(3):
+            Solution.clearTables()
+            MemorySolution.clearTables()
+            expected, memory = random.Random(seed), random.Random(seed)
+            for step in range(400):
+                self.assertEqual(comparable(randomCall(expected, Solution)),
+                                 comparable(randomCall(memory, MemorySolution)),
+                                 "Seed " + str(seed) + ", step " + str(step))
+            self.assertListEqual([], MemorySolution.checkDiskStats(), "Running sums follow the writes")
+        MemorySolution.dropTables()
+        self.assertEqual(ReturnValue.ERROR, MemorySolution.addPhoto(Photo(1, "Tree", 1)), "No tables")
+        self.assertEqual(-1, MemorySolution.getTotalRamOnDisk(1), "No tables")
+
+    def test_session(self) -> None:
+        with MemorySolution.Session() as session:
+            self.assertEqual(ReturnValue.OK, MemorySolution.addPhoto(Photo(1, "Tree", 10)), "Should work")
+            self.assertEqual(ReturnValue.OK, MemorySolution.addDisk(Disk(1, "DELL", 10, 5, 10)), "Should work")
+            self.assertEqual(ReturnValue.BAD_PARAMS, MemorySolution.addPhotoToDisk(Photo(1, "Tree", 10), 1),
+                             "No room left")
+            self.assertListEqual([], MemorySolution.getConflictingDisks(), "The failed call left nothing behind")
+            session.commit()
+            MemorySolution.addRAM(RAM(1, "DELL", 10))
+            session.rollback()
+        self.assertEqual(1, MemorySolution.getPhotoByID(1).getPhotoID(), "Committed")
+        self.assertIsNone(MemorySolution.getRAMByID(1).getRamID(), "Rolled back")
+        with self.assertRaises(KeyError):
+            with MemorySolution.Session():
+                MemorySolution.deletePhoto(Photo(1, "Tree", 10))
+                raise KeyError()
+        self.assertEqual(1, MemorySolution.getPhotoByID(1).getPhotoID(), "Rolled back with the session")
+
+    def test_configure_engine(self) -> None:
+        Solution.configureEngine("memory")
+        self.assertEqual("memory", Solution.engine, "Should work")
+        self.assertEqual(ReturnValue.OK, Solution.addPhoto(Photo(1, "Tree", 10)), "Should work")
+        self.assertEqual(1, MemorySolution.getPhotoByID(1).getPhotoID(), "Added to the memory engine")
+        with Solution.Session():
+            self.assertListEqual([ReturnValue.OK, ReturnValue.ALREADY_EXISTS],
+                                 Solution.runPipelined([(Solution.addPhoto, Photo(2, "Tree", 1)),
+                                                        (Solution.addPhoto, Photo(2, "Tree", 1))]), "Should work")
+        Solution.configureEngine("postgresql")
+        self.assertIsNone(Solution.getPhotoByID(1).getPhotoID(), "Not in PostgreSQL")
+        with self.assertRaises(ValueError):
+            Solution.configureEngine("oracle")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,51 @@
+import random
+import unittest
+import Solution
+import Utility.DBConnector as Connector
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+from Business.Disk import Disk
+
+# the Photos x Disks formulation mostAvailableDisks had before, kept as the reference
+REFERENCE = """
+        SELECT d.disk_id, COUNT(bd.d_id)
+        FROM Disks d
+        LEFT OUTER JOIN (SELECT D.disk_id as d_id, D.speed as d_speed
+        FROM Photos P, Disks D
+        WHERE P.size <= D.free_space) bd
+        ON d.disk_id = bd.d_id
+        GROUP BY d.disk_id
+        ORDER BY COUNT(bd.d_id) DESC, d.speed DESC, d.disk_id ASC
+        LIMIT 5;
+        """
+
+
+class Test(AbstractTest):
+    def reference(self) -> list:
+        conn = Connector.DBConnector()
+        try:
+            _, result = conn.execute(REFERENCE)
+        finally:
+            conn.close()
+        return [row[0] for row in result.rows]
+
+    def test_matches_cross_product_on_random_data(self) -> None:
+        rnd = random.Random(236363)
+        for _ in range(25):
+            Solution.clearTables()
+            disks = rnd.randint(0, 12)
+            photos = rnd.randint(0, 40)
+            # few distinct sizes, free spaces and speeds, so ties in every sort key are frequent
+            Solution.addDisks([Disk(i, "DELL", rnd.randint(1, 3), rnd.randint(0, 12), 1) for i in range(1, disks + 1)])
+            Solution.addPhotos([Photo(i, "Tree", rnd.randint(0, 10)) for i in range(1, photos + 1)])
+            self.assertListEqual(self.reference(), Solution.mostAvailableDisks(), "Same disks in the same order")
+
+    def test_sizes_equal_to_free_space_fit(self) -> None:
+        Solution.addDisks([Disk(1, "DELL", 1, 5, 1), Disk(2, "DELL", 2, 4, 1), Disk(3, "DELL", 3, 0, 1)])
+        self.assertListEqual([3, 2, 1], Solution.mostAvailableDisks(), "No photos, by speed")
+        Solution.addPhotos([Photo(1, "Tree", 5), Photo(2, "Tree", 4), Photo(3, "Tree", 4), Photo(4, "Tree", 0)])
+        self.assertListEqual([1, 2, 3], Solution.mostAvailableDisks(), "4, 3 and 1 photos fit")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
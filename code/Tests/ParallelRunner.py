@@ -0,0 +1,109 @@
+# Runs the tests sharded across worker processes, each owning a schema of its own (see DBConnector.SCHEMA_ENV),
+# and reports the wall-clock time. run from the code directory:
+#     python -m Tests.ParallelRunner --workers 4 --compare
+# with --compare the same tests first run in a single worker, for the speed-up. a test class is never split
+# across workers, its tests may depend on running in order
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+import unittest
+
+# the modules run by default, next to the tests of the Tests package
+MODULES = ["NotSoSimpleTest"]
+
+
+def defaultModules() -> list:
+    return MODULES + sorted("Tests." + os.path.basename(path)[:-3] for path in glob.glob("Tests/*Test.py"))
+
+
+def flatten(suite) -> list:
+    if isinstance(suite, unittest.TestSuite):
+        return [test for child in suite for test in flatten(child)]
+    return [suite]
+
+
+# the IDs of the tests of every test class of modules, by class
+def classesOf(modules: list) -> dict:
+    classes = {}
+    for test in flatten(unittest.defaultTestLoader.loadTestsFromNames(modules)):
+        classes.setdefault(type(test).__module__ + "." + type(test).__qualname__, []).append(test.id())
+    return classes
+
+
+# the test IDs of each worker, whole classes dealt largest first to the worker with the fewest tests
+def shards(classes: dict, workers: int) -> list:
+    shards = [[] for _ in range(workers)]
+    for ids in sorted(classes.values(), key=len, reverse=True):
+        min(shards, key=len).extend(ids)
+    return [shard for shard in shards if shard]
+
+
+# runs ids in this process, printing a JSON summary on the last line. what the tests print is dropped
+def runWorker(ids: list):
+    import Utility.DBConnector as Connector
+    result = unittest.TestResult()
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            unittest.defaultTestLoader.loadTestsFromNames(ids).run(result)
+    finally:
+        Connector.dropSchema()
+    print(json.dumps({"run": result.testsRun,
+                      "problems": [str(test) + "\n" + trace for test, trace in result.failures + result.errors]}))
+
+
+# runs every shard in a worker process with schema prefix_<index>, returns (tests run, problems, seconds)
+def runShards(shards: list, prefix: str) -> tuple:
+    start = time.perf_counter()
+    workers = []
+    for index, ids in enumerate(shards):
+        environment = dict(os.environ, **{"SOLUTION_SCHEMA": prefix + "_" + str(index)})
+        workers.append(subprocess.Popen([sys.executable, "-m", "Tests.ParallelRunner", "--run"] + ids,
+                                        stdout=subprocess.PIPE, env=environment, text=True))
+    run, problems = 0, []
+    for worker in workers:
+        output, _ = worker.communicate()
+        lines = output.strip().splitlines()
+        if worker.returncode != 0 or not lines:
+            problems.append("worker exited with " + str(worker.returncode))
+            continue
+        summary = json.loads(lines[-1])
+        run += summary["run"]
+        problems += summary["problems"]
+    return run, problems, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--modules", default=",".join(defaultModules()), help="comma separated test modules")
+    parser.add_argument("--schema-prefix", default="test_worker")
+    parser.add_argument("--compare", action="store_true", help="run the tests in one worker first")
+    parser.add_argument("--run", nargs="*", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run is not None:
+        return runWorker(args.run)
+
+    classes = classesOf(args.modules.split(","))
+    serial, problems = None, []
+    if args.compare:
+        run, problems, serial = runShards(shards(classes, 1), args.schema_prefix + "_serial")
+        print("{:<12}{:>6} tests{:>10.2f} s".format("1 worker", run, serial))
+    run, sharded_problems, elapsed = runShards(shards(classes, args.workers), args.schema_prefix)
+    print("{:<12}{:>6} tests{:>10.2f} s{}".format(str(args.workers) + " worker" + "s" * (args.workers > 1), run,
+                                                  elapsed, "" if serial is None else
+                                                  "   speed-up {:.2f}x".format(serial / elapsed)))
+    problems += sharded_problems
+    for problem in problems:
+        print(problem)
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == '__main__':
+    main()
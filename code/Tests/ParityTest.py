@@ -0,0 +1,109 @@
+import os
+import random
+import tempfile
+import unittest
+import NotSoSimpleTest
+import Solution
+import SQLiteSolution
+import Utility.SQLiteConnector as SQLite
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest
+from Tests.MemorySolutionTest import comparable, randomCall
+from Business.Photo import Photo
+from Business.RAM import RAM
+from Business.Disk import Disk
+
+
+# NotSoSimpleTest creates and drops the tables of the engine it runs on, so this test does not
+class TestParity(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = SQLite.sqliteConfig()['path']
+        SQLite.configureSQLite(path=os.path.join(self.directory.name, "parity.db"))
+
+    def tearDown(self) -> None:
+        Solution.configureEngine("postgresql")
+        SQLite.closeConnection()
+        SQLite.configureSQLite(path=self.path)
+        self.directory.cleanup()
+
+    def test_not_so_simple_on_every_engine(self) -> None:
+        for name in Solution.ENGINES:
+            Solution.configureEngine(name)
+            result = unittest.TestResult()
+            unittest.defaultTestLoader.loadTestsFromModule(NotSoSimpleTest).run(result)
+            self.assertGreater(result.testsRun, 0, "Should work")
+            self.assertListEqual([], [str(test) + "\n" + trace for test, trace in result.failures + result.errors],
+                                 "NotSoSimpleTest on " + name)
+
+    def test_unknown_engine(self) -> None:
+        with self.assertRaises(ValueError):
+            Solution.configureEngine("oracle")
+        Solution.registerEngine("incomplete", "Queries")
+        try:
+            with self.assertRaises(ValueError):
+                Solution.configureEngine("incomplete")
+        finally:
+            del Solution.ENGINES["incomplete"]
+        self.assertEqual("postgresql", Solution.engine, "Left as it was")
+
+
+class Test(AbstractTest):
+    def setUp(self) -> None:
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = SQLite.sqliteConfig()['path']
+        SQLite.configureSQLite(path=os.path.join(self.directory.name, "parity.db"))
+        SQLiteSolution.createTables()
+
+    def tearDown(self) -> None:
+        SQLiteSolution.dropTables()
+        SQLite.closeConnection()
+        SQLite.configureSQLite(path=self.path)
+        self.directory.cleanup()
+        super().tearDown()
+
+    def test_same_results_as_postgresql(self) -> None:
+        for seed in range(3):
+            Solution.clearTables()
+            SQLiteSolution.clearTables()
+            expected, sqlite = random.Random(seed), random.Random(seed)
+            for step in range(400):
+                self.assertEqual(comparable(randomCall(expected, Solution)),
+                                 comparable(randomCall(sqlite, SQLiteSolution)),
+                                 "Seed " + str(seed) + ", step " + str(step))
+        photos = [Photo(1, "Tree", 1), Photo(1, "Sky", 2), Photo(0, "Tree", 1), Photo(2, None, 1), Photo(3, "Sky", 0)]
+        self.assertListEqual(comparable(Solution.addPhotos(photos)), comparable(SQLiteSolution.addPhotos(photos)),
+                             "Should work")
+        self.assertListEqual(comparable(Solution.getPhotosByIDs([3, 9, 1])),
+                             comparable(SQLiteSolution.getPhotosByIDs([3, 9, 1])), "Should work")
+        SQLiteSolution.dropTables()
+        self.assertEqual(ReturnValue.ERROR, SQLiteSolution.addPhoto(Photo(1, "Tree", 1)), "No tables")
+        self.assertListEqual([ReturnValue.ERROR], SQLiteSolution.addRAMs([RAM(1, "DELL", 1)]), "No tables")
+        self.assertEqual(-1, SQLiteSolution.getTotalRamOnDisk(1), "No tables")
+
+    def test_session(self) -> None:
+        with SQLiteSolution.Session() as session:
+            self.assertEqual(ReturnValue.OK, SQLiteSolution.addPhoto(Photo(1, "Tree", 10)), "Should work")
+            self.assertEqual(ReturnValue.OK, SQLiteSolution.addDisk(Disk(1, "DELL", 10, 5, 10)), "Should work")
+            self.assertEqual(ReturnValue.BAD_PARAMS, SQLiteSolution.addPhotoToDisk(Photo(1, "Tree", 10), 1),
+                             "No room left")
+            self.assertListEqual([], SQLiteSolution.getConflictingDisks(), "The failed call left nothing behind")
+            session.commit()
+            SQLiteSolution.addRAM(RAM(1, "DELL", 10))
+            session.rollback()
+        self.assertEqual(1, SQLiteSolution.getPhotoByID(1).getPhotoID(), "Committed")
+        self.assertIsNone(SQLiteSolution.getRAMByID(1).getRamID(), "Rolled back")
+        with self.assertRaises(KeyError):
+            with SQLiteSolution.Session():
+                SQLiteSolution.deletePhoto(Photo(1, "Tree", 10))
+                raise KeyError()
+        self.assertEqual(1, SQLiteSolution.getPhotoByID(1).getPhotoID(), "Rolled back with the session")
+
+    def test_wal(self) -> None:
+        self.assertEqual("wal", SQLite.connection().execute("PRAGMA journal_mode").fetchone()[0], "Should work")
+        self.assertEqual(1, SQLite.connection().execute("PRAGMA foreign_keys").fetchone()[0], "Should work")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,175 @@
+import unittest
+from psycopg2 import extensions
+import Solution
+import Queries
+import Utility.Cache as Cache
+import Utility.DBConnector as Connector
+import Utility.Pipeline as Pipeline
+from Utility.ReturnValue import ReturnValue
+from Utility.Exceptions import DatabaseException
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+from Business.RAM import RAM
+from Business.Disk import Disk
+
+
+# calls covering every function runPipelined sends itself, failures included, and one it does not
+def queue() -> list:
+    photo = Photo(1, "Tree", 10)
+    return [(Solution.addPhoto, photo),
+            (Solution.addPhoto, photo),
+            (Solution.addPhoto, Photo(2, "Tree", -1)),
+            (Solution.addDisk, Disk(1, "DELL", 10, 15, 10)),
+            (Solution.addRAM, RAM(1, "DELL", 10)),
+            (Solution.addRAMToDisk, 1, 1),
+            (Solution.addRAMToDisk, 1, 1),
+            (Solution.addRAMToDisk, 2, 1),
+            (Solution.getTotalRamOnDisk, 1),
+            (Solution.addPhotoToDisk, photo, 1),
+            (Solution.addPhotoToDisk, photo, 1),
+            (Solution.addPhotoToDisk, photo, 2),
+            (Solution.addDiskAndPhoto, Disk(2, "HP", 10, 5, 10), Photo(3, "Sky", 10)),
+            (Solution.addPhotoToDisk, Photo(3, "Sky", 10), 1),
+            (Solution.getDiskByID, 1),
+            (Solution.getPhotoByID, 1),
+            (Solution.getPhotoByID, 5),
+            (Solution.getRAMByID, 1),
+            (Solution.addDiskAndPhoto, Disk(2, "HP", 10, 5, 10), Photo(4, "Sky", 10)),
+            (Solution.removePhotoFromDisk, photo, 1),
+            (Solution.removePhotoFromDisk, photo, 1),
+            (Solution.getDiskByID, 1),
+            (Solution.removeRAMFromDisk, 1, 1),
+            (Solution.removeRAMFromDisk, 1, 1),
+            (Solution.deletePhoto, photo),
+            (Solution.deleteRAM, 1),
+            (Solution.deleteRAM, 1),
+            (Solution.deleteDisk, 2),
+            (Solution.deleteDisk, 2),
+            (Solution.getPhotoByID, 1)]
+
+
+# ReturnValues as they are, business objects by their text
+def comparable(results: list) -> list:
+    return [result if isinstance(result, (ReturnValue, int)) else str(result) for result in results]
+
+
+class Test(AbstractTest):
+    # pipelined calls run one by one inside a Session, these tests need the pipeline
+    isolation = "truncate"
+
+    def tearDown(self) -> None:
+        Cache.configureCaches(**Cache.CACHE_DEFAULTS)
+        Pipeline.BATCH_SIZE = 256
+        super().tearDown()
+
+    def expected(self) -> list:
+        results = comparable([call[0](*call[1:]) for call in queue()])
+        Solution.clearTables()
+        return results
+
+    def test_same_results_as_one_by_one(self) -> None:
+        expected = self.expected()
+        self.assertEqual(ReturnValue.ALREADY_EXISTS, expected[1], "Should work")
+        self.assertTrue(Pipeline.supported(), "libpq has pipeline mode")
+        self.assertListEqual(expected, comparable(Solution.runPipelined(queue())), "Should work")
+        Solution.clearTables()
+        Pipeline.BATCH_SIZE = 3
+        self.assertListEqual(expected, comparable(Solution.runPipelined(queue())), "Over several batches")
+        Solution.clearTables()
+        with Solution.Session():
+            self.assertListEqual(expected, comparable(Solution.runPipelined(queue())), "One by one in a Session")
+        self.assertListEqual([], Solution.runPipelined([]), "Should work")
+
+    # the statements _PIPELINED queues for a call are the ones the function sends when called directly
+    def test_same_statements_as_the_functions(self) -> None:
+        sent = []
+        execute_prepared = Connector.DBConnector.executePrepared
+
+        def recording(conn, name, query, params=(), *args, **kwargs):
+            sent.append((name, query, tuple(params)))
+            return execute_prepared(conn, name, query, params, *args, **kwargs)
+        Connector.DBConnector.executePrepared = recording
+        try:
+            for function, *arguments in queue():
+                plan = Solution._PIPELINED.get(function)
+                operation = plan(*arguments) if plan is not None else None
+                sent.clear()
+                function(*arguments)
+                if operation is not None:
+                    # a failed statement ends the call, the statements after it are not sent
+                    queued = [(name, query, tuple(params)) for name, query, params in operation[0]]
+                    self.assertTrue(sent, "Should work")
+                    self.assertListEqual(queued[:len(sent)], sent,
+                                         function.__name__ + " sends the statements of _PIPELINED")
+        finally:
+            Connector.DBConnector.executePrepared = execute_prepared
+
+    def test_caches(self) -> None:
+        expected = self.expected()
+        Cache.configureCaches(enabled=True)
+        Solution.addPhoto(Photo(1, "Tree", 10))
+        self.assertEqual(10, Solution.getPhotoByID(1).getSize(), "Cached")
+        self.assertEqual(ReturnValue.OK, Solution.deletePhoto(Photo(1, "Tree", 10)), "Should work")
+        self.assertListEqual(expected, comparable(Solution.runPipelined(queue())), "Should work")
+        self.assertIsNone(Solution.getPhotoByID(1).getPhotoID(), "Invalidated by deletePhoto")
+        self.assertEqual(15, Solution.getDiskByID(1).getFreeSpace(), "Invalidated by removePhotoFromDisk")
+
+    def test_other_engines(self) -> None:
+        expected = self.expected()
+        run_pipelined = Solution.runPipelined
+        calls = queue()
+        for engine in ("memory", "sqlite"):
+            Solution.configureEngine(engine)
+            try:
+                Solution.createTables()
+                self.assertListEqual(expected, comparable(run_pipelined(calls)), "Runs on " + engine)
+                self.assertEqual(1, Solution.getDiskByID(1).getDiskID(), "Should work")
+                Solution.dropTables()
+            finally:
+                Solution.configureEngine("postgresql")
+        self.assertIsNone(Solution.getDiskByID(1).getDiskID(), "Nothing ran on PostgreSQL")
+
+    def test_unsupported(self) -> None:
+        self.assertIsNone(Pipeline.unsupportedReason(), "Should work")
+        libpq, unsupported = Pipeline._libpq, Pipeline._unsupported
+        Pipeline._libpq, Pipeline._unsupported = None, "no pipeline mode here"
+        conn = Connector.DBConnector()
+        try:
+            self.assertFalse(Pipeline.supported(), "Should work")
+            with self.assertRaisesRegex(NotImplementedError, "no pipeline mode here"):
+                Pipeline.run(conn.connection, [], Connector.ResultSet, conn.cursor)
+            outcomes = conn.executePipelined([[("getPhotoByID", Queries.GET_PHOTO_BY_ID, (1,))]])
+            self.assertEqual([], outcomes[0][0][1].rows, "Run one by one")
+        finally:
+            conn.close()
+            Pipeline._libpq, Pipeline._unsupported = libpq, unsupported
+
+    def test_execute_pipelined(self) -> None:
+        Solution.addPhoto(Photo(1, "Tree", 10))
+        conn = Connector.DBConnector()
+        try:
+            conn.executePrepared("pipelined", "SELECT $1::INTEGER + 1 AS value", (1,))
+            conn.commit()
+            outcomes = conn.executePipelined([
+                [("pipelined", "SELECT $1::INTEGER * 10 AS value", (4,))],
+                [("addPhoto", Queries.ADD_PHOTO, (2, "Sky", 5)), ("addPhoto", Queries.ADD_PHOTO, (1, "Sky", 5))],
+                [("getPhotoByID", Queries.GET_PHOTO_BY_ID, (2,)), ("pipelined", "SELECT $1::INTEGER * 10", (None,))],
+                [("broken", "SELECT FROM nowhere", ())],
+                [("getPhotoByID", Queries.GET_PHOTO_BY_ID, (1,))]])
+            self.assertEqual(extensions.TRANSACTION_STATUS_IDLE, conn.connection.get_transaction_status(),
+                             "Every operation committed")
+        finally:
+            conn.close()
+        self.assertEqual(1, outcomes[0][0][0], "Should work")
+        self.assertEqual([(40,)], outcomes[0][0][1].rows, "Prepared again for its new query")
+        self.assertEqual(0, outcomes[0][0][1].cols["value"], "Should work")
+        self.assertIsInstance(outcomes[1], DatabaseException.UNIQUE_VIOLATION, "Should work")
+        self.assertEqual([], outcomes[2][0][1].rows, "Rolled back with its operation")
+        self.assertEqual([(None,)], outcomes[2][1][1].rows, "Should work")
+        self.assertEqual(["?column?"], outcomes[2][1][1].cols_header, "Prepared again for its new query")
+        self.assertIsInstance(outcomes[3], DatabaseException.UNKNOWN_ERROR, "Should work")
+        self.assertEqual([(1, "Tree", 10)], outcomes[4][0][1].rows, "A failure does not stop the others")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,111 @@
+import copy
+import io
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import Solution
+import Utility.Cache as Cache
+import Utility.PlanCapture as PlanCapture
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+from Business.Disk import Disk
+
+
+class Test(AbstractTest):
+    def setUp(self) -> None:
+        super().setUp()
+        PlanCapture.reset()
+        Cache.configureCaches(enabled=False)
+
+    def tearDown(self) -> None:
+        PlanCapture.reset()
+        Cache.configureCaches(**Cache.CACHE_DEFAULTS)
+        super().tearDown()
+
+    def entries(self, function: str) -> list:
+        return [entry for entry in PlanCapture.plans.values() if entry["function"] == function]
+
+    def test_disabled_by_default(self) -> None:
+        Solution.addPhoto(Photo(1, "Tree", 10))
+        Solution.getPhotoByID(1)
+        self.assertDictEqual({}, PlanCapture.plans, "Nothing is captured")
+
+    def test_record_from_threads(self) -> None:
+        def record():
+            for run in range(500):
+                PlanCapture.record("getPhotoByID", "getPhotoByID", (run % 5,), {"Plan": {}})
+        threads = [threading.Thread(target=record) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(5, len(PlanCapture.plans), "Should work")
+        self.assertEqual(4000, sum(entry["runs"] for entry in PlanCapture.plans.values()), "No run is lost")
+
+    def test_capture_by_function_and_params(self) -> None:
+        Solution.addDisk(Disk(1, "DELL", 10, 1000, 10))
+        with PlanCapture.capture():
+            self.assertEqual(ReturnValue.OK, Solution.addPhoto(Photo(1, "Tree", 10)), "Should work")
+            self.assertEqual(ReturnValue.ALREADY_EXISTS, Solution.addPhoto(Photo(1, "Tree", 10)),
+                             "The failed EXPLAIN does not hide the error")
+            Solution.getPhotoByID(1)
+            Solution.getPhotoByID(1)
+            Solution.getPhotoByID(2)
+            self.assertEqual(ReturnValue.OK, Solution.addPhotoToDisk(Photo(1, "Tree", 10), 1), "Should work")
+        Solution.getPhotoByID(3)
+        self.assertEqual(10, Solution.getPhotoByID(1).getSize(), "Should work")
+        self.assertEqual(990, Solution.getDiskByID(1).getFreeSpace(), "The write is applied once")
+        self.assertListEqual([1], Solution.getPhotosCanBeAddedToDisk(1), "Should work")
+        lookups = self.entries("Solution.getPhotoByID")
+        self.assertEqual([[1], [2]], sorted(entry["params"] for entry in lookups), "Keyed by the parameters")
+        self.assertEqual([2, 1], [entry["runs"] for entry in sorted(lookups, key=lambda entry: entry["params"])],
+                         "Should work")
+        self.assertEqual({"getPhotoByID"}, {entry["statement"] for entry in lookups}, "Should work")
+        self.assertIn("Execution Time", lookups[0]["plan"], "ANALYZE")
+        self.assertIn("Shared Hit Blocks", lookups[0]["plan"]["Plan"], "BUFFERS")
+        self.assertEqual(1, len(self.entries("Solution.addPhoto")), "Only the insert that went through")
+        self.assertNotEqual([], self.entries("Solution.addPhotoToDisk"), "Should work")
+
+    def test_capture_pipelined(self) -> None:
+        with PlanCapture.capture():
+            Solution.runPipelined([(Solution.addPhoto, Photo(1, "Tree", 10)), (Solution.getPhotoByID, 1)])
+        self.assertEqual(2, len(self.entries("Solution.runPipelined")), "Run one by one to be captured")
+        self.assertEqual(10, Solution.getPhotoByID(1).getSize(), "The write is applied once")
+
+    def test_save_load_and_compare(self) -> None:
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "plans.json")
+        Solution.addPhotos([Photo(i, "Tree", i) for i in range(1, 4)])
+        with PlanCapture.capture(path):
+            for i in range(1, 4):
+                Solution.getPhotoByID(i)
+        before = PlanCapture.load(path)
+        self.assertDictEqual(copy.deepcopy(PlanCapture.plans), before, "Should work")
+        self.assertEqual(("Result",), PlanCapture.outline({"Plan": {"Node Type": "Result"}}), "Should work")
+        changes = PlanCapture.comparePlans(before, before)
+        self.assertEqual({"same"}, {change["status"] for change in changes}, "Should work")
+
+        after = copy.deepcopy(before)
+        for entry in after.values():
+            if entry["function"] == "Solution.getPhotoByID":
+                # a plan the planner never picks for the lookup, whatever the statistics of the table
+                entry["plan"]["Plan"] = {"Node Type": "Function Scan", "Relation Name": "photos"}
+        after["extra"] = {"function": "Solution.getPhotos", "statement": "getPhotos", "params": [], "runs": 1,
+                          "plan": {"Plan": {"Node Type": "Result"}, "Execution Time": 0.01}}
+        statuses = {(change["function"], change["status"]) for change in PlanCapture.comparePlans(before, after)}
+        self.assertIn(("Solution.getPhotoByID", "changed"), statuses, "Should work")
+        self.assertIn(("Solution.getPhotos", "added"), statuses, "Should work")
+        self.assertIn(("Solution.getPhotos", "removed"),
+                      {(change["function"], change["status"]) for change in PlanCapture.comparePlans(after, before)},
+                      "Should work")
+        text = io.StringIO()
+        PlanCapture.summarise(before, after, text)
+        self.assertIn("    Function Scan on photos\n", text.getvalue(), "The changed outline in full")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
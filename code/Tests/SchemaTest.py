@@ -0,0 +1,57 @@
+import asyncio
+import unittest
+import Solution
+import AsyncSolution
+import Utility.AsyncDBConnector as AsyncConnector
+import Utility.DBConnector as Connector
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+
+
+class Test(AbstractTest):
+    # moves to other schemas, which closes the pool a Session would hold a connection of
+    isolation = "truncate"
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.settings = dict(Connector.DBConnector.connection_settings)
+
+    def tearDown(self) -> None:
+        Connector.configureConnection(schema="schema_test")
+        Connector.dropSchema()
+        self.restore()
+        super().tearDown()
+
+    # back to the schema of the process, the default one unless it runs in a worker of Tests.ParallelRunner
+    def restore(self) -> None:
+        Connector.DBConnector.connection_settings.clear()
+        Connector.configureConnection(**dict(self.settings, schema=self.settings.get('schema')))
+
+    def test_tables_of_a_schema(self) -> None:
+        self.assertEqual(ReturnValue.OK, Solution.addPhoto(Photo(1, "Tree", 10)), "Should work")
+        Connector.configureConnection(schema="schema_test")
+        self.assertEqual("schema_test", Connector.DBConnector.schema(), "Should work")
+        self.assertEqual(ReturnValue.ERROR, Solution.addPhoto(Photo(2, "Tree", 10)), "No tables in the schema yet")
+        Solution.createTables()
+        self.assertEqual(ReturnValue.OK, Solution.addPhoto(Photo(1, "Sky", 5)), "The schema has its own photo 1")
+        self.assertEqual("Sky", Solution.getPhotoByID(1).getDescription(), "Should work")
+
+        async def description():
+            try:
+                return (await AsyncSolution.getPhotoByID(1)).getDescription()
+            finally:
+                await AsyncConnector.closePool()
+        self.assertEqual("Sky", asyncio.run(description()), "AsyncSolution uses the schema too")
+        self.restore()
+        self.assertEqual("Tree", Solution.getPhotoByID(1).getDescription(), "Back to the default schema")
+
+    def test_invalid_schema(self) -> None:
+        with self.assertRaises(ValueError):
+            Connector.configureConnection(schema="x; DROP TABLE Photos")
+        with self.assertRaises(ValueError):
+            Connector.configureConnection(schema="Upper")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,100 @@
+import threading
+import unittest
+import Solution
+import Utility.Cache as Cache
+import Utility.DBConnector as Connector
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest
+from Business.Photo import Photo
+from Business.RAM import RAM
+from Business.Disk import Disk
+
+
+class Test(AbstractTest):
+    # opens sessions of its own and looks at what other threads see once they commit
+    isolation = "truncate"
+
+    # runs function on another thread, outside of the session
+    def elsewhere(self, function):
+        result = []
+        thread = threading.Thread(target=lambda: result.append(function()))
+        thread.start()
+        thread.join()
+        return result[0]
+
+    def test_workflow_in_one_transaction(self) -> None:
+        with Solution.Session() as session:
+            self.assertIs(session, Connector.currentSession(), "Should work")
+            self.assertEqual(ReturnValue.OK, Solution.addDisk(Disk(1, "DELL", 10, 100000, 10)), "Should work")
+            for ram_id in range(1, 4):
+                self.assertEqual(ReturnValue.OK, Solution.addRAM(RAM(ram_id, "DELL", 10)), "Should work")
+                self.assertEqual(ReturnValue.OK, Solution.addRAMToDisk(ram_id, 1), "Should work")
+            photos = [Photo(i, "Tree", 10) for i in range(1, 201)]
+            self.assertEqual([ReturnValue.OK] * 200, Solution.addPhotos(photos), "Should work")
+            self.assertEqual([ReturnValue.OK] * 200, Solution.addPhotosToDisk(photos, 1), "Should work")
+            self.assertEqual(30, Solution.getTotalRamOnDisk(1), "The session sees its own changes")
+            self.assertEqual(98000, Solution.getDiskByID(1).getFreeSpace(), "Should work")
+            self.assertIsNone(self.elsewhere(lambda: Solution.getDiskByID(1)).getDiskID(), "Not committed yet")
+        self.assertIsNone(Connector.currentSession(), "Should work")
+        self.assertEqual(98000, self.elsewhere(lambda: Solution.getDiskByID(1)).getFreeSpace(), "Committed")
+        self.assertEqual(30, Solution.getTotalRamOnDisk(1), "Should work")
+
+    def test_failed_step_keeps_the_others(self) -> None:
+        with Solution.Session():
+            self.assertEqual(ReturnValue.OK, Solution.addPhoto(Photo(1, "Tree", 10)), "Should work")
+            self.assertEqual(ReturnValue.ALREADY_EXISTS, Solution.addPhoto(Photo(1, "Tree", 10)), "Should work")
+            self.assertEqual(ReturnValue.BAD_PARAMS, Solution.addPhoto(Photo(2, "Tree", -1)), "Should work")
+            self.assertEqual(ReturnValue.NOT_EXISTS, Solution.addPhotoToDisk(Photo(1, "Tree", 10), 1),
+                             "Should work")
+            self.assertEqual(ReturnValue.OK, Solution.addDisk(Disk(1, "DELL", 10, 5, 10)), "Should work")
+            self.assertEqual(ReturnValue.BAD_PARAMS, Solution.addPhotoToDisk(Photo(1, "Tree", 10), 1),
+                             "Should work")
+            self.assertEqual([ReturnValue.OK, ReturnValue.ALREADY_EXISTS],
+                             Solution.addPhotos([Photo(3, "Tree", 1), Photo(1, "Tree", 1)]), "Should work")
+            self.assertEqual([ReturnValue.OK], Solution.addPhotos([Photo(4, "Tree", 1)]),
+                             "A second bulk load in the session")
+            self.assertEqual(ReturnValue.OK, Solution.addPhotoToDisk(Photo(3, "Tree", 1), 1), "Should work")
+        self.assertEqual([1, None, 3, 4], [photo.getPhotoID() for photo in Solution.getPhotosByIDs([1, 2, 3, 4])],
+                         "Should work")
+        self.assertEqual(4, Solution.getDiskByID(1).getFreeSpace(), "Should work")
+
+    def test_exception_rolls_back(self) -> None:
+        Solution.addPhoto(Photo(1, "Tree", 10))
+        with self.assertRaises(RuntimeError):
+            with Solution.Session():
+                Solution.addPhoto(Photo(2, "Tree", 10))
+                Solution.deletePhoto(Photo(1, "Tree", 10))
+                raise RuntimeError("Stop")
+        self.assertEqual(10, Solution.getPhotoByID(1).getSize(), "Should work")
+        self.assertIsNone(Solution.getPhotoByID(2).getPhotoID(), "Should work")
+
+    def test_nested_sessions(self) -> None:
+        with Solution.Session() as session:
+            Solution.addPhoto(Photo(1, "Tree", 10))
+            with self.assertRaises(RuntimeError):
+                with Solution.Session():
+                    Solution.addPhoto(Photo(2, "Tree", 10))
+                    raise RuntimeError("Stop")
+            with Solution.Session() as inner:
+                self.assertIs(session.connection, inner.connection, "Should work")
+                Solution.addPhoto(Photo(3, "Tree", 10))
+            self.assertIs(session, Connector.currentSession(), "Should work")
+        self.assertEqual([1, None, 3], [photo.getPhotoID() for photo in Solution.getPhotosByIDs([1, 2, 3])],
+                         "Should work")
+
+    def test_caches_follow_the_session(self) -> None:
+        Cache.configureCaches(enabled=True)
+        Solution.addPhoto(Photo(1, "Tree", 10))
+        self.assertEqual(10, Solution.getPhotoByID(1).getSize(), "Should work")
+        with Solution.Session():
+            Solution.deletePhoto(Photo(1, "Tree", 10))
+            Solution.addPhoto(Photo(1, "Tree", 20))
+            self.assertEqual(20, Solution.getPhotoByID(1).getSize(), "Should work")
+            self.assertEqual(0, Cache.photo_cache.size(), "Nothing uncommitted is cached")
+            self.assertEqual(10, self.elsewhere(lambda: Solution.getPhotoByID(1)).getSize(),
+                             "Other threads still see the committed row")
+        self.assertEqual(20, Solution.getPhotoByID(1).getSize(), "Invalidated again after the commit")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
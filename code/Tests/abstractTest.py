@@ -1,12 +1,72 @@
+import os
 import unittest
 import Solution
+import Queries
+import Utility.DBConnector as Connector
+
+# how every test starts from empty tables, set by SOLUTION_TEST_ISOLATION:
+#   "ddl"       createTables before and dropTables after every test
+#   "truncate"  the tables are created once per process and emptied by clearTables after every test
+#   "rollback"  the tables are created once per process and every test runs in a Solution.Session rolled back
+#               after it, the dropTables and createTables calls of the test included
+# a test class can pin a mode with its isolation attribute. the shared modes only apply to PostgreSQL,
+# where the DDL of createTables dominates short tests, the other engines create their tables in no time
+ISOLATION_ENV = "SOLUTION_TEST_ISOLATION"
+ISOLATIONS = ("ddl", "truncate", "rollback")
+isolation = os.environ.get(ISOLATION_ENV, "rollback")
+if isolation not in ISOLATIONS:
+    raise ValueError("Unknown test isolation: " + isolation)
+
+# whether this process emptied the tables it found, they may hold the rows of an interrupted run
+_cleared = False
+
+
+# creates the tables if a test (or no one yet) dropped them, and empties them the first time in this process
+def _ensureTables():
+    global _cleared
+    conn = Connector.DBConnector()
+    try:
+        _, result = conn.execute(Queries.TABLES_EXIST)
+        conn.commit()
+    finally:
+        conn.close()
+    if not result.rows[0][0]:
+        Solution.dropTables()
+        Solution.createTables()
+    elif not _cleared:
+        Solution.clearTables()
+    _cleared = True
 
 
 class AbstractTest(unittest.TestCase):
+    # the isolation mode of the tests of this class, None for the mode of the process
+    isolation = None
+
+    # the mode this test runs in
+    def isolationMode(self) -> str:
+        if Solution.engine != "postgresql":
+            return "ddl"
+        return self.isolation or isolation
+
     # before each test, setUp is executed
     def setUp(self) -> None:
-        Solution.createTables()
+        self.__session = None
+        self.__mode = self.isolationMode()
+        if self.__mode == "ddl":
+            Solution.createTables()
+            return
+        _ensureTables()
+        if self.__mode == "rollback":
+            self.__session = Solution.Session()
+            self.__session.__enter__()
 
     # after each test, tearDown is executed
     def tearDown(self) -> None:
-        Solution.dropTables()
+        if self.__session is not None:
+            session, self.__session = self.__session, None
+            session.rollback()
+            session.__exit__(None, None, None)
+        elif self.__mode == "truncate":
+            Solution.clearTables()
+        else:
+            Solution.dropTables()
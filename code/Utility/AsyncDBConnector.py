@@ -0,0 +1,180 @@
+import asyncio
+import collections
+import os
+import asyncpg
+from Utility.DBConnector import DBConnector, ResultSet
+from Utility.Exceptions import DatabaseException
+import Utility.Instrumentation as Instrumentation
+from typing import Tuple
+
+
+# the column of a ResultSet built from asyncpg records
+_Attribute = collections.namedtuple('_Attribute', ['name'])
+
+
+_pool = None  # the task creating the pool, awaited by every coroutine that needs it
+_pool_loop = None
+_pool_pid = None
+_checkout_timeout = None
+
+
+async def _createPool() -> asyncpg.Pool:
+    global _checkout_timeout
+    settings = DBConnector.poolConfig()
+    config = DBConnector.connectionConfig()
+    if 'port' in config:
+        config['port'] = int(config['port'])
+    # asyncpg takes the search_path of DBConnector.schema as a server setting instead of libpq options
+    config.pop('options', None)
+    schema = DBConnector.schema()
+    if schema is not None:
+        config['server_settings'] = {'search_path': schema}
+    _checkout_timeout = float(settings['checkout_timeout'])
+    pool = await asyncpg.create_pool(min_size=int(settings['minconn']),
+                                     max_size=int(settings['maxconn']),
+                                     max_inactive_connection_lifetime=float(settings['idle_timeout']),
+                                     **config)
+    if schema is not None:
+        await pool.execute('CREATE SCHEMA IF NOT EXISTS "' + schema + '"')
+    return pool
+
+
+# the pool shared by every AsyncDBConnector of the running event loop, created on first use.
+# sized by the same [pool] settings as the DBConnector pool
+async def getPool() -> asyncpg.Pool:
+    global _pool, _pool_loop, _pool_pid
+    loop = asyncio.get_running_loop()
+    # an asyncpg pool belongs to the loop that created it, and a forked child must not share its sockets.
+    # a failed creation is retried by the next caller
+    if _pool is None or _pool_loop is not loop or _pool_pid != os.getpid() or \
+            (_pool.done() and _pool.exception() is not None):
+        _pool = loop.create_task(_createPool())
+        _pool_loop, _pool_pid = loop, os.getpid()
+    return await asyncio.shield(_pool)
+
+
+# close every pooled connection of the running event loop
+async def closePool():
+    global _pool
+    pool, _pool = _pool, None
+    if pool is not None and _pool_loop is asyncio.get_running_loop() and _pool_pid == os.getpid():
+        try:
+            pool = await pool
+        except Exception:
+            return
+        await pool.close()
+
+
+# raise the DatabaseException matching the error reported by PostgreSQL or the driver
+def _translateError(error: Exception) -> Exception:
+    if isinstance(error, asyncpg.NotNullViolationError):
+        return DatabaseException.NOT_NULL_VIOLATION("NOT_NULL_VIOLATION")
+    if isinstance(error, asyncpg.ForeignKeyViolationError):
+        return DatabaseException.FOREIGN_KEY_VIOLATION("FOREIGN_KEY_VIOLATION")
+    if isinstance(error, asyncpg.UniqueViolationError):
+        return DatabaseException.UNIQUE_VIOLATION("UNIQUE_VIOLATION")
+    if isinstance(error, asyncpg.CheckViolationError):
+        return DatabaseException.CHECK_VIOLATION("CHECK_VIOLATION")
+    if isinstance(error, (asyncpg.PostgresConnectionError, asyncpg.InterfaceError, OSError,
+                          asyncio.TimeoutError)):
+        return DatabaseException.ConnectionInvalid(str(error))
+    return error
+
+
+# the number of rows effected, read from a command tag such as "INSERT 0 1", "DELETE 3" or "SELECT 5"
+def _rowsEffected(status: str) -> int:
+    count = status.rsplit(" ", 1)[-1] if status else ""
+    return int(count) if count.isdigit() else 0
+
+
+class AsyncDBConnector:
+    # constructor, no connection is taken from the pool until the first statement runs
+    def __init__(self):
+        self.connection = None
+        self.transaction = None
+        self.__pool = None
+
+    # close connection, the open transaction is rolled back and the connection is returned to the pool
+    async def close(self):
+        if self.connection is None:
+            return
+        try:
+            await self.rollback()
+        finally:
+            connection, self.connection = self.connection, None
+            await self.__pool.release(connection)
+
+    # commit connection's changes
+    async def commit(self):
+        if self.transaction is not None:
+            transaction, self.transaction = self.transaction, None
+            try:
+                await transaction.commit()
+            except Exception:
+                raise DatabaseException.ConnectionInvalid("Could not commit changes")
+
+    # rollback connection's changes
+    async def rollback(self):
+        if self.transaction is not None:
+            transaction, self.transaction = self.transaction, None
+            try:
+                await transaction.rollback()
+            except Exception:
+                raise DatabaseException.ConnectionInvalid("Could not rollback changes")
+
+    # executes the query with the simple query protocol, it may hold several statements.
+    # returns the number of rows effected by the last statement and an empty ResultSet
+    async def execute(self, query: str) -> Tuple[int, ResultSet]:
+        connection = await self.__begin()
+        with Instrumentation.probe("execute") as probe:
+            try:
+                status = await connection.execute(query)
+            except Exception as e:
+                raise _translateError(e)
+            probe.lap('execute')
+            probe.finish(sent=query)
+        return _rowsEffected(status), ResultSet()
+
+    # executes a server-side prepared statement, query uses $1, $2, ... for the values of params.
+    # asyncpg prepares the statement the first time it runs on the pooled connection and keeps it in the
+    # statement cache of that connection afterwards, name identifies it like in DBConnector.executePrepared.
+    # returns the number of rows returned and a ResultSet, statements whose caller needs the number of rows
+    # effected by an INSERT, UPDATE or DELETE report them with RETURNING
+    async def executePrepared(self, name: str, query: str, params=(),
+                              printSchema=False) -> Tuple[int, ResultSet]:
+        connection = await self.__begin()
+        with Instrumentation.probe("prepared", name) as probe:
+            try:
+                records = await connection.fetch(query, *params)
+            except Exception as e:
+                raise _translateError(e)
+            # asyncpg reads the rows with the statement
+            probe.lap('fetch')
+
+            description = [_Attribute(key) for key in records[0].keys()] if records else None
+            entries = ResultSet(description, records)
+            probe.lap('build')
+            probe.finish(result=entries, bytes_sent=Instrumentation.textSize((params,)))
+        if printSchema:
+            print(entries)
+
+        return len(records), entries
+
+    # borrow a connection and open a transaction on first use
+    async def __begin(self):
+        if self.connection is None:
+            with Instrumentation.probe("connect") as probe:
+                try:
+                    self.__pool = await getPool()
+                    self.connection = await self.__pool.acquire(timeout=_checkout_timeout)
+                except Exception:
+                    raise DatabaseException.ConnectionInvalid("Could not connect to database")
+                probe.lap('connect')
+        if self.transaction is None:
+            transaction = self.connection.transaction()
+            try:
+                await transaction.start()
+            except Exception as e:
+                raise _translateError(e)
+            self.transaction = transaction
+        return self.connection
@@ -0,0 +1,149 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# default settings of the entity caches, override them with configureCaches
+CACHE_DEFAULTS = {
+    'maxsize': 10000,  # entries per cache, the least recently used entry is evicted beyond it
+    'ttl': 60.0,  # seconds an entry is served before it is read again, bounds staleness across processes
+    'enabled': True,
+}
+
+
+class EntityCache:
+    # an LRU cache of database rows keyed by entity ID, entries expire ttl seconds after they were stored.
+    # a missing entity is cached as None, so the add paths must invalidate too.
+    # every invalidation moves the generation forward: a row read before an invalidation is never stored
+    # after it, even if the reader finishes after the writer committed
+    def __init__(self, maxsize=CACHE_DEFAULTS['maxsize'], ttl=CACHE_DEFAULTS['ttl'],
+                 enabled=CACHE_DEFAULTS['enabled']):
+        if maxsize < 0:
+            raise ValueError("Invalid cache size: maxsize=" + str(maxsize))
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.__entries = OrderedDict()  # key -> (expiry, row), least recently used first
+        self.__generation = 0
+        self.__lock = threading.Lock()
+
+    # returns (True, row) for a live entry, (False, None) otherwise
+    def get(self, key):
+        if not self.enabled or _inSession():
+            return False, None
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                if entry[0] >= time.monotonic():
+                    self.__entries.move_to_end(key)
+                    self.hits += 1
+                    return True, entry[1]
+                del self.__entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return False, None
+
+    # the generation to pass to put, taken before the row is read from the database
+    def generation(self) -> int:
+        return self.__generation
+
+    # stores the row read for key, unless something was invalidated since generation was taken
+    def put(self, key, row, generation: int):
+        if not self.enabled or self.maxsize == 0 or _inSession():
+            return
+        with self.__lock:
+            if generation != self.__generation:
+                return
+            self.__entries[key] = (time.monotonic() + self.ttl, row)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.maxsize:
+                self.__entries.popitem(last=False)
+                self.evictions += 1
+
+    # drop the entries of keys, called after the transaction changing them committed
+    def invalidate(self, *keys):
+        if _inSession():
+            _session.invalidated.append((self, keys))
+        with self.__lock:
+            self.__generation += 1
+            for key in keys:
+                if self.__entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    # drop every entry
+    def clear(self):
+        if _inSession():
+            _session.invalidated.append((self, None))
+        with self.__lock:
+            self.__generation += 1
+            self.invalidations += len(self.__entries)
+            self.__entries.clear()
+
+    def size(self) -> int:
+        return len(self.__entries)
+
+    def hitRate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def resetStatistics(self):
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    def __str__(self):
+        return "size: " + str(self.size()) + "/" + str(self.maxsize) + ", hits: " + str(self.hits) + \
+            ", misses: " + str(self.misses) + ", evictions: " + str(self.evictions) + \
+            ", expirations: " + str(self.expirations) + ", invalidations: " + str(self.invalidations)
+
+
+# the rows of getPhotoByID, getDiskByID and getRAMByID, shared by Solution and AsyncSolution
+photo_cache = EntityCache()
+disk_cache = EntityCache()
+ram_cache = EntityCache()
+
+
+# change the settings of every entity cache, the cached entries are dropped
+def configureCaches(**settings):
+    unknown = set(settings) - set(CACHE_DEFAULTS)
+    if unknown:
+        raise ValueError("Unknown cache settings: " + ", ".join(sorted(unknown)))
+    for cache in (photo_cache, disk_cache, ram_cache):
+        cache.clear()
+        for name, value in settings.items():
+            setattr(cache, name, value)
+
+
+# drop every cached entry, for writes the caches cannot follow (clearTables, dropTables, ...)
+def clearCaches():
+    for cache in (photo_cache, disk_cache, ram_cache):
+        cache.clear()
+
+
+# the invalidations of the session open on this thread, None outside of a session
+_session = threading.local()
+_session.invalidated = None
+
+
+def _inSession() -> bool:
+    return getattr(_session, 'invalidated', None) is not None
+
+
+# for the transaction of a DBConnector.Session: on this thread the caches are bypassed, since the rows read
+# may not be committed yet, and every invalidation is applied again when the block ends, after the commit
+# or the rollback, so no row read by another thread in the meantime survives it
+@contextmanager
+def deferInvalidations():
+    _session.invalidated = []
+    try:
+        yield
+    finally:
+        invalidated, _session.invalidated = _session.invalidated, None
+        for cache, keys in invalidated:
+            if keys is None:
+                cache.clear()
+            else:
+                cache.invalidate(*keys)
@@ -0,0 +1,159 @@
+import select
+import threading
+import time
+import psycopg2
+from psycopg2 import extensions
+from Utility.Exceptions import DatabaseException
+
+
+class PooledConnection(extensions.connection):
+    # a psycopg2 connection that remembers when it was last returned to the pool
+    # and which statements were already prepared on its server session
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.last_used = time.monotonic()
+        self.prepared = {}
+
+
+class ConnectionPool:
+    # constructor
+    # minconn connections are opened eagerly, at most maxconn connections exist at once.
+    # connections idle for more than idle_timeout seconds are closed (down to minconn).
+    # health check on checkout: closed connections are dropped, connections the server already wrote to while
+    # they were idle (e.g. the error of pg_terminate_backend) or idle for more than health_check_interval seconds
+    # are pinged. a connection lost silently within the interval fails its first statement, DBConnector then
+    # retries the statement once on another connection.
+    def __init__(self, params: dict, minconn=1, maxconn=10, idle_timeout=300.0,
+                 health_check_interval=30.0, checkout_timeout=30.0):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError("Invalid pool size: minconn=" + str(minconn) + ", maxconn=" + str(maxconn))
+        self.params = dict(params)
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.checkout_timeout = checkout_timeout
+        self.closed = False
+        self.__idle = []  # LIFO, the warmest connection is handed out first
+        self.__opened = 0
+        self.__lock = threading.Condition(threading.Lock())
+        for _ in range(minconn):
+            self.__idle.append(self.__connect())
+            self.__opened += 1
+
+    # take a healthy connection from the pool, opening a new one if needed
+    def getconn(self) -> PooledConnection:
+        deadline = time.monotonic() + self.checkout_timeout
+        while True:
+            connection = None
+            with self.__lock:
+                while True:
+                    if self.closed:
+                        raise DatabaseException.ConnectionInvalid("Connection pool is closed")
+                    self.__reapIdle()
+                    if self.__idle:
+                        connection = self.__idle.pop()
+                        break
+                    if self.__opened < self.maxconn:
+                        self.__opened += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self.__lock.wait(remaining):
+                        raise DatabaseException.ConnectionInvalid("Timed out waiting for a pooled connection")
+
+            if connection is None:
+                try:
+                    return self.__connect()
+                except Exception:
+                    self.__forget()
+                    raise
+            if self.__isHealthy(connection):
+                return connection
+            self.__discard(connection)
+
+    # give a connection back to the pool, rolling back whatever it left open
+    def putconn(self, connection: PooledConnection, discard=False):
+        if not discard and not connection.closed:
+            try:
+                if connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    connection.rollback()
+                if connection.autocommit:
+                    connection.autocommit = False
+            except Exception:
+                discard = True
+        if discard or connection.closed:
+            self.__discard(connection)
+            return
+        connection.last_used = time.monotonic()
+        with self.__lock:
+            if self.closed:
+                self.__opened -= 1
+                connection.close()
+            else:
+                self.__idle.append(connection)
+            self.__lock.notify()
+
+    # close every idle connection, connections still checked out are closed when returned
+    def closeall(self):
+        with self.__lock:
+            self.closed = True
+            for connection in self.__idle:
+                connection.close()
+            self.__opened -= len(self.__idle)
+            self.__idle = []
+            self.__lock.notify_all()
+
+    # number of connections currently open (idle and checked out)
+    def size(self) -> int:
+        return self.__opened
+
+    # number of connections waiting in the pool
+    def idle(self) -> int:
+        return len(self.__idle)
+
+    def __connect(self) -> PooledConnection:
+        connection = psycopg2.connect(connection_factory=PooledConnection, **self.params)
+        connection.autocommit = False
+        return connection
+
+    def __isHealthy(self, connection: PooledConnection) -> bool:
+        if connection.closed:
+            return False
+        if time.monotonic() - connection.last_used < self.health_check_interval and not self.__hasInput(connection):
+            return True
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            connection.rollback()
+            return True
+        except Exception:
+            return False
+
+    # whether the server sent something to an idle connection, which it only does when closing it or for a NOTIFY
+    @staticmethod
+    def __hasInput(connection: PooledConnection) -> bool:
+        try:
+            readable, _, _ = select.select([connection.fileno()], [], [], 0)
+        except (OSError, ValueError, psycopg2.Error):
+            return True
+        return bool(readable)
+
+    def __discard(self, connection: PooledConnection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        self.__forget()
+
+    def __forget(self):
+        with self.__lock:
+            self.__opened -= 1
+            self.__lock.notify()
+
+    # called with the lock held: close connections idle for too long, oldest first
+    def __reapIdle(self):
+        now = time.monotonic()
+        while len(self.__idle) > self.minconn and now - self.__idle[0].last_used > self.idle_timeout:
+            self.__idle.pop(0).close()
+            self.__opened -= 1
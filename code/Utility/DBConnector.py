@@ -1,10 +1,28 @@
 import psycopg2
-from psycopg2 import errors, sql
+from psycopg2 import errors, sql, extras, extensions
 from configparser import ConfigParser
 from Utility.Exceptions import DatabaseException
+from Utility.ConnectionPool import ConnectionPool
+import Utility.Cache as Cache
+import Utility.Instrumentation as Instrumentation
+import Utility.PlanCapture as PlanCapture
+import Utility.Pipeline as Pipeline
 import os
+import re
+import json
+import threading
+import itertools
+import time
+from array import array
+from contextlib import contextmanager
 from typing import Union
 from typing import Tuple
+from typing import Iterable, List
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 class ResultSetDict(dict):
     def __getitem__(self, item):
@@ -13,6 +31,13 @@ class ResultSetDict(dict):
         return super().__getitem__(item.lower())
 
 
+# the lines printed for a ResultSet, produced one at a time
+def _formatLines(cols_header, rows):
+    yield "".join(str(col) + "   " for col in cols_header) + '\n'
+    for row in rows:
+        yield "".join(str(val) + "   " for val in row) + '\n'
+
+
 class ResultSet:
     # constructor
     def __init__(self, description=None, results=None):
@@ -26,15 +51,7 @@ class ResultSet:
 
     # so you can use print(ResultSet)
     def __str__(self):
-        string = ""
-        for col in self.cols_header:
-            string += str(col) + "   "
-        string += '\n'
-        for row in self.rows:
-            for val in row:
-                string += str(val) + "   "
-            string += '\n'
-        return string
+        return "".join(_formatLines(self.cols_header, self.rows))
 
     # what is the size of the ResultSet?
     def size(self):
@@ -57,37 +74,532 @@ class ResultSet:
         if results is None or len(results) == 0:  # no results
             self.cols = ResultSetDict()
         else:
-            self.rows = results.copy()
+            self.rows = results
             self.cols_header = [d.name for d in description]
             self.cols = ResultSetDict()
             for col, index in zip(self.cols_header, range(len(results[0]))):
                 self.cols[col] = index
 
 
-class DBConnector:
-    # constructor
+# raise the DatabaseException matching the integrity violation reported by PostgreSQL
+@contextmanager
+def _translateErrors():
+    try:
+        yield
+    except errors.lookup("23502"):
+        raise DatabaseException.NOT_NULL_VIOLATION("NOT_NULL_VIOLATION")
+    except errors.lookup("23503"):
+        raise DatabaseException.FOREIGN_KEY_VIOLATION("FOREIGN_KEY_VIOLATION")
+    except errors.lookup("23505"):
+        raise DatabaseException.UNIQUE_VIOLATION("UNIQUE_VIOLATION")
+    except errors.lookup("23514"):
+        raise DatabaseException.CHECK_VIOLATION("CHECK_VIOLATION")
+
+
+# file-like object producing COPY text format lines from an iterable of tuples, one buffer at a time
+class _CopyStream:
+    __escapes = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+    def __init__(self, rows: Iterable[tuple]):
+        self.__rows = iter(rows)
+        self.__buffer = ""
+        self.sent = 0
+
+    def read(self, size=-1) -> str:
+        parts = [self.__buffer]
+        length = len(self.__buffer)
+        while size < 0 or length < size:
+            row = next(self.__rows, None)
+            if row is None:
+                break
+            line = "\t".join(_CopyStream.__field(value) for value in row) + "\n"
+            parts.append(line)
+            length += len(line)
+        data = "".join(parts)
+        if size < 0:
+            self.__buffer = ""
+            self.sent += len(data)
+            return data
+        self.__buffer = data[size:]
+        self.sent += min(size, len(data))
+        return data[:size]
+
+    @staticmethod
+    def __field(value) -> str:
+        if value is None:
+            return "\\N"
+        return str(value).translate(_CopyStream.__escapes)
+
+
+# how often executePrepared found its statement already prepared on the connection
+class PreparedStatistics:
     def __init__(self):
+        self.executions = 0
+        self.prepares = 0
+        self.__lock = threading.Lock()
+
+    def record(self, prepared: bool):
+        with self.__lock:
+            self.executions += 1
+            if prepared:
+                self.prepares += 1
+
+    def hits(self) -> int:
+        return self.executions - self.prepares
+
+    def hitRate(self) -> float:
+        if self.executions == 0:
+            return 0.0
+        return self.hits() / self.executions
+
+    def reset(self):
+        with self.__lock:
+            self.executions = 0
+            self.prepares = 0
+
+    def __str__(self):
+        return "executions=" + str(self.executions) + ", prepares=" + str(self.prepares) + \
+            ", hit rate=" + "{:.2%}".format(self.hitRate())
+
+
+prepared_statistics = PreparedStatistics()
+
+# unique names for the server-side cursors opened by iterate
+_cursor_names = itertools.count()
+
+# whether the reason pipeline mode is not supported was printed, once per process
+_pipeline_reported = False
+
+
+def _pipelineSupported() -> bool:
+    global _pipeline_reported
+    reason = Pipeline.unsupportedReason()
+    if reason is not None and not _pipeline_reported:
+        _pipeline_reported = True
+        print("Pipelined statements run one by one: " + reason)
+    return reason is None
+
+
+# reports every statement sent in pipeline mode to Instrumentation, as a "pipelined" statement. the statements
+# are not timed one by one, each gets an equal share of the time of the whole pipeline. every statement of a
+# failed operation carries its error, they were all rolled back
+def _recordPipelined(operations: list, outcomes: list, seconds: float):
+    share = seconds / max(1, sum(len(operation) for operation in operations))
+    for operation, outcome in zip(operations, outcomes):
+        failed = isinstance(outcome, Exception)
+        for index, (name, _, params) in enumerate(operation):
+            result = None if failed or index >= len(outcome) else outcome[index][1]
+            Instrumentation.record("pipelined", name, share, rows=0 if result is None else result.size(),
+                                   bytes_sent=Instrumentation.textSize([params]),
+                                   bytes_received=0 if result is None else Instrumentation.textSize(result.rows),
+                                   error=outcome if failed else None)
+
+
+# default settings of the process-wide connection pool, override them in the [pool] section of database.ini
+POOL_DEFAULTS = {
+    'minconn': 1,
+    'maxconn': 20,
+    'idle_timeout': 300.0,
+    'health_check_interval': 30.0,
+    'checkout_timeout': 30.0,
+}
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+# the pool shared by every DBConnector of this process, created on first use
+def getPool() -> ConnectionPool:
+    global _pool, _pool_pid
+    with _pool_lock:
+        # a forked child must not share the sockets of its parent
+        if _pool is None or _pool.closed or _pool_pid != os.getpid():
+            _pool = DBConnector._createPool()
+            _pool_pid = os.getpid()
+        return _pool
+
+
+# replace the pool settings, the current pool is closed and a new one is created on next use
+def configurePool(**settings):
+    global _pool
+    unknown = set(settings) - set(POOL_DEFAULTS)
+    if unknown:
+        raise ValueError("Unknown pool settings: " + ", ".join(sorted(unknown)))
+    with _pool_lock:
+        DBConnector.pool_settings.update(settings)
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.closeall()
+        _pool = None
+
+
+# override settings of the [postgresql] section of database.ini (host, port, ...) for the connections opened
+# from now on, the current pool is closed. schema moves the tables of this process to a schema of their own
+# (its search_path), created on first use, None goes back to the default search_path
+def configureConnection(**settings):
+    global _pool
+    if settings.get('schema'):
+        checkedSchema(settings['schema'])
+    with _pool_lock:
+        DBConnector.connection_settings.update(settings)
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.closeall()
+        _pool = None
+    if 'schema' in settings:
+        # the cached rows are those of the previous schema
+        Cache.clearCaches()
+
+
+# the environment variable setting the schema of a process, e.g. of a worker running a shard of the tests
+SCHEMA_ENV = "SOLUTION_SCHEMA"
+
+_SCHEMA_NAME = re.compile(r"[a-z_][a-z0-9_]*")
+
+
+# schema if it is a plain lower case identifier, the only names used unquoted in the search_path
+def checkedSchema(schema: str) -> str:
+    if not _SCHEMA_NAME.fullmatch(schema):
+        raise ValueError("Invalid schema name: " + schema)
+    return schema
+
+
+# drop the schema of this process with everything in it, nothing happens if none is configured
+def dropSchema():
+    schema = DBConnector.schema()
+    if schema is None:
+        return
+    conn = DBConnector()
+    try:
+        conn.execute(sql.SQL("DROP SCHEMA IF EXISTS {schema} CASCADE").format(schema=sql.Identifier(schema)))
+        conn.commit()
+    finally:
+        conn.close()
+    closePool()
+    Cache.clearCaches()
+
+
+# close every pooled connection of this process
+def closePool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.closeall()
+        _pool = None
+
+
+# the Session open on each thread
+_sessions = threading.local()
+
+
+# binds one pooled connection and one transaction to every DBConnector created on this thread inside the
+# block, so a sequence of Solution calls is committed once, when the block ends (rolled back if it raises):
+#     with Solution.Session():
+#         Solution.addDisk(disk)
+#         Solution.addPhotosToDisk(photos, disk.getDiskID())
+# every DBConnector is a step running in a savepoint: its commit releases the savepoint and its rollback
+# (or a close without commit) rolls back to it, so a failed call returns its ReturnValue as usual and the
+# other calls of the session are kept. the caches are bypassed on this thread until the session ends.
+# sessions nest: an inner session is a savepoint of the outer one.
+# SAVEPOINT and RELEASE are not sent on their own, they go with the next statement of the session
+class Session:
+    def __init__(self):
+        self.connection = None
+        self.__outer = None
+        self.__caches = None
+        self.__savepoint = None
+        self.__savepoints = itertools.count()
+        self.__pending = []  # SAVEPOINT and RELEASE statements not sent yet
+
+    def __enter__(self):
+        self.__outer = getattr(_sessions, 'current', None)
+        if self.__outer is not None:
+            self.connection = self.__outer.connection
+            self.__savepoint = self.savepoint()
+        else:
+            self.__pool = getPool()
+            try:
+                self.connection = self.__pool.getconn()
+            except Exception:
+                raise DatabaseException.ConnectionInvalid("Could not connect to database")
+            self.__caches = Cache.deferInvalidations()
+            self.__caches.__enter__()
+        _sessions.current = self
+        return self
+
+    def __exit__(self, kind, error, traceback):
+        _sessions.current = self.__outer
         try:
-            # Obtain the configuration parameters
-            params = DBConnector.__config()
-            self.connection = psycopg2.connect(**params)
-            self.connection.autocommit = False
-            self.cursor = self.connection.cursor()
-        except Exception as e:
+            if self.__outer is not None:
+                self.release(self.__savepoint, rollback=error is not None)
+            elif error is None:
+                self.commit()
+            else:
+                self.rollback()
+        finally:
+            if self.__outer is None:
+                self.__pool.putconn(self.connection)
+                self.__caches.__exit__(None, None, None)
             self.connection = None
-            self.cursor = None
-            raise DatabaseException.ConnectionInvalid("Could not connect to database")
+        return False
+
+    # commit what the session did so far, it goes on in a new transaction
+    def commit(self):
+        if self.__outer is not None:
+            return self.__outer.commit()
+        self.__pending.clear()
+        try:
+            self.connection.commit()
+        except Exception:
+            raise DatabaseException.ConnectionInvalid("Could not commit changes")
+
+    # roll back what the session did so far, it goes on in a new transaction
+    def rollback(self):
+        if self.__outer is not None:
+            return self.__outer.rollback()
+        self.__pending.clear()
+        try:
+            self.connection.rollback()
+        except Exception:
+            raise DatabaseException.ConnectionInvalid("Could not rollback changes")
+
+    # starts a step, returns the name of its savepoint
+    def savepoint(self) -> str:
+        if self.__outer is not None:
+            return self.__outer.savepoint()
+        name = "step_" + str(next(self.__savepoints))
+        self.__pending.append("SAVEPOINT " + name)
+        return name
+
+    # ends the step started by savepoint, keeping its changes or rolling them back
+    def release(self, name: str, rollback=False):
+        if self.__outer is not None:
+            return self.__outer.release(name, rollback)
+        if self.__pending and self.__pending[-1] == "SAVEPOINT " + name:
+            # nothing was sent in the step
+            self.__pending.pop()
+        elif not rollback:
+            self.__pending.append("RELEASE SAVEPOINT " + name)
+        else:
+            try:
+                with self.connection.cursor() as cursor:
+                    cursor.execute(self.takePending() + "ROLLBACK TO SAVEPOINT " + name + "; RELEASE SAVEPOINT " + name)
+            except Exception:
+                raise DatabaseException.ConnectionInvalid("Could not end a step")
 
-    # close connection
+    # the statements to send before the next statement of the session, "" if there are none
+    def takePending(self) -> str:
+        if self.__outer is not None:
+            return self.__outer.takePending()
+        if not self.__pending:
+            return ""
+        pending = "; ".join(self.__pending) + "; "
+        self.__pending.clear()
+        return pending
+
+
+# the Session open on this thread, None outside of a session
+def currentSession() -> Union[Session, None]:
+    return getattr(_sessions, 'current', None)
+
+
+# a ResultSet stored column by column: integer and float columns are packed into arrays,
+# rows are lightweight views into the columns, nothing is built per row until a value is read
+class ColumnarResultSet:
+    # constructor, batches is an iterable of row lists (e.g. successive cursor.fetchmany() calls)
+    def __init__(self, description=None, batches=()):
+        self.cols_header = []
+        self.cols = ResultSetDict()
+        self.columns = []
+        self.__size = 0
+        if description is not None:
+            self.cols_header = [d.name for d in description]
+            self.columns = [None] * len(self.cols_header)
+            for batch in batches:
+                self.__append(batch)
+        if self.__size == 0:  # no results
+            self.cols_header = []
+            self.columns = []
+        for index, col in enumerate(self.cols_header):
+            self.cols[col] = index
+        self.rows = _ColumnarRows(self)
+
+    # reads the whole result of an executed cursor, batch_size rows at a time
+    @staticmethod
+    def fromCursor(cursor, batch_size=10000):
+        return ColumnarResultSet(cursor.description, iter(lambda: cursor.fetchmany(batch_size), []))
+
+    def __getitem__(self, row):
+        if self.__size <= row:
+            print('Invalid row ' + str(row))
+            return ResultSetDict()
+        return _ColumnarRow(self, row)
+
+    # so you can use print(ColumnarResultSet)
+    def __str__(self):
+        return "".join(self.lines())
+
+    # the printed lines, one at a time, so large results can be streamed with write
+    def lines(self):
+        return _formatLines(self.cols_header, self.rows)
+
+    def write(self, stream):
+        for line in self.lines():
+            stream.write(line)
+
+    # what is the size of the ResultSet?
+    def size(self):
+        return self.__size
+
+    # is the ResultSet empty?
+    def isEmpty(self):
+        return self.size() == 0
+
+    # the values of one column, by name or index
+    def column(self, col):
+        if type(col) is str:
+            col = self.cols[col]
+        return self.columns[col]
+
+    # the values of one column as a NumPy array, array backed columns are shared, not copied
+    def numpyColumn(self, col):
+        if numpy is None:
+            raise ImportError("numpy is not installed")
+        values = self.column(col)
+        if isinstance(values, array):
+            return numpy.frombuffer(values, dtype=numpy.int64 if values.typecode == 'q' else numpy.float64)
+        return numpy.array(values, dtype=object)
+
+    def __append(self, batch: list):
+        if len(batch) == 0:
+            return
+        for index, values in enumerate(zip(*batch)):
+            column = self.columns[index]
+            if column is None:
+                column = ColumnarResultSet.__newColumn(values)
+            elif isinstance(column, array):
+                # the batch is packed on its own first, so a value that does not fit leaves the column untouched
+                packed = ColumnarResultSet.__newColumn(values)
+                if isinstance(packed, array) and packed.typecode == column.typecode:
+                    column.extend(packed)
+                else:
+                    # a value that does not fit the packed type, fall back to a plain list
+                    column = column.tolist()
+                    column.extend(values)
+            else:
+                column.extend(values)
+            self.columns[index] = column
+        self.__size += len(batch)
+
+    @staticmethod
+    def __newColumn(values: tuple):
+        if all(type(value) is int for value in values):
+            try:
+                return array('q', values)
+            except OverflowError:
+                pass
+        elif all(type(value) is float for value in values):
+            return array('d', values)
+        return list(values)
+
+
+# the rows of a ColumnarResultSet, as a sequence of row views
+class _ColumnarRows:
+    __slots__ = ('__result',)
+
+    def __init__(self, result: ColumnarResultSet):
+        self.__result = result
+
+    def __len__(self):
+        return self.__result.size()
+
+    def __getitem__(self, row: int):
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("row index out of range")
+        return _ColumnarRow(self.__result, row)
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield _ColumnarRow(self.__result, row)
+
+
+# one row of a ColumnarResultSet, indexed by column number or (case insensitive) column name
+class _ColumnarRow:
+    __slots__ = ('__result', '__row')
+
+    def __init__(self, result: ColumnarResultSet, row: int):
+        self.__result = result
+        self.__row = row
+
+    def __getitem__(self, col):
+        if type(col) is str:
+            col = self.__result.cols[col]
+        return self.__result.columns[col][self.__row]
+
+    def __len__(self):
+        return len(self.__result.columns)
+
+    def __iter__(self):
+        for column in self.__result.columns:
+            yield column[self.__row]
+
+    def __str__(self):
+        return str(tuple(self))
+
+
+class DBConnector:
+    pool_settings = {}
+    connection_settings = {}
+
+    # constructor, inside a Session the connection of the session is used for a step of its transaction
+    def __init__(self):
+        self.connection = None
+        self.cursor = None
+        self.__session = getattr(_sessions, 'current', None)
+        self.__step = None
+        with Instrumentation.probe("connect") as probe:
+            if self.__session is not None:
+                self.__step = self.__session.savepoint()
+                self.connection = self.__session.connection
+                self.cursor = self.connection.cursor()
+                probe.lap('connect')
+                return
+            try:
+                # Borrow a warm connection from the process-wide pool
+                self.__pool = getPool()
+                self.connection = self.__pool.getconn()
+                self.cursor = self.connection.cursor()
+            except Exception as e:
+                if self.connection is not None:
+                    self.__pool.putconn(self.connection, discard=True)
+                self.connection = None
+                self.cursor = None
+                raise DatabaseException.ConnectionInvalid("Could not connect to database")
+            probe.lap('connect')
+
+    # close connection, the underlying connection is rolled back and returned to the pool
     def close(self):
         if self.cursor is not None:
             self.cursor.close()
-        if self.connection is not None:
-            self.connection.close()
+            self.cursor = None
+        if self.connection is not None and self.__session is not None:
+            # what was not committed is rolled back, as the pool does
+            step, self.__step = self.__step, None
+            self.connection = None
+            if step is not None:
+                self.__session.release(step, rollback=True)
+        elif self.connection is not None:
+            self.__pool.putconn(self.connection)
+            self.connection = None
 
-    # commit connection's changes
+    # commit connection's changes, inside a Session only the step is ended, the session commits them
     def commit(self):
-        if self.connection is not None:
+        if self.connection is not None and self.__session is not None:
+            if self.__step is not None:
+                self.__session.release(self.__step)
+                self.__step = None
+        elif self.connection is not None:
             try:
                 self.connection.commit()
             except Exception:
@@ -95,7 +607,11 @@ class DBConnector:
 
     # rollback connection's changes
     def rollback(self):
-        if self.connection is not None:
+        if self.connection is not None and self.__session is not None:
+            if self.__step is not None:
+                self.__session.release(self.__step, rollback=True)
+                self.__step = None
+        elif self.connection is not None:
             try:
                 self.connection.rollback()
             except Exception:
@@ -103,28 +619,24 @@ class DBConnector:
 
     # executes the query, if it is SELECT you may ask to print the results with printSchema
     # returns the number of rows effected and a ResultSet (for SELECT)
-    def execute(self, query: Union[str, sql.Composed], printSchema=False) -> Tuple[int, ResultSet]:
+    # with columnar=True the rows are read in batches into a ColumnarResultSet
+    def execute(self, query: Union[str, sql.Composed], printSchema=False,
+                columnar=False) -> Tuple[int, Union[ResultSet, ColumnarResultSet]]:
         if self.connection is None:
             raise DatabaseException.ConnectionInvalid("Connection Invalid")
+        return self.__retried(self.__execute, query, printSchema, columnar)
 
-        # try execute the query
-        try:
-            self.cursor.execute(query)
-            row_effected = max(self.cursor.rowcount, 0)
-        except errors.lookup("23502"):
-            raise DatabaseException.NOT_NULL_VIOLATION("NOT_NULL_VIOLATION")
-        except errors.lookup("23503"):
-            raise DatabaseException.FOREIGN_KEY_VIOLATION("FOREIGN_KEY_VIOLATION")
-        except errors.lookup("23505"):
-            raise DatabaseException.UNIQUE_VIOLATION("UNIQUE_VIOLATION")
-        except errors.lookup("23514"):
-            raise DatabaseException.CHECK_VIOLATION("CHECK_VIOLATION")
-
-        # get entries in case of SELECT
-        if self.cursor.description is not None:
-            entries = ResultSet(self.cursor.description, self.cursor.fetchall())
-        else:
-            entries = ResultSet()
+    def __execute(self, query, printSchema, columnar):
+        with Instrumentation.probe("execute") as probe:
+            # try execute the query
+            with _translateErrors():
+                self.cursor.execute(self.__prefixed(query))
+                row_effected = max(self.cursor.rowcount, 0)
+            probe.lap('execute')
+
+            # get entries in case of SELECT
+            entries = self.__fetchEntries(columnar, probe)
+            probe.finish(sent=self.cursor.query, result=entries)
 
         # print SELECT entries
         if printSchema:
@@ -132,6 +644,300 @@ class DBConnector:
 
         return row_effected, entries
 
+    # the [postgresql] section of database.ini overridden by configureConnection, as keyword arguments for a
+    # connect call. a schema setting becomes the search_path of the connections
+    @staticmethod
+    def connectionConfig() -> dict:
+        config = DBConnector.__config()
+        config.update(DBConnector.connection_settings)
+        schema = config.pop('schema', None)
+        if schema:
+            config['options'] = "-c search_path=" + checkedSchema(schema)
+        return config
+
+    # the schema the tables of this process are created and looked up in, None for the default search_path
+    @staticmethod
+    def schema() -> Union[str, None]:
+        config = DBConnector.__config()
+        config.update(DBConnector.connection_settings)
+        return checkedSchema(config['schema']) if config.get('schema') else None
+
+    # the [pool] section of database.ini, overridden by configurePool
+    @staticmethod
+    def poolConfig() -> dict:
+        settings = DBConnector.__poolConfig()
+        settings.update(DBConnector.pool_settings)
+        return settings
+
+    @staticmethod
+    def _createPool() -> ConnectionPool:
+        settings = DBConnector.poolConfig()
+        pool = ConnectionPool(DBConnector.connectionConfig(),
+                              minconn=int(settings['minconn']),
+                              maxconn=int(settings['maxconn']),
+                              idle_timeout=float(settings['idle_timeout']),
+                              health_check_interval=float(settings['health_check_interval']),
+                              checkout_timeout=float(settings['checkout_timeout']))
+        schema = DBConnector.schema()
+        if schema is not None:
+            # created by the first pool using it
+            connection = pool.getconn()
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(sql.SQL("CREATE SCHEMA IF NOT EXISTS {schema}").format(
+                        schema=sql.Identifier(schema)))
+                connection.commit()
+            finally:
+                pool.putconn(connection)
+        return pool
+
+    # pool settings, every key missing from the [pool] section keeps its default
+    @staticmethod
+    def __poolConfig(section='pool'):
+        parser = ConfigParser()
+        parser.read([os.path.join(os.path.join(os.path.dirname(os.getcwd()), 'Utility'), 'database.ini'),
+                     os.path.join(os.path.join(os.getcwd(), "Utility"), 'database.ini')])
+        settings = dict(POOL_DEFAULTS)
+        if parser.has_section(section):
+            for key, value in parser.items(section):
+                if key in settings:
+                    settings[key] = value
+        return settings
+
+    # executes a named server-side prepared statement, query uses $1, $2, ... for the values of params.
+    # the statement is prepared the first time its name is used on the pooled connection and reused afterwards.
+    # returns the number of rows effected and a ResultSet (for SELECT), like execute
+    def executePrepared(self, name: str, query: str, params=(), printSchema=False,
+                        columnar=False) -> Tuple[int, Union[ResultSet, ColumnarResultSet]]:
+        if self.connection is None:
+            raise DatabaseException.ConnectionInvalid("Connection Invalid")
+        return self.__retried(self.__executePrepared, name, query, params, printSchema, columnar)
+
+    def __executePrepared(self, name, query, params, printSchema, columnar):
+        with Instrumentation.probe("prepared", name) as probe:
+            prepare = self.connection.prepared.get(name) != query
+            if prepare:
+                with _translateErrors():
+                    self.__flush()
+                    if name in self.connection.prepared:
+                        self.cursor.execute(sql.SQL("DEALLOCATE {name}").format(name=sql.Identifier(name)))
+                        del self.connection.prepared[name]
+                    self.cursor.execute(sql.SQL("PREPARE {name} AS ").format(name=sql.Identifier(name)) +
+                                        sql.SQL(query))
+                # prepared statements outlive the transaction, even if it is rolled back
+                self.connection.prepared[name] = query
+            prepared_statistics.record(prepare)
+
+            statement = sql.SQL("EXECUTE {name}").format(name=sql.Identifier(name))
+            if len(params) > 0:
+                statement += sql.SQL("({values})").format(
+                    values=sql.SQL(", ").join(sql.Placeholder() * len(params)))
+            if PlanCapture.enabled:
+                self.__explain(name, statement, params)
+            with _translateErrors():
+                self.cursor.execute(self.__prefixed(statement), params)
+                row_effected = max(self.cursor.rowcount, 0)
+            probe.lap('execute')
+
+            entries = self.__fetchEntries(columnar, probe)
+            probe.finish(sent=self.cursor.query, result=entries)
+
+        if printSchema:
+            print(entries)
+
+        return row_effected, entries
+
+    # runs independent operations, each a list of (name, query, params) prepared statements committed on its own,
+    # as if every operation ran executePrepared for its statements and then commit (or rollback on failure).
+    # with libpq pipeline mode the statements are sent without waiting for the results of the ones before
+    # (see Utility.Pipeline), otherwise, or inside a Session or an open transaction, they run one by one.
+    # returns, per operation and in order, a list of (rows effected, ResultSet) per statement or the
+    # exception raised by the statement that failed
+    def executePipelined(self, operations: List[List[Tuple[str, str, tuple]]]) -> list:
+        if self.connection is None:
+            raise DatabaseException.ConnectionInvalid("Connection Invalid")
+        operations = list(operations)
+        # PlanCapture runs every statement once more under EXPLAIN, which executePrepared does
+        if self.__session is not None or PlanCapture.enabled or not _pipelineSupported() or \
+                self.connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+            return [self.__runOperation(operation) for operation in operations]
+
+        for operation in operations:
+            for name, query, _ in operation:
+                prepared_statistics.record(self.connection.prepared.get(name) != query)
+        start = time.perf_counter()
+        try:
+            outcomes = Pipeline.run(self.connection, operations, ResultSet, self.cursor)
+        except DatabaseException.ConnectionInvalid:
+            raise
+        except Exception as e:
+            raise DatabaseException.ConnectionInvalid(str(e))
+        if Instrumentation.enabled:
+            _recordPipelined(operations, outcomes, time.perf_counter() - start)
+        return outcomes
+
+    # runs the statement, once more on another pooled connection when the connection turns out to be lost
+    # (e.g. its backend was terminated while it was idle in the pool) before anything ran in the transaction.
+    # inside a Session or an open transaction the error is raised, what ran before would be lost
+    def __retried(self, run, *args):
+        fresh = self.__session is None and \
+            self.connection.get_transaction_status() == extensions.TRANSACTION_STATUS_IDLE
+        try:
+            return run(*args)
+        except psycopg2.OperationalError:
+            if not fresh or not self.connection.closed:
+                raise
+        self.__pool.putconn(self.connection, discard=True)
+        self.cursor = None
+        self.connection = None
+        try:
+            self.connection = self.__pool.getconn()
+            self.cursor = self.connection.cursor()
+        except Exception:
+            if self.connection is not None:
+                self.__pool.putconn(self.connection, discard=True)
+            self.connection = None
+            raise DatabaseException.ConnectionInvalid("Could not connect to database")
+        return run(*args)
+
+    def __runOperation(self, operation: list):
+        try:
+            results = [self.executePrepared(name, query, params) for name, query, params in operation]
+            self.commit()
+            return results
+        except DatabaseException.ConnectionInvalid:
+            raise
+        except Exception as e:
+            self.rollback()
+            return e
+
+    # runs the statement of a Solution function once under EXPLAIN ANALYZE for PlanCapture,
+    # inside a savepoint that is rolled back so its writes are not applied twice
+    def __explain(self, name: str, statement: sql.Composed, params):
+        function = Instrumentation.callerName()
+        if function is None or function.split(".")[0] not in Instrumentation.CALLER_MODULES:
+            return
+        try:
+            self.cursor.execute(self.__prefixed("SAVEPOINT plan_capture"))
+        except psycopg2.Error:
+            # an aborted transaction, the statement reports the error
+            return
+        try:
+            self.cursor.execute(sql.SQL("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) ") + statement, params)
+            plan = self.cursor.fetchone()[0]
+            PlanCapture.record(function, name, params, (json.loads(plan) if isinstance(plan, str) else plan)[0])
+        except psycopg2.Error:
+            # the statement fails again when it runs, the error is reported there
+            pass
+        finally:
+            self.cursor.execute("ROLLBACK TO SAVEPOINT plan_capture")
+            self.cursor.execute("RELEASE SAVEPOINT plan_capture")
+
+    # query preceded by the savepoints of the Session not sent yet
+    def __prefixed(self, query: Union[str, sql.Composable]) -> Union[str, sql.Composable]:
+        if self.__session is None:
+            return query
+        pending = self.__session.takePending()
+        if not pending:
+            return query
+        return sql.SQL(pending) + query if isinstance(query, sql.Composable) else pending + query
+
+    # sends the savepoints of the Session not sent yet, before a statement they cannot be prepended to
+    def __flush(self):
+        if self.__session is not None:
+            pending = self.__session.takePending()
+            if pending:
+                self.cursor.execute(pending)
+
+    def __fetchEntries(self, columnar: bool, probe):
+        if self.cursor.description is None:
+            return ColumnarResultSet() if columnar else ResultSet()
+        if columnar:
+            # read and built batch by batch, timed as one phase
+            entries = ColumnarResultSet.fromCursor(self.cursor)
+            probe.lap('fetch')
+            return entries
+        rows = self.cursor.fetchall()
+        probe.lap('fetch')
+        entries = ResultSet(self.cursor.description, rows)
+        probe.lap('build')
+        return entries
+
+    # runs a SELECT on a named server-side cursor and yields its rows, reading batch_size rows per round trip,
+    # so memory stays bounded whatever the size of the table. with chunks=True every batch is yielded
+    # as a ResultSet (a ColumnarResultSet with columnar=True) instead of row by row.
+    # the rows must be consumed before the connection is committed, rolled back or closed
+    def iterate(self, query: Union[str, sql.Composed], params=None, batch_size=1000, chunks=False, columnar=False):
+        if self.connection is None:
+            raise DatabaseException.ConnectionInvalid("Connection Invalid")
+
+        with _translateErrors():
+            self.__flush()
+        # close may hand the connection back (to the pool or the session) before the rows are all read
+        connection = self.connection
+        cursor = connection.cursor(name="iterate_" + str(next(_cursor_names)))
+        cursor.itersize = batch_size
+        try:
+            with _translateErrors():
+                cursor.execute(query, params)
+            while True:
+                with _translateErrors():
+                    batch = cursor.fetchmany(batch_size)
+                if len(batch) == 0:
+                    break
+                if not chunks:
+                    yield from batch
+                elif columnar:
+                    yield ColumnarResultSet(cursor.description, [batch])
+                else:
+                    yield ResultSet(cursor.description, batch)
+        finally:
+            # once handed back, ending its transaction closed the cursor, the connection may be in other use
+            if self.connection is connection and not connection.closed:
+                cursor.close()
+
+    # streams rows into table using COPY FROM STDIN, rows are tuples ordered like columns
+    # returns the number of rows copied
+    def copy(self, table: str, columns: List[str], rows: Iterable[tuple]) -> int:
+        if self.connection is None:
+            raise DatabaseException.ConnectionInvalid("Connection Invalid")
+        query = sql.SQL("COPY {table} ({columns}) FROM STDIN").format(
+            table=sql.Identifier(table),
+            columns=sql.SQL(", ").join(sql.Identifier(column) for column in columns))
+        stream = _CopyStream(rows)
+        with Instrumentation.probe("copy", "copy " + table) as probe:
+            with _translateErrors():
+                self.__flush()
+                self.cursor.copy_expert(query, stream)
+                row_count = max(self.cursor.rowcount, 0)
+            probe.lap('execute')
+            probe.finish(rows=row_count, bytes_sent=stream.sent)
+        return row_count
+
+    # same as copy, but sends multi-row INSERT ... VALUES statements of page_size rows each
+    def insertValues(self, table: str, columns: List[str], rows: Iterable[tuple], page_size=1000) -> int:
+        if self.connection is None:
+            raise DatabaseException.ConnectionInvalid("Connection Invalid")
+        query = sql.SQL("INSERT INTO {table} ({columns}) VALUES %s").format(
+            table=sql.Identifier(table),
+            columns=sql.SQL(", ").join(sql.Identifier(column) for column in columns))
+        row_count = 0
+        sent = 0
+        with Instrumentation.probe("execute", "insert " + table) as probe:
+            with _translateErrors():
+                self.__flush()
+                iterator = iter(rows)
+                while True:
+                    page = [row for _, row in zip(range(page_size), iterator)]
+                    if not page:
+                        break
+                    extras.execute_values(self.cursor, query.as_string(self.connection), page, page_size=page_size)
+                    row_count += len(page)
+                    sent += len(self.cursor.query)
+            probe.lap('execute')
+            probe.finish(rows=row_count, bytes_sent=sent)
+        return row_count
+
     # grant credentials
     @staticmethod
     def __config(filename=os.path.join(os.path.join(os.getcwd(), "Utility"), 'database.ini'),
@@ -154,3 +960,7 @@ class DBConnector:
             if db is None:
                 raise DatabaseException.database_ini_ERROR("Please modify database.ini file under Utility")
         return db
+
+
+if os.environ.get(SCHEMA_ENV):
+    configureConnection(schema=os.environ[SCHEMA_ENV])
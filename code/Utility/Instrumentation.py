@@ -0,0 +1,327 @@
+import bisect
+import json
+import sys
+import threading
+import time
+from typing import Callable, Optional
+
+# default settings of the query instrumentation, override them with configureInstrumentation
+INSTRUMENTATION_DEFAULTS = {
+    'enabled': False,
+    'slow_query_ms': 100.0,  # statements taking at least this long are also passed to the slow query hooks
+}
+
+# the modules whose functions name the caller of a statement, the outermost one on the stack wins
+CALLER_MODULES = ('Solution', 'AsyncSolution')
+
+# the phases a statement is timed in, in seconds
+PHASES = ('connect', 'execute', 'fetch', 'build')
+
+# upper bounds of the histogram buckets, in milliseconds. the last bucket has no upper bound
+BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0,
+              5000.0, 10000.0)
+
+# read by the connectors before anything is measured, set by configureInstrumentation
+enabled = INSTRUMENTATION_DEFAULTS['enabled']
+slow_query_ms = INSTRUMENTATION_DEFAULTS['slow_query_ms']
+
+_hooks = []  # (hook, slow_only)
+_hooks_lock = threading.Lock()
+
+
+# one statement (or the checkout of a connection) as seen by a connector.
+# bytes_sent is the size of the statement text and its parameters, bytes_received the size of the
+# returned values in text form: the driver does not report what went over the socket
+class QueryEvent:
+    __slots__ = ('kind', 'function', 'statement', 'connect', 'execute', 'fetch', 'build', 'rows',
+                 'bytes_sent', 'bytes_received', 'error')
+
+    def __init__(self, kind: str, function: str, statement: Optional[str]):
+        self.kind = kind
+        self.function = function
+        self.statement = statement
+        self.connect = self.execute = self.fetch = self.build = 0.0
+        self.rows = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.error = None
+
+    # seconds spent in every phase
+    def total(self) -> float:
+        return self.connect + self.execute + self.fetch + self.build
+
+    def isSlow(self) -> bool:
+        return self.total() * 1000 >= slow_query_ms
+
+    def asDict(self) -> dict:
+        return {name: getattr(self, name) for name in QueryEvent.__slots__}
+
+    def __str__(self):
+        text = "{:.3f}ms".format(self.total() * 1000) + " " + self.kind + " " + str(self.function) + " " + \
+            str(self.statement) + " rows=" + str(self.rows) + " sent=" + str(self.bytes_sent) + \
+            " received=" + str(self.bytes_received) + "".join(
+                " " + phase + "={:.3f}ms".format(getattr(self, phase) * 1000) for phase in PHASES)
+        if self.error is not None:
+            text += " error=" + self.error
+        return text
+
+
+# a latency histogram over BUCKETS_MS
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def add(self, milliseconds: float):
+        self.counts[bisect.bisect_left(BUCKETS_MS, milliseconds)] += 1
+        self.count += 1
+        self.sum += milliseconds
+        self.max = max(self.max, milliseconds)
+
+    # the upper bound of the bucket holding the given fraction of the values, max for the last bucket
+    def percentile(self, fraction: float) -> float:
+        if self.count == 0:
+            return 0.0
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.counts):
+            seen += count
+            if seen >= fraction * self.count:
+                return min(bound, self.max)
+        return self.max
+
+    def asDict(self) -> dict:
+        return {'count': self.count, 'sum_ms': self.sum, 'max_ms': self.max,
+                'p50_ms': self.percentile(0.5), 'p99_ms': self.percentile(0.99),
+                'buckets': {("+inf" if index == len(BUCKETS_MS) else str(BUCKETS_MS[index])): count
+                            for index, count in enumerate(self.counts) if count > 0}}
+
+
+# counters and per phase histograms of every (function, statement) seen while enabled
+class Metrics:
+    def __init__(self):
+        self.__entries = {}
+        self.__lock = threading.Lock()
+
+    def __call__(self, event: QueryEvent):
+        key = (event.function, event.statement or event.kind)
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                entry = self.__entries[key] = {'calls': 0, 'errors': 0, 'slow': 0, 'rows': 0, 'bytes_sent': 0,
+                                               'bytes_received': 0, 'total': Histogram(),
+                                               **{phase: Histogram() for phase in PHASES}}
+            entry['calls'] += 1
+            entry['errors'] += event.error is not None
+            entry['slow'] += event.isSlow()
+            entry['rows'] += event.rows
+            entry['bytes_sent'] += event.bytes_sent
+            entry['bytes_received'] += event.bytes_received
+            entry['total'].add(event.total() * 1000)
+            for phase in PHASES:
+                seconds = getattr(event, phase)
+                if seconds > 0:
+                    entry[phase].add(seconds * 1000)
+
+    # {"function statement": {counters..., phase: histogram}}, the histograms as dictionaries
+    def snapshot(self) -> dict:
+        with self.__lock:
+            return {str(function) + " " + str(statement): {
+                name: value.asDict() if isinstance(value, Histogram) else value for name, value in entry.items()}
+                for (function, statement), entry in sorted(self.__entries.items(), key=lambda item: str(item[0]))}
+
+    def reset(self):
+        with self.__lock:
+            self.__entries.clear()
+
+    def writeJson(self, path: str):
+        with open(path, "w") as file:
+            json.dump(self.snapshot(), file, indent=2)
+
+    # one line per (function, statement), slowest total first
+    def writeText(self, stream=sys.stdout):
+        snapshot = self.snapshot()
+        for key in sorted(snapshot, key=lambda key: -snapshot[key]['total']['sum_ms']):
+            entry = snapshot[key]
+            stream.write(key + ": calls=" + str(entry['calls']) + " errors=" + str(entry['errors']) +
+                         " slow=" + str(entry['slow']) + " rows=" + str(entry['rows']) +
+                         " sent=" + str(entry['bytes_sent']) + " received=" + str(entry['bytes_received']) +
+                         " total={:.3f}ms p50={:.3f}ms p99={:.3f}ms".format(
+                             entry['total']['sum_ms'], entry['total']['p50_ms'], entry['total']['p99_ms']) +
+                         "".join(" " + phase + "={:.3f}ms".format(entry[phase]['sum_ms']) for phase in PHASES) +
+                         "\n")
+
+
+# appends every event it gets to a file, as a JSON object per line
+class JsonLinesSink:
+    def __init__(self, path: str):
+        self.path = path
+        self.__lock = threading.Lock()
+
+    def __call__(self, event: QueryEvent):
+        line = json.dumps(event.asDict()) + "\n"
+        with self.__lock:
+            with open(self.path, "a") as file:
+                file.write(line)
+
+
+# writes every event it gets to a stream as a line of text, stderr by default
+class TextSink:
+    def __init__(self, stream=None):
+        self.stream = stream
+        self.__lock = threading.Lock()
+
+    def __call__(self, event: QueryEvent):
+        with self.__lock:
+            (self.stream or sys.stderr).write(str(event) + "\n")
+
+
+# the in-process metrics, fed while instrumentation is enabled
+metrics = Metrics()
+
+
+# call hook with every QueryEvent, or only with the slow ones. hooks run on the thread of the statement
+def addHook(hook: Callable[[QueryEvent], None], slow_only=False):
+    with _hooks_lock:
+        _hooks.append((hook, slow_only))
+
+
+def removeHook(hook: Callable[[QueryEvent], None]):
+    with _hooks_lock:
+        _hooks[:] = [(other, slow_only) for other, slow_only in _hooks if other is not hook]
+
+
+# change the instrumentation settings, e.g. configureInstrumentation(enabled=True, slow_query_ms=50)
+def configureInstrumentation(**settings):
+    global enabled, slow_query_ms
+    unknown = set(settings) - set(INSTRUMENTATION_DEFAULTS)
+    if unknown:
+        raise ValueError("Unknown instrumentation settings: " + ", ".join(sorted(unknown)))
+    enabled = settings.get('enabled', enabled)
+    slow_query_ms = float(settings.get('slow_query_ms', slow_query_ms))
+
+
+# the Solution (or AsyncSolution) function called to run the statement, or the first function outside
+# the connectors
+def callerName() -> Optional[str]:
+    frame = sys._getframe(1)
+    caller = first = None
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if module in CALLER_MODULES:
+            caller = module + "." + frame.f_code.co_name
+        elif first is None and not module.startswith('Utility.'):
+            first = module + "." + frame.f_code.co_name
+        frame = frame.f_back
+    return caller or first
+
+
+# the size of the values of rows in text form
+def textSize(rows) -> int:
+    return sum(len(str(value)) for row in rows for value in row if value is not None)
+
+
+# times the phases of one statement, the connectors call lap after every phase and finish at the end
+class Probe:
+    __slots__ = ('event', '__last')
+
+    def __init__(self, kind: str, statement: Optional[str]):
+        self.event = QueryEvent(kind, callerName(), statement)
+        self.__last = time.perf_counter()
+
+    def __enter__(self):
+        return self
+
+    # adds the time since the previous lap to phase
+    def lap(self, phase: str):
+        now = time.perf_counter()
+        setattr(self.event, phase, getattr(self.event, phase) + now - self.__last)
+        self.__last = now
+
+    # sent is the statement text sent, result the ResultSet built, the counters are derived from them
+    def finish(self, sent=None, result=None, rows=0, bytes_sent=0):
+        if sent is not None:
+            bytes_sent = len(sent)
+            if self.event.statement is None:
+                self.event.statement = label(sent)
+        if result is not None:
+            rows = result.size()
+            self.event.bytes_received = textSize(result.rows)
+        self.event.rows = rows
+        self.event.bytes_sent = bytes_sent
+
+    def __exit__(self, kind, error, traceback):
+        if error is not None:
+            self.lap('execute')
+            self.event.error = type(error).__name__
+        _emit(self.event)
+        return False
+
+
+# stands in for Probe while instrumentation is disabled
+class _NullProbe:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def lap(self, phase: str):
+        pass
+
+    def finish(self, sent=None, result=None, rows=0, bytes_sent=0):
+        pass
+
+    def __exit__(self, kind, error, traceback):
+        return False
+
+
+_null_probe = _NullProbe()
+
+
+# the probe timing one statement, use as a context manager around it. kind is "connect", "execute",
+# "prepared" or "copy" ("pipelined" statements are reported with record), statement the prepared statement
+# name (None to label it from the text sent)
+def probe(kind: str, statement: Optional[str] = None):
+    if not enabled:
+        return _null_probe
+    return Probe(kind, statement)
+
+
+# reports a statement its connector timed itself, the probes time one statement at a time. seconds is its
+# execute phase
+def record(kind: str, statement: str, seconds: float, rows: int = 0, bytes_sent: int = 0,
+           bytes_received: int = 0, error: Optional[Exception] = None):
+    if not enabled:
+        return
+    event = QueryEvent(kind, callerName(), statement)
+    event.execute = seconds
+    event.rows = rows
+    event.bytes_sent = bytes_sent
+    event.bytes_received = bytes_received
+    if error is not None:
+        event.error = type(error).__name__
+    _emit(event)
+
+
+# a short label for a statement text: its first 80 characters, whitespace collapsed
+def label(query) -> str:
+    if isinstance(query, bytes):
+        query = query.decode(errors='replace')
+    return " ".join(str(query).split())[:80]
+
+
+def _emit(event: QueryEvent):
+    metrics(event)
+    slow = None
+    for hook, slow_only in list(_hooks):
+        if slow_only:
+            if slow is None:
+                slow = event.isSlow()
+            if not slow:
+                continue
+        try:
+            hook(event)
+        except Exception as e:
+            # instrumentation never fails a statement
+            print(e)
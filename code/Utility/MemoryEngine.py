@@ -0,0 +1,340 @@
+# The tables of Queries.CREATE_TABLES held in memory, with the indexes MemorySolution reads instead of scanning.
+# writes check the constraints of the tables in the order PostgreSQL does (NOT NULL, CHECK, UNIQUE, then FOREIGN
+# KEY) and raise the same DatabaseException, deletes cascade like ON DELETE CASCADE.
+# every write runs in a transaction (see MemoryEngine.transaction) and records how to undo it, so a call that
+# fails halfway leaves nothing behind, like a rolled back statement
+import bisect
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from Utility.Exceptions import DatabaseException
+
+
+# the rows of every table and the indexes kept next to them, replaced as a whole by createTables and clearTables
+class Tables:
+    def __init__(self):
+        self.photos = {}  # photo_id -> (photo_id, description, size)
+        self.disks = {}  # disk_id -> (disk_id, company, speed, free_space, cost)
+        self.rams = {}  # ram_id -> (ram_id, size, company)
+        self.photo_ids = []  # sorted
+        self.photo_sizes = []  # sorted, a size per photo
+        self.descriptions = {}  # description -> photo IDs
+        # StoredOn and PartOf, from both ends
+        self.photo_disks = {}  # photo_id -> disk IDs
+        self.disk_photos = {}  # disk_id -> photo IDs
+        self.ram_disks = {}  # ram_id -> disk IDs
+        self.disk_rams = {}  # disk_id -> RAM IDs
+        # running sums per disk, like DiskStats
+        self.photo_bytes = {}  # disk_id -> size of its photos
+        self.ram_total = {}  # disk_id -> size of its RAMs
+        self.ram_companies = {}  # disk_id -> Counter of the companies of its RAMs
+        self.shared_photos = {}  # disk_id -> number of its photos also stored on another disk
+
+    # the sums of a disk computed from StoredOn and PartOf, (photo_bytes, ram_total, ram_companies, shared_photos)
+    def diskStats(self, disk_id: int) -> tuple:
+        photos = self.disk_photos[disk_id]
+        rams = self.disk_rams[disk_id]
+        return (sum(self.photos[photo_id][2] for photo_id in photos),
+                sum(self.rams[ram_id][1] for ram_id in rams),
+                Counter(self.rams[ram_id][2] for ram_id in rams),
+                sum(1 for photo_id in photos if len(self.photo_disks[photo_id]) > 1))
+
+
+def _notNull(table: str, *values):
+    if any(value is None for value in values):
+        raise DatabaseException.NOT_NULL_VIOLATION('null value in a column of "' + table + '"')
+
+
+def _check(table: str, holds: bool):
+    if not holds:
+        raise DatabaseException.CHECK_VIOLATION('new row for relation "' + table + '" violates a check constraint')
+
+
+def _unique(table: str, exists: bool):
+    if exists:
+        raise DatabaseException.UNIQUE_VIOLATION('duplicate key value violates unique constraint on "' + table + '"')
+
+
+def _foreignKey(table: str, exists: bool):
+    if not exists:
+        raise DatabaseException.FOREIGN_KEY_VIOLATION('insert on "' + table + '" violates foreign key constraint')
+
+
+def _noTables() -> Exception:
+    return DatabaseException.UNKNOWN_ERROR('relation "photos" does not exist')
+
+
+def _remove(values: list, value):
+    del values[bisect.bisect_left(values, value)]
+
+
+class MemoryEngine:
+    def __init__(self):
+        self.__tables = None
+        self.lock = threading.RLock()
+        self.__undo = None  # (function, arguments) undoing every write of the open transaction
+        self.__depth = 0
+
+    # the tables, raises like a statement on a table that does not exist when there are none
+    @property
+    def tables(self) -> Tables:
+        if self.__tables is None:
+            raise _noTables()
+        return self.__tables
+
+    # opens a transaction on this thread, or a savepoint in the transaction the thread already has open.
+    # other threads wait until it ends. returns the savepoint to give to end
+    def begin(self) -> int:
+        self.lock.acquire()
+        if self.__undo is None:
+            self.__undo = []
+        self.__depth += 1
+        return len(self.__undo)
+
+    # ends what begin opened, with rollback its writes are undone
+    def end(self, savepoint: int, rollback=False):
+        try:
+            if rollback:
+                self.rollbackTo(savepoint)
+        finally:
+            self.__depth -= 1
+            if self.__depth == 0:
+                self.__undo = None
+            self.lock.release()
+
+    # the writes made since begin returned savepoint are undone, the latest first
+    def rollbackTo(self, savepoint: int):
+        undo = self.__undo
+        self.__undo = None
+        try:
+            while len(undo) > savepoint:
+                function, arguments = undo.pop()
+                function(*arguments)
+        finally:
+            self.__undo = undo
+
+    # keeps every write made so far, the transaction goes on
+    def commit(self):
+        self.__undo.clear()
+
+    # a transaction (or savepoint) committed when the block ends, rolled back if it raises
+    @contextmanager
+    def transaction(self):
+        savepoint = self.begin()
+        failed = True
+        try:
+            yield self
+            failed = False
+        finally:
+            self.end(savepoint, rollback=failed)
+
+    def __log(self, function, *arguments):
+        if self.__undo is not None:
+            self.__undo.append((function, arguments))
+
+    def __setTables(self, tables):
+        self.__log(self.__setTables, self.__tables)
+        self.__tables = tables
+
+    def createTables(self):
+        if self.__tables is not None:
+            raise DatabaseException.UNKNOWN_ERROR('relation "photos" already exists')
+        self.__setTables(Tables())
+
+    def clearTables(self):
+        if self.__tables is None:
+            raise _noTables()
+        self.__setTables(Tables())
+
+    def dropTables(self):
+        self.__setTables(None)
+
+    def insertPhoto(self, photo_id, description, size):
+        tables = self.tables
+        _notNull("photos", photo_id, description, size)
+        _check("photos", photo_id > 0 and size >= 0)
+        _unique("photos", photo_id in tables.photos)
+        self.__addPhoto((photo_id, description, size))
+
+    def __addPhoto(self, row: tuple):
+        tables = self.tables
+        tables.photos[row[0]] = row
+        bisect.insort(tables.photo_ids, row[0])
+        bisect.insort(tables.photo_sizes, row[2])
+        tables.descriptions.setdefault(row[1], set()).add(row[0])
+        tables.photo_disks[row[0]] = set()
+        self.__log(self.__removePhoto, row[0])
+
+    # deletes the photo and its StoredOn rows, returns False if there is no such photo
+    def deletePhoto(self, photo_id) -> bool:
+        tables = self.tables
+        if photo_id not in tables.photos:
+            return False
+        for disk_id in sorted(tables.photo_disks[photo_id]):
+            self.deleteStoredOn(photo_id, disk_id)
+        self.__removePhoto(photo_id)
+        return True
+
+    def __removePhoto(self, photo_id):
+        tables = self.tables
+        row = tables.photos.pop(photo_id)
+        _remove(tables.photo_ids, photo_id)
+        _remove(tables.photo_sizes, row[2])
+        described = tables.descriptions[row[1]]
+        described.discard(photo_id)
+        if not described:
+            del tables.descriptions[row[1]]
+        del tables.photo_disks[photo_id]
+        self.__log(self.__addPhoto, row)
+
+    def insertDisk(self, disk_id, company, speed, free_space, cost):
+        tables = self.tables
+        _notNull("disks", disk_id, company, speed, free_space, cost)
+        _check("disks", disk_id > 0 and speed > 0 and free_space >= 0 and cost > 0)
+        _unique("disks", disk_id in tables.disks)
+        self.__addDisk((disk_id, company, speed, free_space, cost))
+
+    def __addDisk(self, row: tuple):
+        tables = self.tables
+        disk_id = row[0]
+        tables.disks[disk_id] = row
+        tables.disk_photos[disk_id] = set()
+        tables.disk_rams[disk_id] = set()
+        tables.photo_bytes[disk_id] = 0
+        tables.ram_total[disk_id] = 0
+        tables.ram_companies[disk_id] = Counter()
+        tables.shared_photos[disk_id] = 0
+        self.__log(self.__removeDisk, disk_id)
+
+    # deletes the disk with its StoredOn and PartOf rows, returns False if there is no such disk
+    def deleteDisk(self, disk_id) -> bool:
+        tables = self.tables
+        if disk_id not in tables.disks:
+            return False
+        for photo_id in sorted(tables.disk_photos[disk_id]):
+            self.deleteStoredOn(photo_id, disk_id)
+        for ram_id in sorted(tables.disk_rams[disk_id]):
+            self.deletePartOf(ram_id, disk_id)
+        self.__removeDisk(disk_id)
+        return True
+
+    def __removeDisk(self, disk_id):
+        tables = self.tables
+        row = tables.disks.pop(disk_id)
+        for index in (tables.disk_photos, tables.disk_rams, tables.photo_bytes, tables.ram_total,
+                      tables.ram_companies, tables.shared_photos):
+            del index[disk_id]
+        self.__log(self.__addDisk, row)
+
+    # the free space of an existing disk
+    def setFreeSpace(self, disk_id, free_space):
+        tables = self.tables
+        _notNull("disks", free_space)
+        _check("disks", free_space >= 0)
+        row = tables.disks[disk_id]
+        tables.disks[disk_id] = row[:3] + (free_space,) + row[4:]
+        self.__log(self.setFreeSpace, disk_id, row[3])
+
+    def insertRAM(self, ram_id, size, company):
+        tables = self.tables
+        _notNull("rams", ram_id, size, company)
+        _check("rams", ram_id > 0 and size > 0)
+        _unique("rams", ram_id in tables.rams)
+        self.__addRAM((ram_id, size, company))
+
+    def __addRAM(self, row: tuple):
+        tables = self.tables
+        tables.rams[row[0]] = row
+        tables.ram_disks[row[0]] = set()
+        self.__log(self.__removeRAM, row[0])
+
+    # deletes the RAM and its PartOf rows, returns False if there is no such RAM
+    def deleteRAM(self, ram_id) -> bool:
+        tables = self.tables
+        if ram_id not in tables.rams:
+            return False
+        for disk_id in sorted(tables.ram_disks[ram_id]):
+            self.deletePartOf(ram_id, disk_id)
+        self.__removeRAM(ram_id)
+        return True
+
+    def __removeRAM(self, ram_id):
+        tables = self.tables
+        row = tables.rams.pop(ram_id)
+        del tables.ram_disks[ram_id]
+        self.__log(self.__addRAM, row)
+
+    def insertStoredOn(self, photo_id, disk_id):
+        tables = self.tables
+        _notNull("storedon", photo_id, disk_id)
+        _unique("storedon", disk_id in tables.photo_disks.get(photo_id, ()))
+        _foreignKey("storedon", photo_id in tables.photos and disk_id in tables.disks)
+        disks = tables.photo_disks[photo_id]
+        # the photo was on one other disk, that disk now shares it
+        if len(disks) == 1:
+            tables.shared_photos[next(iter(disks))] += 1
+        if disks:
+            tables.shared_photos[disk_id] += 1
+        disks.add(disk_id)
+        tables.disk_photos[disk_id].add(photo_id)
+        tables.photo_bytes[disk_id] += tables.photos[photo_id][2]
+        self.__log(self.deleteStoredOn, photo_id, disk_id)
+
+    # returns False if the photo is not stored on the disk
+    def deleteStoredOn(self, photo_id, disk_id) -> bool:
+        tables = self.tables
+        disks = tables.photo_disks.get(photo_id)
+        if disks is None or disk_id not in disks:
+            return False
+        disks.discard(disk_id)
+        tables.disk_photos[disk_id].discard(photo_id)
+        tables.photo_bytes[disk_id] -= tables.photos[photo_id][2]
+        if disks:
+            tables.shared_photos[disk_id] -= 1
+        if len(disks) == 1:
+            tables.shared_photos[next(iter(disks))] -= 1
+        self.__log(self.insertStoredOn, photo_id, disk_id)
+        return True
+
+    def insertPartOf(self, ram_id, disk_id):
+        tables = self.tables
+        _notNull("partof", ram_id, disk_id)
+        _unique("partof", disk_id in tables.ram_disks.get(ram_id, ()))
+        _foreignKey("partof", ram_id in tables.rams and disk_id in tables.disks)
+        _, size, company = tables.rams[ram_id]
+        tables.ram_disks[ram_id].add(disk_id)
+        tables.disk_rams[disk_id].add(ram_id)
+        tables.ram_total[disk_id] += size
+        tables.ram_companies[disk_id][company] += 1
+        self.__log(self.deletePartOf, ram_id, disk_id)
+
+    # returns False if the RAM is not part of the disk
+    def deletePartOf(self, ram_id, disk_id) -> bool:
+        tables = self.tables
+        disks = tables.ram_disks.get(ram_id)
+        if disks is None or disk_id not in disks:
+            return False
+        _, size, company = tables.rams[ram_id]
+        disks.discard(disk_id)
+        tables.disk_rams[disk_id].discard(ram_id)
+        tables.ram_total[disk_id] -= size
+        companies = tables.ram_companies[disk_id]
+        companies[company] -= 1
+        if companies[company] == 0:
+            del companies[company]
+        self.__log(self.insertPartOf, ram_id, disk_id)
+        return True
+
+    # the disks whose running sums do not match StoredOn and PartOf, with rebuild=True they are recomputed
+    def checkDiskStats(self, rebuild=False) -> list:
+        tables = self.tables
+        wrong = []
+        for disk_id in sorted(tables.disks):
+            stats = tables.diskStats(disk_id)
+            if stats != (tables.photo_bytes[disk_id], tables.ram_total[disk_id], tables.ram_companies[disk_id],
+                         tables.shared_photos[disk_id]):
+                wrong.append(disk_id)
+                if rebuild:
+                    (tables.photo_bytes[disk_id], tables.ram_total[disk_id], tables.ram_companies[disk_id],
+                     tables.shared_photos[disk_id]) = stats
+        return wrong
@@ -0,0 +1,299 @@
+import collections
+import ctypes
+import ctypes.util
+import os
+import sys
+import threading
+from typing import Optional
+from psycopg2 import extensions
+from Utility.Exceptions import DatabaseException
+
+# pipeline mode is driven through libpq itself, on the connection.pgconn_ptr of psycopg2 (2.8 or newer): the libpq
+# psycopg2 is linked with (extensions.libpq_version()) must be 14 or newer, and it is only found on Linux,
+# where /proc/self/maps names the copy psycopg2 loaded. otherwise unsupportedReason() says why and
+# DBConnector.executePipelined runs the statements one by one
+
+# operations sent before their results are read. every operation ends with a sync point, its results are
+# small, so a batch fits in the socket buffers and neither side blocks on a full one
+BATCH_SIZE = 256
+
+# the column of a ResultSet built from a libpq result
+_Attribute = collections.namedtuple('_Attribute', ['name'])
+
+# ExecStatusType values of libpq-fe.h
+_COMMAND_OK = 1
+_TUPLES_OK = 2
+_PIPELINE_SYNC = 10
+_PIPELINE_ABORTED = 11
+
+_PG_DIAG_SQLSTATE = ord('C')
+
+_ERRORS = {
+    "23502": DatabaseException.NOT_NULL_VIOLATION,
+    "23503": DatabaseException.FOREIGN_KEY_VIOLATION,
+    "23505": DatabaseException.UNIQUE_VIOLATION,
+    "23514": DatabaseException.CHECK_VIOLATION,
+}
+
+_libpq = None
+_libpq_loaded = False
+_unsupported = None
+_libpq_lock = threading.Lock()
+
+
+# the libpq psycopg2 is linked with, None unless it has pipeline mode (libpq 14 or later)
+def _loadLibpq():
+    global _libpq, _libpq_loaded, _unsupported
+    with _libpq_lock:
+        if _libpq_loaded:
+            return _libpq
+        _libpq_loaded = True
+        if extensions.libpq_version() < 140000:
+            _unsupported = "psycopg2 is linked with libpq " + str(extensions.libpq_version()) + \
+                           ", pipeline mode needs libpq 14 or newer"
+            return None
+        if not sys.platform.startswith("linux"):
+            # any other libpq found would not be the one holding the connections of psycopg2
+            _unsupported = "the libpq of psycopg2 can only be located on Linux, not on " + sys.platform
+            return None
+        path = None
+        try:
+            # the copy loaded by psycopg2, the wheels ship their own
+            with open("/proc/self/maps") as maps:
+                for line in maps:
+                    if os.path.basename(line.split()[-1]).startswith("libpq"):
+                        path = line.split()[-1]
+                        break
+        except OSError:
+            pass
+        try:
+            libpq = ctypes.CDLL(path or ctypes.util.find_library("pq"))
+        except (OSError, TypeError):
+            _unsupported = "the libpq of psycopg2 could not be loaded"
+            return None
+        if libpq.PQlibVersion() != extensions.libpq_version():
+            _unsupported = "the libpq found is not the one psycopg2 is linked with"
+            return None
+
+        PGconn, PGresult = ctypes.c_void_p, ctypes.c_void_p
+        strings = ctypes.POINTER(ctypes.c_char_p)
+        for name, result, arguments in (
+                ("PQenterPipelineMode", ctypes.c_int, [PGconn]),
+                ("PQexitPipelineMode", ctypes.c_int, [PGconn]),
+                ("PQpipelineSync", ctypes.c_int, [PGconn]),
+                ("PQsendPrepare", ctypes.c_int, [PGconn, ctypes.c_char_p, ctypes.c_char_p, ctypes.c_int,
+                                                 ctypes.c_void_p]),
+                ("PQsendQueryPrepared", ctypes.c_int, [PGconn, ctypes.c_char_p, ctypes.c_int, strings,
+                                                       ctypes.c_void_p, ctypes.c_void_p, ctypes.c_int]),
+                ("PQsendQueryParams", ctypes.c_int, [PGconn, ctypes.c_char_p, ctypes.c_int, ctypes.c_void_p,
+                                                     ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p,
+                                                     ctypes.c_int]),
+                ("PQgetResult", PGresult, [PGconn]),
+                ("PQresultStatus", ctypes.c_int, [PGresult]),
+                ("PQclear", None, [PGresult]),
+                ("PQntuples", ctypes.c_int, [PGresult]),
+                ("PQnfields", ctypes.c_int, [PGresult]),
+                ("PQfname", ctypes.c_char_p, [PGresult, ctypes.c_int]),
+                ("PQftype", ctypes.c_uint, [PGresult, ctypes.c_int]),
+                ("PQgetvalue", ctypes.c_char_p, [PGresult, ctypes.c_int, ctypes.c_int]),
+                ("PQgetisnull", ctypes.c_int, [PGresult, ctypes.c_int, ctypes.c_int]),
+                ("PQcmdTuples", ctypes.c_char_p, [PGresult]),
+                ("PQresultErrorField", ctypes.c_char_p, [PGresult, ctypes.c_int]),
+                ("PQresultErrorMessage", ctypes.c_char_p, [PGresult]),
+                ("PQerrorMessage", ctypes.c_char_p, [PGconn])):
+            function = getattr(libpq, name)
+            function.restype = result
+            function.argtypes = arguments
+        _libpq = libpq
+        return _libpq
+
+
+# True if run can send statements in pipeline mode, otherwise DBConnector.executePipelined runs them one by one
+def supported() -> bool:
+    return _loadLibpq() is not None
+
+
+# why run cannot send statements in pipeline mode here, None if it can
+def unsupportedReason() -> Optional[str]:
+    _loadLibpq()
+    return _unsupported
+
+
+# a parameter in the text format of PostgreSQL, lists and tuples as arrays
+def _text(value, encoding: str):
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return b"t" if value else b"f"
+    if isinstance(value, (list, tuple)):
+        return ("{" + ",".join("NULL" if element is None else
+                               '"' + str(element).replace("\\", "\\\\").replace('"', '\\"') + '"'
+                               for element in value) + "}").encode(encoding)
+    return str(value).encode(encoding)
+
+
+# sends the operations of connection in pipeline mode, BATCH_SIZE operations per round trip. an operation is a
+# list of (name, query, params) prepared statements run in one implicit transaction: it ends with a sync
+# point, so it is committed on its own and a failure rolls back only its statements.
+# returns, per operation, a list of (rows effected, ResultSet) per statement or the DatabaseException of the
+# statement that failed. resultSet builds a ResultSet from (description, rows).
+# the connection must not be in a transaction; statements are prepared on it like by executePrepared
+def run(connection, operations: list, resultSet, cursor) -> list:
+    libpq = _loadLibpq()
+    if libpq is None:
+        raise NotImplementedError("Pipeline mode is not supported: " + _unsupported)
+    conn = ctypes.c_void_p(connection.pgconn_ptr)
+    encoding = extensions.encodings.get(connection.encoding, "utf_8")
+    if not libpq.PQenterPipelineMode(conn):
+        raise DatabaseException.ConnectionInvalid(_message(libpq.PQerrorMessage(conn)))
+    outcomes = []
+    try:
+        for batch in _batches(operations):
+            # the statements missing from the connection are prepared first, in a segment of their own,
+            # so the failure of an operation cannot skip a statement the next ones need
+            prepares = _sendPrepares(libpq, conn, connection, batch, encoding)
+            for operation in batch:
+                for name, _, params in operation:
+                    values = (ctypes.c_char_p * len(params))(*(_text(value, encoding) for value in params))
+                    _check(libpq, conn, libpq.PQsendQueryPrepared(conn, name.encode(encoding), len(params), values,
+                                                                  None, None, 0))
+                _check(libpq, conn, libpq.PQpipelineSync(conn))
+            _receivePrepares(libpq, conn, connection, prepares)
+            for operation in batch:
+                outcomes.append(_receive(libpq, conn, len(operation), encoding, resultSet, cursor))
+    except BaseException:
+        # the results left are lost, the connection cannot be used anymore
+        connection.close()
+        raise
+    if not libpq.PQexitPipelineMode(conn):
+        connection.close()
+        raise DatabaseException.ConnectionInvalid(_message(libpq.PQerrorMessage(conn)))
+    return outcomes
+
+
+# up to BATCH_SIZE operations at a time, a name is prepared for a single query in a batch
+def _batches(operations: list):
+    batch, queries = [], {}
+    for operation in operations:
+        if len(batch) == BATCH_SIZE or any(queries.get(name, query) != query for name, query, _ in operation):
+            yield batch
+            batch, queries = [], {}
+        batch.append(operation)
+        queries.update((name, query) for name, query, _ in operation)
+    if batch:
+        yield batch
+
+
+# queues a DEALLOCATE (for a name reused with another query) and a prepare per statement missing from the
+# connection, and a sync point. returns the commands sent, ("deallocate", name) or ("prepare", name, query)
+def _sendPrepares(libpq, conn, connection, batch: list, encoding: str) -> list:
+    commands = []
+    queued = {}
+    for operation in batch:
+        for name, query, _ in operation:
+            if connection.prepared.get(name) == query or name in queued:
+                continue
+            queued[name] = query
+            if name in connection.prepared:
+                del connection.prepared[name]
+                _check(libpq, conn, libpq.PQsendQueryParams(
+                    conn, ('DEALLOCATE "' + name + '"').encode(encoding), 0, None, None, None, None, 0))
+                commands.append(("deallocate", name))
+            _check(libpq, conn, libpq.PQsendPrepare(conn, name.encode(encoding), query.encode(encoding), 0, None))
+            commands.append(("prepare", name, query))
+    if commands:
+        _check(libpq, conn, libpq.PQpipelineSync(conn))
+    return commands
+
+
+def _receivePrepares(libpq, conn, connection, commands: list):
+    if not commands:
+        return
+    for command in commands:
+        result = _next(libpq, conn)
+        try:
+            # a statement that cannot be prepared fails every operation using it
+            if command[0] == "prepare" and libpq.PQresultStatus(result) == _COMMAND_OK:
+                connection.prepared[command[1]] = command[2]
+        finally:
+            libpq.PQclear(result)
+    _sync(libpq, conn)
+
+
+# reads the results of the statements of one operation and its sync point
+def _receive(libpq, conn, statements: int, encoding: str, resultSet, cursor):
+    results = []
+    error = None
+    for _ in range(statements):
+        result = _next(libpq, conn)
+        try:
+            status = libpq.PQresultStatus(result)
+            if status in (_COMMAND_OK, _TUPLES_OK):
+                results.append(_result(libpq, result, encoding, resultSet, cursor))
+            elif status != _PIPELINE_ABORTED and error is None:
+                error = _error(libpq, result)
+        finally:
+            libpq.PQclear(result)
+    _sync(libpq, conn)
+    return results if error is None else error
+
+
+# the result of the next command, the NULL that ends it is read too
+def _next(libpq, conn):
+    result = libpq.PQgetResult(conn)
+    if not result:
+        raise DatabaseException.ConnectionInvalid(_message(libpq.PQerrorMessage(conn)))
+    end = libpq.PQgetResult(conn)
+    if end:
+        libpq.PQclear(end)
+        libpq.PQclear(result)
+        raise DatabaseException.ConnectionInvalid("Unexpected result in pipeline")
+    return result
+
+
+def _sync(libpq, conn):
+    result = libpq.PQgetResult(conn)
+    try:
+        if not result or libpq.PQresultStatus(result) != _PIPELINE_SYNC:
+            raise DatabaseException.ConnectionInvalid("Pipeline out of sync")
+    finally:
+        if result:
+            libpq.PQclear(result)
+
+
+def _check(libpq, conn, sent: int):
+    if not sent:
+        raise DatabaseException.ConnectionInvalid(_message(libpq.PQerrorMessage(conn)))
+
+
+def _message(message: bytes) -> str:
+    return (message or b"").decode(errors="replace").strip()
+
+
+def _error(libpq, result) -> Exception:
+    sqlstate = _message(libpq.PQresultErrorField(result, _PG_DIAG_SQLSTATE))
+    if sqlstate in _ERRORS:
+        return _ERRORS[sqlstate](_ERRORS[sqlstate].__name__)
+    return DatabaseException.UNKNOWN_ERROR(_message(libpq.PQresultErrorMessage(result)))
+
+
+# (rows effected, ResultSet), the values cast by the typecasters psycopg2 uses for their types
+def _result(libpq, result, encoding: str, resultSet, cursor) -> tuple:
+    count = libpq.PQcmdTuples(result)
+    rows_effected = int(count) if count else 0
+    fields = libpq.PQnfields(result)
+    if fields == 0:
+        return rows_effected, resultSet(None, None)
+    casters = [extensions.string_types.get(libpq.PQftype(result, field)) for field in range(fields)]
+    description = [_Attribute(libpq.PQfname(result, field).decode(encoding)) for field in range(fields)]
+    rows = []
+    for row in range(libpq.PQntuples(result)):
+        values = []
+        for field, caster in enumerate(casters):
+            if libpq.PQgetisnull(result, row, field):
+                values.append(None)
+                continue
+            value = libpq.PQgetvalue(result, row, field).decode(encoding)
+            values.append(value if caster is None else caster(value, cursor))
+        rows.append(tuple(values))
+    return rows_effected, resultSet(description, rows)
@@ -0,0 +1,138 @@
+import atexit
+import json
+import os
+import statistics
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Optional
+
+# when set to a path, the plans of the whole process are captured and written there when it exits
+CAPTURE_ENV = "SOLUTION_EXPLAIN"
+
+# read by DBConnector.executePrepared, set by capture or CAPTURE_ENV
+enabled = False
+
+# "function statement params" -> {function, statement, params, runs, plan}, the plan of the last run
+plans = {}
+# record runs on the threads of the Solution calls, every use of plans here holds it
+_lock = threading.Lock()
+
+
+# capture the plans of the statements run by Solution functions inside the block, optionally written to path.
+# every prepared statement is run once more under EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) inside a savepoint
+# that is rolled back, so writes are not applied twice. cached lookups (see Utility.Cache) run no statement
+@contextmanager
+def capture(path: Optional[str] = None):
+    global enabled
+    previous, enabled = enabled, True
+    try:
+        yield plans
+    finally:
+        enabled = previous
+        if path is not None:
+            save(path)
+
+
+def reset():
+    with _lock:
+        plans.clear()
+
+
+def record(function: str, statement: str, params, plan: dict):
+    params = json.loads(json.dumps(list(params), default=str))
+    key = function + " " + statement + " " + json.dumps(params)
+    with _lock:
+        runs = plans[key]["runs"] if key in plans else 0
+        plans[key] = {"function": function, "statement": statement, "params": params, "runs": runs + 1, "plan": plan}
+
+
+def save(path: str, captured: dict = None):
+    if captured is None:
+        with _lock:
+            captured = dict(plans)
+    with open(path, "w") as file:
+        json.dump(captured, file, indent=2, sort_keys=True)
+
+
+def load(path: str) -> dict:
+    with open(path) as file:
+        return json.load(file)
+
+
+# the plan as indented node lines, without costs, timings or row counts
+def outline(plan: dict) -> tuple:
+    lines = []
+
+    def visit(node: dict, depth: int):
+        line = node["Node Type"]
+        if "Strategy" in node:
+            line += " " + node["Strategy"]
+        if "Join Type" in node and node["Node Type"] != "Hash":
+            line += " " + node["Join Type"]
+        if "Index Name" in node:
+            line += " using " + node["Index Name"]
+        elif "Relation Name" in node:
+            line += " on " + node["Relation Name"]
+        lines.append("  " * depth + line)
+        for child in node.get("Plans", ()):
+            visit(child, depth + 1)
+
+    visit(plan["Plan"], 0)
+    return tuple(lines)
+
+
+# per (function, statement): how often each outline was seen, the execution times and the shared buffers used
+def _byStatement(captured: dict) -> dict:
+    statements = {}
+    for entry in captured.values():
+        plan = entry["plan"]
+        statement = statements.setdefault((entry["function"], entry["statement"]),
+                                          {"outlines": Counter(), "execution_ms": [], "buffers": []})
+        statement["outlines"][outline(plan)] += 1
+        statement["execution_ms"].append(plan.get("Execution Time", 0.0))
+        statement["buffers"].append(plan["Plan"].get("Shared Hit Blocks", 0) +
+                                    plan["Plan"].get("Shared Read Blocks", 0))
+    return statements
+
+
+# the statements of two captures side by side: status is "changed" when the most common outline differs,
+# "same", "added" or "removed". times are the median execution time, buffers the median shared blocks
+def comparePlans(before: dict, after: dict) -> list:
+    old, new = _byStatement(before), _byStatement(after)
+    changes = []
+    for key in sorted(set(old) | set(new), key=str):
+        change = {"function": key[0], "statement": key[1]}
+        for side, statements in (("before", old), ("after", new)):
+            statement = statements.get(key)
+            if statement is not None:
+                change[side + "_outline"] = statement["outlines"].most_common(1)[0][0]
+                change[side + "_ms"] = statistics.median(statement["execution_ms"])
+                change[side + "_buffers"] = statistics.median(statement["buffers"])
+        if key not in old:
+            change["status"] = "added"
+        elif key not in new:
+            change["status"] = "removed"
+        else:
+            change["status"] = "changed" if change["before_outline"] != change["after_outline"] else "same"
+        changes.append(change)
+    return changes
+
+
+# prints comparePlans, the outlines of the changed statements in full
+def summarise(before: dict, after: dict, stream=sys.stdout):
+    for change in comparePlans(before, after):
+        line = "{:<8}{} {}".format(change["status"], change["function"], change["statement"])
+        if change["status"] in ("same", "changed"):
+            line += "  {:.3f}ms -> {:.3f}ms  buffers {:g} -> {:g}".format(
+                change["before_ms"], change["after_ms"], change["before_buffers"], change["after_buffers"])
+        stream.write(line + "\n")
+        if change["status"] == "changed":
+            stream.write("  before:\n" + "".join("    " + node + "\n" for node in change["before_outline"]))
+            stream.write("  after:\n" + "".join("    " + node + "\n" for node in change["after_outline"]))
+
+
+if os.environ.get(CAPTURE_ENV):
+    enabled = True
+    atexit.register(save, os.environ[CAPTURE_ENV])
@@ -0,0 +1,242 @@
+import collections
+import itertools
+import os
+import sqlite3
+import threading
+from configparser import ConfigParser
+from contextlib import contextmanager
+from typing import Iterable, Tuple, Union
+from Utility.DBConnector import ResultSet
+from Utility.Exceptions import DatabaseException
+
+# the [sqlite] section of database.ini: the database file and the pragmas set on every connection.
+# WAL lets readers run next to the writer and commits append to the log instead of rewriting pages,
+# synchronous=NORMAL then only syncs at checkpoints, a negative cache_size is in KiB
+SQLITE_DEFAULTS = {
+    'path': 'cs236363.db',
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -65536,
+    'mmap_size': 268435456,
+    'temp_store': 'MEMORY',
+    'busy_timeout': 30000,
+}
+
+# statements sqlite3 keeps compiled per connection, every statement of SQLiteSolution fits
+CACHED_STATEMENTS = 256
+
+_settings = {}
+_generation = 0
+_lock = threading.Lock()
+
+# the connection of each thread, and its open session
+_local = threading.local()
+
+# a column of a ResultSet built from cursor.description
+_Attribute = collections.namedtuple('_Attribute', ['name'])
+
+
+# override settings of the [sqlite] section for the connections opened from now on, every thread reconnects
+def configureSQLite(**settings):
+    global _generation
+    unknown = set(settings) - set(SQLITE_DEFAULTS)
+    if unknown:
+        raise ValueError("Unknown SQLite settings: " + ", ".join(sorted(unknown)))
+    with _lock:
+        _settings.update(settings)
+        _generation += 1
+
+
+# the [sqlite] section of database.ini overridden by configureSQLite, every key missing keeps its default
+def sqliteConfig(section='sqlite') -> dict:
+    parser = ConfigParser()
+    parser.read([os.path.join(os.path.join(os.path.dirname(os.getcwd()), 'Utility'), 'database.ini'),
+                 os.path.join(os.path.join(os.getcwd(), "Utility"), 'database.ini')])
+    settings = dict(SQLITE_DEFAULTS)
+    if parser.has_section(section):
+        for key, value in parser.items(section):
+            if key in settings:
+                settings[key] = value
+    settings.update(_settings)
+    return settings
+
+
+# the connection of this thread, opened on first use and after configureSQLite
+def connection() -> sqlite3.Connection:
+    conn = getattr(_local, 'connection', None)
+    if conn is not None and _local.generation == _generation and _local.pid == os.getpid():
+        return conn
+    if conn is not None and _local.pid == os.getpid():
+        conn.close()
+    settings = sqliteConfig()
+    try:
+        # transactions are begun and ended explicitly
+        conn = sqlite3.connect(settings['path'], isolation_level=None, check_same_thread=False,
+                               cached_statements=CACHED_STATEMENTS)
+        for pragma in ('journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'temp_store', 'busy_timeout'):
+            conn.execute("PRAGMA " + pragma + " = " + str(settings[pragma]))
+        conn.execute("PRAGMA foreign_keys = ON")
+    except sqlite3.Error as e:
+        raise DatabaseException.ConnectionInvalid("Could not open " + settings['path'] + ": " + str(e))
+    _local.connection, _local.generation, _local.pid = conn, _generation, os.getpid()
+    _local.session = None
+    return conn
+
+
+# close the connection of this thread
+def closeConnection():
+    conn = getattr(_local, 'connection', None)
+    if conn is not None and _local.pid == os.getpid():
+        conn.close()
+    _local.connection = None
+    _local.session = None
+
+
+# raise the DatabaseException matching the constraint SQLite reports
+@contextmanager
+def _translateErrors():
+    try:
+        yield
+    except sqlite3.IntegrityError as e:
+        message = str(e)
+        if message.startswith("NOT NULL"):
+            raise DatabaseException.NOT_NULL_VIOLATION("NOT_NULL_VIOLATION")
+        if message.startswith("FOREIGN KEY"):
+            raise DatabaseException.FOREIGN_KEY_VIOLATION("FOREIGN_KEY_VIOLATION")
+        if message.startswith("UNIQUE"):
+            raise DatabaseException.UNIQUE_VIOLATION("UNIQUE_VIOLATION")
+        if message.startswith("CHECK"):
+            raise DatabaseException.CHECK_VIOLATION("CHECK_VIOLATION")
+        raise
+
+
+# the SQLite counterpart of DBConnector.Session: every SQLiteConnector created on this thread inside the block
+# is a step in a savepoint of one transaction, committed when the block ends (rolled back if it raises)
+class Session:
+    def __init__(self):
+        self.connection = None
+        self.__outer = None
+        self.__savepoint = None
+        self.__savepoints = itertools.count()
+
+    def __enter__(self):
+        self.connection = connection()
+        self.__outer = _local.session
+        if self.__outer is not None:
+            self.__savepoint = self.savepoint()
+        else:
+            _execute(self.connection, "BEGIN")
+        _local.session = self
+        return self
+
+    def __exit__(self, kind, error, traceback):
+        _local.session = self.__outer
+        if self.__outer is not None:
+            self.release(self.__savepoint, rollback=error is not None)
+        elif error is None:
+            _execute(self.connection, "COMMIT")
+        else:
+            _execute(self.connection, "ROLLBACK")
+        return False
+
+    # commit what the session did so far, it goes on in a new transaction
+    def commit(self):
+        if self.__outer is not None:
+            return self.__outer.commit()
+        _execute(self.connection, "COMMIT")
+        _execute(self.connection, "BEGIN")
+
+    # roll back what the session did so far, it goes on in a new transaction
+    def rollback(self):
+        if self.__outer is not None:
+            return self.__outer.rollback()
+        _execute(self.connection, "ROLLBACK")
+        _execute(self.connection, "BEGIN")
+
+    # starts a step, returns the name of its savepoint
+    def savepoint(self) -> str:
+        if self.__outer is not None:
+            return self.__outer.savepoint()
+        name = "step_" + str(next(self.__savepoints))
+        _execute(self.connection, "SAVEPOINT " + name)
+        return name
+
+    # ends the step started by savepoint, keeping its changes or rolling them back
+    def release(self, name: str, rollback=False):
+        if rollback:
+            _execute(self.connection, "ROLLBACK TO SAVEPOINT " + name)
+        _execute(self.connection, "RELEASE SAVEPOINT " + name)
+
+
+def _execute(conn: sqlite3.Connection, statement: str):
+    try:
+        conn.execute(statement)
+    except sqlite3.Error as e:
+        raise DatabaseException.ConnectionInvalid(str(e))
+
+
+# the DBConnector of SQLiteSolution, on the connection of the thread: opens a transaction (a savepoint inside a
+# Session) that commit ends, close rolls back whatever was not committed.
+# statements use ?1, ?2, ... for their parameters, sqlite3 keeps them compiled like prepared statements
+class SQLiteConnector:
+    def __init__(self):
+        self.connection = connection()
+        self.__session = _local.session
+        self.__step = None
+        if self.__session is not None:
+            self.__step = self.__session.savepoint()
+        else:
+            _execute(self.connection, "BEGIN")
+        self.__open = True
+
+    def close(self):
+        if self.__open:
+            self.rollback()
+
+    def commit(self):
+        if not self.__open:
+            return
+        self.__open = False
+        if self.__session is not None:
+            self.__session.release(self.__step)
+        else:
+            _execute(self.connection, "COMMIT")
+
+    def rollback(self):
+        if not self.__open:
+            return
+        self.__open = False
+        if self.__session is not None:
+            self.__session.release(self.__step, rollback=True)
+        else:
+            _execute(self.connection, "ROLLBACK")
+
+    # returns the number of rows effected (or selected) and a ResultSet, like DBConnector.executePrepared
+    def execute(self, query: str, params=(), printSchema=False) -> Tuple[int, ResultSet]:
+        with _translateErrors():
+            cursor = self.connection.execute(query, params)
+            rows = cursor.fetchall()
+        if cursor.description is None:
+            entries = ResultSet()
+        else:
+            entries = ResultSet([_Attribute(column[0]) for column in cursor.description], rows)
+        if printSchema:
+            print(entries)
+        return (cursor.rowcount if cursor.rowcount >= 0 else len(rows)), entries
+
+    # runs query once per row of params, returns the number of rows effected
+    def executeMany(self, query: str, params: Iterable[Union[tuple, list]]) -> int:
+        with _translateErrors():
+            return max(self.connection.executemany(query, params).rowcount, 0)
+
+    # runs the ;-separated statements of script in the transaction
+    def executeScript(self, script: str):
+        with _translateErrors():
+            for statement in script.split(";"):
+                if statement.strip():
+                    self.connection.execute(statement)
+
+
+# the Session open on this thread, None outside of a session
+def currentSession() -> Union[Session, None]:
+    return getattr(_local, 'session', None)